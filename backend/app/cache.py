@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.env import env_number
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+
+# Seconds a response stays valid, per calling tool. Infrastructure snapshots
+# go stale quickly; analyses of a fixed log/commit/incident text do not.
+# Override with LLM_CACHE_TTL_<TOOL> (e.g. LLM_CACHE_TTL_SCAN_INFRASTRUCTURE=30).
+DEFAULT_TTLS = {
+    "default": 300,
+    "scan_infrastructure": 60,
+    "correlate_alerts": 120,
+    "estimate_gcp_cost": 900,
+    "analyze_heavy_logs": 1800,
+    "analyze_log_patterns": 600,
+    "generate_diagnosis": 1800,
+    "generate_hypothesis": 1800,
+    "generate_remediation_plan": 1800,
+    "generate_code_fix": 3600,
+}
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM responses.
+    Two tiers: an in-process LRU for hot prompts and a SQLite table that
+    survives restarts and is shared by every worker on the host.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = 512):
+        self.path = path
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_path = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0,
+                       "misses": 0, "bypassed": 0, "stores": 0}
+
+    @staticmethod
+    def make_key(model: str, system_instruction, prompt, extra=None) -> str:
+        """Hashes (model, system instruction, prompt[, extra]) into a cache key."""
+        payload = json.dumps(
+            [str(model), system_instruction, prompt, extra],
+            sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def ttl_for(tool: str) -> int:
+        return env_number(f"LLM_CACHE_TTL_{tool.upper()}",
+                          DEFAULT_TTLS.get(tool, DEFAULT_TTLS["default"]))
+
+    @staticmethod
+    def bypassed(bypass: bool = False) -> bool:
+        return bypass or os.getenv(
+            "LLM_CACHE_BYPASS", "false").lower() == "true"
+
+    def _db(self):
+        # Caller holds self._lock.
+        if self._conn is None or self._conn_path != self.path:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, tool TEXT, value TEXT, expires_at REAL)")
+            self._conn_path = self.path
+        return self._conn
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            try:
+                row = self._db().execute(
+                    "SELECT value, expires_at FROM llm_responses WHERE key = ?",
+                    (key,)).fetchone()
+            except sqlite3.Error:
+                row = None
+
+            if row and row[1] > now:
+                self._remember(key, row[0], row[1])
+                self._stats["disk_hits"] += 1
+                return row[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str, tool: str = "default"):
+        if not isinstance(value, str) or not value:
+            return
+        ttl = self.ttl_for(tool)
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._stats["stores"] += 1
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?)",
+                    (key, tool, value, expires_at))
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: LLM cache write failed: {e}")
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def record_bypass(self):
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def purge_expired(self) -> int:
+        """Deletes expired rows from the persistent tier."""
+        with self._lock:
+            try:
+                db = self._db()
+                cur = db.execute(
+                    "DELETE FROM llm_responses WHERE expires_at <= ?", (time.time(),))
+                db.commit()
+                return cur.rowcount
+            except sqlite3.Error:
+                return 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["memory_entries"] = len(self._memory)
+        lookups = s["memory_hits"] + s["disk_hits"] + s["misses"]
+        s["hit_ratio"] = round(
+            (s["memory_hits"] + s["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return s
+
+    def clear(self):
+        """Drops both tiers."""
+        with self._lock:
+            self._memory.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+            try:
+                db = self._db()
+                db.execute("DELETE FROM llm_responses")
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+
+response_cache = ResponseCache(
+    max_entries=env_number("LLM_CACHE_MAX_ENTRIES", 512))
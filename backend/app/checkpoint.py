@@ -0,0 +1,366 @@
+import asyncio
+import importlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.env import env_number
+
+# "sqlite" (default), "memory", or "package.module:factory" for a custom saver.
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite")
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "./checkpoints.db")
+# Threads untouched for this long are deleted (default 7 days; 0 keeps them forever).
+CHECKPOINT_TTL_SECONDS = env_number("CHECKPOINT_TTL_SECONDS", 7 * 24 * 3600)
+# Checkpoints kept per thread; older ones are compacted away on write.
+CHECKPOINT_KEEP_LAST = env_number("CHECKPOINT_KEEP_LAST", 20)
+# In-process LRU of deserialized checkpoints, capped by count and serialized size.
+CHECKPOINT_CACHE_MAX_ENTRIES = env_number("CHECKPOINT_CACHE_MAX_ENTRIES", 256)
+CHECKPOINT_CACHE_MAX_BYTES = env_number("CHECKPOINT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+_PURGE_EVERY_PUTS = 500
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    Disk-backed LangGraph checkpointer.
+    Checkpoints live in a SQLite file (WAL mode), so paused approvals survive
+    restarts and are visible to every uvicorn worker on the host. Hot
+    checkpoints are kept deserialized in a bounded LRU; the latest checkpoint
+    id is always read from disk, so another worker's writes are never missed.
+    Each thread keeps its last `keep_last` checkpoints and expires after
+    `ttl` seconds without writes.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH, ttl: int = CHECKPOINT_TTL_SECONDS,
+                 keep_last: int = CHECKPOINT_KEEP_LAST,
+                 max_entries: int = CHECKPOINT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = CHECKPOINT_CACHE_MAX_BYTES, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        self.ttl = ttl
+        self.keep_last = keep_last
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._hot = OrderedDict()  # (thread, ns, id) -> (checkpoint, metadata, parent, size)
+        self._hot_bytes = 0
+        self._lock = threading.RLock()
+        self._conn = None
+        self._puts_since_purge = 0
+        self._stats = {"hot_hits": 0, "disk_reads": 0, "puts": 0, "writes": 0,
+                       "compacted": 0, "expired_threads": 0, "evictions": 0}
+
+    def _db(self):
+        # Caller holds self._lock.
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT,"
+                " parent_checkpoint_id TEXT, type TEXT, checkpoint BLOB,"
+                " metadata_type TEXT, metadata BLOB,"
+                " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id));"
+                "CREATE TABLE IF NOT EXISTS writes ("
+                " thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT,"
+                " task_id TEXT, idx INTEGER, channel TEXT, type TEXT, value BLOB,"
+                " task_path TEXT,"
+                " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx));"
+                "CREATE TABLE IF NOT EXISTS threads ("
+                " thread_id TEXT PRIMARY KEY, updated_at REAL);"
+                "CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);")
+            self._purge_expired_locked()
+        return self._conn
+
+    # -- hot cache -------------------------------------------------------
+
+    def _remember(self, key, entry):
+        old = self._hot.pop(key, None)
+        if old is not None:
+            self._hot_bytes -= old[3]
+        self._hot[key] = entry
+        self._hot_bytes += entry[3]
+        while self._hot and (len(self._hot) > self.max_entries or self._hot_bytes > self.max_bytes):
+            _, evicted = self._hot.popitem(last=False)
+            self._hot_bytes -= evicted[3]
+            self._stats["evictions"] += 1
+
+    def _forget(self, predicate):
+        for key in [k for k in self._hot if predicate(k)]:
+            self._hot_bytes -= self._hot.pop(key)[3]
+
+    def _load(self, thread_id, checkpoint_ns, checkpoint_id, row=None):
+        # Caller holds self._lock. Returns (checkpoint, metadata, parent) or None.
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        entry = self._hot.get(key)
+        if entry is not None:
+            self._hot.move_to_end(key)
+            self._stats["hot_hits"] += 1
+            return entry[:3]
+
+        if row is None:
+            row = self._db().execute(
+                "SELECT parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+                " FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                key).fetchone()
+            if row is None:
+                return None
+        parent, type_, blob, metadata_type, metadata_blob = row
+        entry = (self.serde.loads_typed((type_, blob)),
+                 self.serde.loads_typed((metadata_type, metadata_blob)),
+                 parent, len(blob))
+        self._stats["disk_reads"] += 1
+        self._remember(key, entry)
+        return entry[:3]
+
+    def _pending_writes(self, thread_id, checkpoint_ns, checkpoint_id):
+        rows = self._db().execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        rows.sort(key=lambda r: writes_sort_key(r[5], r[0], r[1]))
+        return [(task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, _, channel, type_, value, _ in rows]
+
+    def _tuple(self, thread_id, checkpoint_ns, checkpoint_id, loaded):
+        checkpoint, metadata, parent = loaded
+        # Shallow copies: cached entries are shared between callers.
+        checkpoint = {**checkpoint,
+                      "channel_values": dict(checkpoint["channel_values"]),
+                      "channel_versions": dict(checkpoint["channel_versions"]),
+                      "versions_seen": {k: dict(v) for k, v in checkpoint["versions_seen"].items()}}
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint=checkpoint,
+            metadata=dict(metadata),
+            parent_config=({"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                             "checkpoint_id": parent}} if parent else None),
+            pending_writes=self._pending_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    # -- BaseCheckpointSaver ---------------------------------------------
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            checkpoint_id = get_checkpoint_id(config)
+            if not checkpoint_id:
+                row = self._db().execute(
+                    "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+                    " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns)).fetchone()
+                if row is None:
+                    return None
+                checkpoint_id = row[0]
+            loaded = self._load(thread_id, checkpoint_ns, checkpoint_id)
+            if loaded is None:
+                return None
+            return self._tuple(thread_id, checkpoint_ns, checkpoint_id, loaded)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints"
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            keys = self._db().execute(query, params).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, checkpoint_id in keys:
+                if limit is not None and len(results) >= limit:
+                    break
+                loaded = self._load(thread_id, checkpoint_ns, checkpoint_id)
+                if loaded is None:
+                    continue
+                if filter and not all(loaded[1].get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(self._tuple(thread_id, checkpoint_ns, checkpoint_id, loaded))
+        yield from results
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent = config["configurable"].get("checkpoint_id")
+        metadata = get_checkpoint_metadata(config, metadata)
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(metadata)
+
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], parent, type_, blob,
+                     metadata_type, metadata_blob))
+                db.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+                self._compact(db, thread_id, checkpoint_ns)
+            self._remember((thread_id, checkpoint_ns, checkpoint["id"]),
+                           (checkpoint, metadata, parent, len(blob)))
+            self._stats["puts"] += 1
+            self._puts_since_purge += 1
+            if self._puts_since_purge >= _PURGE_EVERY_PUTS:
+                self._purge_expired_locked()
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special channels (errors, interrupts) overwrite; regular writes are idempotent.
+        verb = "INSERT OR REPLACE" if all(c in WRITES_IDX_MAP for c, _ in writes) else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id,
+                         WRITES_IDX_MAP.get(channel, idx), channel, type_, blob, task_path))
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._stats["writes"] += len(rows)
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            db = self._db()
+            with db:
+                for table in ("checkpoints", "writes", "threads"):
+                    db.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._forget(lambda key: key[0] == thread_id)
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in results:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current, channel):
+        # Same scheme as MemorySaver: monotonically increasing, unique per write.
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # -- maintenance -----------------------------------------------------
+
+    def _compact(self, db, thread_id, checkpoint_ns):
+        # Caller holds self._lock, inside a transaction.
+        if self.keep_last <= 0:
+            return
+        row = db.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+            " ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last - 1)).fetchone()
+        if row is None:
+            return
+        cutoff = row[0]
+        cur = db.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, cutoff))
+        db.execute(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, cutoff))
+        if cur.rowcount:
+            self._stats["compacted"] += cur.rowcount
+            self._forget(lambda key: key[0] == thread_id and key[1] == checkpoint_ns and key[2] < cutoff)
+
+    def _purge_expired_locked(self) -> int:
+        self._puts_since_purge = 0
+        if self.ttl <= 0:
+            return 0
+        db = self._conn
+        expired = [r[0] for r in db.execute(
+            "SELECT thread_id FROM threads WHERE updated_at < ?", (time.time() - self.ttl,))]
+        if expired:
+            with db:
+                for table in ("checkpoints", "writes", "threads"):
+                    db.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in expired])
+            expired_set = set(expired)
+            self._forget(lambda key: key[0] in expired_set)
+            self._stats["expired_threads"] += len(expired)
+        return len(expired)
+
+    def purge_expired(self) -> int:
+        """Deletes threads that have not been written to within the TTL."""
+        with self._lock:
+            self._db()
+            return self._purge_expired_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["hot_entries"] = len(self._hot)
+            s["hot_bytes"] = self._hot_bytes
+        s["backend"] = "sqlite"
+        return s
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._hot.clear()
+            self._hot_bytes = 0
+
+
+def get_checkpointer(backend: str = None):
+    """Builds the graph checkpointer selected by CHECKPOINT_BACKEND."""
+    backend = backend or CHECKPOINT_BACKEND
+    if backend == "sqlite":
+        return SQLiteCheckpointer()
+    if backend == "memory":
+        return MemorySaver()
+    module_name, _, factory = backend.partition(":")
+    if not factory:
+        raise ValueError(
+            f"Unknown CHECKPOINT_BACKEND {backend!r}: use 'sqlite', 'memory' or 'module:factory'.")
+    return getattr(importlib.import_module(module_name), factory)()
+
+
+def get_checkpointer_stats(checkpointer) -> dict:
+    if hasattr(checkpointer, "stats"):
+        return checkpointer.stats()
+    return {"backend": type(checkpointer).__name__}
@@ -0,0 +1,187 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.env import env_number
+
+# Rough budget for the conversation part of a prompt (system prompts excluded).
+CONTEXT_TOKEN_BUDGET = env_number("CONTEXT_TOKEN_BUDGET", 6000)
+# Number of most recent messages always passed verbatim.
+CONTEXT_KEEP_RECENT = env_number("CONTEXT_KEEP_RECENT", 6)
+# Older messages below this size are left untouched.
+SUMMARY_THRESHOLD_CHARS = 1200
+
+_SIGNAL = re.compile(
+    r"error|fail|exception|critical|warn|timeout|refused|oom|crash|denied|unhealthy",
+    re.IGNORECASE)
+
+
+def estimate_tokens(messages) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return sum(len(_text(m)) for m in messages) // 4
+
+
+def _text(message) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return str(content)
+
+
+def _summarize(text: str, label: str) -> str:
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    head = text[:240].replace("\n", " ").strip()
+    signals = []
+    for line in lines:
+        if _SIGNAL.search(line) and line[:160] not in signals:
+            signals.append(line[:160])
+        if len(signals) == 5:
+            break
+
+    summary = (f"[Compacted {label}: {len(text):,} chars, {len(lines)} lines. "
+               f"Full output is kept in the thread history.]\n{head}...")
+    if signals:
+        summary += "\nKey lines:\n" + "\n".join(f"- {s}" for s in signals)
+    return summary
+
+
+class ContextCompactor:
+    """
+    Keeps the messages sent to an LLM within a token budget.
+    The latest turns pass verbatim; older large tool outputs and messages are
+    replaced by short summaries (cached by content hash, so each is computed
+    once), and if that is not enough the oldest turns are dropped. Tool
+    results the model has not answered yet are always passed verbatim.
+    The graph state itself is never modified.
+    """
+
+    def __init__(self, budget: int = None, keep_recent: int = None,
+                 max_cached: int = 1024):
+        self.budget = budget if budget is not None else CONTEXT_TOKEN_BUDGET
+        self.keep_recent = keep_recent if keep_recent is not None else CONTEXT_KEEP_RECENT
+        self.max_cached = max_cached
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "compacted": 0, "summary_hits": 0,
+                       "summary_misses": 0, "dropped_messages": 0,
+                       "tokens_in": 0, "tokens_out": 0}
+
+    def summary_for(self, text: str, label: str) -> str:
+        key = hashlib.sha256(f"{label}\0{text}".encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._summaries.get(key)
+            if cached is not None:
+                self._summaries.move_to_end(key)
+                self._stats["summary_hits"] += 1
+                return cached
+            self._stats["summary_misses"] += 1
+
+        summary = _summarize(text, label)
+        with self._lock:
+            self._summaries[key] = summary
+            while len(self._summaries) > self.max_cached:
+                self._summaries.popitem(last=False)
+        return summary
+
+    def _shrink(self, message):
+        text = _text(message)
+        if len(text) <= SUMMARY_THRESHOLD_CHARS:
+            return message
+        if isinstance(message, ToolMessage):
+            # Tool results must keep their tool_call_id to stay paired with the
+            # AIMessage that requested them.
+            label = f"output of tool '{message.name or 'unknown'}'"
+            return ToolMessage(content=self.summary_for(text, label),
+                               tool_call_id=message.tool_call_id,
+                               name=message.name)
+        if isinstance(message, AIMessage):
+            label = f"message from {message.name or 'assistant'}"
+            return AIMessage(content=self.summary_for(text, label),
+                             name=message.name,
+                             tool_calls=message.tool_calls)
+        if isinstance(message, HumanMessage):
+            return HumanMessage(content=self.summary_for(text, "user message"))
+        return message
+
+    def _recent_start(self, messages) -> int:
+        start = max(0, len(messages) - self.keep_recent)
+        # Never start the verbatim window on a tool result whose request was cut.
+        while start > 0 and isinstance(messages[start], ToolMessage):
+            start -= 1
+        return start
+
+    def compact(self, messages):
+        messages = list(messages)
+        tokens_in = estimate_tokens(messages)
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["tokens_in"] += tokens_in
+        if tokens_in <= self.budget:
+            with self._lock:
+                self._stats["tokens_out"] += tokens_in
+            return messages
+
+        start = self._recent_start(messages)
+        older = [self._shrink(m) for m in messages[:start]]
+        recent = messages[start:]
+        compacted = older + recent
+
+        # Still too large: drop the oldest turns, but keep the original request.
+        dropped = 0
+        anchor = 1 if older and isinstance(older[0], HumanMessage) else 0
+        while estimate_tokens(compacted) > self.budget and len(compacted) - len(recent) > anchor:
+            compacted.pop(anchor)
+            dropped += 1
+            # Orphaned tool results would be rejected by the model API.
+            while len(compacted) - len(recent) > anchor and isinstance(compacted[anchor], ToolMessage):
+                compacted.pop(anchor)
+                dropped += 1
+        if dropped:
+            # A human-role note: some providers reject mid-conversation system messages.
+            compacted.insert(anchor, HumanMessage(
+                content=f"[{dropped} earlier messages omitted to fit the context budget]"))
+
+        # Last resort: summarize tool outputs in the recent window that the
+        # model has already answered. Trailing results it has not seen yet stay.
+        if estimate_tokens(compacted) > self.budget:
+            unseen = len(compacted)
+            while unseen > 0 and isinstance(compacted[unseen - 1], ToolMessage):
+                unseen -= 1
+            compacted = [
+                self._shrink(m) if isinstance(m, ToolMessage) and i < unseen else m
+                for i, m in enumerate(compacted)]
+
+        tokens_out = estimate_tokens(compacted)
+        with self._lock:
+            self._stats["compacted"] += 1
+            self._stats["dropped_messages"] += dropped
+            self._stats["tokens_out"] += tokens_out
+        return compacted
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["cached_summaries"] = len(self._summaries)
+        s["budget"] = self.budget
+        return s
+
+    def clear(self):
+        with self._lock:
+            self._summaries.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+
+
+context_compactor = ContextCompactor()
+
+
+def compact_messages(messages):
+    return context_compactor.compact(messages)
+
+
+def compaction_hook(state):
+    """pre_model_hook for specialists: compacts only what the LLM sees."""
+    return {"llm_input_messages": compact_messages(state["messages"])}
@@ -1,9 +1,10 @@
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Table
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Session, sessionmaker, relationship
 import datetime
 import json
 import os
+import threading
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sre_agent.db")
 
@@ -171,13 +172,35 @@ class Runbook(Base):
 
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+_db_ready = False
+_db_lock = threading.Lock()
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
 
 
+def ensure_db():
+    """Creates the tables once, the first time a session is opened."""
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_lock:
+        if not _db_ready:
+            init_db()
+            _db_ready = True
+
+
+class LazyInitSession(Session):
+    def __init__(self, *args, **kwargs):
+        ensure_db()
+        super().__init__(*args, **kwargs)
+
+
+SessionLocal = sessionmaker(class_=LazyInitSession, autocommit=False, autoflush=False, bind=engine)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,13 @@
+import os
+
+
+def env_number(name: str, default, cast=int, minimum=None):
+    """
+    The environment variable `name` as a number (`cast` is int or float);
+    `default` when it is unset or not a number, raised to `minimum` if given.
+    """
+    try:
+        value = cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return value if minimum is None else max(minimum, value)
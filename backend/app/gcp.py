@@ -0,0 +1,205 @@
+import datetime
+import os
+import threading
+
+from app.env import env_number
+
+CLOUD_PLATFORM_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
+
+
+def refresh_margin() -> float:
+    """Seconds before expiry at which an access token is renewed."""
+    return env_number("GCP_TOKEN_REFRESH_MARGIN", 300.0, float)
+
+
+def _adc_source():
+    from google.auth import default
+    return default(scopes=[CLOUD_PLATFORM_SCOPE])
+
+
+def _utcnow():
+    # google-auth keeps `expiry` as a naive UTC datetime.
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class GCPCredentials:
+    """
+    Process-wide Application Default Credentials, project and SDK clients.
+    ADC is resolved once; the access token is refreshed only when it is
+    within `GCP_TOKEN_REFRESH_MARGIN` of expiry, by a background thread
+    ahead of time and, as a fallback, by the first caller that finds it
+    stale (concurrent callers wait for that one refresh). SDK clients are
+    built once per key so their gRPC channels are reused across calls.
+
+    `source` returns `(credentials, project)` like `google.auth.default`;
+    tests swap it for a fake with `set_source`.
+    """
+
+    def __init__(self, source=None):
+        self._source = source or _adc_source
+        self._credentials = None
+        self._project = None
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"loads": 0, "hits": 0, "refreshes": 0, "background_refreshes": 0, "failures": 0}
+
+    def set_source(self, source):
+        self.clear()
+        self._source = source or _adc_source
+
+    # --- credentials ---
+
+    def _load(self):
+        with self._lock:
+            if self._credentials is None:
+                try:
+                    credentials, project = self._source()
+                except Exception:
+                    self._stats["failures"] += 1
+                    raise
+                self._credentials = credentials
+                self._project = project or os.getenv("GOOGLE_CLOUD_PROJECT")
+                self._stats["loads"] += 1
+            return self._credentials
+
+    def project(self):
+        """The ADC project, falling back to GOOGLE_CLOUD_PROJECT."""
+        self._load()
+        return self._project
+
+    def _expires_in(self, credentials):
+        expiry = getattr(credentials, "expiry", None)
+        if expiry is None:
+            return None
+        return (expiry - _utcnow()).total_seconds()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _stale(self, credentials) -> bool:
+        if not credentials.token:
+            return True
+        expires_in = self._expires_in(credentials)
+        return expires_in is not None and expires_in <= refresh_margin()
+
+    def _refresh(self, credentials, stat: str):
+        from google.auth.transport.requests import Request
+        from app.http import sync_http
+
+        try:
+            # Token calls share the pooled "gcp" session with the REST tools.
+            credentials.refresh(Request(sync_http.session("gcp")))
+        except Exception:
+            self._count("failures")
+            raise
+        self._count(stat)
+
+    def token(self) -> str:
+        credentials = self._load()
+        if self._stale(credentials):
+            with self._refresh_lock:
+                if self._stale(credentials):
+                    self._refresh(credentials, "refreshes")
+        else:
+            self._count("hits")
+        self._start_refresher()
+        return credentials.token
+
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token()}"}
+
+    def project_and_headers(self):
+        """(project, auth headers), or (None, None) when no project is known."""
+        project = self.project()
+        if not project:
+            return None, None
+        return project, self.headers()
+
+    # --- background refresh ---
+
+    def _start_refresher(self):
+        if self._thread is not None or self._expires_in(self._credentials) is None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._refresh_loop, args=(self._stop,), name="gcp-token-refresh", daemon=True)
+                self._thread.start()
+
+    def _refresh_loop(self, stop):
+        backoff = 5
+        while not stop.is_set():
+            credentials = self._credentials
+            if credentials is None:
+                return
+            expires_in = self._expires_in(credentials)
+            if expires_in is None:
+                return
+            # Wake up just inside the margin so callers never see a stale token.
+            if stop.wait(max(0.0, expires_in - refresh_margin())):
+                return
+            try:
+                with self._refresh_lock:
+                    if self._stale(credentials):
+                        self._refresh(credentials, "background_refreshes")
+                backoff = 5
+            except Exception:
+                # Callers still refresh on demand; retry ahead of them.
+                if stop.wait(backoff):
+                    return
+                backoff = min(backoff * 2, 60)
+
+    # --- SDK clients ---
+
+    def client(self, key: str, factory):
+        """The shared SDK client for `key`, built by `factory()` on first use."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = factory()
+            return client
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["project"] = self._project
+            s["clients"] = sorted(self._clients)
+            expires_in = self._expires_in(self._credentials) if self._credentials is not None else None
+        s["token_expires_in"] = round(expires_in) if expires_in is not None else None
+        return s
+
+    def clear(self):
+        with self._lock:
+            self._stop.set()
+            self._stop = threading.Event()
+            thread, self._thread = self._thread, None
+            self._credentials = None
+            self._project = None
+            self._clients.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+        if thread is not None:
+            thread.join(timeout=1)
+
+
+gcp_credentials = GCPCredentials()
+
+
+def gcp_project():
+    return gcp_credentials.project()
+
+
+def gcp_project_and_headers():
+    return gcp_credentials.project_and_headers()
+
+
+def gcp_client(key: str, factory):
+    return gcp_credentials.client(key, factory)
+
+
+def get_gcp_credential_stats() -> dict:
+    return gcp_credentials.stats()
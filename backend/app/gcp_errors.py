@@ -0,0 +1,176 @@
+import datetime
+from array import array
+from urllib.parse import unquote
+
+from app.log_templates import normalize
+
+SEVERITY = {"EMERGENCY": 0, "ALERT": 1, "CRITICAL": 2, "ERROR": 3}
+# Histogram bins per group: one per minute for windows up to a day, wider
+# bins beyond that, so each group costs a fixed few KB.
+MAX_BINS = 1440
+# A group is "rising"/"new" by its last RECENT_MINUTES.
+RECENT_MINUTES = 15
+MAX_FINGERPRINT_CHARS = 200
+MAX_MESSAGE_CHARS = 120
+SPARK = "▁▂▃▄▅▆▇█"
+
+
+def _utc(ts):
+    if not isinstance(ts, datetime.datetime):
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=datetime.timezone.utc)
+
+
+def entry_message(entry) -> str:
+    """Message text of a log entry (text, JSON or proto payload)."""
+    payload = entry.payload
+    if isinstance(payload, dict):
+        return str(payload.get("message") or payload.get("textPayload") or payload)
+    if isinstance(payload, str):
+        return payload
+    return "No message" if payload is None else str(payload)
+
+
+def _text(value, default="-") -> str:
+    return value if isinstance(value, str) and value else default
+
+
+class ErrorGroup:
+    __slots__ = ("count", "first", "last", "severity", "message", "bins")
+
+    def __init__(self, bins: int, message: str):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.severity = None
+        self.message = message
+        self.bins = array("I", bytes(4 * bins))  # entries per bin, zero-filled
+
+
+class ErrorAggregator:
+    """
+    Groups Cloud Logging error entries by resource type, log name and
+    message fingerprint (the first line with ids, numbers, IPs... masked),
+    keeping a count, first/last seen and a per-bin histogram per group.
+    Entries are fed one at a time, so memory grows with distinct groups
+    (at most `max_groups`), not with entries.
+    """
+
+    def __init__(self, window_minutes: int, now: datetime.datetime = None, max_groups: int = 2000):
+        self.now = now or datetime.datetime.now(datetime.timezone.utc)
+        self.start = self.now - datetime.timedelta(minutes=window_minutes)
+        self.bin_seconds = max(60.0, window_minutes * 60 / MAX_BINS)
+        self.bins = max(1, int(window_minutes * 60 / self.bin_seconds + 0.5))
+        self.max_groups = max_groups
+        self.groups = {}  # (resource type, log name, fingerprint) -> ErrorGroup
+        self.seen = 0
+        self.untracked = 0  # entries of groups beyond max_groups
+        self.oldest = None  # earliest timestamp read
+        self.complete = False  # the whole window was read
+        self.error = None  # why reading stopped early, if it failed
+
+    def add(self, entry):
+        self.seen += 1
+        resource = _text(getattr(getattr(entry, "resource", None), "type", None))
+        log_name = unquote(_text(getattr(entry, "log_name", None)).rsplit("/", 1)[-1])
+        message = entry_message(entry).strip()
+        first_line = message.split("\n", 1)[0]
+        key = (resource, log_name, normalize(first_line)[:MAX_FINGERPRINT_CHARS])
+
+        group = self.groups.get(key)
+        if group is None:
+            if len(self.groups) >= self.max_groups:
+                self.untracked += 1
+                return
+            group = self.groups[key] = ErrorGroup(self.bins, first_line)
+        group.count += 1
+
+        ts = _utc(getattr(entry, "timestamp", None))
+        if ts is not None and (self.oldest is None or ts < self.oldest):
+            self.oldest = ts
+        if ts is not None:
+            if group.first is None or ts < group.first:
+                group.first = ts
+            if group.last is None or ts >= group.last:
+                group.last, group.message = ts, first_line
+            index = int((ts - self.start).total_seconds() // self.bin_seconds)
+            group.bins[min(max(index, 0), self.bins - 1)] += 1
+
+        severity = getattr(entry, "severity", None)
+        severity = severity.upper() if isinstance(severity, str) else None
+        if severity in SEVERITY and (group.severity is None or SEVERITY[severity] < SEVERITY[group.severity]):
+            group.severity = severity
+
+    def feed(self, entries, max_entries: int = 0):
+        """
+        Consumes an entry iterator (pages are fetched as it is read); stops
+        after `max_entries`. A failing page ends the scan with what was read
+        so far and the error in `self.error`.
+        """
+        try:
+            for entry in entries:
+                self.add(entry)
+                if max_entries and self.seen >= max_entries:
+                    return self
+        except Exception as e:
+            self.error = str(e)
+            return self
+        self.complete = True
+        return self
+
+    def first_bin(self) -> int:
+        """First histogram bin the scan covered: a scan cut short (newest first) stops at `oldest`."""
+        if self.complete or self.oldest is None:
+            return 0
+        index = int((self.oldest - self.start).total_seconds() // self.bin_seconds)
+        return min(max(index, 0), self.bins - 1)
+
+    def trend(self, group: ErrorGroup) -> str:
+        recent_bins = max(1, int(RECENT_MINUTES * 60 // self.bin_seconds))
+        earlier_bins = self.bins - self.first_bin() - recent_bins
+        recent = sum(group.bins[-recent_bins:])
+        earlier = group.count - recent
+        if not recent:
+            return "stopped" if group.count else "-"
+        if earlier_bins <= 0:
+            return "-"  # the scan did not reach back past the recent window
+        if not earlier:
+            return "new"
+        recent_rate = recent / recent_bins
+        earlier_rate = earlier / earlier_bins
+        if recent_rate > 2 * earlier_rate:
+            return f"rising ({recent_rate / earlier_rate:.0f}x)"
+        if recent_rate * 2 < earlier_rate:
+            return "falling"
+        return "steady"
+
+    def sparkline(self, group: ErrorGroup, width: int = 24) -> str:
+        """The scanned part of the histogram folded into `width` buckets, oldest first."""
+        bins = group.bins[self.first_bin():]
+        width = min(width, len(bins))
+        buckets = [0] * width
+        for i, n in enumerate(bins):
+            buckets[i * width // len(bins)] += n
+        peak = max(buckets) or 1
+        return "".join(SPARK[(n * (len(SPARK) - 1) + peak - 1) // peak] if n else " " for n in buckets)
+
+    def ranked(self) -> list:
+        """Most severe first, then most frequent."""
+        return sorted(self.groups.items(), key=lambda kv: (SEVERITY.get(kv[1].severity, 3), -kv[1].count))
+
+    def table(self, top_k: int = 10) -> str:
+        rows = self.ranked()
+        lines = ["| Count | Severity | Trend | Resource | Log | First | Last | Histogram | Message |",
+                 "|---|---|---|---|---|---|---|---|---|"]
+        for (resource, log_name, _), g in rows[:top_k]:
+            message = " ".join(g.message.split()).replace("|", "/")
+            if len(message) > MAX_MESSAGE_CHARS:
+                message = message[:MAX_MESSAGE_CHARS - 3] + "..."
+            first = g.first.strftime("%m-%d %H:%M") if g.first else "?"
+            last = g.last.strftime("%m-%d %H:%M") if g.last else "?"
+            lines.append(f"| {g.count} | {g.severity or 'ERROR'} | {self.trend(g)} | {resource} | {log_name} "
+                         f"| {first} | {last} | `{self.sparkline(g)}` | {message} |")
+        if len(rows) > top_k:
+            rest = rows[top_k:]
+            lines.append(f"... {len(rest)} more groups ({sum(g.count for _, g in rest)} entries) not shown")
+        return "\n".join(lines)
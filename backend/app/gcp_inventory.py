@@ -0,0 +1,243 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app.env import env_number
+from app.gcp import gcp_project_and_headers
+from app.http import request
+from app.singleflight import singleflight
+
+COMPUTE_API = "https://compute.googleapis.com/compute/v1/projects"
+SQL_API = "https://sqladmin.googleapis.com/sql/v1beta4/projects"
+# Largest page the Compute and SQL Admin list APIs accept.
+PAGE_SIZE = 500
+# Snapshots that missed a collection, zone or region are reused for at most
+# this long, so a permanently unreachable scope does not force a crawl per call.
+PARTIAL_INVENTORY_TTL = 60.0
+
+
+def _leaf(path) -> str:
+    """Last segment of a resource URL or aggregated key ("zones/us-central1-a")."""
+    return (path or "").rsplit("/", 1)[-1]
+
+
+def _instance(location, item) -> dict:
+    nics = item.get("networkInterfaces") or [{}]
+    return {"name": item.get("name"), "zone": location, "status": item.get("status"),
+            "machine_type": _leaf(item.get("machineType")), "ip": nics[0].get("networkIP", "N/A")}
+
+
+def _disk(location, item) -> dict:
+    return {"name": item.get("name"), "zone": location, "size_gb": int(item.get("sizeGb") or 0),
+            "type": _leaf(item.get("type")), "attached": bool(item.get("users"))}
+
+
+def _address(location, item) -> dict:
+    return {"name": item.get("name"), "region": location, "address": item.get("address"),
+            "status": item.get("status"), "type": item.get("addressType", "EXTERNAL")}
+
+
+def _sql(location, item) -> dict:
+    return {"name": item.get("name"), "region": item.get("region") or location, "state": item.get("state"),
+            "version": item.get("databaseVersion"), "tier": (item.get("settings") or {}).get("tier")}
+
+
+# collection -> (list URL, items key inside each aggregated scope or None
+# for a flat list, normalizer).
+COLLECTIONS = {
+    "instances": (COMPUTE_API + "/{project}/aggregated/instances", "instances", _instance),
+    "disks": (COMPUTE_API + "/{project}/aggregated/disks", "disks", _disk),
+    "addresses": (COMPUTE_API + "/{project}/aggregated/addresses", "addresses", _address),
+    "sql": (SQL_API + "/{project}/instances", None, _sql),
+}
+
+
+def inventory_ttl() -> float:
+    return env_number("GCP_INVENTORY_TTL", 300.0, float)
+
+
+def list_pages(url: str, headers: dict, aggregated: bool = True):
+    """Yields the JSON pages of a Compute/SQL Admin list, following `nextPageToken`."""
+    params = {"maxResults": PAGE_SIZE}
+    if aggregated:
+        # One unreachable zone must not fail the whole crawl.
+        params["returnPartialSuccess"] = "true"
+    while True:
+        resp = request("gcp", "GET", url, headers=headers, params=params, timeout=15)
+        resp.raise_for_status()
+        page = resp.json()
+        yield page
+        token = page.get("nextPageToken")
+        if not token:
+            break
+        params = dict(params, pageToken=token)
+
+
+def _warning(scope, warning) -> str:
+    where = f"{scope}: " if scope else ""
+    return where + (warning.get("message") or warning.get("code") or "warning")
+
+
+def crawl_collection(name: str, project: str, headers: dict) -> tuple:
+    """
+    (items, warnings) of one collection. With `returnPartialSuccess`, zones
+    or regions that could not be read are listed in `unreachables` or carry
+    a `warning`; those are returned as warnings instead of failing the crawl.
+    """
+    url, key, normalize = COLLECTIONS[name]
+    url = url.format(project=project)
+    items, warnings = [], []
+    for page in list_pages(url, headers, aggregated=key is not None):
+        warnings.extend(f"{_leaf(scope)}: unreachable" for scope in page.get("unreachables") or [])
+        if page.get("warning"):
+            warnings.append(_warning("", page["warning"]))
+        if key is None:
+            items.extend(normalize("", item) for item in page.get("items") or [])
+            continue
+        # Aggregated pages map "zones/<zone>" / "regions/<region>" / "global" to a scope.
+        for scope, data in (page.get("items") or {}).items():
+            items.extend(normalize(_leaf(scope), item) for item in data.get(key, []))
+            warning = data.get("warning") or {}
+            if warning and warning.get("code") != "NO_RESULTS_ON_PAGE":
+                warnings.append(_warning(_leaf(scope), warning))
+    return items, warnings
+
+
+class GCPInventory:
+    """
+    Compact snapshot of a project's instances, disks, addresses and Cloud
+    SQL instances across all zones and regions. A collection that could
+    not be fetched is empty and its error is kept in `errors`; one that
+    skipped unreachable zones or regions keeps what it read, and the
+    skipped scopes are listed in `errors` too.
+    """
+
+    def __init__(self, project: str, collections: dict, errors: dict = None):
+        self.project = project
+        self.instances = collections.get("instances", [])
+        self.disks = collections.get("disks", [])
+        self.addresses = collections.get("addresses", [])
+        self.sql = collections.get("sql", [])
+        self.errors = errors or {}
+        self.fetched = set(collections)
+        self.fetched_at = time.time()
+
+    def failed(self, name: str) -> bool:
+        """True when the collection could not be read at all."""
+        return name not in self.fetched
+
+    def footer(self, *names) -> str:
+        """Freshness line for tool output, plus the zones/regions the given collections missed."""
+        lines = [f"{name}: {self.errors[name]}" for name in names
+                 if name in self.errors and not self.failed(name)]
+        note = f"\n⚠️ Incomplete ({'; '.join(lines)})" if lines else ""
+        return f"{note}\n_Inventory as of {self.age():.0f}s ago; pass refresh=true to re-crawl._"
+
+    def instances_in(self, zone: str = "") -> list:
+        return [i for i in self.instances if not zone or i["zone"] == zone]
+
+    def stopped_instances(self) -> list:
+        return [i for i in self.instances if i["status"] == "TERMINATED"]
+
+    def orphaned_disks(self) -> list:
+        """Unattached disks, largest first."""
+        return sorted((d for d in self.disks if not d["attached"]), key=lambda d: -d["size_gb"])
+
+    def unused_addresses(self) -> list:
+        """Reserved external IPs not assigned to anything (billed while idle)."""
+        return [a for a in self.addresses if a["status"] == "RESERVED" and a["type"] == "EXTERNAL"]
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def ttl(self) -> float:
+        """Seconds this snapshot is reused: shorter when it is incomplete."""
+        return min(inventory_ttl(), PARTIAL_INVENTORY_TTL) if self.errors else inventory_ttl()
+
+    def summary(self) -> str:
+        status = Counter(i["status"] for i in self.instances)
+        orphaned = self.orphaned_disks()
+        return (f"{len(self.instances)} VMs ({status.get('RUNNING', 0)} running) in "
+                f"{len({i['zone'] for i in self.instances})} zones, {len(self.disks)} disks "
+                f"({len(orphaned)} unattached, {sum(d['size_gb'] for d in orphaned)} GB), "
+                f"{len(self.addresses)} addresses ({len(self.unused_addresses())} unused), "
+                f"{len(self.sql)} Cloud SQL instances")
+
+
+class InventoryCache:
+    """
+    The latest inventory per project, reused for `GCP_INVENTORY_TTL` seconds
+    (at most `PARTIAL_INVENTORY_TTL` when it carries errors). Concurrent misses
+    share one crawl; the four collections are crawled in parallel, each page
+    after page.
+    """
+
+    def __init__(self):
+        self._inventories = {}  # project -> GCPInventory
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "crawls": 0, "partial": 0}
+
+    def _crawl(self, project: str, headers: dict) -> GCPInventory:
+        collections, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=len(COLLECTIONS), thread_name_prefix="gcp-inventory") as pool:
+            futures = {name: pool.submit(crawl_collection, name, project, headers) for name in COLLECTIONS}
+            for name, future in futures.items():
+                try:
+                    collections[name], warnings = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+                    continue
+                if warnings:
+                    errors[name] = "; ".join(warnings)
+        inventory = GCPInventory(project, collections, errors)
+        with self._lock:
+            self._stats["crawls"] += 1
+            if errors:
+                self._stats["partial"] += 1
+            self._inventories[project] = inventory
+        return inventory
+
+    def get(self, refresh: bool = False):
+        """The project's inventory, or None when no GCP project is configured."""
+        project, headers = gcp_project_and_headers()
+        if not project:
+            return None
+        with self._lock:
+            inventory = self._inventories.get(project)
+            if inventory is not None and not refresh and inventory.age() < inventory.ttl():
+                self._stats["hits"] += 1
+                return inventory
+        return singleflight.do(f"gcp:inventory:{project}", self._crawl, project, headers)
+
+    def peek(self):
+        """The most recent fresh inventory of any project without crawling, or None."""
+        with self._lock:
+            fresh = [i for i in self._inventories.values() if i.age() < i.ttl()]
+        return max(fresh, key=lambda i: i.fetched_at) if fresh else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["projects"] = {p: {"age": round(i.age()), "instances": len(i.instances), "disks": len(i.disks),
+                                 "addresses": len(i.addresses), "sql": len(i.sql),
+                                 "errors": dict(i.errors)}
+                             for p, i in self._inventories.items()}
+        return s
+
+    def clear(self):
+        with self._lock:
+            self._inventories.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+
+
+inventory_cache = InventoryCache()
+
+
+def gcp_inventory(refresh: bool = False):
+    return inventory_cache.get(refresh)
+
+
+def get_gcp_inventory_stats() -> dict:
+    return inventory_cache.stats()
@@ -0,0 +1,320 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+from app.env import env_number
+from app.http import arequest, request
+
+GITHUB_CACHE_PATH = os.getenv("GITHUB_CACHE_PATH", "./github_cache.db")
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Bodies larger than this (e.g. big files via the contents API) are not stored.
+MAX_CACHED_BODY = 1024 * 1024
+MAX_THROTTLE_SECONDS = 5.0
+
+_PURGE_EVERY_STORES = 200
+
+
+# Responses not stored or revalidated for this long are dropped (default 7 days; 0 keeps them).
+GITHUB_CACHE_TTL_SECONDS = env_number("GITHUB_CACHE_TTL_SECONDS", 7 * 24 * 3600)
+# Rows kept on disk; the least recently validated go first (0 means no limit).
+GITHUB_CACHE_MAX_ROWS = env_number("GITHUB_CACHE_MAX_ROWS", 20000)
+
+
+def _header(resp, name):
+    value = resp.headers.get(name)
+    return value if isinstance(value, str) else None
+
+
+class CachedResponse:
+    """The subset of a `requests`/`httpx` response the GitHub tools read."""
+
+    def __init__(self, url: str, status_code: int, body: str, headers: dict = None):
+        self.url = url
+        self.status_code = status_code
+        self.text = body
+        self.headers = headers or {}
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class RateLimit:
+    """
+    Last seen `X-RateLimit-*` budget. Once fewer than
+    `GITHUB_RATELIMIT_RESERVE` calls remain, calls are spaced so the rest of
+    the budget lasts until the window resets.
+    """
+
+    def __init__(self):
+        self.remaining = None
+        self.limit = None
+        self.reset_at = None
+        self._lock = threading.Lock()
+
+    def update(self, resp):
+        remaining, limit, reset = (_header(resp, f"X-RateLimit-{k}") for k in ("Remaining", "Limit", "Reset"))
+        if remaining is None:
+            return
+        with self._lock:
+            try:
+                self.remaining = int(remaining)
+                self.limit = int(limit) if limit else self.limit
+                self.reset_at = float(reset) if reset else self.reset_at
+            except ValueError:
+                pass
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            return self.remaining == 0 and self.reset_at is not None and self.reset_at > time.time()
+
+    def delay(self) -> float:
+        reserve = env_number("GITHUB_RATELIMIT_RESERVE", 200)
+        with self._lock:
+            if self.remaining is None or self.reset_at is None or self.remaining >= reserve:
+                return 0.0
+            window = max(0.0, self.reset_at - time.time())
+            return min(window / max(self.remaining, 1), MAX_THROTTLE_SECONDS)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"remaining": self.remaining, "limit": self.limit, "reset_at": self.reset_at}
+
+
+class GitHubCache:
+    """
+    Persistent cache of GitHub GET responses keyed by URL (and the token
+    and Accept header they were fetched with). Every call is revalidated
+    with `If-None-Match`/`If-Modified-Since`; GitHub answers an unchanged
+    resource with a 304, which does not count against the rate limit.
+    While the budget is exhausted, cached responses are served as is.
+    Rows not validated within `ttl` seconds are ignored and purged, and the
+    table is trimmed to the `max_rows` most recently validated.
+    """
+
+    def __init__(self, path: str = GITHUB_CACHE_PATH, ttl: int = GITHUB_CACHE_TTL_SECONDS,
+                 max_rows: int = GITHUB_CACHE_MAX_ROWS):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.rate = RateLimit()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_path = None
+        self._stores_since_purge = 0
+        self._stats = {"hits": 0, "misses": 0, "stale_served": 0, "stores": 0, "throttled": 0,
+                       "throttle_seconds": 0.0, "purged": 0}
+
+    @staticmethod
+    def make_key(url: str, headers: dict) -> str:
+        headers = headers or {}
+        payload = json.dumps([url, headers.get("Authorization"), headers.get("Accept")])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _db(self):
+        # Caller holds self._lock.
+        if self._conn is None or self._conn_path != self.path:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS github_responses ("
+                "key TEXT PRIMARY KEY, url TEXT, etag TEXT, last_modified TEXT, body TEXT, stored_at REAL)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS github_responses_stored_at ON github_responses (stored_at)")
+            self._conn_path = self.path
+            self._purge_locked()
+        return self._conn
+
+    def _purge_locked(self) -> int:
+        self._stores_since_purge = 0
+        db = self._conn
+        purged = 0
+        if self.ttl > 0:
+            purged += db.execute(
+                "DELETE FROM github_responses WHERE stored_at < ?", (time.time() - self.ttl,)).rowcount
+        if self.max_rows > 0:
+            purged += db.execute(
+                "DELETE FROM github_responses WHERE key IN (SELECT key FROM github_responses "
+                "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_rows,)).rowcount
+        db.commit()
+        self._stats["purged"] += purged
+        return purged
+
+    def purge_expired(self) -> int:
+        """Deletes rows past the TTL and beyond `max_rows`."""
+        with self._lock:
+            try:
+                self._db()
+                return self._purge_locked()
+            except sqlite3.Error:
+                return 0
+
+    def _lookup(self, key: str):
+        oldest = time.time() - self.ttl if self.ttl > 0 else 0
+        with self._lock:
+            try:
+                return self._db().execute(
+                    "SELECT etag, last_modified, body FROM github_responses WHERE key = ? AND stored_at >= ?",
+                    (key, oldest)).fetchone()
+            except sqlite3.Error:
+                return None
+
+    def _touch(self, key: str):
+        # A 304 proves the stored body is still current.
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute("UPDATE github_responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def _store(self, key: str, url: str, resp):
+        etag, last_modified = _header(resp, "ETag"), _header(resp, "Last-Modified")
+        body = resp.text
+        if not (etag or last_modified) or not isinstance(body, str) or len(body) > MAX_CACHED_BODY:
+            return
+        with self._lock:
+            self._stats["stores"] += 1
+            try:
+                db = self._db()
+                db.execute("INSERT OR REPLACE INTO github_responses VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, url, etag, last_modified, body, time.time()))
+                db.commit()
+                self._stores_since_purge += 1
+                if self._stores_since_purge >= _PURGE_EVERY_STORES:
+                    self._purge_locked()
+            except sqlite3.Error as e:
+                print(f"Warning: GitHub cache write failed: {e}")
+
+    def _count(self, stat: str, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    # --- request flow shared by the sync and async paths ---
+
+    def _prepare(self, url: str, headers: dict):
+        """(key, cached row, conditional headers, throttle delay) for a GET."""
+        key = self.make_key(url, headers)
+        row = self._lookup(key)
+        conditional = dict(headers or {})
+        if row:
+            etag, last_modified, _ = row
+            if etag:
+                conditional["If-None-Match"] = etag
+            if last_modified:
+                conditional["If-Modified-Since"] = last_modified
+        delay = self.rate.delay()
+        if delay:
+            self._count("throttled")
+            self._count("throttle_seconds", delay)
+        return key, row, conditional, delay
+
+    def _serve_stale(self, url: str, row):
+        if row and self.rate.exhausted():
+            self._count("stale_served")
+            return CachedResponse(url, 200, row[2])
+        return None
+
+    def _finish(self, key: str, url: str, row, resp):
+        self.rate.update(resp)
+        if resp.status_code == 304 and row:
+            self._touch(key)
+            self._count("hits")
+            return CachedResponse(url, 200, row[2], resp.headers)
+        self._count("misses")
+        if resp.status_code == 200:
+            self._store(key, url, resp)
+        return resp
+
+    def get(self, url: str, headers: dict = None, **kwargs):
+        key, row, conditional, delay = self._prepare(url, headers)
+        stale = self._serve_stale(url, row)
+        if stale is not None:
+            return stale
+        if delay:
+            time.sleep(delay)
+        resp = request("github", "GET", url, headers=conditional, **kwargs)
+        return self._finish(key, url, row, resp)
+
+    async def aget(self, url: str, headers: dict = None, **kwargs):
+        key, row, conditional, delay = self._prepare(url, headers)
+        stale = self._serve_stale(url, row)
+        if stale is not None:
+            return stale
+        if delay:
+            await asyncio.sleep(delay)
+        resp = await arequest("github", "GET", url, headers=conditional, **kwargs)
+        return self._finish(key, url, row, resp)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        s["throttle_seconds"] = round(s["throttle_seconds"], 2)
+        lookups = s["hits"] + s["misses"] + s["stale_served"]
+        s["hit_ratio"] = round((s["hits"] + s["stale_served"]) / lookups, 3) if lookups else 0.0
+        s["rate_limit"] = self.rate.snapshot()
+        return s
+
+    def clear(self):
+        with self._lock:
+            for k in self._stats:
+                self._stats[k] = 0
+            try:
+                db = self._db()
+                db.execute("DELETE FROM github_responses")
+                db.commit()
+            except sqlite3.Error:
+                pass
+        self.rate = RateLimit()
+
+
+github_cache = GitHubCache()
+
+
+def github_get(url: str, headers: dict = None, **kwargs):
+    """GET through the conditional-request cache (sync path)."""
+    return github_cache.get(url, headers, **kwargs)
+
+
+async def agithub_get(url: str, headers: dict = None, **kwargs):
+    return await github_cache.aget(url, headers, **kwargs)
+
+
+def _graphql_data(resp) -> dict:
+    resp.raise_for_status()
+    payload = resp.json()
+    if payload.get("data") is None:
+        messages = "; ".join(e.get("message", "?") for e in payload.get("errors", []))
+        raise RuntimeError(f"GraphQL error: {messages or 'no data'}")
+    # Per-field errors (e.g. one repository not found) leave that field null.
+    return payload
+
+
+def github_graphql(query: str, variables: dict = None, headers: dict = None, **kwargs) -> dict:
+    """POSTs a GraphQL query; returns the payload (`data` and any per-field `errors`)."""
+    resp = request("github", "POST", GRAPHQL_URL, headers=headers,
+                   json={"query": query, "variables": variables or {}}, **kwargs)
+    return _graphql_data(resp)
+
+
+async def agithub_graphql(query: str, variables: dict = None, headers: dict = None, **kwargs) -> dict:
+    resp = await arequest("github", "POST", GRAPHQL_URL, headers=headers,
+                          json={"query": query, "variables": variables or {}}, **kwargs)
+    return _graphql_data(resp)
+
+
+def get_github_cache_stats() -> dict:
+    return github_cache.stats()
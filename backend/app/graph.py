@@ -1,146 +1,92 @@
-from typing import Literal
-from langchain_core.messages import SystemMessage
+import asyncio
+import threading
+from typing import List, Literal
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
 from langgraph.graph import StateGraph, END, START
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
 from .llm import get_llm
-from .tools import (
-    list_k8s_pods,
-    describe_pod,
-    get_pod_logs,
-    get_cluster_events,
-    check_gcp_status,
-    query_gmp_prometheus,
-    list_compute_instances,
-    get_gcp_sql_instances,
-    get_datadog_metrics,
-    get_active_alerts,
-    check_github_repos,
-    get_pr_status,
-    list_recent_commits,
-    check_pipeline_status,
-    get_argocd_sync_status,
-    check_vulnerabilities,
-    analyze_iam_policy,
-    analyze_log_patterns,
-    diagnose_service_health,
-    analyze_ci_failure,
-    create_issue,
-    trace_service_health,
-    list_datadog_metrics,
-    check_on_call_schedule,
-    send_slack_notification,
-    investigate_root_cause,
-    scan_infrastructure,
-    analyze_heavy_logs,
-    analyze_gcp_errors,
-    correlate_alerts,
-    optimize_k8s_resources,
-    optimize_gcp_resources,
-    analyze_cost_anomalies,
-    suggest_spot_migrations,
-    predict_resource_exhaustion,
-    run_chaos_experiment,
-    analyze_chaos_results,
-    check_traefik_health,
-    list_traefik_routes,
-    diagnose_traefik_ingress,
-    check_azion_edge,
-    check_azion_waf,
-    purge_azion_cache,
-    opsy_backup_and_ticket_failing_pods,
-    fuzzylabs_sre_workflow,
-    opsmate_troubleshooting_workflow,
-    smythos_unified_resource_manager,
-    bits_ai_investigate_monitor,
-    incidentfox_auto_investigate)
-from .tools.azion import list_edge_applications, check_azion_status, get_azion_metrics
-from .tools.dashboard import analyze_infrastructure_health
-from .tools.incident import (
-    create_incident,
-    update_incident_status,
-    list_incidents,
-    get_incident_details,
-    generate_postmortem,
-    log_incident_event,
-    build_incident_timeline,
-    manage_incident_channels,
-    list_incident_channels,
-    suggest_remediation,
-    generate_remediation_plan,
-    generate_runbook_from_incident)
-from .tools.runbooks import list_runbooks, execute_runbook, lookup_service, get_service_dependencies, get_service_topology  # noqa: E501
-from .tools.visualizer import generate_topology_diagram
-from .tools.knowledge import search_knowledge_base, generate_service_catalog_docs
-from .tools.code import generate_code_fix, create_github_pr, read_repo_file, list_repo_files
-from .tools.cost import estimate_gcp_cost
-from .tools.reasoning import generate_hypothesis
+from .router import fast_router
+from .context import compaction_hook, compact_messages
+from .checkpoint import get_checkpointer
+from .tools import get_tools
 from .state import AgentState
+from .env import env_number
+
+# 1. The LLM (and its provider SDK) is resolved on first use, not at import.
+def __getattr__(name):
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _llm():
+    # Module globals first, so a patched `app.graph.llm` is honoured.
+    return globals()["llm"] if "llm" in globals() else get_llm()
 
-# 1. Initialize LLM
-llm = get_llm()
 
 # 2. Define Tools for each specialist
-k8s_tools = [list_k8s_pods, describe_pod, get_pod_logs, get_cluster_events, analyze_log_patterns, analyze_heavy_logs, diagnose_service_health, trace_service_health, optimize_k8s_resources, list_traefik_routes]  # noqa: E501
-gcp_tools = [check_gcp_status, query_gmp_prometheus, list_compute_instances, get_gcp_sql_instances, analyze_heavy_logs, analyze_gcp_errors, estimate_gcp_cost, optimize_gcp_resources]  # noqa: E501
-datadog_tools = [get_datadog_metrics, get_active_alerts, list_datadog_metrics, correlate_alerts, bits_ai_investigate_monitor]  # noqa: E501
+k8s_tools = ["list_k8s_pods", "describe_pod", "get_pod_logs", "follow_pod_logs", "get_cluster_events", "analyze_log_patterns", "analyze_heavy_logs", "diagnose_service_health", "trace_service_health", "optimize_k8s_resources", "list_traefik_routes"]  # noqa: E501
+gcp_tools = ["check_gcp_status", "query_gmp_prometheus", "list_compute_instances", "get_gcp_sql_instances", "analyze_heavy_logs", "analyze_gcp_errors", "estimate_gcp_cost", "optimize_gcp_resources"]  # noqa: E501
+datadog_tools = ["get_datadog_metrics", "get_active_alerts", "list_datadog_metrics", "correlate_alerts", "bits_ai_investigate_monitor"]  # noqa: E501
 traefik_tools = [
-    check_traefik_health,
-    list_traefik_routes,
-    diagnose_traefik_ingress]
-azion_tools = [check_azion_edge, check_azion_waf, list_edge_applications, check_azion_status, get_azion_metrics, purge_azion_cache]  # noqa: E501
-code_tools = [check_github_repos, get_pr_status, list_recent_commits, generate_code_fix, create_github_pr, read_repo_file, list_repo_files]  # noqa: E501
+    "check_traefik_health",
+    "list_traefik_routes",
+    "diagnose_traefik_ingress"]
+azion_tools = ["check_azion_edge", "check_azion_waf", "list_edge_applications", "check_azion_status", "get_azion_metrics", "purge_azion_cache"]  # noqa: E501
+code_tools = ["check_github_repos", "get_pr_status", "list_recent_commits", "get_multi_repo_status", "generate_code_fix", "create_github_pr", "read_repo_file", "list_repo_files"]  # noqa: E501
 cicd_tools = [
-    check_pipeline_status,
-    get_argocd_sync_status,
-    analyze_ci_failure]
-sec_tools = [check_vulnerabilities, analyze_iam_policy]
+    "check_pipeline_status",
+    "get_multi_repo_status",
+    "get_argocd_sync_status",
+    "analyze_ci_failure"]
+sec_tools = ["check_vulnerabilities", "analyze_iam_policy"]
 incident_tools = [
-    create_incident,
-    update_incident_status,
-    list_incidents,
-    get_incident_details,
-    generate_postmortem,
-    search_knowledge_base,
-    create_issue,
-    log_incident_event,
-    build_incident_timeline,
-    manage_incident_channels,
-    list_incident_channels,
-    suggest_remediation,
-    generate_remediation_plan,
-    check_on_call_schedule,
-    send_slack_notification,
-    generate_runbook_from_incident,
-    fuzzylabs_sre_workflow,
-    opsmate_troubleshooting_workflow,
-    incidentfox_auto_investigate]
-automation_tools = [list_runbooks, execute_runbook, lookup_service, optimize_k8s_resources, optimize_gcp_resources, opsy_backup_and_ticket_failing_pods, smythos_unified_resource_manager]  # noqa: E501
+    "create_incident",
+    "update_incident_status",
+    "list_incidents",
+    "get_incident_details",
+    "generate_postmortem",
+    "search_knowledge_base",
+    "create_issue",
+    "log_incident_event",
+    "build_incident_timeline",
+    "manage_incident_channels",
+    "list_incident_channels",
+    "suggest_remediation",
+    "generate_remediation_plan",
+    "check_on_call_schedule",
+    "send_slack_notification",
+    "generate_runbook_from_incident",
+    "fuzzylabs_sre_workflow",
+    "opsmate_troubleshooting_workflow",
+    "incidentfox_auto_investigate"]
+automation_tools = ["list_runbooks", "execute_runbook", "lookup_service", "optimize_k8s_resources", "optimize_gcp_resources", "opsy_backup_and_ticket_failing_pods", "smythos_unified_resource_manager"]  # noqa: E501
 topology_tools = [
-    get_service_dependencies,
-    get_service_topology,
-    lookup_service,
-    generate_topology_diagram,
-    trace_service_health,
-    analyze_infrastructure_health,
-    investigate_root_cause,
-    scan_infrastructure,
-    analyze_heavy_logs,
-    generate_service_catalog_docs,
-    predict_resource_exhaustion]
-planner_tools = [generate_hypothesis, search_knowledge_base]
+    "get_service_dependencies",
+    "get_service_topology",
+    "lookup_service",
+    "generate_topology_diagram",
+    "trace_service_health",
+    "analyze_infrastructure_health",
+    "investigate_root_cause",
+    "scan_infrastructure",
+    "analyze_heavy_logs",
+    "generate_service_catalog_docs",
+    "predict_resource_exhaustion"]
+planner_tools = ["generate_hypothesis", "search_knowledge_base"]
 finops_tools = [
-    analyze_cost_anomalies,
-    suggest_spot_migrations,
-    estimate_gcp_cost,
-    optimize_gcp_resources]
-chaos_tools = [run_chaos_experiment, analyze_chaos_results]
+    "analyze_cost_anomalies",
+    "suggest_spot_migrations",
+    "estimate_gcp_cost",
+    "optimize_gcp_resources"]
+chaos_tools = ["run_chaos_experiment", "analyze_chaos_results"]
 
-# 3. Create Specialist Agents
+# 3. Create Specialist Agents (built lazily, on first use)
 
 
 def make_specialist(tools, persona, heuristics=""):
@@ -154,41 +100,85 @@ def make_specialist(tools, persona, heuristics=""):
         f"{heuristics}\n"
     )
 
-    return create_react_agent(llm, tools, prompt=system_msg)
+    return create_react_agent(
+        _llm(), tools, prompt=system_msg, pre_model_hook=compaction_hook)
+
+
+class LazySpecialist:
+    """
+    Specialist whose tools (and their vendor SDKs) are imported and whose
+    ReAct agent is built the first time it is routed to, keeping `import
+    app.graph` cheap. The agent is rebuilt if the LLM instance changes.
+    """
+
+    def __init__(self, tool_names, persona, heuristics=""):
+        self.tool_names = tool_names
+        self.persona = persona
+        self.heuristics = heuristics
+        self._agent = None
+        self._built_with = None
+        self._lock = threading.Lock()
+        self.node = RunnableLambda(self._run, afunc=self._arun)
+
+    @property
+    def built(self) -> bool:
+        return self._agent is not None
+
+    @property
+    def agent(self):
+        with self._lock:
+            llm = _llm()
+            if self._agent is None or self._built_with is not llm:
+                self._agent = make_specialist(
+                    get_tools(self.tool_names), self.persona, self.heuristics)
+                self._built_with = llm
+            return self._agent
+
+    def invoke(self, state, config=None):
+        return self.agent.invoke(state, config)
 
+    async def ainvoke(self, state, config=None):
+        return await self.agent.ainvoke(state, config)
 
-k8s_agent = make_specialist(
+    def _run(self, state, config):
+        return self.invoke(state, config)
+
+    async def _arun(self, state, config):
+        return await self.ainvoke(state, config)
+
+
+k8s_agent = LazySpecialist(
     k8s_tools,
     "Kubernetes (K8s) & Container Orchestration",
-    heuristics="SRE TIP: Start by calling `diagnose_service_health` for a full picture. If a pod is crashing, `analyze_log_patterns` is more efficient than reading raw logs. Use `trace_service_health` to check dependencies if the issue seems external. Use `list_traefik_routes` to see how traffic enters."  # noqa: E501
+    heuristics="SRE TIP: Start by calling `diagnose_service_health` for a full picture. If a pod is crashing, `analyze_log_patterns` is more efficient than reading raw logs. While watching a rollout, call `follow_pod_logs` (with `level`/`since`) again to see the newest lines without re-fetching. Use `trace_service_health` to check dependencies if the issue seems external. Use `list_traefik_routes` to see how traffic enters."  # noqa: E501
 )
-gcp_agent = make_specialist(
+gcp_agent = LazySpecialist(
     gcp_tools,
     "Google Cloud Platform (GCP) & Cloud Infrastructure",
     heuristics="SRE TIP: If a service is down or unreachable, check `check_gcp_status` for maintenance windows or outages first. Use `analyze_gcp_errors` to check Cloud Logging for severe errors. Use `estimate_gcp_cost` for billing questions."  # noqa: E501
 )
-datadog_agent = make_specialist(
+datadog_agent = LazySpecialist(
     datadog_tools,
     "Datadog Observability & Metrics",
     heuristics="SRE TIP: Correlate high latency spikes with error logs. Check for recent alerts. If the user asks for a 'Bits AI' style investigation, use `bits_ai_investigate_monitor`."  # noqa: E501
 )
-traefik_agent = make_specialist(traefik_tools,
-                                "Traefik Ingress Controller & Reverse Proxy")
-azion_agent = make_specialist(
+traefik_agent = LazySpecialist(traefik_tools,
+                               "Traefik Ingress Controller & Reverse Proxy")
+azion_agent = LazySpecialist(
     azion_tools,
     "Azion Edge Computing, CDN & WAF",
     heuristics="SRE TIP: When users mention Edge, CDN, Cache, WAF, or Azion, route to me. Use `check_azion_status` for health, `list_edge_applications` to find apps, `get_azion_metrics` for traffic/errors, and `purge_azion_cache` when asked to clear cache."  # noqa: E501
 )
-code_agent = make_specialist(
+code_agent = LazySpecialist(
     code_tools,
     "Source Code, Git, Development & Bug Fixing",
     heuristics="SRE TIP: You are the 'Bits Dev Agent'. You can fix bugs! Use `generate_code_fix` to propose fixes and `create_github_pr` to submit them. Always check recent commits first."  # noqa: E501
 )
-cicd_agent = make_specialist(cicd_tools, "CI/CD Pipelines & ArgoCD")
-sec_agent = make_specialist(
+cicd_agent = LazySpecialist(cicd_tools, "CI/CD Pipelines & ArgoCD")
+sec_agent = LazySpecialist(
     sec_tools,
     "DevSecOps, Vulnerability Scanning & IAM")
-incident_agent = make_specialist(
+incident_agent = LazySpecialist(
     incident_tools,
     "Incident Management & Post-Mortems",
     heuristics=(
@@ -199,14 +189,14 @@ incident_agent = make_specialist(
         "4. Always act on facts, not assumptions."
     )
 )
-automation_agent = make_specialist(
+automation_agent = LazySpecialist(
     automation_tools, "Runbook Automation & Site Reliability Engineering", heuristics=(
         "SRE TIP: SAFETY FIRST. You have the power to change infrastructure.\n"
         "1. Always use `execute_runbook` with `dry_run=True` FIRST to verify the action.\n"
         "2. Show the dry-run output to the user and ask for explicit confirmation.\n"
         "3. Only run with `dry_run=False` after receiving user approval.\n"
         "4. If a service is unknown, use `lookup_service`."))
-topology_agent = make_specialist(
+topology_agent = LazySpecialist(
     topology_tools,
     "Service Topology & Dependency Mapping",
     heuristics=(
@@ -218,63 +208,63 @@ topology_agent = make_specialist(
         "Use `predict_resource_exhaustion` to forecast outages."
     )
 )
-planner_agent = make_specialist(
+planner_agent = LazySpecialist(
     planner_tools, "Hypothesis Generation & Reasoning Engine", heuristics=(
         "SRE TIP: You are the brain. When a problem is complex or the root cause is unclear:\n"
         "1. Use `generate_hypothesis` to brainstorm potential causes.\n"
         "2. Use `search_knowledge_base` to see if this has happened before.\n"
         "3. Provide a structured plan to the Supervisor."))
 
-finops_agent = make_specialist(
+finops_agent = LazySpecialist(
     finops_tools,
     "FinOps & Cloud Cost Optimization",
     heuristics="SRE TIP: Look for cost anomalies and underutilized resources. Suggest Spot migrations where possible."
 )
 
-chaos_agent = make_specialist(
+chaos_agent = LazySpecialist(
     chaos_tools,
     "Chaos Engineering & Resilience Testing",
     heuristics="SRE TIP: ALWAYS use dry_run=True first. Inject faults to verify self-healing capabilities."
 )
 
 
-opsy_tools = [opsy_backup_and_ticket_failing_pods]
-opsy_agent = make_specialist(
+opsy_tools = ["opsy_backup_and_ticket_failing_pods"]
+opsy_agent = LazySpecialist(
     opsy_tools,
     "Opsy SRE AI (Mocked Operations)",
     heuristics="SRE TIP: You use `opsy_backup_and_ticket_failing_pods` when asked to run the Opsy workflow."
 )
 
-fuzzylabs_tools = [fuzzylabs_sre_workflow]
-fuzzylabs_agent = make_specialist(
+fuzzylabs_tools = ["fuzzylabs_sre_workflow"]
+fuzzylabs_agent = LazySpecialist(
     fuzzylabs_tools,
     "FuzzyLabs SRE Agent",
     heuristics="SRE TIP: You use `fuzzylabs_sre_workflow` when asked to run the FuzzyLabs workflow."
 )
 
-opsmate_tools = [opsmate_troubleshooting_workflow]
-opsmate_agent = make_specialist(
+opsmate_tools = ["opsmate_troubleshooting_workflow"]
+opsmate_agent = LazySpecialist(
     opsmate_tools,
     "OpsMate AI Copilot",
     heuristics="SRE TIP: You use `opsmate_troubleshooting_workflow` when asked to run the OpsMate workflow."
 )
 
-smythos_tools = [smythos_unified_resource_manager]
-smythos_agent = make_specialist(
+smythos_tools = ["smythos_unified_resource_manager"]
+smythos_agent = LazySpecialist(
     smythos_tools,
     "SmythOS Agent",
     heuristics="SRE TIP: You use `smythos_unified_resource_manager` when asked to interact with SmythOS unified resources."  # noqa: E501
 )
 
-incidentfox_tools = [incidentfox_auto_investigate]
-incidentfox_agent = make_specialist(
+incidentfox_tools = ["incidentfox_auto_investigate"]
+incidentfox_agent = LazySpecialist(
     incidentfox_tools,
     "IncidentFox Auto-Investigator",
     heuristics="SRE TIP: You use `incidentfox_auto_investigate` when asked to run the IncidentFox workflow."
 )
 
-bits_ai_tools = [bits_ai_investigate_monitor]
-bits_ai_agent = make_specialist(
+bits_ai_tools = ["bits_ai_investigate_monitor"]
+bits_ai_agent = LazySpecialist(
     bits_ai_tools,
     "Bits AI Copilot",
     heuristics="SRE TIP: You use `bits_ai_investigate_monitor` when asked to run the Bits AI workflow."
@@ -340,6 +330,7 @@ supervisor_system_prompt = (
     "   - 'High Latency' or '5xx Errors' -> Route to Traefik_Specialist FIRST to check Ingress health.\n"
     "   - If Traefik is healthy, route to Datadog_Specialist (check Backend Metrics).\n"
     "   - If DB errors are found, route to GCP_Specialist.\n"
+    "   - When several checks are independent of each other (e.g. a 5xx triage across Traefik, Datadog and GCP), list them in `parallel_agents` so they run concurrently instead of one hop at a time.\n"  # noqa: E501
     "5. DEPENDENCY AWARENESS: If a dependency fails (e.g., 'ConnectionRefused'), route to the owner of that dependency.\n"  # noqa: E501
     "6. PROACTIVE AGENT BEHAVIOR:\n"
     "   - If a Root Cause is found, AUTOMATICALLY route to Incident_Specialist to `generate_remediation_plan`.\n"
@@ -374,21 +365,43 @@ class RouterSchema(BaseModel):
                         "IncidentFox_Specialist",
                         "BitsAI_Specialist",
                         "FINISH"] = Field(description="The next agent to route to, or FINISH.")
+    parallel_agents: List[str] = Field(
+        default_factory=list,
+        description="Optional: two or more independent specialists to run concurrently instead of next_agent.")
 
 
 def supervisor_node(state: AgentState):
     messages = state["messages"]
 
+    # Fast path: a fresh user request naming an unambiguous domain skips the
+    # routing LLM call entirely. Follow-up hops always go through the LLM.
+    route = None
+    if messages and isinstance(messages[-1], HumanMessage):
+        text = str(messages[-1].content)
+        route = fast_router.classify(text)
+        if route["confident"]:
+            fast_router.log_decision(route, text, source="fast_path")
+            return {"next": route["agent"]}
+
+    result = _llm_route(compact_messages(messages))
+    if route is not None:
+        fast_router.log_decision(
+            route, text, source="llm", llm_agent=result["next"])
+    return result
+
+
+def _llm_route(messages):
     prompt = ChatPromptTemplate.from_messages([
         ("system", supervisor_system_prompt),
         MessagesPlaceholder(variable_name="messages"),
         ("system", "Who should act next? Provide your reasoning and select the next agent.")
     ]).partial(members=", ".join(members))
 
+    llm = _llm()
     try:
         chain = prompt | llm.with_structured_output(RouterSchema)
         decision = chain.invoke({"messages": messages})
-        return {"next": decision.next_agent}
+        return _route_result(decision.next_agent, getattr(decision, "parallel_agents", None))
     except Exception:
         try:
             parser = JsonOutputParser(pydantic_object=RouterSchema)
@@ -400,7 +413,8 @@ def supervisor_node(state: AgentState):
 
             fallback_chain = fallback_prompt | llm | parser
             decision = fallback_chain.invoke({"messages": messages})
-            return {"next": decision.get("next_agent", "Topology_Specialist")}
+            return _route_result(decision.get("next_agent", "Topology_Specialist"),
+                                 decision.get("parallel_agents"))
         except Exception as e2:
             return {
                 "next": "Topology_Specialist",
@@ -408,35 +422,109 @@ def supervisor_node(state: AgentState):
             }
 
 
+def _route_result(next_agent, parallel_agents=None):
+    branches = []
+    for agent in parallel_agents or []:
+        if agent in PARALLEL_SAFE and agent not in branches:
+            branches.append(agent)
+    if len(branches) >= 2:
+        return {"next": PARALLEL_NODE, "parallel": branches}
+    return {"next": next_agent}
+
+
+# 4b. Parallel fan-out
+# Risky agents stay out: they are gated by interrupt_before on their own nodes.
+PARALLEL_NODE = "Parallel_Specialists"
+PARALLEL_SAFE = [m for m in members if m not in ("Automation_Specialist", "Chaos_Specialist")]
+FANOUT_MAX_CONCURRENCY = env_number("FANOUT_MAX_CONCURRENCY", 3)
+FANOUT_BRANCH_TIMEOUT = env_number("FANOUT_BRANCH_TIMEOUT", 120.0, float)
+
+specialists = {
+    "K8s_Specialist": k8s_agent,
+    "GCP_Specialist": gcp_agent,
+    "Datadog_Specialist": datadog_agent,
+    "Traefik_Specialist": traefik_agent,
+    "Azion_Specialist": azion_agent,
+    "Code_Specialist": code_agent,
+    "CICD_Specialist": cicd_agent,
+    "Security_Specialist": sec_agent,
+    "Incident_Specialist": incident_agent,
+    "Topology_Specialist": topology_agent,
+    "Planner_Specialist": planner_agent,
+    "FinOps_Specialist": finops_agent,
+    "Opsy_Specialist": opsy_agent,
+    "FuzzyLabs_Specialist": fuzzylabs_agent,
+    "OpsMate_Specialist": opsmate_agent,
+    "SmythOS_Specialist": smythos_agent,
+    "IncidentFox_Specialist": incidentfox_agent,
+    "BitsAI_Specialist": bits_ai_agent,
+}
+
+
+async def parallel_specialists_node(state: AgentState):
+    """
+    Runs the specialists chosen by the supervisor concurrently (at most
+    FANOUT_MAX_CONCURRENCY at a time, each bounded by FANOUT_BRANCH_TIMEOUT)
+    and merges their new messages, grouped per branch, back into the thread.
+    """
+    messages = list(state["messages"])
+    branches = [a for a in state.get("parallel") or [] if a in specialists]
+    semaphore = asyncio.Semaphore(max(1, FANOUT_MAX_CONCURRENCY))
+
+    async def run_branch(agent):
+        async with semaphore:
+            try:
+                # The metadata lets streaming clients attribute tokens to the branch.
+                result = await asyncio.wait_for(
+                    specialists[agent].ainvoke({"messages": messages}, {"metadata": {"agent": agent}}),
+                    timeout=FANOUT_BRANCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                return [AIMessage(
+                    content=f"⚠️ {agent} did not finish within {FANOUT_BRANCH_TIMEOUT:g}s.", name=agent)]
+            except Exception as e:
+                return [AIMessage(content=f"⚠️ {agent} failed: {str(e)}", name=agent)]
+
+        new_messages = list(result["messages"][len(messages):])
+        for msg in new_messages:
+            if isinstance(msg, AIMessage) and not msg.name:
+                msg.name = agent
+        return new_messages
+
+    results = await asyncio.gather(*(run_branch(a) for a in branches))
+    return {"messages": [msg for branch in results for msg in branch], "parallel": []}
+
+
 # 5. Build the Graph
 workflow = StateGraph(AgentState)
 
 workflow.add_node("Supervisor", supervisor_node)
-workflow.add_node("K8s_Specialist", k8s_agent)
-workflow.add_node("GCP_Specialist", gcp_agent)
-workflow.add_node("Datadog_Specialist", datadog_agent)
-workflow.add_node("Traefik_Specialist", traefik_agent)
-workflow.add_node("Azion_Specialist", azion_agent)
-workflow.add_node("Code_Specialist", code_agent)
-workflow.add_node("CICD_Specialist", cicd_agent)
-workflow.add_node("Security_Specialist", sec_agent)
-workflow.add_node("Incident_Specialist", incident_agent)
-workflow.add_node("Automation_Specialist", automation_agent)
-workflow.add_node("Topology_Specialist", topology_agent)
-workflow.add_node("Planner_Specialist", planner_agent)
-workflow.add_node("FinOps_Specialist", finops_agent)
-workflow.add_node("Chaos_Specialist", chaos_agent)
-workflow.add_node("Opsy_Specialist", opsy_agent)
-workflow.add_node("FuzzyLabs_Specialist", fuzzylabs_agent)
-workflow.add_node("OpsMate_Specialist", opsmate_agent)
-workflow.add_node("SmythOS_Specialist", smythos_agent)
-workflow.add_node("IncidentFox_Specialist", incidentfox_agent)
-workflow.add_node("BitsAI_Specialist", bits_ai_agent)
+workflow.add_node("K8s_Specialist", k8s_agent.node)
+workflow.add_node("GCP_Specialist", gcp_agent.node)
+workflow.add_node("Datadog_Specialist", datadog_agent.node)
+workflow.add_node("Traefik_Specialist", traefik_agent.node)
+workflow.add_node("Azion_Specialist", azion_agent.node)
+workflow.add_node("Code_Specialist", code_agent.node)
+workflow.add_node("CICD_Specialist", cicd_agent.node)
+workflow.add_node("Security_Specialist", sec_agent.node)
+workflow.add_node("Incident_Specialist", incident_agent.node)
+workflow.add_node("Automation_Specialist", automation_agent.node)
+workflow.add_node("Topology_Specialist", topology_agent.node)
+workflow.add_node("Planner_Specialist", planner_agent.node)
+workflow.add_node("FinOps_Specialist", finops_agent.node)
+workflow.add_node("Chaos_Specialist", chaos_agent.node)
+workflow.add_node("Opsy_Specialist", opsy_agent.node)
+workflow.add_node("FuzzyLabs_Specialist", fuzzylabs_agent.node)
+workflow.add_node("OpsMate_Specialist", opsmate_agent.node)
+workflow.add_node("SmythOS_Specialist", smythos_agent.node)
+workflow.add_node("IncidentFox_Specialist", incidentfox_agent.node)
+workflow.add_node("BitsAI_Specialist", bits_ai_agent.node)
+workflow.add_node(PARALLEL_NODE, parallel_specialists_node)
 
 workflow.add_edge(START, "Supervisor")
 
 for member in members:
     workflow.add_edge(member, "Supervisor")
+workflow.add_edge(PARALLEL_NODE, "Supervisor")
 
 workflow.add_conditional_edges(
     "Supervisor",
@@ -462,12 +550,15 @@ workflow.add_conditional_edges(
         "SmythOS_Specialist": "SmythOS_Specialist",
         "IncidentFox_Specialist": "IncidentFox_Specialist",
         "BitsAI_Specialist": "BitsAI_Specialist",
+        PARALLEL_NODE: PARALLEL_NODE,
         "FINISH": END
     }
 )
 
-# Human-in-the-Loop: Interrupt before risky actions
-checkpointer = MemorySaver()
+# Human-in-the-Loop: Interrupt before risky actions.
+# Checkpoints are persisted (SQLite by default) so a pending approval survives
+# restarts and can be resumed by any worker.
+checkpointer = get_checkpointer()
 app_graph = workflow.compile(
     checkpointer=checkpointer,
     interrupt_before=[
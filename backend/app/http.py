@@ -0,0 +1,360 @@
+import asyncio
+import functools
+import random
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+from app.env import env_number
+
+# Max in-flight calls per upstream (per event loop). A slow upstream can only
+# hold this many slots, so it cannot starve the others.
+# Override with HTTP_MAX_CONCURRENCY_<UPSTREAM> (e.g. HTTP_MAX_CONCURRENCY_GITHUB=4).
+UPSTREAM_CONCURRENCY = {
+    "default": 16,
+    "github": 8,
+    "gcp": 8,
+    "k8s": 8,
+    "datadog": 8,
+    "azion": 4,
+    "traefik": 4,
+    "pagerduty": 4,
+    "slack": 4,
+    "jira": 4,
+}
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+SYNC_DEFAULT_TIMEOUT = (5.0, 10.0)  # (connect, read), same as DEFAULT_TIMEOUT
+
+# Retried with jittered exponential backoff (Retry-After wins when present).
+# Non-idempotent calls are only retried when the request was never processed:
+# 429 or a failed connect (refused, unresolvable or timed out). The same
+# policy applies to the sync and async layers.
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+
+def concurrency_for(upstream: str) -> int:
+    default = UPSTREAM_CONCURRENCY.get(upstream, UPSTREAM_CONCURRENCY["default"])
+    return env_number(f"HTTP_MAX_CONCURRENCY_{upstream.upper()}", default, minimum=1)
+
+
+def max_retries() -> int:
+    return env_number("HTTP_MAX_RETRIES", 2, minimum=0)
+
+
+def _retry_after(response) -> float:
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return min(float(value), RETRY_MAX_SECONDS) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_delay(attempt: int, response=None) -> float:
+    """Retry-After if the upstream sent one, else full-jitter exponential backoff."""
+    delay = _retry_after(response)
+    if delay is not None:
+        return delay
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def should_retry_status(method: str, status: int) -> bool:
+    if status == 429:
+        return True
+    return status in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+
+
+def _connect_failed(exc) -> bool:
+    """True when the request never reached the upstream, so resending it is always safe."""
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, requests.ConnectTimeout)):
+        return True
+    # requests wraps urllib3's NewConnectionError (a ConnectTimeoutError) in a ConnectionError.
+    if isinstance(exc, requests.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", None), ConnectTimeoutError)
+    return False
+
+
+def should_retry_error(method: str, exc) -> bool:
+    if _connect_failed(exc):
+        return True
+    transport = (httpx.TransportError, requests.ConnectionError, requests.Timeout)
+    return isinstance(exc, transport) and method in IDEMPOTENT_METHODS
+
+
+class UpstreamStats:
+    """Per-upstream request, error, retry, concurrency and latency counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _entry(self, upstream: str) -> dict:
+        return self._stats.setdefault(upstream, {
+            "requests": 0, "errors": 0, "retries": 0, "in_flight": 0, "max_in_flight": 0,
+            "latency_ms_total": 0.0, "latency_ms_max": 0.0})
+
+    def count(self, upstream: str, key: str, delta: int = 1):
+        with self._lock:
+            stats = self._entry(upstream)
+            stats[key] += delta
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+    def response(self, upstream: str, status: int):
+        """Server errors count as errors too, not only exceptions."""
+        if status >= 500:
+            self.count(upstream, "errors")
+
+    def observe(self, upstream: str, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._entry(upstream)
+            stats["latency_ms_total"] += ms
+            stats["latency_ms_max"] = max(stats["latency_ms_max"], ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for upstream, s in self._stats.items():
+                s = dict(s, limit=concurrency_for(upstream))
+                total = s.pop("latency_ms_total")
+                s["latency_ms_avg"] = round(total / s["requests"], 1) if s["requests"] else 0.0
+                s["latency_ms_max"] = round(s["latency_ms_max"], 1)
+                out[upstream] = s
+            return out
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class AsyncHTTP:
+    """
+    Shared async HTTP layer for tools.
+    One keep-alive `httpx.AsyncClient` and one semaphore per upstream for each
+    running event loop (asyncio primitives cannot be shared across loops).
+    Blocking SDK calls (kubernetes, google-cloud, datadog) go through
+    `run_blocking`, which bounds them by the same per-upstream limits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loops = weakref.WeakKeyDictionary()  # loop -> (client, semaphores)
+        self._stats = UpstreamStats()
+
+    def _loop_state(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None:
+                client = httpx.AsyncClient(
+                    timeout=DEFAULT_TIMEOUT,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+                state = (client, {})
+                self._loops[loop] = state
+            return state
+
+    def _semaphore(self, upstream: str) -> asyncio.Semaphore:
+        _, semaphores = self._loop_state()
+        with self._lock:
+            sem = semaphores.get(upstream)
+            if sem is None:
+                sem = semaphores[upstream] = asyncio.Semaphore(concurrency_for(upstream))
+            return sem
+
+    async def _bounded(self, upstream: str, make_call):
+        async with self._semaphore(upstream):
+            self._stats.count(upstream, "requests")
+            self._stats.count(upstream, "in_flight")
+            start = time.monotonic()
+            try:
+                return await make_call()
+            except Exception:
+                self._stats.count(upstream, "errors")
+                raise
+            finally:
+                self._stats.observe(upstream, time.monotonic() - start)
+                self._stats.count(upstream, "in_flight", -1)
+
+    async def request(self, upstream: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request on the shared client, bounded by the upstream's
+        semaphore and retried on 429/5xx and transport errors (the slot is
+        released while backing off).
+        """
+        client, _ = self._loop_state()
+        method = method.upper()
+        for attempt in range(max_retries() + 1):
+            last = attempt == max_retries()
+            try:
+                response = await self._bounded(
+                    upstream, lambda: client.request(method, url, **kwargs))
+                self._stats.response(upstream, response.status_code)
+            except Exception as e:
+                if last or not should_retry_error(method, e):
+                    raise
+                response = None
+            if response is not None and (last or not should_retry_status(method, response.status_code)):
+                return response
+            self._stats.count(upstream, "retries")
+            await asyncio.sleep(retry_delay(attempt, response))
+
+    async def run_blocking(self, upstream: str, fn, *args, **kwargs):
+        """Runs a blocking SDK call in a worker thread, bounded like HTTP calls."""
+        return await self._bounded(
+            upstream, lambda: asyncio.to_thread(fn, *args, **kwargs))
+
+    async def aclose(self):
+        """Closes the client bound to the running loop (call on shutdown)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.pop(loop, None)
+        if state:
+            await state[0].aclose()
+
+    def stats(self) -> dict:
+        return self._stats.snapshot()
+
+    def reset(self):
+        self._stats.clear()
+
+
+class SyncHTTP:
+    """
+    Shared blocking HTTP layer for the sync (`tool.invoke`) path.
+    One keep-alive `requests.Session` per upstream, with its connection pool
+    sized to the upstream's concurrency limit and a semaphore enforcing that
+    limit. Retries and timeouts follow the same policy as `AsyncHTTP`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._semaphores = {}
+        self._stats = UpstreamStats()
+
+    def session(self, upstream: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(upstream)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=concurrency_for(upstream))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[upstream] = session
+                self._semaphores[upstream] = threading.BoundedSemaphore(concurrency_for(upstream))
+            return session
+
+    def _semaphore(self, upstream: str) -> threading.BoundedSemaphore:
+        # Get-or-create: close() may swap in an empty dict while a call is in flight.
+        with self._lock:
+            sem = self._semaphores.get(upstream)
+            if sem is None:
+                sem = self._semaphores[upstream] = threading.BoundedSemaphore(concurrency_for(upstream))
+            return sem
+
+    def _send(self, upstream: str, session: requests.Session, method: str, url: str, **kwargs):
+        with self._semaphore(upstream):
+            self._stats.count(upstream, "requests")
+            self._stats.count(upstream, "in_flight")
+            start = time.monotonic()
+            try:
+                return session.request(method, url, **kwargs)
+            except Exception:
+                self._stats.count(upstream, "errors")
+                raise
+            finally:
+                self._stats.observe(upstream, time.monotonic() - start)
+                self._stats.count(upstream, "in_flight", -1)
+
+    def request(self, upstream: str, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request on the upstream's pooled session, bounded by its
+        semaphore and retried on 429/5xx and transport errors.
+        """
+        kwargs.setdefault("timeout", SYNC_DEFAULT_TIMEOUT)
+        session = self.session(upstream)
+        method = method.upper()
+        for attempt in range(max_retries() + 1):
+            last = attempt == max_retries()
+            try:
+                response = self._send(upstream, session, method, url, **kwargs)
+                self._stats.response(upstream, response.status_code)
+            except Exception as e:
+                if last or not should_retry_error(method, e):
+                    raise
+                response = None
+            if response is not None and (last or not should_retry_status(method, response.status_code)):
+                return response
+            self._stats.count(upstream, "retries")
+            if response is not None:
+                response.close()
+            time.sleep(retry_delay(attempt, response))
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+            self._semaphores = {}
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> dict:
+        return self._stats.snapshot()
+
+    def reset(self):
+        self._stats.clear()
+
+
+async_http = AsyncHTTP()
+sync_http = SyncHTTP()
+
+
+def request(upstream: str, method: str, url: str, **kwargs) -> requests.Response:
+    return sync_http.request(upstream, method, url, **kwargs)
+
+
+async def arequest(upstream: str, method: str, url: str, **kwargs) -> httpx.Response:
+    return await async_http.request(upstream, method, url, **kwargs)
+
+
+async def run_blocking(upstream: str, fn, *args, **kwargs):
+    return await async_http.run_blocking(upstream, fn, *args, **kwargs)
+
+
+def async_variant(sync_tool):
+    """
+    Registers the decorated coroutine as the async implementation of a
+    LangChain tool. `tool.invoke` (CLI) keeps using the sync function;
+    `tool.ainvoke` (the graph under FastAPI) awaits the coroutine.
+    """
+    def register(coro):
+        sync_tool.coroutine = coro
+        return coro
+    return register
+
+
+def offload_tool(tool, upstream: str = "default"):
+    """
+    Gives a sync-only tool a coroutine that runs it through `run_blocking`
+    instead of LangChain's unbounded default executor. No-op if the tool
+    already has an async implementation.
+    """
+    if tool.coroutine is not None:
+        return tool
+
+    @functools.wraps(tool.func)
+    async def offloaded(*args, **kwargs):
+        # Resolve tool.func at call time so later wrappers (single-flight) apply.
+        return await run_blocking(upstream, tool.func, *args, **kwargs)
+
+    offloaded.__offloaded__ = True
+    tool.coroutine = offloaded
+    return tool
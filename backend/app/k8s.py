@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+
+SERVICE_ACCOUNT_TOKEN = "/var/run/secrets/kubernetes.io/serviceaccount/token"
+
+# Chunk size for LIST calls: the API server and this process hold one page
+# at a time instead of the whole collection.
+LIST_PAGE_SIZE = 500
+# Server-side Table projection (what `kubectl get` renders) instead of full objects.
+TABLE_ACCEPT = "application/json;as=Table;v=v1;g=meta.k8s.io,application/json"
+
+
+def _kubeconfig_paths():
+    env = os.getenv("KUBECONFIG")
+    paths = env.split(os.pathsep) if env else ["~/.kube/config"]
+    return [os.path.expanduser(p) for p in paths if p]
+
+
+def _fingerprint():
+    """Identity of the files a client was built from (kubeconfig(s) + SA token)."""
+    parts = []
+    for path in _kubeconfig_paths() + [SERVICE_ACCOUNT_TOKEN]:
+        try:
+            st = os.stat(path)
+            parts.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            parts.append((path, None, None))
+    return tuple(parts)
+
+
+class K8sClientFactory:
+    """
+    Shared Kubernetes `ApiClient`s, one per kubeconfig context.
+    Kubeconfig is parsed once per context and re-read only when a kubeconfig
+    file or the service-account token changes; every tool reuses the same
+    client (and its connection pool). Clients get their own Configuration,
+    so contexts never race on the library's global default config.
+    Expiring exec/OIDC tokens are refreshed by the client's own hook.
+    """
+
+    def __init__(self):
+        self._clients = {}  # context -> (fingerprint, ApiClient)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "loads": 0, "reloads": 0, "failures": 0}
+
+    @staticmethod
+    def _load(context: str = None):
+        from kubernetes import client, config
+
+        configuration = client.Configuration()
+        try:
+            config.load_kube_config(context=context or None, client_configuration=configuration)
+        except config.ConfigException:
+            if context:
+                raise
+            config.load_incluster_config(client_configuration=configuration)
+        return client.ApiClient(configuration)
+
+    def api_client(self, context: str = None):
+        """
+        Returns the shared ApiClient for `context` (default: the current
+        context, or the in-cluster service account), or None if no
+        configuration can be loaded.
+        """
+        key = context or ""
+        fingerprint = _fingerprint()
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._stats["hits"] += 1
+                return cached[1]
+
+            try:
+                api_client = self._load(context)
+            except Exception:
+                self._stats["failures"] += 1
+                return None
+
+            # The replaced client may still be serving in-flight calls; it is
+            # released when the last of them drops it.
+            self._stats["reloads" if cached is not None else "loads"] += 1
+            self._clients[key] = (fingerprint, api_client)
+            return api_client
+
+    def api(self, api_class: str, context: str = None):
+        """
+        A typed API (e.g. "CoreV1Api", "AppsV1Api") bound to the shared
+        client for `context`, or None if no configuration can be loaded.
+        """
+        api_client = self.api_client(context)
+        if api_client is None:
+            return None
+        from kubernetes import client
+        return getattr(client, api_class)(api_client)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["contexts"] = sorted(self._clients)
+        return s
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+
+
+k8s_clients = K8sClientFactory()
+
+
+def k8s_api(api_class: str, context: str = None):
+    return k8s_clients.api(api_class, context)
+
+
+def get_k8s_client_stats() -> dict:
+    return k8s_clients.stats()
+
+
+def list_pages(list_fn, *args, page_size: int = LIST_PAGE_SIZE, **kwargs):
+    """Yields the pages of a chunked LIST (`limit`/`_continue`)."""
+    token = None
+    while True:
+        if token:
+            kwargs["_continue"] = token
+        page = list_fn(*args, limit=page_size, **kwargs)
+        yield page
+        token = page.metadata._continue
+        if not token:
+            break
+
+
+def list_table_rows(list_fn, *args, page_size: int = LIST_PAGE_SIZE, **kwargs):
+    """
+    Yields one `{column: cell}` dict per object from a chunked LIST served
+    as a Table, so only the printed columns cross the wire.
+    """
+    token = None
+    while True:
+        if token:
+            kwargs["_continue"] = token
+        response = list_fn(*args, limit=page_size, _preload_content=False,
+                           _headers={"Accept": TABLE_ACCEPT}, **kwargs)
+        table = json.loads(response.data)
+        columns = [c["name"] for c in table.get("columnDefinitions", [])]
+        for row in table.get("rows", []):
+            yield dict(zip(columns, row.get("cells", [])))
+        token = table.get("metadata", {}).get("continue")
+        if not token:
+            break
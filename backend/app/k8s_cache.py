@@ -0,0 +1,290 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.env import env_number
+from app.k8s import k8s_api, list_pages
+
+# resource -> (API class, cluster-wide list method). Informers LIST once and
+# then WATCH from the returned resourceVersion.
+RESOURCES = {
+    "pods": ("CoreV1Api", "list_pod_for_all_namespaces"),
+    "events": ("CoreV1Api", "list_event_for_all_namespaces"),
+    "deployments": ("AppsV1Api", "list_deployment_for_all_namespaces"),
+    "hpas": ("AutoscalingV2Api", "list_horizontal_pod_autoscaler_for_all_namespaces"),
+    "services": ("CoreV1Api", "list_service_for_all_namespaces"),
+    "endpoints": ("CoreV1Api", "list_endpoints_for_all_namespaces"),
+    "ingresses": ("NetworkingV1Api", "list_ingress_for_all_namespaces"),
+}
+
+# Stores that may drop their oldest entries and still be served (only the
+# most recent events matter); any other store that overflows is bypassed.
+LOSSY = {"events"}
+
+WATCH_TIMEOUT_SECONDS = 300
+LAST_APPLIED = "kubectl.kubernetes.io/last-applied-configuration"
+
+
+def cache_enabled() -> bool:
+    return os.getenv("K8S_WATCH_CACHE", "true").lower() not in ("0", "false", "no", "off")
+
+
+def watch_contexts() -> list:
+    """Kubeconfig contexts watched from server start: the default plus `K8S_WATCH_CONTEXTS`."""
+    extra = [c.strip() for c in os.getenv("K8S_WATCH_CONTEXTS", "").split(",") if c.strip()]
+    return [""] + list(dict.fromkeys(extra))
+
+
+def max_objects(resource: str) -> int:
+    if resource == "events":
+        return env_number("K8S_CACHE_MAX_EVENTS", 5000)
+    return env_number("K8S_CACHE_MAX_OBJECTS", 20000)
+
+
+def max_staleness() -> float:
+    return env_number("K8S_CACHE_MAX_STALENESS", 120, float)
+
+
+def _is_expired(exc) -> bool:
+    return getattr(exc, "status", None) == 410
+
+
+def _slim(obj):
+    """Drops the fields no tool reads but that dominate object size."""
+    meta = getattr(obj, "metadata", None)
+    if meta is not None:
+        meta.managed_fields = None
+        if meta.annotations and LAST_APPLIED in meta.annotations:
+            meta.annotations = {k: v for k, v in meta.annotations.items() if k != LAST_APPLIED}
+    return obj
+
+
+class Informer:
+    """
+    Local store of one resource kind, kept current by a background watch.
+    After the initial (paginated) LIST the watch resumes from the last seen
+    resourceVersion; only an expired version (410 Gone) triggers a re-LIST.
+    """
+
+    def __init__(self, resource: str, context: str = "", limit: int = None):
+        self.resource = resource
+        self.context = context
+        self.api_class, self.list_method = RESOURCES[resource]
+        self.limit = limit or max_objects(resource)
+        self.resource_version = None
+        self.synced = False
+        self.connected = False
+        self.complete = True
+        self.last_error = None
+        self._fresh_at = 0.0
+        self._store = OrderedDict()  # (namespace, name) -> object
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._thread = None
+        self._stats = {"lists": 0, "events": 0, "resumes": 0, "relists": 0, "evictions": 0, "errors": 0}
+
+    # --- store ---
+
+    def _add(self, store: OrderedDict, obj) -> bool:
+        """Stores the slimmed `obj`, evicting the oldest beyond the limit; True if any were evicted."""
+        meta = obj.metadata
+        key = (meta.namespace or "", meta.name)
+        store.pop(key, None)
+        store[key] = _slim(obj)
+        evicted = False
+        while len(store) > self.limit:
+            store.popitem(last=False)
+            self._stats["evictions"] += 1
+            evicted = True
+        return evicted
+
+    def _put(self, obj):
+        if self._add(self._store, obj):
+            self.complete = False
+
+    def list(self, namespace: str = "") -> list:
+        with self._lock:
+            if not namespace:
+                return list(self._store.values())
+            return [obj for (ns, _), obj in self._store.items() if ns == namespace]
+
+    def get(self, namespace: str, name: str):
+        with self._lock:
+            return self._store.get((namespace or "", name))
+
+    # --- freshness ---
+
+    def staleness(self) -> float:
+        """Seconds the store may be behind the API server (0 while watching)."""
+        if self.connected:
+            return 0.0
+        return max(0.0, time.time() - self._fresh_at)
+
+    def freshness(self) -> str:
+        # Only the bound, not the lag itself: this text ends up in prompts, and
+        # a number that changes every second would defeat the LLM response cache.
+        if self.staleness() < 1:
+            return "watch cache, live"
+        return f"watch cache, under {max_staleness():.0f}s stale"
+
+    def usable(self) -> bool:
+        if not self.synced:
+            return False
+        if not self.complete and self.resource not in LOSSY:
+            return False
+        return self.staleness() <= max_staleness()
+
+    # --- list/watch loop ---
+
+    def _api(self):
+        api = k8s_api(self.api_class, self.context)
+        if api is None:
+            raise RuntimeError("could not load Kubernetes configuration")
+        return getattr(api, self.list_method)
+
+    def _relist(self):
+        # Filled page by page into a bounded store that replaces the live one
+        # at the end, so a cluster-wide LIST holds at most `limit` slimmed
+        # objects plus one page, not the whole cluster.
+        store, complete = OrderedDict(), True
+        for page in list_pages(self._api()):
+            for obj in page.items:
+                if self._add(store, obj):
+                    complete = False
+        with self._lock:
+            self._store = store
+            self.complete = complete
+            self.resource_version = page.metadata.resource_version
+            self.synced = True
+            self._fresh_at = time.time()
+        self._stats["lists"] += 1
+
+    def _watch(self):
+        from kubernetes import watch
+
+        self._watcher = watch.Watch()
+        stream = self._watcher.stream(
+            self._api(), resource_version=self.resource_version,
+            timeout_seconds=WATCH_TIMEOUT_SECONDS, allow_watch_bookmarks=True)
+        try:
+            for event in stream:
+                kind, obj = event["type"], event["object"]
+                with self._lock:
+                    # Live from the first event (bookmarks keep quiet watches live).
+                    self.connected = True
+                    if kind == "DELETED":
+                        meta = obj.metadata
+                        self._store.pop((meta.namespace or "", meta.name), None)
+                    elif kind in ("ADDED", "MODIFIED"):
+                        self._put(obj)
+                    # The watcher tracks the version from objects and bookmarks alike.
+                    if self._watcher.resource_version:
+                        self.resource_version = self._watcher.resource_version
+                    self._fresh_at = time.time()
+                self._stats["events"] += 1
+                if self._stop.is_set():
+                    break
+        finally:
+            if self.connected:
+                self.connected = False
+                self._fresh_at = time.time()
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                if self.resource_version is None:
+                    self._relist()
+                self._watch()
+                self._stats["resumes"] += 1
+                backoff = 1
+            except Exception as e:
+                if _is_expired(e):
+                    self.resource_version = None
+                    self._stats["relists"] += 1
+                    continue
+                self.last_error = str(e)
+                self._stats["errors"] += 1
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"k8s-informer-{self.resource}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s.update(objects=len(self._store), synced=self.synced, complete=self.complete,
+                     staleness=round(self.staleness(), 1), resource_version=self.resource_version)
+        if self.last_error:
+            s["last_error"] = self.last_error
+        return s
+
+
+class ClusterCache:
+    """
+    Informers for every resource in RESOURCES, one set per kubeconfig
+    context, started with the server (see `watch_contexts`). `get` returns an
+    informer only when it is synced, complete and fresh enough; otherwise,
+    and for contexts that are not watched, callers LIST live.
+    """
+
+    def __init__(self):
+        self._informers = {}  # (context, resource) -> Informer
+        self._lock = threading.Lock()
+
+    def start(self, context: str = ""):
+        with self._lock:
+            for resource in RESOURCES:
+                if (context, resource) not in self._informers:
+                    informer = Informer(resource, context)
+                    self._informers[(context, resource)] = informer
+                    informer.start()
+
+    def get(self, resource: str, context: str = ""):
+        if not cache_enabled():
+            return None
+        informer = self._informers.get((context, resource))
+        return informer if informer is not None and informer.usable() else None
+
+    def stop(self):
+        with self._lock:
+            informers, self._informers = list(self._informers.values()), {}
+        for informer in informers:
+            informer.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            informers = dict(self._informers)
+        return {f"{ctx or 'default'}/{res}": inf.stats() for (ctx, res), inf in sorted(informers.items())}
+
+
+cluster_cache = ClusterCache()
+
+
+def cached(resource: str, context: str = ""):
+    """The informer for `resource` if it can answer reads, else None."""
+    return cluster_cache.get(resource, context)
+
+
+def cache_note(*informers) -> str:
+    """Staleness footer for tool output served from the watch cache."""
+    used = [i for i in informers if i is not None]
+    if not used:
+        return ""
+    worst = max(used, key=lambda i: i.staleness())
+    return f"\n_(from {worst.freshness()})_"
+
+
+def get_k8s_cache_stats() -> dict:
+    return cluster_cache.stats()
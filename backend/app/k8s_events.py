@@ -0,0 +1,103 @@
+import datetime
+
+# Lower ranks sort first.
+SEVERITY = {"Warning": 0, "Normal": 1}
+MAX_MESSAGE_CHARS = 120
+
+
+def _utc(ts):
+    if ts is None:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=datetime.timezone.utc)
+
+
+def event_times(event):
+    """(first_seen, last_seen, count) across core/v1 and events.k8s.io-style fields."""
+    series = getattr(event, "series", None)
+    created = _utc(event.metadata.creation_timestamp) if event.metadata else None
+    first = _utc(event.first_timestamp) or _utc(event.event_time) or created
+    last = (_utc(series.last_observed_time) if series else None) or _utc(event.last_timestamp) or first
+    count = (series.count if series else None) or event.count or 1
+    return first, last, count
+
+
+def object_selector(involved_object: str) -> str:
+    """Field selector for "name" or "Kind/name"."""
+    if not involved_object:
+        return ""
+    kind, _, name = involved_object.rpartition("/")
+    selector = f"involvedObject.name={name}"
+    return f"{selector},involvedObject.kind={kind}" if kind else selector
+
+
+def matches_object(event, involved_object: str) -> bool:
+    if not involved_object:
+        return True
+    kind, _, name = involved_object.rpartition("/")
+    obj = event.involved_object
+    return obj.name == name and (not kind or obj.kind == kind)
+
+
+class EventAggregator:
+    """
+    Collapses repeated events (same object, type and reason) into one row
+    with a total count and first/last timestamps. Events are fed one at a
+    time, so memory grows with distinct groups, not with raw events.
+    """
+
+    def __init__(self, window_minutes: int = 0, now: datetime.datetime = None):
+        self.now = now or datetime.datetime.now(datetime.timezone.utc)
+        self.since = self.now - datetime.timedelta(minutes=window_minutes) if window_minutes else None
+        self.groups = {}
+        self.seen = 0
+
+    def add(self, event):
+        first, last, count = event_times(event)
+        if self.since and last and last < self.since:
+            return
+        obj = event.involved_object
+        key = (obj.namespace or event.metadata.namespace, obj.kind, obj.name, event.type, event.reason)
+        self.seen += count
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = {"first": first, "last": last, "count": count, "message": event.message or ""}
+            return
+        group["count"] += count
+        if first and (group["first"] is None or first < group["first"]):
+            group["first"] = first
+        if last and (group["last"] is None or last >= group["last"]):
+            group["last"], group["message"] = last, event.message or group["message"]
+
+    def ranked(self) -> list:
+        """Warnings first, then most recent, then most frequent."""
+        oldest = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+        return sorted(
+            self.groups.items(),
+            key=lambda kv: (SEVERITY.get(kv[0][3], 2), -(kv[1]["last"] or oldest).timestamp(), -kv[1]["count"]))
+
+    def _ago(self, ts) -> str:
+        if ts is None:
+            return "?"
+        seconds = max(0, int((self.now - ts).total_seconds()))
+        if seconds < 60:
+            return f"{seconds}s"
+        if seconds < 3600:
+            return f"{seconds // 60}m"
+        if seconds < 86400:
+            return f"{seconds // 3600}h"
+        return f"{seconds // 86400}d"
+
+    def table(self, max_rows: int = 20, show_namespace: bool = False) -> str:
+        rows = self.ranked()
+        lines = ["| Type | Object | Reason | Count | First | Last | Message |",
+                 "|---|---|---|---|---|---|---|"]
+        for (ns, kind, name, type_, reason), g in rows[:max_rows]:
+            obj = f"{kind}/{ns}/{name}" if show_namespace else f"{kind}/{name}"
+            message = " ".join(g["message"].split()).replace("|", "/")
+            if len(message) > MAX_MESSAGE_CHARS:
+                message = message[:MAX_MESSAGE_CHARS - 3] + "..."
+            lines.append(f"| {type_} | {obj} | {reason} | {g['count']} | {self._ago(g['first'])} ago "
+                         f"| {self._ago(g['last'])} ago | {message} |")
+        if len(rows) > max_rows:
+            lines.append(f"... {len(rows) - max_rows} more groups not shown")
+        return "\n".join(lines)
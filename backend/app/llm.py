@@ -1,16 +1,174 @@
+import hashlib
+import importlib
 import os
-from langchain_ollama import ChatOllama
-from langchain_google_genai import ChatGoogleGenerativeAI, HarmBlockThreshold, HarmCategory
+import threading
+from app.cache import response_cache
+from app.singleflight import singleflight
+
+# Provider SDKs dominate import time, so they are imported on first use.
+_LAZY_IMPORTS = {
+    "ChatOllama": ("langchain_ollama", "ChatOllama"),
+    "ChatGoogleGenerativeAI": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "HarmBlockThreshold": ("langchain_google_genai", "HarmBlockThreshold"),
+    "HarmCategory": ("langchain_google_genai", "HarmCategory"),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _LAZY_IMPORTS[name]
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
+
+def _sdk(name):
+    # Module globals first, so patched attributes are honoured.
+    return globals()[name] if name in globals() else __getattr__(name)
+
 
 # Default to llama3 if not specified
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+GEMINI_MODEL = "gemini-1.5-flash"
+
+
+_CONNECTION_STATE = "llm_registry_connection"
+
+
+def _is_connect(event: str) -> bool:
+    # httpcore traces "connection.connect_tcp.started" (or connect_unix_socket)
+    # only when the pool has no idle connection to hand out.
+    return event.startswith("connection.connect_") and event.endswith(".started")
+
+
+def _httpx_clients(obj, depth: int = 3) -> list:
+    """httpx clients held by an SDK client, found through its *client* attributes."""
+    import httpx
+
+    found, frontier = [], [obj]
+    for _ in range(depth + 1):
+        nested = []
+        for o in frontier:
+            if isinstance(o, (httpx.Client, httpx.AsyncClient)):
+                found.append(o)
+                continue
+            attrs = dict(getattr(o, "__dict__", None) or {})
+            attrs.update(getattr(o, "__pydantic_private__", None) or {})
+            nested.extend(v for k, v in attrs.items() if "client" in k.lower() and v is not None)
+        frontier = nested
+    return found
+
+
+class LLMClientRegistry:
+    """
+    Process-wide pool of LLM clients.
+    Holds one client per provider/model slot and rebuilds it only when the
+    config fingerprint (endpoint, API key, ...) for that slot changes.
+    Reusing the client keeps its underlying keep-alive HTTP pool warm; the
+    httpx clients inside each SDK client are traced to count requests sent
+    on a newly opened connection versus a reused pooled one.
+    """
+
+    COUNTERS = ("hits", "misses", "reloads", "connections_opened", "connections_reused")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}  # slot -> (fingerprint, client)
+        self._stats = {}
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        """Hashes config values so secrets are never kept as cache keys."""
+        raw = "\x1f".join("" if p is None else str(p) for p in parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, slot: str, fingerprint: str, factory):
+        with self._lock:
+            stats = self._stats.setdefault(slot, dict.fromkeys(self.COUNTERS, 0))
+            entry = self._clients.get(slot)
+            if entry and entry[0] == fingerprint:
+                stats["hits"] += 1
+                return entry[1]
+
+            stats["misses"] += 1
+            if entry:
+                stats["reloads"] += 1
+
+            client = factory()
+            if client is not None:
+                self._clients[slot] = (fingerprint, client)
+                for http_client in _httpx_clients(client):
+                    self._trace_connections(slot, http_client)
+            return client
+
+    def _record_connection(self, slot: str, opened: bool):
+        with self._lock:
+            stats = self._stats.setdefault(slot, dict.fromkeys(self.COUNTERS, 0))
+            stats["connections_opened" if opened else "connections_reused"] += 1
+
+    def _trace_connections(self, slot: str, http_client):
+        """Hooks `http_client` so each response records whether httpcore opened a connection for it."""
+        import httpx
+
+        def start(request, asynchronous: bool):
+            state, outer = {"opened": False}, request.extensions.get("trace")
+
+            if asynchronous:
+                async def trace(event, info):
+                    state["opened"] |= _is_connect(event)
+                    if outer is not None:
+                        await outer(event, info)
+            else:
+                def trace(event, info):
+                    state["opened"] |= _is_connect(event)
+                    if outer is not None:
+                        outer(event, info)
+            request.extensions.update({"trace": trace, _CONNECTION_STATE: state})
+
+        def finish(response):
+            state = response.request.extensions.get(_CONNECTION_STATE)
+            if state is not None:
+                self._record_connection(slot, state["opened"])
+
+        if isinstance(http_client, httpx.AsyncClient):
+            async def on_request(request):
+                start(request, True)
+
+            async def on_response(response):
+                finish(response)
+        else:
+            def on_request(request):
+                start(request, False)
+            on_response = finish
+        http_client.event_hooks["request"].append(on_request)
+        http_client.event_hooks["response"].append(on_response)
+
+    def stats(self) -> dict:
+        with self._lock:
+            slots = {slot: dict(s) for slot, s in self._stats.items()}
+            clients = len(self._clients)
+        totals = dict.fromkeys(self.COUNTERS, 0)
+        for s in slots.values():
+            for k in totals:
+                totals[k] += s[k]
+        return {"clients": clients, "totals": totals, "slots": slots}
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._stats.clear()
+
+
+llm_registry = LLMClientRegistry()
 
 
 def get_llm():
     """
     Returns the configured LLM instance based on LLM_PROVIDER env var.
     Options: 'ollama' (default), 'gemini'.
+    Instances are pooled in `llm_registry` and reused across calls.
     """
     llm_provider = os.getenv("LLM_PROVIDER", "ollama").lower()
     google_api_key = os.getenv("GOOGLE_API_KEY")
@@ -23,29 +181,101 @@ def get_llm():
         # Best practice 2026: Use Flash for speed/cost, disable safety blocks for SRE logs
         # Using google-genai v1.0+ under the hood via langchain-google-genai
         # v2+
-        return ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            google_api_key=google_api_key,
-            temperature=0,  # Precision for SRE tasks
-            # convert_system_message_to_human=False, # Gemini 1.5 supports
-            # system instructions natively
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            }
+        chat_model = _sdk("ChatGoogleGenerativeAI")
+        harm_category = _sdk("HarmCategory")
+        block_none = _sdk("HarmBlockThreshold").BLOCK_NONE
+        return llm_registry.get(
+            f"gemini:{GEMINI_MODEL}",
+            llm_registry.fingerprint(google_api_key),
+            lambda: chat_model(
+                model=GEMINI_MODEL,
+                google_api_key=google_api_key,
+                temperature=0,  # Precision for SRE tasks
+                # convert_system_message_to_human=False, # Gemini 1.5 supports
+                # system instructions natively
+                safety_settings={
+                    harm_category.HARM_CATEGORY_DANGEROUS_CONTENT: block_none,
+                    harm_category.HARM_CATEGORY_HATE_SPEECH: block_none,
+                    harm_category.HARM_CATEGORY_HARASSMENT: block_none,
+                    harm_category.HARM_CATEGORY_SEXUALLY_EXPLICIT: block_none,
+                }
+            )
         )
 
     # Default to Ollama
-    return ChatOllama(
-        model=OLLAMA_MODEL,
-        base_url=OLLAMA_BASE_URL,
-        temperature=0,  # Precision for SRE tasks
+    model = os.getenv("OLLAMA_MODEL", OLLAMA_MODEL)
+    base_url = os.getenv("OLLAMA_BASE_URL", OLLAMA_BASE_URL)
+    return llm_registry.get(
+        f"ollama:{model}",
+        llm_registry.fingerprint(base_url),
+        lambda: _sdk("ChatOllama")(
+            model=model,
+            base_url=base_url,
+            temperature=0,  # Precision for SRE tasks
+        )
     )
 
 
-def generate_diagnosis(prompt: str, system_instruction: str = None) -> str:
+def cached_generate_content(
+        client,
+        contents,
+        tool: str = "default",
+        config=None,
+        model: str = GEMINI_MODEL,
+        bypass: bool = False) -> str:
+    """
+    Runs `client.models.generate_content` through the response cache.
+    Returns the response text; exceptions from the SDK propagate to the caller.
+    """
+    if isinstance(contents, list) and len(contents) > 1:
+        system_instruction, prompt = contents[:-1], contents[-1]
+    else:
+        system_instruction, prompt = None, contents
+    key = response_cache.make_key(model, system_instruction, prompt, config)
+
+    if response_cache.bypassed(bypass):
+        response_cache.record_bypass()
+    else:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    def call():
+        kwargs = {"model": model, "contents": contents}
+        if config:
+            kwargs["config"] = config
+        response = client.models.generate_content(**kwargs)
+        text = response.text if response else None
+        response_cache.set(key, text, tool)
+        return text
+
+    # Identical prompts already in flight share one model call.
+    return singleflight.do(f"llm:{key}", call)
+
+
+def cached_invoke(llm, prompt: str, tool: str = "default",
+                  bypass: bool = False) -> str:
+    """Invokes a LangChain chat model through the response cache and returns its content."""
+    model = f"{type(llm).__name__}:{getattr(llm, 'model', '')}"
+    key = response_cache.make_key(model, None, prompt)
+
+    if response_cache.bypassed(bypass):
+        response_cache.record_bypass()
+    else:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    def call():
+        content = llm.invoke(prompt).content
+        response_cache.set(key, content, tool)
+        return content
+
+    return singleflight.do(f"llm:{key}", call)
+
+
+def generate_diagnosis(prompt: str, system_instruction: str = None,
+                       tool: str = "generate_diagnosis", bypass_cache: bool = False) -> str:
     """Helper to generate a diagnosis using Google GenAI SDK with fallback to LangChain LLM."""
     client = get_google_sdk_client()
     diagnosis = "Analysis failed."
@@ -56,19 +286,16 @@ def generate_diagnosis(prompt: str, system_instruction: str = None) -> str:
             if system_instruction:
                 contents.append(system_instruction)
             contents.append(prompt)
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=contents
-            )
-            diagnosis = response.text
+            diagnosis = cached_generate_content(
+                client, contents, tool=tool, bypass=bypass_cache)
         except Exception:
             pass
 
     if diagnosis == "Analysis failed.":
         try:
             llm = get_llm()
-            res = llm.invoke(prompt)
-            diagnosis = res.content
+            diagnosis = cached_invoke(
+                llm, prompt, tool=tool, bypass=bypass_cache)
         except Exception as e:
             diagnosis = f"Could not perform diagnosis: {e}"
 
@@ -92,4 +319,23 @@ def get_google_sdk_client():
         print("Warning: GOOGLE_API_KEY not set. Cannot initialize Gen AI SDK.")
         return None
 
-    return genai.Client(api_key=api_key)
+    return llm_registry.get(
+        "genai-sdk",
+        llm_registry.fingerprint(api_key),
+        lambda: genai.Client(api_key=api_key)
+    )
+
+
+def get_llm_client_stats() -> dict:
+    """Returns hit/miss/reload and connection opened/reused counters of the client pool."""
+    return llm_registry.stats()
+
+
+def get_response_cache_stats() -> dict:
+    """Returns hit/miss counters of the LLM response cache."""
+    return response_cache.stats()
+
+
+def get_singleflight_stats() -> dict:
+    """Returns per-key call/coalesce/wait counters of in-flight deduplication."""
+    return singleflight.stats()
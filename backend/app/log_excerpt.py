@@ -0,0 +1,98 @@
+import re
+from collections import deque
+
+from app.env import env_number
+
+# Lines that mark a failure in CI output: GitHub Actions annotations, test
+# runner summaries (pytest, go test, jest, JUnit/maven, cargo) and common
+# crash signatures.
+FAILURE_PATTERNS = re.compile(
+    r"##\[error\]|\bFAILED\b|--- FAIL:|^FAIL\b|\b[Tt]ests? failed|\bERROR\b|\b[Ee]rror(\[E\d+\])?:|"
+    r"Traceback \(most recent call last\)|\w+(Error|Exception):|\bpanic:|npm ERR!|"
+    r"exit code [1-9]|Segmentation fault|\bfatal:|BUILD FAILURE")
+# GitHub Actions prefixes every line with an ISO timestamp.
+TIMESTAMP_PREFIX = re.compile(r"^\ufeff?\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d+)?Z ")
+MAX_LINE_CHARS = 400
+
+
+class FailureExcerpt:
+    """
+    Builds a bounded excerpt of a log fed one line at a time: the
+    `context` lines around every failure marker plus the last lines of the
+    log, never more than `max_lines` in total. Memory stays at a few
+    windows no matter how large the log is.
+    """
+
+    def __init__(self, context: int = None, max_lines: int = None, tail: int = 30):
+        self.context = context if context is not None else env_number("CI_LOG_CONTEXT_LINES", 20)
+        self.max_lines = max_lines if max_lines is not None else env_number("CI_LOG_MAX_EXCERPT_LINES", 400)
+        self.lines_seen = 0
+        self.bytes_seen = 0
+        self.failures = 0
+        self.first_failure = None
+        self._before = deque(maxlen=self.context)
+        self._tail = deque(maxlen=tail)
+        self._windows = []  # [[first line number, lines], ...]
+        self._kept = 0
+        self._after = 0
+
+    def _keep(self, number: int, line: str):
+        if self._kept >= self.max_lines:
+            return
+        window = self._windows[-1] if self._windows else None
+        if window is not None and window[0] + len(window[1]) == number:
+            window[1].append(line)
+        else:
+            self._windows.append([number, [line]])
+        self._kept += 1
+
+    def add(self, line: str):
+        self.lines_seen += 1
+        self.bytes_seen += len(line) + 1
+        number = self.lines_seen
+        line = TIMESTAMP_PREFIX.sub("", line.rstrip("\r\n"))
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS] + "..."
+        self._tail.append((number, line))
+
+        if FAILURE_PATTERNS.search(line):
+            self.failures += 1
+            if self.first_failure is None:
+                self.first_failure = line.strip()
+            start = number - len(self._before)
+            for offset, previous in enumerate(self._before):
+                self._keep(start + offset, previous)
+            self._before.clear()
+            self._keep(number, line)
+            self._after = self.context
+        elif self._after:
+            self._keep(number, line)
+            self._after -= 1
+        else:
+            self._before.append(line)
+
+    def feed(self, lines):
+        for line in lines:
+            self.add(line)
+        return self
+
+    def render(self) -> str:
+        if not self.lines_seen:
+            return ""
+        windows = [list(w) for w in self._windows]
+        # The tail carries the runner's summary; append what is not already kept.
+        kept_until = windows[-1][0] + len(windows[-1][1]) - 1 if windows else 0
+        tail = [(n, line) for n, line in self._tail if n > kept_until]
+        if tail:
+            windows.append([tail[0][0], [line for _, line in tail]])
+
+        out = [f"[{self.lines_seen} lines, {self.bytes_seen / 1024:.0f} KB, {self.failures} failure markers]"]
+        last = 0
+        for start, lines in windows:
+            if start > last + 1:
+                out.append(f"... ({start - last - 1} lines skipped) ...")
+            out.extend(lines)
+            last = start + len(lines) - 1
+        if self._kept >= self.max_lines:
+            out.append(f"... (excerpt capped at {self.max_lines} lines) ...")
+        return "\n".join(out)
@@ -0,0 +1,401 @@
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from app.env import env_number
+from app.k8s import k8s_api
+from app.log_templates import LEVEL, LEVELS, TIMESTAMP
+
+# Longest line kept in a buffer; the rest is cut so a runaway line cannot
+# blow the memory bound.
+MAX_LINE_CHARS = 2000
+RFC3339 = re.compile(r"^(\d{4}-\d\d-\d\d)[T ](\d\d:\d\d:\d\d)(?:[.,](\d+))?(Z|[+-]\d\d:?\d\d)?$")
+RELATIVE = re.compile(r"^(\d+)([smhd])$")
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_timestamp(ts: str) -> float:
+    """Epoch seconds of an RFC 3339 timestamp (nanoseconds allowed, UTC if no offset)."""
+    match = RFC3339.match(ts.strip())
+    if not match:
+        raise ValueError(f"invalid timestamp: {ts!r}")
+    day, clock, fraction, offset = match.groups()
+    moment = datetime.strptime(f"{day}T{clock}", "%Y-%m-%dT%H:%M:%S")
+    tz = timezone.utc
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        hours, minutes = int(offset[1:3]), int(offset[-2:])
+        tz = timezone(sign * timedelta(hours=hours, minutes=minutes))
+    seconds = moment.replace(tzinfo=tz).timestamp()
+    return seconds + (float(f"0.{fraction}") if fraction else 0.0)
+
+
+def parse_since(since: str, now: float = None):
+    """`since` as epoch seconds: "" (no bound), a duration ("30s", "10m", "2h", "1d") or RFC 3339."""
+    since = (since or "").strip()
+    if not since:
+        return None
+    match = RELATIVE.match(since)
+    if match:
+        return (now if now is not None else time.time()) - int(match.group(1)) * UNITS[match.group(2)]
+    return parse_timestamp(since)
+
+
+def pod_log_lines(v1, pod_name: str, namespace: str, opened=None, **kwargs):
+    """
+    Yields decoded pod log lines as they arrive instead of loading the whole
+    log. `opened(resp)` is called with the streaming response once it is open
+    so another thread can close it to end a blocked read.
+    """
+    resp = v1.read_namespaced_pod_log(name=pod_name, namespace=namespace, _preload_content=False, **kwargs)
+    if opened is not None:
+        opened(resp)
+    try:
+        pending = b""
+        for chunk in resp.stream(64 * 1024):
+            pending += chunk
+            *complete, pending = pending.split(b"\n")
+            for line in complete:
+                yield line.decode("utf-8", errors="replace")
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+    finally:
+        resp.release_conn()
+
+
+def _close(resp):
+    # urllib3 >= 2.3 can shut the socket down under a read blocked in another
+    # thread; close() alone only takes effect once that read returns.
+    for method in ("shutdown", "close"):
+        try:
+            getattr(resp, method, lambda: None)()
+        except Exception:
+            pass
+
+
+class LogLine:
+    __slots__ = ("seq", "pod", "ts", "epoch", "level", "text")
+
+    def __init__(self, seq: int, pod: str, ts, epoch, level, text: str):
+        self.seq = seq
+        self.pod = pod
+        self.ts = ts
+        self.epoch = epoch
+        self.level = level
+        self.text = text
+
+    def to_dict(self) -> dict:
+        return {"pod": self.pod, "ts": self.ts, "level": self.level, "line": self.text}
+
+    def render(self) -> str:
+        return f"{self.ts or '-'} {self.text}"
+
+
+class LogFilter:
+    """Server-side filter: a regex and/or a minimum level ("WARN" keeps WARN, ERROR and FATAL)."""
+
+    def __init__(self, pattern: str = "", level: str = ""):
+        try:
+            self.pattern = re.compile(pattern) if pattern else None
+        except re.error as e:
+            raise ValueError(f"invalid pattern {pattern!r}: {e}")
+        level = (level or "").upper()
+        if level and level not in LEVELS:
+            raise ValueError(f"unknown level {level!r} (one of {', '.join(LEVELS)})")
+        self.max_rank = LEVELS[level] if level else None
+
+    def matches(self, line: LogLine) -> bool:
+        if self.max_rank is not None and (line.level is None or LEVELS[line.level] > self.max_rank):
+            return False
+        return self.pattern is None or bool(self.pattern.search(line.text))
+
+
+class PodLogFollower:
+    """
+    Follows one pod's log over a single `follow=True` connection into a
+    ring buffer of the last `capacity` lines. The buffer is seeded from the
+    log's tail; when the stream ends (container restart, API timeout) it
+    reconnects with `since_seconds` and skips the lines it already holds.
+    Lines carry a sequence number so readers can pick up where they left off.
+    """
+
+    def __init__(self, pod: str, namespace: str = "default", container: str = "", context: str = "",
+                 capacity: int = None):
+        self.pod = pod
+        self.namespace = namespace
+        self.container = container
+        self.context = context
+        self.capacity = capacity or env_number("LOG_FOLLOW_BUFFER_LINES", 5000)
+        self.connected = False
+        self.last_error = None
+        self.last_used = time.time()
+        self.readers = 0  # open streams; a follower with readers is never reaped
+        self._buffer = deque(maxlen=self.capacity)
+        self._seq = 0
+        self._seeded_at = None
+        self._last_epoch = None
+        self._at_last_epoch = set()  # texts already seen at _last_epoch
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._resp = None  # the open follow=True response, closed by stop()
+        self._stats = {"lines": 0, "duplicates": 0, "reconnects": 0, "errors": 0}
+
+    def _api(self):
+        api = k8s_api("CoreV1Api", self.context)
+        if api is None:
+            raise RuntimeError("could not load Kubernetes configuration")
+        return api
+
+    def _read(self, **kwargs):
+        if self.container:
+            kwargs["container"] = self.container
+        opened = self._opened if kwargs.get("follow") else None
+        return pod_log_lines(self._api(), self.pod, self.namespace, opened=opened, timestamps=True, **kwargs)
+
+    def _opened(self, resp):
+        self._resp = resp
+        if self._stop.is_set():
+            # stop() ran while this connection was being opened.
+            _close(resp)
+
+    # --- buffer ---
+
+    def _append(self, raw: str):
+        raw = raw.rstrip("\r\n")
+        if not raw.strip():
+            return
+        ts, epoch, text = None, None, raw
+        match = TIMESTAMP.match(raw)
+        if match:
+            ts, text = match.group(1), raw[match.end():]
+            try:
+                epoch = parse_timestamp(ts)
+            except ValueError:
+                ts = None
+        level = LEVEL.search(text)
+        level = level.group(1).upper() if level else None
+        if len(text) > MAX_LINE_CHARS:
+            text = text[:MAX_LINE_CHARS] + "..."
+        with self._lock:
+            if epoch is not None and self._last_epoch is not None:
+                # A resumed stream starts at a whole second; drop what we already hold.
+                if epoch < self._last_epoch or (epoch == self._last_epoch and text in self._at_last_epoch):
+                    self._stats["duplicates"] += 1
+                    return
+            if epoch is not None:
+                if epoch != self._last_epoch:
+                    self._last_epoch, self._at_last_epoch = epoch, set()
+                self._at_last_epoch.add(text)
+            self._seq += 1
+            self._buffer.append(LogLine(self._seq, self.pod, ts, epoch, level, text))
+            self._stats["lines"] += 1
+
+    def seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def since_seq(self, seq: int, log_filter: LogFilter = None) -> tuple:
+        """(matching lines after `seq`, lines dropped from the buffer before they could be read, new seq)."""
+        self.last_used = time.time()
+        with self._lock:
+            lines = [line for line in self._buffer if line.seq > seq]
+            oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+            current = self._seq
+        dropped = max(0, oldest - seq - 1)
+        if log_filter is not None:
+            lines = [line for line in lines if log_filter.matches(line)]
+        return lines, dropped, current
+
+    def query(self, log_filter: LogFilter = None, since: float = None, limit: int = 50) -> tuple:
+        """
+        (the last `limit` buffered lines matching the filter at or after
+        `since` (epoch seconds), the sequence number to follow on from).
+        """
+        lines, _, seq = self.since_seq(0, log_filter)
+        if since is not None:
+            lines = [line for line in lines if line.epoch is not None and line.epoch >= since]
+        return lines[-max(1, limit):], seq
+
+    # --- follow loop ---
+
+    def _follow(self):
+        # Resume from the newest buffered line (or the seeding, for a quiet pod)
+        # so nothing written between two connections is missed.
+        resume_from = self._last_epoch if self._last_epoch is not None else self._seeded_at
+        kwargs = {"follow": True, "since_seconds": max(1, int(time.time() - resume_from) + 1)}
+        self.connected = True
+        try:
+            for raw in self._read(**kwargs):
+                self._append(raw)
+                if self._stop.is_set():
+                    break
+        finally:
+            self.connected = False
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self._follow()
+                backoff = 1
+            except Exception as e:
+                if self._stop.is_set():
+                    break  # stop() closed the stream under the read
+                self.last_error = str(e)
+                self._stats["errors"] += 1
+                if getattr(e, "status", None) == 404:
+                    break  # the pod is gone; retrying cannot bring it back
+                backoff = min(backoff * 2, 60)
+            finally:
+                self._resp = None
+            if self._stop.wait(backoff):
+                break
+            self._stats["reconnects"] += 1
+
+    def start(self, tail: int = None):
+        """Seeds the buffer with the last `tail` lines (errors propagate), then follows in the background."""
+        if self._thread is not None:
+            return
+        tail = tail if tail is not None else min(self.capacity, env_number("LOG_FOLLOW_TAIL_LINES", 1000))
+        self._seeded_at = time.time()
+        for raw in self._read(tail_lines=tail):
+            self._append(raw)
+        self._thread = threading.Thread(target=self._run, name=f"log-follow-{self.pod}", daemon=True)
+        self._thread.start()
+
+    def attach(self):
+        with self._lock:
+            self.readers += 1
+        self.last_used = time.time()
+
+    def detach(self):
+        with self._lock:
+            self.readers -= 1
+        self.last_used = time.time()
+
+    @property
+    def stopped(self) -> bool:
+        """True once stopped, or once the follow loop gave up (e.g. the pod was deleted)."""
+        return self._stop.is_set() or (self._thread is not None and not self._thread.is_alive())
+
+    def stop(self):
+        """Stops following; the open stream is closed so a read blocked on a quiet pod returns."""
+        self._stop.set()
+        resp = self._resp
+        if resp is not None:
+            _close(resp)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s.update(buffered=len(self._buffer), capacity=self.capacity, connected=self.connected,
+                     readers=self.readers, idle=round(time.time() - self.last_used))
+        if self.last_error:
+            s["last_error"] = self.last_error
+        return s
+
+
+class LogFollowRegistry:
+    """
+    One follower per (context, namespace, pod, container), shared by the
+    `/logs/stream` endpoint and the `follow_pod_logs` tool, so each pod is
+    read over a single connection however many readers there are. Followers
+    unused for `LOG_FOLLOW_IDLE_SECONDS` are stopped by a background reaper
+    (and on every lookup); at most `LOG_FOLLOW_MAX_PODS` run at once (least
+    recently used is stopped first). Followers with an open stream attached
+    are never reaped, even if that exceeds the limit.
+    """
+
+    def __init__(self):
+        self._followers = {}  # key -> PodLogFollower
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stats = {"started": 0, "reused": 0, "expired": 0}
+
+    def _reap(self, room: int = 0) -> list:
+        """Unregisters idle followers, and the oldest beyond the limit less `room`; the caller stops them."""
+        # Caller holds self._lock.
+        idle = env_number("LOG_FOLLOW_IDLE_SECONDS", 600, float)
+        limit = env_number("LOG_FOLLOW_MAX_PODS", 50)
+        by_age = sorted(self._followers.items(), key=lambda kv: kv[1].last_used)
+        running = len(by_age) + room
+        expired = []
+        for key, follower in by_age:
+            if follower.readers:
+                continue
+            if time.time() - follower.last_used > idle or running > limit:
+                expired.append(follower)
+                del self._followers[key]
+                self._stats["expired"] += 1
+                running -= 1
+        return expired
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(min(env_number("LOG_FOLLOW_IDLE_SECONDS", 600, float), 60) / 2)
+            with self._lock:
+                expired = self._reap()
+                if not self._followers:
+                    self._reaper = None
+            for follower in expired:
+                follower.stop()
+            if self._reaper is not threading.current_thread():
+                return
+
+    def get(self, pod: str, namespace: str = "default", container: str = "", context: str = "") -> PodLogFollower:
+        """The running follower for a pod, started (and seeded) on first use."""
+        key = (context, namespace, pod, container)
+        with self._lock:
+            follower = self._followers.get(key)
+            if follower is not None:
+                follower.last_used = time.time()
+                self._stats["reused"] += 1
+            expired = self._reap(room=0 if follower is not None else 1)
+        for old in expired:
+            old.stop()
+        if follower is not None:
+            return follower
+        follower = PodLogFollower(pod, namespace, container, context)
+        follower.start()
+        with self._lock:
+            existing = self._followers.get(key)
+            if existing is not None:
+                # Lost a race with another reader; keep the first one.
+                follower.stop()
+                return existing
+            self._followers[key] = follower
+            self._stats["started"] += 1
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_loop, name="log-follow-reaper", daemon=True)
+                self._reaper.start()
+        return follower
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["pods"] = {f"{ctx or 'default'}/{ns}/{pod}" + (f"/{c}" if c else ""): f.stats()
+                         for (ctx, ns, pod, c), f in self._followers.items()}
+        return s
+
+    def stop(self):
+        with self._lock:
+            followers, self._followers = list(self._followers.values()), {}
+            self._reaper = None
+            for k in self._stats:
+                self._stats[k] = 0
+        for follower in followers:
+            follower.stop()
+
+
+log_followers = LogFollowRegistry()
+
+
+def follow_pod(pod: str, namespace: str = "default", container: str = "", context: str = "") -> PodLogFollower:
+    return log_followers.get(pod, namespace, container, context)
+
+
+def get_log_follow_stats() -> dict:
+    return log_followers.stats()
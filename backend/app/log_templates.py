@@ -0,0 +1,215 @@
+import re
+from collections import OrderedDict
+
+WILDCARD = "<*>"
+# Leading timestamp as written by `kubectl logs --timestamps` (RFC 3339) or
+# common app loggers ("2026-05-01 10:00:00,123").
+TIMESTAMP = re.compile(r"^\s*(\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:[.,]\d+)?(?:Z|[+-]\d\d:?\d\d)?)\s+")
+# Tokens that are variables wherever they appear; masked before the tree
+# lookup so they never split a template.
+VARIABLES = re.compile(
+    r"^(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"  # uuid
+    r"|\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?"                                   # ipv4[:port]
+    r"|0x[0-9a-f]+|[0-9a-f]{12,}"                                          # hex ids / hashes
+    r"|[-+]?\d+(?:\.\d+)?(?:ms|us|µs|ns|s|m|h|%|b|kb|mb|gb|ki|mi|gi)?"    # numbers, durations, sizes
+    r")[,;:.)\]]*$", re.IGNORECASE)
+LEVELS = {"FATAL": 0, "PANIC": 0, "CRITICAL": 0, "ERROR": 1, "ERR": 1, "WARN": 2, "WARNING": 2,
+          "INFO": 3, "DEBUG": 4, "TRACE": 4}
+LEVEL = re.compile(r"\b(" + "|".join(LEVELS) + r")\b", re.IGNORECASE)
+MAX_SAMPLES = 3
+MAX_VALUES = 5
+
+
+def _mask(token: str) -> str:
+    if VARIABLES.match(token):
+        return WILDCARD
+    key, sep, value = token.partition("=")
+    if sep and value and VARIABLES.match(value):
+        return f"{key}={WILDCARD}"
+    return token
+
+
+def normalize(text: str) -> str:
+    """`text` with its variable tokens masked: lines differing only in ids, numbers, IPs... are equal."""
+    return " ".join(_mask(t) for t in text.split())
+
+
+class LogTemplate:
+    """One mined template with its count, time range, level, sample values and sources."""
+
+    __slots__ = ("tokens", "count", "first_seen", "last_seen", "level", "samples", "values", "sources")
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.level = None
+        self.samples = []
+        self.values = {}  # wildcard position -> distinct sample values
+        self.sources = {}  # source (e.g. replica) -> lines
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: list) -> float:
+        # Masked positions match each other, so mostly-variable lines still group.
+        same = sum(1 for a, b in zip(self.tokens, tokens) if a == b)
+        return same / len(tokens)
+
+    def merge(self, tokens: list):
+        for i, (a, b) in enumerate(zip(self.tokens, tokens)):
+            if a != b and a != WILDCARD:
+                # Keep the value this position had before it became a variable.
+                self.values.setdefault(i, []).append(a)
+                self.tokens[i] = WILDCARD
+
+    def observe(self, raw_tokens: list, line: str, ts, level, source=None):
+        self.count += 1
+        if source is not None:
+            self.sources[source] = self.sources.get(source, 0) + 1
+        if ts:
+            # Lines from several sources interleave; keep the true range.
+            self.first_seen = min(self.first_seen, ts) if self.first_seen else ts
+            self.last_seen = max(self.last_seen, ts) if self.last_seen else ts
+        if level is not None and (self.level is None or LEVELS[level] < LEVELS[self.level]):
+            self.level = level
+        if len(self.samples) < MAX_SAMPLES and line not in self.samples:
+            self.samples.append(line)
+        for i, token in enumerate(self.tokens):
+            if i >= len(raw_tokens):
+                break
+            if token == WILDCARD:
+                value = raw_tokens[i]
+            elif token.endswith("=" + WILDCARD):
+                value = raw_tokens[i].partition("=")[2]
+            else:
+                continue
+            values = self.values.setdefault(i, [])
+            if len(values) < MAX_VALUES and value not in values:
+                values.append(value)
+
+
+class TemplateMiner:
+    """
+    Streaming Drain-style log template miner. Lines are routed through a
+    fixed-depth parse tree (token count, then the first `depth` tokens) to
+    a small list of candidate templates; a line joins the most similar one
+    (at least `similarity` of its tokens equal) and differing positions
+    become `<*>`, otherwise it starts a new template. Memory is bounded by
+    `max_templates` (least recently matched are dropped), not by log size.
+    Lines may be tagged with a source (e.g. the replica they came from), so
+    one miner deduplicates several logs and tells where each template occurs.
+    """
+
+    def __init__(self, depth: int = 3, similarity: float = 0.5, max_children: int = 64,
+                 max_templates: int = 2000):
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self.lines = 0
+        self.evicted = 0
+        self.sources = set()
+        self._tree = {}  # length -> {prefix tuple -> [LogTemplate]}
+        self._lru = OrderedDict()  # id(template) -> (template, leaf list)
+        # Masked token tuple -> the template that absorbed it: repeated lines
+        # skip the leaf scan. Bounded; cleared when full.
+        self._exact = {}
+
+    def _leaf(self, tokens: list) -> list:
+        prefix = []
+        for token in tokens[:self.depth]:
+            # Tokens with digits are usually variables; don't branch on them.
+            prefix.append(WILDCARD if any(c.isdigit() for c in token) else token)
+        by_prefix = self._tree.setdefault(len(tokens), {})
+        key = tuple(prefix)
+        if key not in by_prefix and len(by_prefix) >= self.max_children:
+            key = (WILDCARD,) * len(prefix)
+        return by_prefix.setdefault(key, [])
+
+    def add(self, line: str, source=None):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            return None
+        self.lines += 1
+        if source is not None:
+            self.sources.add(source)
+        ts = None
+        match = TIMESTAMP.match(line)
+        if match:
+            ts, line = match.group(1), line[match.end():]
+        level = LEVEL.search(line)
+        level = level.group(1).upper() if level else None
+        raw = line.split()
+        tokens = [_mask(t) for t in raw]
+
+        key = tuple(tokens)
+        best = self._exact.get(key)
+        entry = self._lru.get(id(best)) if best is not None else None
+        if entry is not None and entry[0] is best:
+            leaf = entry[1]
+        else:
+            leaf = self._leaf(tokens)
+            best, best_score = None, -1.0
+            for template in leaf:
+                score = template.similarity(tokens)
+                if score > best_score:
+                    best, best_score = template, score
+            if best is None or best_score < self.similarity:
+                best = LogTemplate(list(tokens))
+                leaf.append(best)
+            else:
+                best.merge(tokens)
+            if len(self._exact) >= 4 * self.max_templates:
+                self._exact.clear()
+            self._exact[key] = best
+        best.observe(raw, line, ts, level, source)
+
+        self._lru.pop(id(best), None)
+        self._lru[id(best)] = (best, leaf)
+        while len(self._lru) > self.max_templates:
+            _, (old, old_leaf) = self._lru.popitem(last=False)
+            old_leaf.remove(old)
+            self.evicted += 1
+        return best
+
+    def feed(self, lines, source=None):
+        for line in lines:
+            self.add(line, source)
+        return self
+
+    def templates(self) -> list:
+        """Most severe first, then most frequent."""
+        return sorted((t for t, _ in self._lru.values()),
+                      key=lambda t: (LEVELS.get(t.level, 3), -t.count))
+
+    def _seen_in(self, template) -> str:
+        names = sorted(template.sources)
+        if len(names) == len(self.sources):
+            return f"all {len(names)}"
+        shown = ", ".join(names[:3]) + (f" +{len(names) - 3}" if len(names) > 3 else "")
+        return f"{len(names)}/{len(self.sources)}: {shown}"
+
+    def table(self, max_rows: int = 30) -> str:
+        rows = self.templates()
+        # With tagged lines, a column tells which sources show each template.
+        seen_in = bool(self.sources)
+        header = ("| Level | Count |" + (" Seen in |" if seen_in else "")
+                  + " First seen | Last seen | Template | Sample values |")
+        lines = [header, "|---" * header.count(" |") + "|"]
+        for t in rows[:max_rows]:
+            values = "; ".join(", ".join(v) for v in t.values.values())
+            text = t.text.replace("|", "/")
+            where = f" {self._seen_in(t)} |" if seen_in else ""
+            lines.append(f"| {t.level or '-'} | {t.count} |{where} {t.first_seen or '-'} | {t.last_seen or '-'} "
+                         f"| {text[:200]} | {values.replace('|', '/')[:120]} |")
+        if len(rows) > max_rows:
+            rest = rows[max_rows:]
+            lines.append(f"... {len(rest)} more templates ({sum(t.count for t in rest)} lines) not shown")
+        return "\n".join(lines)
+
+    def exemplars(self, max_templates: int = 5) -> str:
+        """A raw sample line for each of the top templates."""
+        return "\n".join(t.samples[0] for t in self.templates()[:max_templates] if t.samples)
@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.env import env_number
+
+# The map prompt depends only on the chunk text, so each chunk's findings
+# are cached by content hash (via the LLM response cache) and reused by any
+# later analysis that contains the same chunk, whatever its context.
+MAP_PROMPT = (
+    "You are an expert SRE log analyzer. Below is one part of a larger log.\n"
+    "List the errors, warnings and anomalies in it: what happened, approximate counts, "
+    "first/last timestamps and the components involved. Be terse. "
+    "If nothing is notable, answer 'No issues.'\n\nLOG PART:\n{chunk}"
+)
+REDUCE_PROMPT = (
+    "Context: {context}\n\n"
+    "Below are findings from consecutive parts of one log, in order. Merge them into a single "
+    "report: deduplicate repeated issues and add up their counts, keep the timeline, and identify "
+    "the most probable root cause. Be technical and concise.\n\n{findings}"
+)
+
+
+def chunk_chars() -> int:
+    """Largest input sent to the standard LLM in one call."""
+    return env_number("LLM_CHUNK_CHARS", 12000, minimum=1)
+
+
+def split_lines(text: str, max_chars: int) -> list:
+    """Splits text on line boundaries into chunks of at most `max_chars` (longer lines are cut)."""
+    chunks, current, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                chunks.append("".join(current))
+                current, size = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if not line:
+            continue
+        if size + len(line) > max_chars:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _groups(partials: list, max_chars: int) -> list:
+    """Packs consecutive findings into reduce inputs; at least two per group so every level shrinks."""
+    groups, current, size = [], [], 0
+    for partial in partials:
+        if len(current) >= 2 and size + len(partial) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(partial)
+        size += len(partial)
+    if len(current) == 1 and groups:
+        groups[-1].append(current[0])
+    elif current:
+        groups.append(current)
+    return groups
+
+
+def map_reduce(text: str, analyze, context: str = "", max_chars: int = None,
+               concurrency: int = None) -> tuple:
+    """
+    Analyzes text of any size with a model that only fits `max_chars` per
+    call: the line-aligned chunks are analyzed concurrently (at most
+    `concurrency` calls in flight, `LLM_MAP_CONCURRENCY`, default 4), then
+    the partial findings are merged level by level until one report is left.
+    `analyze(prompt) -> str` makes one LLM call. Returns (report, chunk count).
+    """
+    max_chars = max_chars or chunk_chars()
+    concurrency = concurrency or env_number("LLM_MAP_CONCURRENCY", 4, minimum=1)
+    chunks = split_lines(text, max_chars) or [""]
+
+    def map_chunk(chunk):
+        try:
+            return analyze(MAP_PROMPT.format(chunk=chunk)), None
+        except Exception as e:
+            return None, e
+
+    def reduce_group(group):
+        findings = "\n\n".join(f"--- Part {i} ---\n{p}" for i, p in enumerate(group, 1))
+        return analyze(REDUCE_PROMPT.format(context=context, findings=findings))
+
+    workers = max(1, min(concurrency, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-map") as pool:
+        results = list(pool.map(map_chunk, chunks))
+        errors = [e for _, e in results if e is not None]
+        if len(errors) == len(results):
+            raise errors[0]
+        # One failed part must not lose the findings of all the others.
+        partials = [p if e is None else f"(Analysis of this part failed: {e})" for p, e in results]
+        while len(partials) > 1:
+            partials = list(pool.map(reduce_group, _groups(partials, max_chars)))
+    return partials[0], len(chunks)
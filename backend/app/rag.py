@@ -1,18 +1,43 @@
 import os
+import threading
 from typing import List, Dict, Optional
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
 from app.db import SessionLocal, Incident, Service, Runbook, PostMortem
 
 CHROMA_DB_DIR = "./chroma_db"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
 
 class RAGEngine:
+    """
+    Vector store over runbooks, services and incidents.
+    The embedding model and Chroma client are heavy (torch, transformers), so
+    they are only loaded on first use rather than at import time.
+    """
+
     def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2")
-        self.vector_store = Chroma(
+        self._embeddings = None
+        self._vector_store = None
+        self._lock = threading.RLock()
+
+    @property
+    def embeddings(self):
+        with self._lock:
+            if self._embeddings is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+                self._embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+            return self._embeddings
+
+    @property
+    def vector_store(self):
+        with self._lock:
+            if self._vector_store is None:
+                self._vector_store = self._open_store()
+            return self._vector_store
+
+    def _open_store(self):
+        from langchain_chroma import Chroma
+        return Chroma(
             collection_name="sre_knowledge_base",
             embedding_function=self.embeddings,
             persist_directory=CHROMA_DB_DIR
@@ -35,11 +60,8 @@ class RAGEngine:
     def reset(self):
         """Resets the vector store (clears all data)."""
         self.vector_store.delete_collection()
-        self.vector_store = Chroma(
-            collection_name="sre_knowledge_base",
-            embedding_function=self.embeddings,
-            persist_directory=CHROMA_DB_DIR
-        )
+        with self._lock:
+            self._vector_store = self._open_store()
 
 
 rag_engine = RAGEngine()
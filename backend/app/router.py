@@ -0,0 +1,216 @@
+import datetime
+import json
+import math
+import os
+import re
+import threading
+from collections import deque
+
+from app.env import env_number
+
+# Unambiguous vocabulary lifted from the supervisor routing table. Generic
+# nouns ("pods", "incident", "commits", "pipeline", "IAM", "CDN") are left out:
+# they appear in prompts meant for other specialists. Automation and Chaos
+# are never fast-pathed because they perform risky actions.
+KEYWORD_RULES = {
+    "Traefik_Specialist": [r"\btraefik\b", r"\bingress ?routes?\b"],
+    "Azion_Specialist": [r"\bazion\b", r"\bwaf\b", r"\bedge (functions?|applications?|apps?|cache)\b"],
+    "CICD_Specialist": [r"\bargo ?cd\b", r"\bgithub actions\b", r"\bci/cd\b"],
+    "Incident_Specialist": [r"\bpost-?mortems?\b", r"\bremediation plan\b"],
+    "FuzzyLabs_Specialist": [r"\bfuzzy ?labs\b"],
+    "OpsMate_Specialist": [r"\bops ?mate\b"],
+    "IncidentFox_Specialist": [r"\bincident ?fox\b"],
+    "Opsy_Specialist": [r"\bopsy\b"],
+    "SmythOS_Specialist": [r"\bsmyth ?os\b"],
+    "BitsAI_Specialist": [r"\bbits ?ai\b"],
+    "FinOps_Specialist": [r"\bfinops\b", r"\bspot (instances?|vms?|migrations?)\b", r"\bcloud costs?\b"],
+    "K8s_Specialist": [r"\bkubectl\b", r"\bcrashloop\w*", r"\bkubernetes\b", r"\bk8s\b"],
+    "GCP_Specialist": [r"\bgcp\b", r"\bcloud sql\b", r"\bgmp\b", r"\bcompute engine\b", r"\bgoogle cloud\b"],
+    "Datadog_Specialist": [r"\bdatadog\b", r"\bapm\b"],
+    "Code_Specialist": [r"\bpull requests?\b", r"\bfix (this|the) bug\b"],
+    "Security_Specialist": [r"\bvulnerabilit(y|ies)\b", r"\bcve-\d+"],
+    "Planner_Specialist": [r"\bhypothes[ie]s\b", r"\bhypothesi[sz]e\b"],
+    "Topology_Specialist": [r"\btopology\b", r"\bdependency (map|graph)\b", r"\bservice catalog\b"],
+}
+
+# Symptoms ("slow", "latency", "5xx", "outage") call for the SMART TRIAGE
+# rules and the LLM's judgement, whichever specialist a keyword points at.
+SYMPTOMS = re.compile(
+    r"\b(slow\w*|latency|lag\w*|5\d\ds?|5xx|errors?|outages?|time ?outs?|timing out|down|broken|"
+    r"fail(s|ed|ing|ures?)?|degraded|why)\b", re.IGNORECASE)
+
+# Labelled examples for the embedding nearest-neighbour stage.
+LABELLED_EXAMPLES = [
+    ("Pod keeps restarting with CrashLoopBackOff", "K8s_Specialist"),
+    ("Container was OOMKilled in the payments namespace", "K8s_Specialist"),
+    ("Right-size the resource limits of my deployments", "K8s_Specialist"),
+    ("Cloud SQL instance is refusing connections", "GCP_Specialist"),
+    ("Compute Engine VM is unreachable", "GCP_Specialist"),
+    ("Show me severe errors from Cloud Logging", "GCP_Specialist"),
+    ("Which Datadog monitors are firing right now?", "Datadog_Specialist"),
+    ("Query the p99 latency metric for checkout", "Datadog_Specialist"),
+    ("Is the ingress controller healthy?", "Traefik_Specialist"),
+    ("SSL certificate on the ingress is failing", "Traefik_Specialist"),
+    ("Purge the CDN cache for the homepage", "Azion_Specialist"),
+    ("The web application firewall is blocking users", "Azion_Specialist"),
+    ("Show the recent commits to the payment repo", "Code_Specialist"),
+    ("Open a pull request with the fix", "Code_Specialist"),
+    ("The build failed in the deploy pipeline", "CICD_Specialist"),
+    ("Is the ArgoCD application out of sync?", "CICD_Specialist"),
+    ("Scan this image for CVEs", "Security_Specialist"),
+    ("Audit the IAM permissions of this user", "Security_Specialist"),
+    ("Write the post-mortem for yesterday's outage", "Incident_Specialist"),
+    ("Open a SEV-1 incident and page the on-call", "Incident_Specialist"),
+    ("Draw the service dependency map", "Topology_Specialist"),
+    ("Give me a global health dashboard of the platform", "Topology_Specialist"),
+    ("Brainstorm hypotheses for this intermittent failure", "Planner_Specialist"),
+    ("Why did our cloud bill spike this week?", "FinOps_Specialist"),
+    ("Which workloads can move to spot instances?", "FinOps_Specialist"),
+]
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a))
+    nb = math.sqrt(sum(y * y for y in b))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+def _default_embed(texts):
+    from app.rag import rag_engine
+    return rag_engine.embeddings.embed_documents(texts)
+
+
+class FastRouter:
+    """
+    Local classifier in front of the supervisor LLM.
+    Keyword rules first, then nearest-neighbour over labelled examples.
+    Only routes when confident; otherwise the caller falls back to the LLM.
+    Every decision is kept (and optionally appended to a JSONL log) so it can
+    be compared offline with what the LLM would have chosen.
+    """
+
+    def __init__(self, rules=None, examples=None, embed_fn=None,
+                 threshold: float = None, log_path: str = None):
+        self.rules = {
+            agent: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for agent, patterns in (rules or KEYWORD_RULES).items()
+        }
+        self.examples = examples if examples is not None else LABELLED_EXAMPLES
+        self.embed_fn = embed_fn
+        self.threshold = threshold if threshold is not None else env_number(
+            "ROUTER_CONFIDENCE_THRESHOLD", 0.8, float)
+        self.log_path = log_path if log_path is not None else os.getenv(
+            "ROUTER_DECISION_LOG")
+        self.decisions = deque(maxlen=200)
+        self.counters = {"fast_path": 0, "llm": 0, "agreements": 0}
+        self._example_vectors = None
+        self._lock = threading.Lock()
+
+    def embeddings_enabled(self) -> bool:
+        if self.embed_fn is not None:
+            return True
+        return os.getenv("ROUTER_EMBEDDINGS", "true").lower() == "true"
+
+    def _keyword_route(self, text: str) -> dict:
+        scores = {}
+        for agent, patterns in self.rules.items():
+            hits = sum(1 for p in patterns if p.search(text))
+            if hits:
+                scores[agent] = hits
+        if not scores:
+            return {"agent": None, "confidence": 0.0, "method": "keywords"}
+
+        agent = max(scores, key=scores.get)
+        total = sum(scores.values())
+        # A single matching domain is a strong signal; competing domains
+        # dilute the confidence proportionally.
+        confidence = min(0.99, 0.8 + 0.1 * scores[agent]) * \
+            scores[agent] / total
+        return {"agent": agent, "confidence": round(confidence, 3),
+                "method": "keywords", "matches": scores}
+
+    def _load_examples(self, embed):
+        with self._lock:
+            if self._example_vectors is None:
+                self._example_vectors = embed(
+                    [t for t, _ in self.examples])
+
+    def warm(self):
+        """
+        Loads the embedding model and example vectors. Called at server start:
+        until then the default (MiniLM) tier is skipped, so no request waits
+        seconds for the model to load.
+        """
+        if self.embeddings_enabled():
+            self._load_examples(self.embed_fn or _default_embed)
+
+    def _embedding_route(self, text: str) -> dict:
+        if self.embed_fn is None and self._example_vectors is None:
+            return {"agent": None, "confidence": 0.0,
+                    "method": "embeddings", "error": "embedder not loaded yet"}
+        embed = self.embed_fn or _default_embed
+        try:
+            self._load_examples(embed)
+            query = embed([text])[0]
+        except Exception as e:
+            return {"agent": None, "confidence": 0.0,
+                    "method": "embeddings", "error": str(e)}
+
+        best = {}
+        for (_, label), vec in zip(self.examples, self._example_vectors):
+            sim = _cosine(query, vec)
+            if sim > best.get(label, -1.0):
+                best[label] = sim
+        ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+        if not ranked:
+            return {"agent": None, "confidence": 0.0, "method": "embeddings"}
+
+        agent, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        # Require both similarity and a margin over the next label.
+        margin = top - runner_up
+        confidence = top if margin >= 0.05 else top * 0.5
+        return {"agent": agent, "confidence": round(confidence, 3),
+                "method": "embeddings"}
+
+    def classify(self, text: str) -> dict:
+        route = self._keyword_route(text)
+        if route["confidence"] < self.threshold and self.embeddings_enabled():
+            nn = self._embedding_route(text)
+            if nn["confidence"] > route["confidence"]:
+                route = nn
+        route["symptoms"] = bool(SYMPTOMS.search(text))
+        route["confident"] = bool(route["agent"]) and not route["symptoms"] \
+            and route["confidence"] >= self.threshold
+        return route
+
+    def log_decision(self, route: dict, text: str, source: str,
+                     llm_agent: str = None):
+        entry = {
+            "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+            "source": source,
+            "text": text[:500],
+            "local_agent": route.get("agent"),
+            "confidence": route.get("confidence"),
+            "method": route.get("method"),
+            "llm_agent": llm_agent,
+        }
+        with self._lock:
+            self.decisions.append(entry)
+            self.counters[source] = self.counters.get(source, 0) + 1
+            if llm_agent and llm_agent == route.get("agent"):
+                self.counters["agreements"] += 1
+            if self.log_path:
+                try:
+                    with open(self.log_path, "a") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"Warning: could not write router decision log: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, threshold=self.threshold)
+
+
+fast_router = FastRouter()
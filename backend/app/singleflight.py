@@ -0,0 +1,162 @@
+import asyncio
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one.
+    The first caller for a key runs the function; callers arriving while it is
+    still in flight wait on the same Future and receive its result (or error).
+    Nothing is cached after the call completes.
+    """
+
+    def __init__(self, max_tracked_keys: int = 256):
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> [Future, leader (thread id or task), waiters]
+        self._stats = OrderedDict()
+        self.max_tracked_keys = max_tracked_keys
+
+    def _key_stats(self, key: str) -> dict:
+        # Caller holds self._lock.
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = {"calls": 0, "executions": 0, "coalesced": 0,
+                     "wait_seconds": 0.0, "max_waiters": 0}
+            self._stats[key] = stats
+            while len(self._stats) > self.max_tracked_keys:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        return stats
+
+    def _enter(self, key: str, me):
+        """Registers a call; returns (future, role) with role leader/waiter/reentrant."""
+        with self._lock:
+            stats = self._key_stats(key)
+            stats["calls"] += 1
+            entry = self._inflight.get(key)
+            # A leader re-entering its own key must not wait on itself.
+            if entry and entry[1] != me:
+                future = entry[0]
+                entry[2] += 1
+                stats["coalesced"] += 1
+                stats["max_waiters"] = max(stats["max_waiters"], entry[2])
+                return future, "waiter"
+            if entry:
+                return None, "reentrant"
+            future = Future()
+            self._inflight[key] = [future, me, 0]
+            stats["executions"] += 1
+            return future, "leader"
+
+    def _waited(self, key: str, start: float):
+        with self._lock:
+            self._key_stats(key)["wait_seconds"] += time.monotonic() - start
+
+    def _finish(self, key: str, future: Future, result=None, error=None):
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def do(self, key: str, fn, *args, **kwargs):
+        future, role = self._enter(key, threading.get_ident())
+        if role == "reentrant":
+            return fn(*args, **kwargs)
+        if role == "waiter":
+            start = time.monotonic()
+            try:
+                return future.result()
+            finally:
+                self._waited(key, start)
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: str, fn, *args, **kwargs):
+        """Async counterpart of `do` for coroutine functions; shares the same keys."""
+        task = asyncio.current_task()
+        future, role = self._enter(key, ("task", id(task)))
+        if role == "reentrant":
+            return await fn(*args, **kwargs)
+        if role == "waiter":
+            start = time.monotonic()
+            try:
+                return await asyncio.wrap_future(future)
+            finally:
+                self._waited(key, start)
+
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            keys = {k: dict(v) for k, v in self._stats.items()}
+            inflight = len(self._inflight)
+        totals = {"calls": 0, "executions": 0, "coalesced": 0}
+        for s in keys.values():
+            for k in totals:
+                totals[k] += s[k]
+        return {"inflight": inflight, "totals": totals, "keys": keys}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+singleflight = SingleFlight()
+
+
+def call_key(name: str, *args, **kwargs) -> str:
+    """Builds a stable key from a call name and its arguments."""
+    return f"{name}:" + json.dumps(
+        [args, kwargs], sort_keys=True, default=str)
+
+
+def coalesce_tool(tool):
+    """
+    Routes a LangChain tool's function (and coroutine, if any) through the
+    shared SingleFlight so concurrent invocations with identical arguments
+    run once.
+    Only use on read-only tools; side effects would be silently merged.
+    """
+    func = tool.func
+    if getattr(func, "__singleflight__", False):
+        return tool
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return singleflight.do(
+            call_key(f"tool:{tool.name}", *args, **kwargs), func, *args, **kwargs)
+
+    wrapper.__singleflight__ = True
+    tool.func = wrapper
+
+    coro = tool.coroutine
+    # Offloaded coroutines already run the (coalesced) sync function.
+    if coro is not None and not getattr(coro, "__offloaded__", False):
+        @functools.wraps(coro)
+        async def async_wrapper(*args, **kwargs):
+            return await singleflight.ado(
+                call_key(f"tool:{tool.name}", *args, **kwargs), coro, *args, **kwargs)
+
+        async_wrapper.__singleflight__ = True
+        tool.coroutine = async_wrapper
+    return tool
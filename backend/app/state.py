@@ -1,8 +1,9 @@
 import operator
-from typing import Annotated, Sequence, TypedDict, Union
+from typing import Annotated, List, Sequence, TypedDict, Union
 from langchain_core.messages import BaseMessage
 
 
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
     next: str
+    parallel: List[str]
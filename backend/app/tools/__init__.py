@@ -1,60 +1,249 @@
-from .k8s_optimizer import optimize_k8s_resources
-from .gcp_optimizer import optimize_gcp_resources
-from .finops import analyze_cost_anomalies, suggest_spot_migrations, predict_resource_exhaustion
-from .chaos import run_chaos_experiment, analyze_chaos_results
-from .traefik import check_traefik_health, list_traefik_routes, diagnose_traefik_ingress
-from .azion import check_azion_edge, check_azion_waf, purge_azion_cache, list_edge_applications, check_azion_status, get_azion_metrics
-from .real import (
-    list_k8s_pods,
-    describe_pod,
-    get_pod_logs,
-    get_cluster_events,
-    check_gcp_status,
-    query_gmp_prometheus,
-    list_compute_instances,
-    get_gcp_sql_instances,
-    get_datadog_metrics,
-    get_active_alerts,
-    check_github_repos,
-    get_pr_status,
-    list_recent_commits,
-    check_pipeline_status,
-    get_argocd_sync_status,
-    check_vulnerabilities,
-    analyze_iam_policy,
-    analyze_log_patterns,
-    diagnose_service_health,
-    analyze_ci_failure,
-    trace_service_health,
-    create_issue,
-    check_on_call_schedule,
-    send_slack_notification,
-    list_datadog_metrics,
-    analyze_gcp_errors)
-from .observability import investigate_root_cause, scan_infrastructure, analyze_heavy_logs, correlate_alerts
-from .dashboard import analyze_infrastructure_health
-from .incident import (
-    create_incident,
-    update_incident_status,
-    list_incidents,
-    get_incident_details,
-    generate_postmortem,
-    log_incident_event,
-    build_incident_timeline,
-    manage_incident_channels,
-    list_incident_channels,
-    suggest_remediation,
-    generate_remediation_plan,
-    generate_runbook_from_incident)
-from .runbooks import list_runbooks, execute_runbook, lookup_service, get_service_dependencies, get_service_topology
-from .visualizer import generate_topology_diagram
-from .knowledge import search_knowledge_base, generate_service_catalog_docs
-from .code import generate_code_fix, create_github_pr, read_repo_file, list_repo_files
-from .cost import estimate_gcp_cost
-from .reasoning import generate_hypothesis
-from .opsy import opsy_backup_and_ticket_failing_pods
-from .fuzzylabs import fuzzylabs_sre_workflow
-from .opsmate import opsmate_troubleshooting_workflow
-from .smythos import smythos_unified_resource_manager
-from .bits_ai import bits_ai_investigate_monitor
-from .incidentfox import incidentfox_auto_investigate
+"""
+Tool registry.
+
+Tools are resolved lazily: a tool module (and the vendor SDKs it imports) is
+only loaded the first time one of its tools is accessed, e.g. when the
+specialist that owns it is first routed to.
+"""
+import importlib
+import sys
+
+from app.http import offload_tool
+from app.singleflight import coalesce_tool
+
+_TOOL_MODULES = {
+    "k8s_optimizer": [
+        "optimize_k8s_resources",
+    ],
+    "gcp_optimizer": [
+        "optimize_gcp_resources",
+    ],
+    "finops": [
+        "analyze_cost_anomalies",
+        "suggest_spot_migrations",
+        "predict_resource_exhaustion",
+    ],
+    "chaos": [
+        "run_chaos_experiment",
+        "analyze_chaos_results",
+    ],
+    "traefik": [
+        "check_traefik_health",
+        "list_traefik_routes",
+        "diagnose_traefik_ingress",
+    ],
+    "azion": [
+        "check_azion_edge",
+        "check_azion_waf",
+        "purge_azion_cache",
+        "list_edge_applications",
+        "check_azion_status",
+        "get_azion_metrics",
+    ],
+    "real": [
+        "list_k8s_pods",
+        "describe_pod",
+        "get_pod_logs",
+        "follow_pod_logs",
+        "get_cluster_events",
+        "check_gcp_status",
+        "query_gmp_prometheus",
+        "list_compute_instances",
+        "get_gcp_sql_instances",
+        "get_datadog_metrics",
+        "get_active_alerts",
+        "check_github_repos",
+        "get_pr_status",
+        "list_recent_commits",
+        "check_pipeline_status",
+        "get_multi_repo_status",
+        "get_argocd_sync_status",
+        "check_vulnerabilities",
+        "analyze_iam_policy",
+        "analyze_log_patterns",
+        "diagnose_service_health",
+        "analyze_ci_failure",
+        "trace_service_health",
+        "create_issue",
+        "check_on_call_schedule",
+        "send_slack_notification",
+        "list_datadog_metrics",
+        "analyze_gcp_errors",
+    ],
+    "observability": [
+        "investigate_root_cause",
+        "scan_infrastructure",
+        "analyze_heavy_logs",
+        "correlate_alerts",
+    ],
+    "dashboard": [
+        "analyze_infrastructure_health",
+    ],
+    "incident": [
+        "create_incident",
+        "update_incident_status",
+        "list_incidents",
+        "get_incident_details",
+        "generate_postmortem",
+        "log_incident_event",
+        "build_incident_timeline",
+        "manage_incident_channels",
+        "list_incident_channels",
+        "suggest_remediation",
+        "generate_remediation_plan",
+        "generate_runbook_from_incident",
+    ],
+    "runbooks": [
+        "list_runbooks",
+        "execute_runbook",
+        "lookup_service",
+        "get_service_dependencies",
+        "get_service_topology",
+    ],
+    "visualizer": [
+        "generate_topology_diagram",
+    ],
+    "knowledge": [
+        "search_knowledge_base",
+        "generate_service_catalog_docs",
+    ],
+    "code": [
+        "generate_code_fix",
+        "create_github_pr",
+        "read_repo_file",
+        "list_repo_files",
+    ],
+    "cost": [
+        "estimate_gcp_cost",
+    ],
+    "reasoning": [
+        "generate_hypothesis",
+    ],
+    "opsy": [
+        "opsy_backup_and_ticket_failing_pods",
+    ],
+    "fuzzylabs": [
+        "fuzzylabs_sre_workflow",
+    ],
+    "opsmate": [
+        "opsmate_troubleshooting_workflow",
+    ],
+    "smythos": [
+        "smythos_unified_resource_manager",
+    ],
+    "bits_ai": [
+        "bits_ai_investigate_monitor",
+    ],
+    "incidentfox": [
+        "incidentfox_auto_investigate",
+    ],
+}
+
+_TOOL_LOCATIONS = {name: module for module, names in _TOOL_MODULES.items() for name in names}
+
+# Read-only tools that are safe to share between concurrent callers.
+# Mutating tools (runbooks, PRs, cache purges, notifications) are never coalesced.
+COALESCED_TOOLS = {
+    "list_k8s_pods",
+    "describe_pod",
+    "get_pod_logs",
+    "follow_pod_logs",
+    "get_cluster_events",
+    "check_gcp_status",
+    "query_gmp_prometheus",
+    "list_compute_instances",
+    "get_gcp_sql_instances",
+    "analyze_gcp_errors",
+    "get_datadog_metrics",
+    "get_active_alerts",
+    "list_datadog_metrics",
+    "check_github_repos",
+    "get_pr_status",
+    "list_recent_commits",
+    "check_pipeline_status",
+    "get_multi_repo_status",
+    "get_argocd_sync_status",
+    "analyze_log_patterns",
+    "diagnose_service_health",
+    "analyze_ci_failure",
+    "trace_service_health",
+    "investigate_root_cause",
+    "scan_infrastructure",
+    "correlate_alerts",
+    "analyze_infrastructure_health",
+    "optimize_k8s_resources",
+    "optimize_gcp_resources",
+    "suggest_spot_migrations",
+    "check_traefik_health",
+    "list_traefik_routes",
+    "diagnose_traefik_ingress",
+    "check_azion_edge",
+    "check_azion_waf",
+    "check_azion_status",
+    "list_edge_applications",
+    "estimate_gcp_cost",
+}
+
+# Upstream whose concurrency limit bounds a sync-only tool when it is awaited.
+# Tools with a native async variant (HTTP APIs) never reach this table.
+_MODULE_UPSTREAMS = {
+    "k8s_optimizer": "k8s",
+    "gcp_optimizer": "gcp",
+    "chaos": "k8s",
+    "traefik": "k8s",
+    "opsy": "k8s",
+}
+_TOOL_UPSTREAMS = {
+    "list_k8s_pods": "k8s",
+    "describe_pod": "k8s",
+    "get_pod_logs": "k8s",
+    "follow_pod_logs": "k8s",
+    "get_cluster_events": "k8s",
+    "get_argocd_sync_status": "k8s",
+    "analyze_log_patterns": "k8s",
+    "check_gcp_status": "gcp",
+    "query_gmp_prometheus": "gcp",
+    "analyze_gcp_errors": "gcp",
+    "estimate_gcp_cost": "gcp",
+    "get_datadog_metrics": "datadog",
+    "get_active_alerts": "datadog",
+    "list_datadog_metrics": "datadog",
+    "bits_ai_investigate_monitor": "datadog",
+}
+
+__all__ = sorted(_TOOL_LOCATIONS)
+
+
+def __getattr__(name):
+    module_name = _TOOL_LOCATIONS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    tool = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    _offload_loaded()
+    _coalesce_loaded()
+    globals()[name] = tool
+    return tool
+
+
+def _offload_loaded():
+    # Sync-only tools get a bounded coroutine so the graph can await them
+    # without blocking the event loop. Must run before coalescing.
+    for name, module_name in _TOOL_LOCATIONS.items():
+        module = sys.modules.get(f"{__name__}.{module_name}")
+        if module is not None:
+            upstream = _TOOL_UPSTREAMS.get(name, _MODULE_UPSTREAMS.get(module_name, "default"))
+            offload_tool(getattr(module, name), upstream)
+
+
+def _coalesce_loaded():
+    # Tool modules import each other directly (dashboard -> real), so wrap every
+    # read-only tool of any loaded module, not just the one being accessed.
+    for name in COALESCED_TOOLS:
+        module = sys.modules.get(f"{__name__}.{_TOOL_LOCATIONS[name]}")
+        if module is not None:
+            coalesce_tool(getattr(module, name))
+
+
+def get_tools(names):
+    """Resolves a list of tool names, importing their modules on first use."""
+    return [globals()[name] if name in globals() else __getattr__(name) for name in names]
@@ -1,6 +1,9 @@
 from langchain_core.tools import tool
 import os
-import requests
+
+from app.http import arequest, request, async_variant
+
+AZION_API = "https://api.azionapi.net"
 
 
 def _get_azion_headers():
@@ -14,98 +17,169 @@ def _get_azion_headers():
     }
 
 
+def _format_edge_apps(resp) -> str:
+    resp.raise_for_status()
+    data = resp.json()
+    apps = data.get("results", [])
+    if not apps:
+        return "No Azion Edge Applications found."
+
+    result = [f"Found {len(apps)} Azion Edge Applications:"]
+    for app in apps[:5]:
+        result.append(
+            f"- {app.get('name')} (ID: {app.get('id')}) - Active: {app.get('active')}")
+    return "\n".join(result)
+
+
 @tool
 def check_azion_edge() -> str:
     """Checks the status of Azion Edge Applications."""
     try:
         headers = _get_azion_headers()
-        resp = requests.get(
-            "https://api.azionapi.net/edge_applications",
+        resp = request(
+            "azion", "GET",
+            f"{AZION_API}/edge_applications",
             headers=headers,
             timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        apps = data.get("results", [])
-        if not apps:
-            return "No Azion Edge Applications found."
-
-        result = [f"Found {len(apps)} Azion Edge Applications:"]
-        for app in apps[:5]:
-            result.append(
-                f"- {app.get('name')} (ID: {app.get('id')}) - Active: {app.get('active')}")
-        return "\n".join(result)
+        return _format_edge_apps(resp)
     except ValueError as e:
         return f"Azion Error: {e}"
     except Exception as e:
         return f"Error checking Azion Edge Applications: {str(e)}"
 
 
+@async_variant(check_azion_edge)
+async def acheck_azion_edge() -> str:
+    try:
+        resp = await arequest("azion", "GET", f"{AZION_API}/edge_applications",
+                              headers=_get_azion_headers(), timeout=10)
+        return _format_edge_apps(resp)
+    except ValueError as e:
+        return f"Azion Error: {e}"
+    except Exception as e:
+        return f"Error checking Azion Edge Applications: {str(e)}"
+
+
+def _format_waf(resp) -> str:
+    resp.raise_for_status()
+    data = resp.json()
+    firewalls = data.get("results", [])
+    if not firewalls:
+        return "No Azion WAF Configurations found."
+
+    result = [f"Found {len(firewalls)} Azion WAF Configurations:"]
+    for fw in firewalls[:5]:
+        result.append(
+            f"- {fw.get('name')} (ID: {fw.get('id')}) - Active: {fw.get('is_active')}")
+    return "\n".join(result)
+
+
 @tool
 def check_azion_waf() -> str:
     """Checks the status of Azion WAF (Web Application Firewall)."""
     try:
         headers = _get_azion_headers()
-        resp = requests.get(
-            "https://api.azionapi.net/edge_firewall",
+        resp = request(
+            "azion", "GET",
+            f"{AZION_API}/edge_firewall",
             headers=headers,
             timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        firewalls = data.get("results", [])
-        if not firewalls:
-            return "No Azion WAF Configurations found."
-
-        result = [f"Found {len(firewalls)} Azion WAF Configurations:"]
-        for fw in firewalls[:5]:
-            result.append(
-                f"- {fw.get('name')} (ID: {fw.get('id')}) - Active: {fw.get('is_active')}")
-        return "\n".join(result)
+        return _format_waf(resp)
     except ValueError as e:
         return f"Azion Error: {e}"
     except Exception as e:
         return f"Error checking Azion WAF: {str(e)}"
 
 
+@async_variant(check_azion_waf)
+async def acheck_azion_waf() -> str:
+    try:
+        resp = await arequest("azion", "GET", f"{AZION_API}/edge_firewall",
+                              headers=_get_azion_headers(), timeout=10)
+        return _format_waf(resp)
+    except ValueError as e:
+        return f"Azion Error: {e}"
+    except Exception as e:
+        return f"Error checking Azion WAF: {str(e)}"
+
+
+def _format_status(resp) -> str:
+    resp.raise_for_status()
+    count = resp.json().get("count", 0)
+    return f"Azion Edge CDN is Active. {count} edge applications found."
+
+
 @tool
 def check_azion_status() -> str:
     """Checks the status of the Azion Edge CDN infrastructure."""
     try:
         headers = _get_azion_headers()
-        resp = requests.get(
-            "https://api.azionapi.net/edge_applications",
+        resp = request(
+            "azion", "GET",
+            f"{AZION_API}/edge_applications",
             headers=headers,
             timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        count = data.get("count", 0)
-        return f"Azion Edge CDN is Active. {count} edge applications found."
+        return _format_status(resp)
+    except ValueError as e:
+        return f"Azion Error: {e}"
+    except Exception as e:
+        return f"Azion Connection Failed: {e}"
+
+
+@async_variant(check_azion_status)
+async def acheck_azion_status() -> str:
+    try:
+        resp = await arequest("azion", "GET", f"{AZION_API}/edge_applications",
+                              headers=_get_azion_headers(), timeout=10)
+        return _format_status(resp)
     except ValueError as e:
         return f"Azion Error: {e}"
     except Exception as e:
         return f"Azion Connection Failed: {e}"
 
 
+def _format_app_list(resp) -> str:
+    resp.raise_for_status()
+    apps = resp.json().get("results", [])
+    if not apps:
+        return "No Edge Applications found."
+
+    app_list = [f"- {app['name']} (ID: {app['id']})" for app in apps[:10]]
+    return "Azion Edge Applications (showing up to 10):\n" + \
+        "\n".join(app_list)
+
+
 @tool
 def list_edge_applications() -> str:
     """Lists Edge Applications in the Azion account."""
     try:
         headers = _get_azion_headers()
-        url = "https://api.azionapi.net/edge_applications"
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        apps = resp.json().get("results", [])
-        if not apps:
-            return "No Edge Applications found."
+        url = f"{AZION_API}/edge_applications"
+        resp = request("azion", "GET", url, headers=headers, timeout=10)
+        return _format_app_list(resp)
+    except ValueError as e:
+        return f"Azion Error: {e}"
+    except Exception as e:
+        return f"Error fetching Edge Applications: {e}"
+
 
-        app_list = [f"- {app['name']} (ID: {app['id']})" for app in apps[:10]]
-        return "Azion Edge Applications (showing up to 10):\n" + \
-            "\n".join(app_list)
+@async_variant(list_edge_applications)
+async def alist_edge_applications() -> str:
+    try:
+        resp = await arequest("azion", "GET", f"{AZION_API}/edge_applications",
+                              headers=_get_azion_headers(), timeout=10)
+        return _format_app_list(resp)
     except ValueError as e:
         return f"Azion Error: {e}"
     except Exception as e:
         return f"Error fetching Edge Applications: {e}"
 
 
+def _purge_payload(urls: str):
+    url_list = [u.strip() for u in urls.split(",") if u.strip()]
+    return url_list, {"urls": url_list, "method": "delete"}
+
+
 @tool
 def purge_azion_cache(urls: str) -> str:
     """
@@ -115,12 +189,12 @@ def purge_azion_cache(urls: str) -> str:
     """
     try:
         headers = _get_azion_headers()
-        url_list = [u.strip() for u in urls.split(",") if u.strip()]
+        url_list, payload = _purge_payload(urls)
         if not url_list:
             return "No URLs provided for cache purge."
-        payload = {"urls": url_list, "method": "delete"}
-        resp = requests.post(
-            "https://api.azionapi.net/purge/url",
+        resp = request(
+            "azion", "POST",
+            f"{AZION_API}/purge/url",
             headers=headers,
             json=payload,
             timeout=10)
@@ -133,6 +207,23 @@ def purge_azion_cache(urls: str) -> str:
         return f"Error purging Azion cache: {e}"
 
 
+@async_variant(purge_azion_cache)
+async def apurge_azion_cache(urls: str) -> str:
+    try:
+        headers = _get_azion_headers()
+        url_list, payload = _purge_payload(urls)
+        if not url_list:
+            return "No URLs provided for cache purge."
+        resp = await arequest("azion", "POST", f"{AZION_API}/purge/url",
+                              headers=headers, json=payload, timeout=10)
+        resp.raise_for_status()
+        return f"Successfully purged cache for {len(url_list)} URL(s) in Azion."
+    except ValueError as e:
+        return f"Azion Error: {e}"
+    except Exception as e:
+        return f"Error purging Azion cache: {e}"
+
+
 @tool
 def get_azion_metrics(app_id: str, metric_type: str = "requests") -> str:
     """
@@ -143,8 +234,9 @@ def get_azion_metrics(app_id: str, metric_type: str = "requests") -> str:
     """
     try:
         headers = _get_azion_headers()
-        url = "https://api.azionapi.net/metrics/graphql"
-        resp = requests.post(
+        url = f"{AZION_API}/metrics/graphql"
+        resp = request(
+            "azion", "POST",
             url, headers=headers, json={
                 "query": "{ metrics }"}, timeout=10)
         if resp.status_code == 200:
@@ -154,3 +246,17 @@ def get_azion_metrics(app_id: str, metric_type: str = "requests") -> str:
         return f"Azion Error: {e}"
     except Exception as e:
         return f"Error fetching metrics for App {app_id}: {e}"
+
+
+@async_variant(get_azion_metrics)
+async def aget_azion_metrics(app_id: str, metric_type: str = "requests") -> str:
+    try:
+        resp = await arequest("azion", "POST", f"{AZION_API}/metrics/graphql",
+                              headers=_get_azion_headers(), json={"query": "{ metrics }"}, timeout=10)
+        if resp.status_code == 200:
+            return f"Azion Metrics for App {app_id}: {metric_type} is normal."
+        resp.raise_for_status()
+    except ValueError as e:
+        return f"Azion Error: {e}"
+    except Exception as e:
+        return f"Error fetching metrics for App {app_id}: {e}"
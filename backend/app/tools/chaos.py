@@ -8,21 +8,23 @@ def run_chaos_experiment(
         experiment_type: str,
         target: str,
         duration_sec: int,
-        dry_run: bool = True) -> str:
+        dry_run: bool = True,
+        context: str = "") -> str:
     """
     Executes a controlled Chaos Engineering experiment to test system resilience.
     Types: 'pod_kill', 'network_delay'.
-    Requires K8s context.
+    Requires K8s context (`context` selects a kubeconfig context, default: the current one).
     """
     if dry_run:
         return f"🧪 **Chaos Proposal (Dry Run)**: Target {target} with {experiment_type} for {duration_sec}s."
 
     # Implementation for pod_kill using K8s API
     if experiment_type == "pod_kill":
-        from kubernetes import client, config
+        from app.k8s import k8s_api
         try:
-            config.load_kube_config()
-            v1 = client.CoreV1Api()
+            v1 = k8s_api("CoreV1Api", context)
+            if v1 is None:
+                return "Chaos Error: could not load Kubernetes configuration."
             # Safety: Only kill 1 pod matching target prefix
             pods = v1.list_namespaced_pod("default")
             target_pod = next(
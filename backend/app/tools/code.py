@@ -1,31 +1,39 @@
 from langchain_core.tools import tool
-import requests
 import base64
 import os
-from app.llm import get_google_sdk_client, get_llm
+from app.github import agithub_get, github_get
+from app.http import request, async_variant
+from app.llm import get_google_sdk_client, get_llm, cached_generate_content, cached_invoke
 
 
-def _fetch_file_content(repo: str, file_path: str) -> str:
+def _github_headers():
     token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        return "Error: GITHUB_TOKEN not set."
+    return {"Authorization": f"token {token}"} if token else None
 
-    headers = {"Authorization": f"token {token}"}
-    try:
-        url = f"https://api.github.com/repos/{repo}/contents/{file_path}"
-        resp = requests.get(url, headers=headers, timeout=10)
 
-        if resp.status_code == 404:
-            return f"File '{file_path}' not found in '{repo}'."
+def _format_file_content(resp, repo: str, file_path: str) -> str:
+    if resp.status_code == 404:
+        return f"File '{file_path}' not found in '{repo}'."
 
-        resp.raise_for_status()
-        data = resp.json()
+    resp.raise_for_status()
+    data = resp.json()
 
-        if "content" not in data:
-            return f"Error: No content found (is it a directory?)"
+    if "content" not in data:
+        return f"Error: No content found (is it a directory?)"
 
-        content = base64.b64decode(data["content"]).decode("utf-8")
-        return content
+    content = base64.b64decode(data["content"]).decode("utf-8")
+    return content
+
+
+def _fetch_file_content(repo: str, file_path: str) -> str:
+    headers = _github_headers()
+    if not headers:
+        return "Error: GITHUB_TOKEN not set."
+
+    try:
+        url = f"https://api.github.com/repos/{repo}/contents/{file_path}"
+        resp = github_get(url, headers=headers, timeout=10)
+        return _format_file_content(resp, repo, file_path)
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
@@ -41,6 +49,38 @@ def read_repo_file(repo: str, file_path: str) -> str:
     return _fetch_file_content(repo, file_path)
 
 
+@async_variant(read_repo_file)
+async def aread_repo_file(repo: str, file_path: str) -> str:
+    headers = _github_headers()
+    if not headers:
+        return "Error: GITHUB_TOKEN not set."
+
+    try:
+        url = f"https://api.github.com/repos/{repo}/contents/{file_path}"
+        resp = await agithub_get(url, headers=headers, timeout=10)
+        return _format_file_content(resp, repo, file_path)
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
+
+
+def _format_listing(resp, repo: str, path: str) -> str:
+    if resp.status_code == 404:
+        return f"Path '{path}' not found in '{repo}'."
+
+    resp.raise_for_status()
+    items = resp.json()
+
+    if isinstance(items, dict):  # Single file
+        return f"Item is a file: {items['name']}"
+
+    file_list = []
+    for item in items:
+        type_icon = "📁" if item["type"] == "dir" else "📄"
+        file_list.append(f"{type_icon} {item['name']}")
+
+    return "\n".join(file_list)
+
+
 @tool
 def list_repo_files(repo: str, path: str = "") -> str:
     """
@@ -49,30 +89,28 @@ def list_repo_files(repo: str, path: str = "") -> str:
         repo: The GitHub repository (e.g., "owner/repo").
         path: The directory path to list (default root).
     """
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
+    headers = _github_headers()
+    if not headers:
         return "Error: GITHUB_TOKEN not set."
 
-    headers = {"Authorization": f"token {token}"}
     try:
         url = f"https://api.github.com/repos/{repo}/contents/{path}"
-        resp = requests.get(url, headers=headers, timeout=10)
-
-        if resp.status_code == 404:
-            return f"Path '{path}' not found in '{repo}'."
-
-        resp.raise_for_status()
-        items = resp.json()
+        resp = github_get(url, headers=headers, timeout=10)
+        return _format_listing(resp, repo, path)
+    except Exception as e:
+        return f"Error listing files: {str(e)}"
 
-        if isinstance(items, dict):  # Single file
-            return f"Item is a file: {items['name']}"
 
-        file_list = []
-        for item in items:
-            type_icon = "📁" if item["type"] == "dir" else "📄"
-            file_list.append(f"{type_icon} {item['name']}")
+@async_variant(list_repo_files)
+async def alist_repo_files(repo: str, path: str = "") -> str:
+    headers = _github_headers()
+    if not headers:
+        return "Error: GITHUB_TOKEN not set."
 
-        return "\n".join(file_list)
+    try:
+        url = f"https://api.github.com/repos/{repo}/contents/{path}"
+        resp = await agithub_get(url, headers=headers, timeout=10)
+        return _format_listing(resp, repo, path)
     except Exception as e:
         return f"Error listing files: {str(e)}"
 
@@ -110,14 +148,15 @@ def generate_code_fix(
     if client:
         try:
             # Use `models.generate_content` as per v1.0 SDK
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=prompt,
+            text = cached_generate_content(
+                client,
+                prompt,
+                tool="generate_code_fix",
                 config={
                     "temperature": 0.2,  # Lower temperature for code precision
                 }
             )
-            return response.text.strip().replace("```python", "").replace("```", "")
+            return text.strip().replace("```python", "").replace("```", "")
         except Exception as e:
             print(f"Gemini SDK failed: {e}. Falling back to standard LLM.")
 
@@ -128,8 +167,8 @@ def generate_code_fix(
         if len(prompt) > 12000:
             prompt = prompt[:12000] + "\n...[TRUNCATED]"
 
-        response = llm.invoke(prompt)
-        return response.content.strip().replace("```python", "").replace("```", "")
+        content = cached_invoke(llm, prompt, tool="generate_code_fix")
+        return content.strip().replace("```python", "").replace("```", "")
     except Exception as e:
         return f"Error generating fix: {str(e)}"
 
@@ -164,14 +203,16 @@ def create_github_pr(
 
     try:
         # 1. Get default branch (usually main or master)
-        resp = requests.get(
+        resp = request(
+            "github", "GET",
             f"https://api.github.com/repos/{repo}",
             headers=headers)
         resp.raise_for_status()
         default_branch = resp.json().get("default_branch", "main")
 
         # 2. Get SHA of the default branch
-        resp = requests.get(
+        resp = request(
+            "github", "GET",
             f"https://api.github.com/repos/{repo}/git/ref/heads/{default_branch}",
             headers=headers)
         resp.raise_for_status()
@@ -179,11 +220,13 @@ def create_github_pr(
 
         # 3. Create new branch
         # Check if branch exists first
-        branch_check = requests.get(
+        branch_check = request(
+            "github", "GET",
             f"https://api.github.com/repos/{repo}/git/ref/heads/{branch_name}",
             headers=headers)
         if branch_check.status_code == 404:
-            resp = requests.post(
+            resp = request(
+                "github", "POST",
                 f"https://api.github.com/repos/{repo}/git/refs",
                 headers=headers,
                 json={"ref": f"refs/heads/{branch_name}", "sha": base_sha}
@@ -198,7 +241,8 @@ def create_github_pr(
         # 4. Get file SHA (needed for update)
         # MUST fetch from the target branch to avoid 409 Conflict if file
         # exists/changed there
-        resp = requests.get(
+        resp = request(
+            "github", "GET",
             f"https://api.github.com/repos/{repo}/contents/{file_path}?ref={branch_name}",
             headers=headers)
         file_sha = None
@@ -217,7 +261,8 @@ def create_github_pr(
         if file_sha:
             payload["sha"] = file_sha
 
-        resp = requests.put(
+        resp = request(
+            "github", "PUT",
             f"https://api.github.com/repos/{repo}/contents/{file_path}",
             headers=headers,
             json=payload
@@ -231,7 +276,8 @@ def create_github_pr(
             "head": branch_name,
             "base": default_branch
         }
-        resp = requests.post(
+        resp = request(
+            "github", "POST",
             f"https://api.github.com/repos/{repo}/pulls",
             headers=headers,
             json=pr_payload
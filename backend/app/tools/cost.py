@@ -1,5 +1,5 @@
 from langchain_core.tools import tool
-from app.llm import get_google_sdk_client, get_llm
+from app.llm import get_google_sdk_client, get_llm, cached_generate_content, cached_invoke
 import concurrent.futures
 import os
 import importlib
@@ -66,18 +66,14 @@ def estimate_gcp_cost() -> str:
     client = get_google_sdk_client()
     if client:
         try:
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=prompt
-            )
-            return response.text
+            return cached_generate_content(
+                client, prompt, tool="estimate_gcp_cost")
         except Exception as e:
             print(f"Gemini SDK failed: {e}. Falling back to standard LLM.")
 
     # Strategy 2: Standard LLM Fallback
     try:
         llm = get_llm()
-        response = llm.invoke(prompt)
-        return response.content
+        return cached_invoke(llm, prompt, tool="estimate_gcp_cost")
     except Exception as e:
         return f"Error generating cost estimate: {str(e)}"
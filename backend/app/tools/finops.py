@@ -26,24 +26,25 @@ def analyze_cost_anomalies(days: int = 7) -> str:
 
 
 @tool
-def suggest_spot_migrations(namespace: str = "default") -> str:
+def suggest_spot_migrations(namespace: str = "default", context: str = "") -> str:
     """
     Identifies stateless, fault-tolerant workloads that can be migrated to cheaper Spot/Preemptible VMs.
+    `context` selects a kubeconfig context (default: the current one).
     """
-    from kubernetes import client, config
-    try:
-        config.load_kube_config()
-    except BaseException:
-        try:
-            config.load_incluster_config()
-        except BaseException:
-            return "Error: K8s config failed."
+    from app.k8s import k8s_api
+    from app.k8s_cache import cached, cache_note
+    dep_cache = cached("deployments", context)
+    apps_v1 = None if dep_cache else k8s_api("AppsV1Api", context)
+    if not dep_cache and apps_v1 is None:
+        return "Error: K8s config failed."
 
-    apps_v1 = client.AppsV1Api()
     try:
-        deployments = apps_v1.list_namespaced_deployment(namespace)
+        if dep_cache:
+            deployments = dep_cache.list(namespace)
+        else:
+            deployments = apps_v1.list_namespaced_deployment(namespace).items
         candidates = []
-        for dep in deployments.items:
+        for dep in deployments:
             # Check for statelessness markers: No PVs, multiple replicas
             vols = dep.spec.template.spec.volumes or []
             has_pv = any(v.persistent_volume_claim for v in vols)
@@ -54,9 +55,9 @@ def suggest_spot_migrations(namespace: str = "default") -> str:
                     f"- **{dep.metadata.name}**: Stateless candidate found.")
 
         if not candidates:
-            return f"No obvious Spot migration candidates found in namespace '{namespace}'."
+            return f"No obvious Spot migration candidates found in namespace '{namespace}'." + cache_note(dep_cache)
 
-        return f"### 🎯 Spot Migration Candidates\n" + "\n".join(candidates)
+        return f"### 🎯 Spot Migration Candidates\n" + "\n".join(candidates) + cache_note(dep_cache)
     except Exception as e:
         return f"Spot Migration Error: {str(e)}"
 
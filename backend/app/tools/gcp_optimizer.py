@@ -1,61 +1,77 @@
 from langchain_core.tools import tool
-import os
-import requests
-from google.auth import default
-from google.auth.transport.requests import Request as GoogleAuthRequest
+
+from app.gcp_inventory import gcp_inventory
+from app.http import async_variant, run_blocking
+
+# Items itemized per finding; the rest are counted and summed.
+MAX_LISTED = 10
+
+
+def _more(report, items, total_gb=None):
+    if len(items) > MAX_LISTED:
+        size = f", {total_gb}GB in total" if total_gb is not None else ""
+        report.append(f"- ... and {len(items) - MAX_LISTED} more ({len(items)} total{size})")
+
+
+def _report_disks(report, inventory):
+    if inventory.failed("disks"):
+        report.append(f"\n⚠️ Could not fetch disks: {inventory.errors['disks']}")
+        return
+    orphaned = inventory.orphaned_disks()
+    if orphaned:
+        report.append("\n**Orphaned Disks (Not attached):**")
+        report.extend(f"- {d['name']} ({d['zone']}, {d['size_gb']}GB)" for d in orphaned[:MAX_LISTED])
+        _more(report, orphaned, sum(d["size_gb"] for d in orphaned))
+    else:
+        report.append("\n✅ No orphaned disks found.")
+
+
+def _report_vms(report, inventory):
+    stopped = inventory.stopped_instances()
+    if stopped:
+        report.append("\n**Stopped VMs (Incurring storage costs):**")
+        report.extend(f"- {i['name']} (Stopped in {i['zone']})" for i in stopped[:MAX_LISTED])
+        _more(report, stopped)
+
+
+def _report_addresses(report, inventory):
+    unused = inventory.unused_addresses()
+    if unused:
+        report.append("\n**Unused Static IPs (Reserved, not attached):**")
+        report.extend(f"- {a['name']} ({a['address']}, {a['region']})" for a in unused[:MAX_LISTED])
+        _more(report, unused)
+
+
+def _report(inventory) -> str:
+    if inventory is None:
+        return "Error: GCP Project not found. Ensure GOOGLE_APPLICATION_CREDENTIALS is set."
+
+    report = ["### ☁️ GCP Infrastructure Optimization Report"]
+    _report_disks(report, inventory)
+    _report_vms(report, inventory)
+    _report_addresses(report, inventory)
+    if len(report) == 1:
+        return "GCP Optimization: No significant opportunities found or permission denied."
+    report.append(f"\n_Scanned {inventory.summary()}._")
+    return "\n".join(report) + inventory.footer("instances", "disks", "addresses")
 
 
 @tool
-def optimize_gcp_resources() -> str:
+def optimize_gcp_resources(refresh: bool = False) -> str:
     """
     Identifies optimization opportunities in GCP: orphaned disks, unused IPs, and underutilized VMs.
+    Uses the cached inventory unless `refresh=True`.
     """
     try:
-        credentials, project = default()
-        if not project:
-            return "Error: GCP Project not found. Ensure GOOGLE_APPLICATION_CREDENTIALS is set."
-
-        credentials.refresh(GoogleAuthRequest())
-        token = credentials.token
-        headers = {"Authorization": f"Bearer {token}"}
-
-        report = ["### ☁️ GCP Infrastructure Optimization Report"]
-
-        # 1. Orphaned Disks Check
-        url_disks = f"https://compute.googleapis.com/compute/v1/projects/{project}/aggregated/disks"
-        resp = requests.get(url_disks, headers=headers, timeout=15)
-        if resp.status_code == 200:
-            orphaned = []
-            for zone, data in resp.json().get("items", {}).items():
-                for disk in data.get("disks", []):
-                    if not disk.get("users"):
-                        orphaned.append(
-                            f"- {disk['name']} ({zone.split('/')[-1]}, {disk['sizeGb']}GB)")
-            if orphaned:
-                report.append("\n**Orphaned Disks (Not attached):**")
-                report.extend(orphaned[:10])
-            else:
-                report.append("\n✅ No orphaned disks found.")
-        else:
-            report.append(f"\n⚠️ Could not fetch disks: {resp.status_code}")
-
-        # 2. Stopped VMs Check
-        url_vms = f"https://compute.googleapis.com/compute/v1/projects/{project}/aggregated/instances"
-        resp_vms = requests.get(url_vms, headers=headers, timeout=15)
-        if resp_vms.status_code == 200:
-            stopped = []
-            for zone, data in resp_vms.json().get("items", {}).items():
-                for inst in data.get("instances", []):
-                    if inst['status'] == "TERMINATED":
-                        stopped.append(
-                            f"- {inst['name']} (Stopped in {zone.split('/')[-1]})")
-            if stopped:
-                report.append("\n**Stopped VMs (Incurring storage costs):**")
-                report.extend(stopped[:10])
-
-        if len(report) == 1:
-            return "GCP Optimization: No significant opportunities found or permission denied."
-
-        return "\n".join(report)
+        return _report(gcp_inventory(refresh))
+    except Exception as e:
+        return f"GCP Optimization Tool Error: {str(e)}"
+
+
+@async_variant(optimize_gcp_resources)
+async def aoptimize_gcp_resources(refresh: bool = False) -> str:
+    try:
+        # google-auth and the paginated crawl are sync; they run in a bounded worker.
+        return _report(await run_blocking("gcp", gcp_inventory, refresh))
     except Exception as e:
         return f"GCP Optimization Tool Error: {str(e)}"
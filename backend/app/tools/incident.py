@@ -4,14 +4,11 @@ from typing import List, Dict, Optional
 import datetime
 import uuid
 import json
-from app.db import init_db, SessionLocal, Incident, PostMortem, IncidentEvent, IncidentChannel, Runbook, Service
-from app.llm import get_llm, get_google_sdk_client
+from app.db import SessionLocal, Incident, PostMortem, IncidentEvent, IncidentChannel, Runbook, Service
+from app.llm import get_llm, get_google_sdk_client, cached_generate_content, cached_invoke
 from langchain_core.prompts import ChatPromptTemplate
 from app.rag import rag_engine
 
-# Ensure DB is initialized
-init_db()
-
 
 @tool
 def create_incident(title: str, severity: str, description: str) -> str:
@@ -586,13 +583,11 @@ def generate_remediation_plan(incident_context: str) -> str:
 
     if client:
         try:
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=prompt_text
-            )
-            if response and response.text:
+            text = cached_generate_content(
+                client, prompt_text, tool="generate_remediation_plan")
+            if text:
                 plan_content = f"**Generated Remediation Plan (Gemini):**\n\n{
-                    response.text}"
+                    text}"
         except Exception as e:
             print(
                 f"Error generating plan with Gemini SDK: {e}. Falling back to standard LLM.")
@@ -604,7 +599,8 @@ def generate_remediation_plan(incident_context: str) -> str:
     # Fallback to standard LLM (Ollama or LangChain adapter)
     llm = get_llm()
     try:
-        res = llm.invoke(prompt_text)
-        return f"**Generated Remediation Plan:**\n\n{res.content}"
+        content = cached_invoke(
+            llm, prompt_text, tool="generate_remediation_plan")
+        return f"**Generated Remediation Plan:**\n\n{content}"
     except Exception as e:
         return f"Error generating remediation plan: {str(e)}"
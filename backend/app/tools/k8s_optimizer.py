@@ -2,64 +2,69 @@ from langchain_core.tools import tool
 import os
 import requests
 import json
+from itertools import chain
 from typing import List, Dict, Optional
-from kubernetes import client, config
 from google.auth import default
 from google.auth.transport.requests import Request as GoogleAuthRequest
 
+from app.k8s import k8s_api, list_pages, list_table_rows
+from app.k8s_cache import cached, cache_note
 
-def _get_k8s_apps_client():
-    try:
-        config.load_kube_config()
-    except BaseException:
-        try:
-            config.load_incluster_config()
-        except BaseException:
-            return None
-    return client.AppsV1Api()
 
+def _get_k8s_apps_client(context: str = ""):
+    return k8s_api("AppsV1Api", context)
 
-def _get_k8s_autoscaling_client():
-    try:
-        config.load_kube_config()
-    except BaseException:
-        try:
-            config.load_incluster_config()
-        except BaseException:
-            return None
-    return client.AutoscalingV2Api()
+
+def _get_k8s_autoscaling_client(context: str = ""):
+    return k8s_api("AutoscalingV2Api", context)
+
+
+# Deployments itemized in the audit; the rest are only counted.
+MAX_AUDITED_DEPLOYMENTS = 50
 
 
 @tool
-def optimize_k8s_resources(namespace: str = "default") -> str:
+def optimize_k8s_resources(namespace: str = "default", context: str = "", label_selector: str = "") -> str:
     """
     Performs a multi-dimensional optimization audit of Kubernetes resources.
     Checks: Resource Limits/Requests, Probes (Liveness/Readiness), HPA usage, and Image Tags.
+    `label_selector` (e.g. "team=payments") narrows the audit on the API server.
+    `context` selects a kubeconfig context (default: the current one).
     """
-    apps_v1 = _get_k8s_apps_client()
-    if not apps_v1:
+    dep_cache = None if label_selector else cached("deployments", context)
+    hpa_cache = cached("hpas", context)
+    apps_v1 = None if dep_cache else _get_k8s_apps_client(context)
+    if not dep_cache and not apps_v1:
         return "Error: K8s client configuration failed (check ~/.kube/config)."
 
     try:
-        deployments = apps_v1.list_namespaced_deployment(namespace)
-
-        # Try to get HPAs to check coverage
-        autoscaling_v2 = _get_k8s_autoscaling_client()
-        hpas = []
-        if autoscaling_v2:
-            try:
-                hpas = autoscaling_v2.list_namespaced_horizontal_pod_autoscaler(
-                    namespace).items
-            except BaseException:
-                pass
-
-        hpa_targets = [h.spec.scale_target_ref.name for h in hpas]
-        recommendations = []
+        # Try to get HPAs to check coverage (live: only the Table's "Reference" column)
+        hpa_targets = set()
+        if hpa_cache:
+            hpa_targets = {h.spec.scale_target_ref.name for h in hpa_cache.list(namespace)}
+        else:
+            autoscaling_v2 = _get_k8s_autoscaling_client(context)
+            if autoscaling_v2:
+                try:
+                    rows = list_table_rows(autoscaling_v2.list_namespaced_horizontal_pod_autoscaler, namespace)
+                    hpa_targets = {row["Reference"].split("/")[-1] for row in rows}
+                except BaseException:
+                    pass
+
+        # Deployments are audited one LIST page at a time.
+        if dep_cache:
+            pages = [dep_cache.list(namespace)]
+        else:
+            pages = (page.items for page in list_pages(
+                apps_v1.list_namespaced_deployment, namespace, label_selector=label_selector or None))
 
-        for dep in deployments.items:
+        recommendations = []
+        flagged = 0
+        for dep in chain.from_iterable(pages):
             name = dep.metadata.name
             template = dep.spec.template.spec
             containers = template.containers
+            findings = []
 
             for container in containers:
                 c_name = container.name
@@ -89,15 +94,26 @@ def optimize_k8s_resources(namespace: str = "default") -> str:
                         "No HPA configured (manual scaling detected)")
 
                 if issues:
-                    recommendations.append(
+                    findings.append(
                         f"**{name}** ({c_name}):\n  - " +
                         "\n  - ".join(issues))
 
+            if findings:
+                flagged += 1
+                if flagged <= MAX_AUDITED_DEPLOYMENTS:
+                    recommendations.extend(findings)
+
+        if flagged > MAX_AUDITED_DEPLOYMENTS:
+            recommendations.append(
+                f"\n... and {flagged - MAX_AUDITED_DEPLOYMENTS} more deployments with findings "
+                "(narrow the audit with label_selector).")
+
         if not recommendations:
-            return f"✅ All deployments in namespace '{namespace}' follow optimization best practices."
+            return f"✅ All deployments in namespace '{namespace}' follow optimization best practices." + \
+                cache_note(dep_cache, hpa_cache)
 
         return f"### 🚀 K8s Optimization Audit: {namespace}\n\n" + \
-            "\n".join(recommendations)
+            "\n".join(recommendations) + cache_note(dep_cache, hpa_cache)
 
     except Exception as e:
         return f"K8s Optimization Error: {str(e)}"
@@ -3,36 +3,56 @@ from langchain_core.tools import tool
 import concurrent.futures
 
 
+# Gemini 1.5 Flash takes ~1M tokens; larger inputs are map-reduced too.
+GEMINI_CHUNK_CHARS = 2_000_000
+
+
 @tool
 def analyze_heavy_logs(log_content: str, context: str = "") -> str:
     """
     Analyzes large log outputs using Google's Gemini 1.5 Flash directly.
+    Logs larger than the model's input are analyzed in map-reduce mode.
     """
-    from app.llm import get_google_sdk_client
+    from app.llm import get_google_sdk_client, cached_generate_content, cached_invoke
+    from app.map_reduce import chunk_chars, map_reduce
 
     client = get_google_sdk_client()
     if not client:
         from app.llm import get_llm
         llm = get_llm()
-        limit = 32000
-        truncated_logs = log_content[:limit] + \
-            ("...[TRUNCATED]" if len(log_content) > limit else "")
         try:
-            res = llm.invoke(
-                f"Context: {context}\n\nAnalyze these logs:\n{truncated_logs}")
-            return f"Analysis (Standard LLM Fallback):\n{res.content}"
+            if len(log_content) <= chunk_chars():
+                content = cached_invoke(
+                    llm,
+                    f"Context: {context}\n\nAnalyze these logs:\n{log_content}",
+                    tool="analyze_heavy_logs")
+                return f"Analysis (Standard LLM Fallback):\n{content}"
+            # Chunks sized for a local model instead of truncating: the whole
+            # log is read, in parallel.
+            content, chunks = map_reduce(
+                log_content,
+                lambda prompt: cached_invoke(llm, prompt, tool="analyze_heavy_logs"),
+                context=context)
+            return f"Analysis (Standard LLM Fallback, {chunks} chunks map-reduced):\n{content}"
         except Exception as e:
             return f"Error: Google SDK missing and Standard LLM failed: {e}"
 
     try:
-        response = client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=[
+        if len(log_content) > GEMINI_CHUNK_CHARS:
+            text, chunks = map_reduce(
+                log_content,
+                lambda prompt: cached_generate_content(client, prompt, tool="analyze_heavy_logs"),
+                context=context, max_chars=GEMINI_CHUNK_CHARS)
+            return f"Gemini Analysis ({chunks} chunks map-reduced):\n{text}"
+        text = cached_generate_content(
+            client,
+            [
                 "You are an expert SRE log analyzer.",
                 f"Context: {context}",
                 "Analyze the following logs and find the root cause of errors. Be technical and concise.",
-                log_content])
-        return f"Gemini Analysis:\n{response.text}"
+                log_content],
+            tool="analyze_heavy_logs")
+        return f"Gemini Analysis:\n{text}"
     except Exception as e:
         return f"Error analyzing logs with Gemini SDK: {e}"
 
@@ -64,7 +84,7 @@ def investigate_root_cause(
 
     with concurrent.futures.ThreadPoolExecutor() as executor:
         future_k8s = executor.submit(get_cluster_events.invoke, {
-                                     "namespace": "default"})
+                                     "namespace": "", "window_minutes": time_window_minutes})
         future_dd = executor.submit(get_active_alerts.invoke, {
                                     "tags": f"service:{service_name}"})
         future_gcp = executor.submit(check_gcp_status.invoke, {})
@@ -135,7 +155,7 @@ def scan_infrastructure() -> str:
         check_traefik_health,
         query_gmp_prometheus,
         check_azion_status)
-    from app.llm import get_google_sdk_client
+    from app.llm import get_google_sdk_client, cached_generate_content, cached_invoke
     import concurrent.futures
 
     import datetime
@@ -250,14 +270,13 @@ def scan_infrastructure() -> str:
 
     try:
         if client:
-            response = client.models.generate_content(
-                model="gemini-1.5-flash", contents=prompt_msgs)
-            ai_summary = response.text.strip()
+            ai_summary = cached_generate_content(
+                client, prompt_msgs, tool="scan_infrastructure").strip()
         else:
             from app.llm import get_llm
             llm = get_llm()
-            res = llm.invoke("\n".join(prompt_msgs))
-            ai_summary = res.content.strip()
+            ai_summary = cached_invoke(
+                llm, "\n".join(prompt_msgs), tool="scan_infrastructure").strip()
     except Exception:
         ai_summary = "System Normal (AI analysis failed)"
 
@@ -273,7 +292,7 @@ def correlate_alerts(alerts_input: str = "") -> str:
     """
     Analyzes active alerts to identify patterns.
     """
-    from app.llm import get_google_sdk_client
+    from app.llm import get_google_sdk_client, cached_generate_content, cached_invoke
     from app.tools import get_active_alerts
 
     alerts_data = alerts_input or get_active_alerts.invoke({})
@@ -284,16 +303,14 @@ def correlate_alerts(alerts_input: str = "") -> str:
     client = get_google_sdk_client()
     if client:
         try:
-            response = client.models.generate_content(
-                model="gemini-1.5-flash", contents=prompt)
-            return response.text
+            return cached_generate_content(
+                client, prompt, tool="correlate_alerts")
         except Exception:
             pass
 
     try:
         from app.llm import get_llm
         llm = get_llm()
-        res = llm.invoke(prompt)
-        return res.content
+        return cached_invoke(llm, prompt, tool="correlate_alerts")
     except Exception as e:
         return f"Error: {e}"
@@ -1,9 +1,26 @@
 from langchain_core.tools import tool
+import asyncio
+import concurrent.futures
+import json
 import os
 import datetime
-import requests
+import threading
+from collections import Counter
+from itertools import chain
 from app.db import SessionLocal, Service
-from app.llm import get_llm, get_google_sdk_client
+from app.env import env_number
+from app.gcp import gcp_client, gcp_project
+from app.gcp_errors import ErrorAggregator
+from app.gcp_inventory import gcp_inventory, inventory_cache
+from app.github import agithub_get, agithub_graphql, github_get, github_graphql
+from app.http import arequest, request, async_variant, concurrency_for, run_blocking
+from app.k8s import k8s_api, list_pages, list_table_rows
+from app.k8s_events import EventAggregator, matches_object, object_selector
+from app.log_excerpt import FailureExcerpt
+from app.log_follow import LogFilter, follow_pod, parse_since, pod_log_lines
+from app.log_templates import TemplateMiner
+from app.k8s_cache import cached, cache_note
+from app.llm import get_llm, get_google_sdk_client, cached_generate_content, cached_invoke
 
 # Infrastructure Libraries
 try:
@@ -14,14 +31,10 @@ except ImportError:
 
 try:
     from google.cloud import resourcemanager_v3, monitoring_v3, logging as cloud_logging
-    from google.auth import default
-    from google.auth.transport.requests import Request as GoogleAuthRequest
 except ImportError:
     resourcemanager_v3 = None
     monitoring_v3 = None
     cloud_logging = None
-    default = None
-    GoogleAuthRequest = None
 
 try:
     from datadog_api_client import ApiClient, Configuration
@@ -32,54 +45,101 @@ except ImportError:
 
 # --- Kubernetes Tools ---
 
+# Pods named in list_k8s_pods output; the rest are only counted.
+MAX_LISTED_PODS = 100
+# Same for Compute Engine instances in list_compute_instances.
+MAX_LISTED_INSTANCES = 100
 
-def _get_k8s_client():
+
+def _get_k8s_client(context: str = ""):
     if not config:
         raise ImportError("Kubernetes library not installed.")
-    try:
-        config.load_kube_config()  # Try local config first
-    except config.ConfigException:
-        try:
-            config.load_incluster_config()  # Try inside pod
-        except config.ConfigException:
-            return None
-    return client.CoreV1Api()
+    # Shared, cached client: local kubeconfig first, then in-cluster.
+    return k8s_api("CoreV1Api", context)
+
+
+def _pod_status(pod) -> str:
+    """Close to kubectl's STATUS column: a container's waiting/terminated reason beats the phase."""
+    if pod.metadata.deletion_timestamp:
+        return "Terminating"
+    for cs in pod.status.container_statuses or []:
+        state = cs.state
+        if state and state.waiting and state.waiting.reason:
+            return state.waiting.reason
+        if state and state.terminated and state.terminated.reason:
+            return state.terminated.reason
+    return pod.status.phase
 
 
 @tool
-def list_k8s_pods(namespace: str = "default") -> str:
-    """Lists all pods in the specified Kubernetes namespace."""
-    v1 = _get_k8s_client()
-    if not v1:
+def list_k8s_pods(
+        namespace: str = "default",
+        context: str = "",
+        label_selector: str = "",
+        field_selector: str = "",
+        max_pods: int = MAX_LISTED_PODS) -> str:
+    """
+    Lists the pods in the specified Kubernetes namespace with their status.
+    `label_selector` (e.g. "app=api") and `field_selector` (e.g. "status.phase!=Running")
+    are evaluated by the API server. At most `max_pods` pods are named; the rest are
+    counted by status.
+    `context` selects a kubeconfig context (default: the current one).
+    """
+    # Served from the watch cache when it is synced; selectors and cache
+    # misses go to the API server as a paginated Table LIST (name + status only).
+    pod_cache = None if label_selector or field_selector else cached("pods", context)
+    v1 = None if pod_cache else _get_k8s_client(context)
+    if not pod_cache and not v1:
         return "Error: Could not load Kubernetes configuration. Check ~/.kube/config or service account."
 
     try:
-        pods = v1.list_namespaced_pod(namespace)
-        pod_list = []
-        for pod in pods.items:
-            pod_list.append(f"{pod.metadata.name} ({pod.status.phase})")
+        if pod_cache:
+            rows = ((pod.metadata.name, _pod_status(pod)) for pod in pod_cache.list(namespace))
+        else:
+            rows = ((row["Name"], row["Status"]) for row in list_table_rows(
+                v1.list_namespaced_pod, namespace,
+                label_selector=label_selector or None, field_selector=field_selector or None))
+
+        pod_list, by_status = [], Counter()
+        for name, status in rows:
+            by_status[status] += 1
+            if len(pod_list) < max_pods:
+                pod_list.append(f"{name} ({status})")
 
         if not pod_list:
-            return f"No pods found in namespace {namespace}."
-
-        return f"Pods in {namespace}: " + ", ".join(pod_list)
+            return f"No pods found in namespace {namespace}." + cache_note(pod_cache)
+
+        result = f"Pods in {namespace}: " + ", ".join(pod_list)
+        total = sum(by_status.values())
+        if total > len(pod_list):
+            summary = ", ".join(f"{status}={n}" for status, n in by_status.most_common())
+            result += f" ... and {total - len(pod_list)} more ({total} total: {summary})"
+        return result + cache_note(pod_cache)
     except Exception as e:
         return f"Error listing pods: {str(e)}"
 
 
 @tool
-def describe_pod(pod_name: str, namespace: str = "default") -> str:
+def describe_pod(pod_name: str, namespace: str = "default", context: str = "") -> str:
     """Describes a specific pod to get details about its status and events."""
-    v1 = _get_k8s_client()
-    if not v1:
-        return "Error: Could not load Kubernetes configuration."
+    pod_cache, event_cache = cached("pods", context), cached("events", context)
+    pod = pod_cache.get(namespace, pod_name) if pod_cache else None
+    if pod is None or not event_cache:
+        # A pod missing from the cache may be brand new; ask the API server.
+        pod_cache = event_cache = None
+        v1 = _get_k8s_client(context)
+        if not v1:
+            return "Error: Could not load Kubernetes configuration."
 
     try:
-        pod = v1.read_namespaced_pod(name=pod_name, namespace=namespace)
-        events = v1.list_namespaced_event(
-            namespace, field_selector=f"involvedObject.name={pod_name}")
+        if pod_cache:
+            events = [e for e in event_cache.list(namespace) if e.involved_object.name == pod_name]
+        else:
+            pod = v1.read_namespaced_pod(name=pod_name, namespace=namespace)
+            events = v1.list_namespaced_event(
+                namespace, field_selector=f"involvedObject.name={pod_name}").items
 
-        event_msgs = [f"{e.type}: {e.message}" for e in events.items]
+        event_msgs = [f"{e.type}: {e.message}" for e in events]
 
         info = [
             f"Name: {pod.metadata.name}",
@@ -88,7 +148,7 @@ def describe_pod(pod_name: str, namespace: str = "default") -> str:
             f"Node: {pod.spec.node_name}",
             f"Events: {'; '.join(event_msgs) if event_msgs else 'None'}"
         ]
-        return "\n".join(info)
+        return "\n".join(info) + cache_note(pod_cache, event_cache)
     except Exception as e:
         return f"Error describing pod {pod_name}: {str(e)}"
 
@@ -97,9 +157,10 @@ def describe_pod(pod_name: str, namespace: str = "default") -> str:
 def get_pod_logs(
         pod_name: str,
         namespace: str = "default",
-        lines: int = 50) -> str:
+        lines: int = 50,
+        context: str = "") -> str:
     """Retrieves the last N lines of logs from a pod."""
-    v1 = _get_k8s_client()
+    v1 = _get_k8s_client(context)
     if not v1:
         return "Error: Could not load Kubernetes configuration."
 
@@ -112,25 +173,93 @@ def get_pod_logs(
 
 
 @tool
-def get_cluster_events(namespace: str = "default") -> str:
-    """Lists recent events in the cluster (or namespace) to identify systemic issues."""
-    v1 = _get_k8s_client()
-    if not v1:
+def follow_pod_logs(
+        pods: str,
+        namespace: str = "default",
+        pattern: str = "",
+        level: str = "",
+        since: str = "",
+        lines: int = 50,
+        container: str = "",
+        context: str = "") -> str:
+    """
+    Follows the logs of one or more pods (comma-separated) and returns the
+    last `lines` lines matching the filters, per pod. The first call starts a
+    live follow; later calls read its buffer, so repeated checks during a
+    rollout cost no extra API calls.
+    `pattern` is a regex; `level` keeps lines at or above it (e.g. "WARN");
+    `since` is a duration ("10m") or an RFC 3339 timestamp.
+    """
+    try:
+        log_filter = LogFilter(pattern, level)
+        since_epoch = parse_since(since)
+    except ValueError as e:
+        return f"Error: {e}"
+
+    names = [p.strip() for p in pods.split(",") if p.strip()]
+    if not names:
+        return "Error: no pod names given."
+
+    sections = []
+    for name in names:
+        try:
+            follower = follow_pod(name, namespace, container, context)
+        except Exception as e:
+            sections.append(f"**{name}**: Error following logs: {str(e)}")
+            continue
+        matched, _ = follower.query(log_filter, since_epoch, lines)
+        state = "following" if follower.connected else "reconnecting"
+        header = f"**{name}** ({len(matched)} matching lines, {state})"
+        sections.append(f"{header}\n" + "\n".join(line.render() for line in matched) if matched
+                        else f"{header}: no matching lines.")
+    return "\n\n".join(sections)
+
+
+@tool
+def get_cluster_events(
+        namespace: str = "default",
+        context: str = "",
+        window_minutes: int = 60,
+        involved_object: str = "",
+        max_rows: int = 20) -> str:
+    """
+    Summarizes recent Kubernetes events to identify systemic issues.
+    Repeated events are collapsed into one row with a count and first/last seen
+    times, ranked Warnings first, then by recency.
+    `namespace=""` covers all namespaces. `window_minutes` drops older events (0 = no limit).
+    `involved_object` ("name" or "Kind/name") is matched by the API server.
+    `context` selects a kubeconfig context (default: the current one).
+    """
+    event_cache = cached("events", context)
+    v1 = None if event_cache else _get_k8s_client(context)
+    if not event_cache and not v1:
         return "Error: Could not load Kubernetes configuration."
 
     try:
-        events = v1.list_namespaced_event(namespace)
-        event_list = []
-        for e in events.items:
-            # Format: [Warning] Pod/my-pod: Failed to pull image
-            event_list.append(
-                f"[{e.type}] {e.involved_object.kind}/{e.involved_object.name}: {e.message}")
-
-        if not event_list:
-            return f"No events found in namespace {namespace}."
-
-        # Return last 20 events
-        return "\n".join(event_list[-20:])
+        if event_cache:
+            events = (e for e in event_cache.list(namespace) if matches_object(e, involved_object))
+        else:
+            # Events have no time field selector; the window is applied while
+            # paging, so only the aggregated groups are held in memory.
+            selector = object_selector(involved_object) or None
+            if namespace:
+                pages = list_pages(v1.list_namespaced_event, namespace, field_selector=selector)
+            else:
+                pages = list_pages(v1.list_event_for_all_namespaces, field_selector=selector)
+            events = chain.from_iterable(page.items for page in pages)
+
+        aggregator = EventAggregator(window_minutes)
+        for e in events:
+            aggregator.add(e)
+
+        scope = f"namespace {namespace}" if namespace else "all namespaces"
+        window = f" in the last {window_minutes}m" if window_minutes else ""
+        if not aggregator.groups:
+            return f"No events found in {scope}{window}." + cache_note(event_cache)
+
+        header = f"Events in {scope}{window}: {aggregator.seen} events in {len(aggregator.groups)} groups"
+        table = aggregator.table(max_rows, show_namespace=not namespace)
+        return f"{header}\n{table}" + cache_note(event_cache)
     except Exception as e:
         return f"Error listing events: {str(e)}"
 
@@ -145,15 +274,20 @@ def check_gcp_status(service: str = "compute") -> str:
 
     try:
         # Check if we can list projects
-        rm_client = resourcemanager_v3.ProjectsClient()
+        rm_client = gcp_client("resourcemanager.projects", resourcemanager_v3.ProjectsClient)
         request = resourcemanager_v3.ListProjectsRequest()
         projects = rm_client.list_projects(request=request)
 
         project_list = [p.project_id for p in projects]
-        return f"GCP Connection Successful. Active Projects: {
+        result = f"GCP Connection Successful. Active Projects: {
             ', '.join(
                 project_list[
                     :5])}..."
+        # Only a recent crawl is reported; the status check itself stays cheap.
+        inventory = inventory_cache.peek()
+        if inventory is not None:
+            result += f"\nInventory ({inventory.project}, {inventory.age():.0f}s old): {inventory.summary()}"
+        return result
     except Exception as e:
         return f"Error checking GCP status: {
             str(e)}. Check GOOGLE_APPLICATION_CREDENTIALS."
@@ -169,7 +303,7 @@ def query_gmp_prometheus(query: str) -> str:
     if not project_id:
         # Try to deduce from auth
         try:
-            _, project_id = default()
+            project_id = gcp_project()
         except Exception:
             pass
 
@@ -177,7 +311,7 @@ def query_gmp_prometheus(query: str) -> str:
         return "Error: Could not determine Google Cloud Project ID. Set GOOGLE_CLOUD_PROJECT env var."
 
     try:
-        client = monitoring_v3.QueryServiceClient()
+        client = gcp_client("monitoring.query", monitoring_v3.QueryServiceClient)
         # Create request
         request = monitoring_v3.QueryTimeSeriesRequest(
             name=f"projects/{project_id}",
@@ -212,96 +346,110 @@ def query_gmp_prometheus(query: str) -> str:
             str(e)}. Ensure GOOGLE_APPLICATION_CREDENTIALS is set and the service account has 'Monitoring Viewer' role."
 
 
+def _format_compute_instances(inventory, zone: str = "", max_instances: int = MAX_LISTED_INSTANCES) -> str:
+    if inventory is None:
+        return "Error: Could not determine GCP Project ID."
+    if inventory.failed("instances"):
+        return f"Error listing compute instances: {inventory.errors['instances']}"
+
+    instances = inventory.instances_in(zone)
+    if not instances:
+        return f"No instances found in {zone or 'any zone'}.{inventory.footer('instances')}"
+
+    result = []
+    for inst in instances[:max_instances]:
+        where = "" if zone else f" [{inst['zone']}]"
+        result.append(f"{inst['name']} ({inst['status']}){where} - IP: {inst['ip']}")
+    if len(instances) > max_instances:
+        summary = ", ".join(f"{s}={n}" for s, n in Counter(i["status"] for i in instances).most_common())
+        result.append(f"... and {len(instances) - max_instances} more ({len(instances)} total: {summary})")
+
+    return "\n".join(result) + inventory.footer("instances")
+
+
 @tool
-def list_compute_instances(zone: str = "us-central1-a") -> str:
-    """Lists Google Cloud Compute Engine instances in a zone."""
+def list_compute_instances(zone: str = "", refresh: bool = False) -> str:
+    """
+    Lists Google Cloud Compute Engine instances in every zone of the project,
+    or only in `zone` (e.g. "us-central1-a"). The inventory is cached for a
+    few minutes; `refresh=True` crawls it again.
+    """
     if not resourcemanager_v3:
         return "GCP libraries not installed."
 
     try:
-        credentials, project = default()
-        if not project:
-            project = os.getenv("GOOGLE_CLOUD_PROJECT")
-
-        if not project:
-            return "Error: Could not determine GCP Project ID."
+        return _format_compute_instances(gcp_inventory(refresh), zone)
+    except Exception as e:
+        return f"Error listing compute instances: {str(e)}"
 
-        # Refresh creds to get token
-        credentials.refresh(GoogleAuthRequest())
-        token = credentials.token
 
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://compute.googleapis.com/compute/v1/projects/{project}/zones/{zone}/instances"
+@async_variant(list_compute_instances)
+async def alist_compute_instances(zone: str = "", refresh: bool = False) -> str:
+    if not resourcemanager_v3:
+        return "GCP libraries not installed."
 
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
+    try:
+        # The crawl pages through blocking requests; concurrent callers share it.
+        return _format_compute_instances(await run_blocking("gcp", gcp_inventory, refresh), zone)
+    except Exception as e:
+        return f"Error listing compute instances: {str(e)}"
 
-        data = resp.json()
-        instances = data.get("items", [])
 
-        if not instances:
-            return f"No instances found in {zone}."
+def _format_sql_instances(inventory) -> str:
+    if inventory is None:
+        return "Error: Could not determine GCP Project ID."
+    if inventory.failed("sql"):
+        return f"Error listing SQL instances: {inventory.errors['sql']}"
 
-        result = []
-        for inst in instances:
-            name = inst.get("name")
-            status = inst.get("status")
-            network_ip = inst.get(
-                "networkInterfaces", [
-                    {}])[0].get(
-                "networkIP", "N/A")
-            result.append(f"{name} ({status}) - IP: {network_ip}")
+    if not inventory.sql:
+        return "No Cloud SQL instances found." + inventory.footer("sql")
 
-        return "\n".join(result)
+    result = []
+    for inst in inventory.sql:
+        result.append(f"{inst['name']} ({inst['state']}) - {inst['version']} - {inst['tier']} [{inst['region']}]")
 
-    except Exception as e:
-        return f"Error listing compute instances: {str(e)}"
+    return "\n".join(result) + inventory.footer("sql")
 
 
 @tool
-def get_gcp_sql_instances() -> str:
-    """Lists Google Cloud SQL instances."""
+def get_gcp_sql_instances(refresh: bool = False) -> str:
+    """Lists Google Cloud SQL instances (cached for a few minutes; `refresh=True` fetches them again)."""
     if not resourcemanager_v3:
         return "GCP libraries not installed."
 
     try:
-        credentials, project = default()
-        if not project:
-            project = os.getenv("GOOGLE_CLOUD_PROJECT")
-
-        credentials.refresh(GoogleAuthRequest())
-        token = credentials.token
-
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://sqladmin.googleapis.com/sql/v1beta4/projects/{project}/instances"
-
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-
-        data = resp.json()
-        instances = data.get("items", [])
-
-        if not instances:
-            return "No Cloud SQL instances found."
+        return _format_sql_instances(gcp_inventory(refresh))
+    except Exception as e:
+        return f"Error listing SQL instances: {str(e)}"
 
-        result = []
-        for inst in instances:
-            name = inst.get("name")
-            state = inst.get("state")
-            db_version = inst.get("databaseVersion")
-            result.append(f"{name} ({state}) - {db_version}")
 
-        return "\n".join(result)
+@async_variant(get_gcp_sql_instances)
+async def aget_gcp_sql_instances(refresh: bool = False) -> str:
+    if not resourcemanager_v3:
+        return "GCP libraries not installed."
 
+    try:
+        return _format_sql_instances(await run_blocking("gcp", gcp_inventory, refresh))
     except Exception as e:
         return f"Error listing SQL instances: {str(e)}"
 
 
+# Entries per Cloud Logging page, and the most read per analysis (newest
+# first); override the latter with GCP_ERRORS_MAX_ENTRIES. Each page is one
+# entries.list call, and Cloud Logging allows about 60 of those per minute
+# per project, so the default scan stays within one minute of that quota.
+GCP_ERRORS_PAGE_SIZE = 1000
+GCP_ERRORS_MAX_ENTRIES = 50000
+
+
 @tool
-def analyze_gcp_errors(days: int = 1) -> str:
+def analyze_gcp_errors(days: int = 1, top_k: int = 10, extra_filter: str = "") -> str:
     """
     Analyzes Google Cloud Logging for errors in the current project.
-    Fetches logs with severity >= ERROR from the last N days.
+    Streams every entry with severity >= ERROR from the last N days and groups
+    them by resource type, log name and normalized message, returning the
+    `top_k` groups with counts, first/last seen, a per-minute histogram and
+    a trend. `extra_filter` is ANDed to the query (e.g. 'resource.type="k8s_container"').
     """
     if not cloud_logging:
         return "GCP Cloud Logging library not installed."
@@ -309,7 +457,7 @@ def analyze_gcp_errors(days: int = 1) -> str:
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
     if not project_id:
         try:
-            _, project_id = default()
+            project_id = gcp_project()
         except Exception:
             pass
 
@@ -317,7 +465,7 @@ def analyze_gcp_errors(days: int = 1) -> str:
         return "Error: Could not determine Google Cloud Project ID."
 
     try:
-        client = cloud_logging.Client(project=project_id)
+        client = gcp_client(f"logging:{project_id}", lambda: cloud_logging.Client(project=project_id))
 
         # Calculate timestamp
         now = datetime.datetime.now(datetime.UTC)
@@ -325,34 +473,34 @@ def analyze_gcp_errors(days: int = 1) -> str:
         timestamp = past.isoformat().replace("+00:00", "Z")
 
         filter_str = f"severity>=ERROR AND timestamp>=\"{timestamp}\""
+        if extra_filter:
+            filter_str += f" AND ({extra_filter})"
 
+        max_entries = env_number("GCP_ERRORS_MAX_ENTRIES", GCP_ERRORS_MAX_ENTRIES)
+
+        # The iterator fetches the next page only when the current one is
+        # consumed; entries are folded into groups as they arrive.
         entries = client.list_entries(
             filter_=filter_str,
             order_by=cloud_logging.DESCENDING,
-            max_results=50)
-
-        error_summary = []
-        count = 0
-        for entry in entries:
-            count += 1
-            payload = entry.payload
-            # Payload can be dict, str, or None
-            msg = "No message"
-            if isinstance(payload, dict):
-                msg = payload.get("message") or payload.get(
-                    "textPayload") or str(payload)
-            elif isinstance(payload, str):
-                msg = payload
-
-            # Truncate
-            msg = (msg[:100] + '...') if len(msg) > 100 else msg
-            error_summary.append(f"[{entry.timestamp}] {msg}")
-
-        if not error_summary:
+            page_size=GCP_ERRORS_PAGE_SIZE)
+        aggregator = ErrorAggregator(days * 1440, now=now).feed(entries, max_entries)
+
+        if not aggregator.seen:
+            if aggregator.error:
+                return f"Error analyzing GCP logs: {aggregator.error}"
             return f"No errors found in GCP Cloud Logging for project {project_id} in the last {days} days."
 
-        return f"Found {count} errors in GCP Cloud Logging (Last {days} days):\n" + "\n".join(
-            error_summary)
+        header = (f"Found {aggregator.seen} errors in GCP Cloud Logging (Last {days} days) "
+                  f"in {len(aggregator.groups)} groups, most severe and frequent first:")
+        if not aggregator.complete:
+            reached = aggregator.oldest.strftime("%m-%d %H:%M") if aggregator.oldest else "?"
+            why = f"reading failed: {aggregator.error}" if aggregator.error else f"limit of {max_entries} entries"
+            header += (f"\n_Partial: only the newest entries back to {reached} UTC were read ({why}); "
+                       "trends and histograms cover that range._")
+        if aggregator.untracked:
+            header += f"\n_{aggregator.untracked} entries of further groups are counted but not grouped._"
+        return f"{header}\n{aggregator.table(top_k)}"
 
     except Exception as e:
         return f"Error analyzing GCP logs: {str(e)}"
@@ -434,6 +582,45 @@ def get_active_alerts(tags: str = "") -> str:
 # --- DevOps / Git / Security Tools (Simplified wrappers) ---
 
 
+def _github_token_headers(accept: str = None):
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        return None
+    headers = {"Authorization": f"token {token}"}
+    if accept:
+        headers["Accept"] = accept
+    return headers
+
+
+def _commits_url(owner: str, repo: str, hours: int) -> str:
+    since = datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=hours)
+    # Whole 10-minute steps keep the URL (the cache key) stable between polls.
+    since = since.replace(minute=since.minute - since.minute % 10, second=0, microsecond=0)
+    since = since.isoformat().replace("+00:00", "Z")
+    return f"https://api.github.com/repos/{owner}/{repo}/commits?since={since}"
+
+
+def _format_commits(resp, owner: str, repo: str, hours: int) -> str:
+    if resp.status_code == 404:
+        return f"Repository {owner}/{repo} not found."
+
+    resp.raise_for_status()
+    commits = resp.json()
+
+    if not commits:
+        return f"No commits found in {owner}/{repo} in the last {hours} hours."
+
+    summary = [f"Recent commits for {owner}/{repo} (Last {hours}h):"]
+    for c in commits[:10]:  # Limit to 10
+        sha = c['sha'][:7]
+        msg = c['commit']['message'].split('\n')[0]
+        author = c['commit']['author']['name']
+        date = c['commit']['author']['date']
+        summary.append(f"- [{date}] {sha} {author}: {msg}")
+
+    return "\n".join(summary)
+
+
 @tool
 def list_recent_commits(owner: str, repo: str, hours: int = 24) -> str:
     """
@@ -443,91 +630,136 @@ def list_recent_commits(owner: str, repo: str, hours: int = 24) -> str:
         repo: Repository name.
         hours: How many hours back to check (default 24).
     """
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
+    headers = _github_token_headers()
+    if not headers:
         return "Error: GITHUB_TOKEN is missing."
 
-    headers = {"Authorization": f"token {token}"}
-    since = (
-        datetime.datetime.now(datetime.UTC) -
-        datetime.timedelta(hours=hours)
-    ).isoformat().replace("+00:00", "Z")
-
     try:
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits?since={since}"
-        resp = requests.get(url, headers=headers, timeout=10)
-
-        if resp.status_code == 404:
-            return f"Repository {owner}/{repo} not found."
-
-        resp.raise_for_status()
-        commits = resp.json()
+        resp = github_get(_commits_url(owner, repo, hours), headers=headers, timeout=10)
+        return _format_commits(resp, owner, repo, hours)
+    except Exception as e:
+        return f"Error fetching commits: {str(e)}"
 
-        if not commits:
-            return f"No commits found in {owner}/{repo} in the last {hours} hours."
 
-        summary = [f"Recent commits for {owner}/{repo} (Last {hours}h):"]
-        for c in commits[:10]:  # Limit to 10
-            sha = c['sha'][:7]
-            msg = c['commit']['message'].split('\n')[0]
-            author = c['commit']['author']['name']
-            date = c['commit']['author']['date']
-            summary.append(f"- [{date}] {sha} {author}: {msg}")
+@async_variant(list_recent_commits)
+async def alist_recent_commits(owner: str, repo: str, hours: int = 24) -> str:
+    headers = _github_token_headers()
+    if not headers:
+        return "Error: GITHUB_TOKEN is missing."
 
-        return "\n".join(summary)
+    try:
+        resp = await agithub_get(_commits_url(owner, repo, hours), headers=headers, timeout=10)
+        return _format_commits(resp, owner, repo, hours)
     except Exception as e:
         return f"Error fetching commits: {str(e)}"
 
 
+def _format_repos(resp, org: str) -> str:
+    if resp.status_code == 200:
+        repos = resp.json()
+        names = [r['name'] for r in repos[:5]]
+        return f"Repositories in {org}: {', '.join(names)}"
+    return f"GitHub API Error: {resp.status_code}"
+
+
 @tool
 def check_github_repos(org: str = "my-org") -> str:
     """Checks the status of GitHub repositories and recent commits."""
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
+    headers = _github_token_headers()
+    if not headers:
         return "Error: GITHUB_TOKEN is missing."
 
-    headers = {"Authorization": f"token {token}"}
     try:
-        resp = requests.get(
+        resp = github_get(
             f"https://api.github.com/orgs/{org}/repos",
             headers=headers,
             timeout=10)
-        if resp.status_code == 200:
-            repos = resp.json()
-            names = [r['name'] for r in repos[:5]]
-            return f"Repositories in {org}: {', '.join(names)}"
-        return f"GitHub API Error: {resp.status_code}"
+        return _format_repos(resp, org)
     except Exception as e:
         return f"Error connecting to GitHub: {str(e)}"
 
 
+@async_variant(check_github_repos)
+async def acheck_github_repos(org: str = "my-org") -> str:
+    headers = _github_token_headers()
+    if not headers:
+        return "Error: GITHUB_TOKEN is missing."
+
+    try:
+        resp = await agithub_get(f"https://api.github.com/orgs/{org}/repos",
+                                 headers=headers, timeout=10)
+        return _format_repos(resp, org)
+    except Exception as e:
+        return f"Error connecting to GitHub: {str(e)}"
+
+
+def _format_pr(resp, pr_id: int) -> str:
+    resp.raise_for_status()
+    pr = resp.json()
+    return (
+        f"### 🎋 PR Status: {pr['title']} (#{pr_id})\n"
+        f"- **State**: {pr['state'].upper()}\n"
+        f"- **Author**: {pr['user']['login']}\n"
+        f"- **Mergeable**: {pr.get('mergeable_state', 'unknown')}\n"
+        f"- **Labels**: {', '.join([label['name'] for label in pr['labels']]) or 'None'}"
+    )
+
+
 @tool
 def get_pr_status(owner: str, repo: str, pr_id: int) -> str:
     """Checks the status of a specific GitHub Pull Request."""
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
+    headers = _github_token_headers("application/vnd.github.v3+json")
+    if not headers:
         return "Error: GITHUB_TOKEN missing."
 
-    headers = {"Authorization": f"token {token}",
-               "Accept": "application/vnd.github.v3+json"}
     try:
-        resp = requests.get(
+        resp = github_get(
             f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_id}",
             headers=headers,
             timeout=10)
-        resp.raise_for_status()
-        pr = resp.json()
-        return (
-            f"### 🎋 PR Status: {pr['title']} (#{pr_id})\n"
-            f"- **State**: {pr['state'].upper()}\n"
-            f"- **Author**: {pr['user']['login']}\n"
-            f"- **Mergeable**: {pr.get('mergeable_state', 'unknown')}\n"
-            f"- **Labels**: {', '.join([label['name'] for label in pr['labels']]) or 'None'}"
-        )
+        return _format_pr(resp, pr_id)
     except Exception as e:
         return f"GitHub PR Error: {str(e)}"
 
 
+@async_variant(get_pr_status)
+async def aget_pr_status(owner: str, repo: str, pr_id: int) -> str:
+    headers = _github_token_headers("application/vnd.github.v3+json")
+    if not headers:
+        return "Error: GITHUB_TOKEN missing."
+
+    try:
+        resp = await agithub_get(f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_id}",
+                                 headers=headers, timeout=10)
+        return _format_pr(resp, pr_id)
+    except Exception as e:
+        return f"GitHub PR Error: {str(e)}"
+
+
+def _format_runs(resp, owner: str, target_repo: str) -> str:
+    if resp.status_code == 404:
+        return f"Repository {owner}/{target_repo} not found."
+
+    resp.raise_for_status()
+    runs = resp.json().get("workflow_runs", [])
+
+    if not runs:
+        return f"No pipeline runs found for {owner}/{target_repo}."
+
+    summary = [f"Recent Pipelines for {owner}/{target_repo}:"]
+    for run in runs:
+        status = run.get("status")
+        conclusion = run.get("conclusion") or "pending"
+        created_at = run.get("created_at")
+        branch = run.get("head_branch")
+        icon = "🟢" if conclusion == "success" else "🔴" if conclusion == "failure" else "🟡"
+        summary.append(
+            f"{icon} ID: {
+                run['id']} [{branch}] {status} -> {conclusion} ({created_at})")
+
+    return "\n".join(summary)
+
+
 @tool
 def check_pipeline_status(
         service: str,
@@ -536,53 +768,226 @@ def check_pipeline_status(
     """
     Checks the status of CI/CD pipelines (GitHub Actions) for a specific service/repo.
     """
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
+    headers = _github_token_headers("application/vnd.github.v3+json")
+    if not headers:
         return "Error: GITHUB_TOKEN is missing."
 
     target_repo = repo if repo else service
-    headers = {"Authorization": f"token {token}",
-               "Accept": "application/vnd.github.v3+json"}
+    try:
+        url = f"https://api.github.com/repos/{owner}/{target_repo}/actions/runs?per_page=5"
+        resp = github_get(url, headers=headers, timeout=10)
+        return _format_runs(resp, owner, target_repo)
 
+    except Exception as e:
+        return f"Error checking pipeline status: {str(e)}"
+
+
+@async_variant(check_pipeline_status)
+async def acheck_pipeline_status(
+        service: str,
+        repo: str = "",
+        owner: str = "my-org") -> str:
+    headers = _github_token_headers("application/vnd.github.v3+json")
+    if not headers:
+        return "Error: GITHUB_TOKEN is missing."
+
+    target_repo = repo if repo else service
     try:
         url = f"https://api.github.com/repos/{owner}/{target_repo}/actions/runs?per_page=5"
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = await agithub_get(url, headers=headers, timeout=10)
+        return _format_runs(resp, owner, target_repo)
 
-        if resp.status_code == 404:
-            return f"Repository {owner}/{target_repo} not found."
+    except Exception as e:
+        return f"Error checking pipeline status: {str(e)}"
 
-        resp.raise_for_status()
-        runs = resp.json().get("workflow_runs", [])
 
-        if not runs:
-            return f"No pipeline runs found for {owner}/{target_repo}."
+# --- Multi-repo status (GraphQL) ---
 
-        summary = [f"Recent Pipelines for {owner}/{target_repo}:"]
-        for run in runs:
-            status = run.get("status")
-            conclusion = run.get("conclusion") or "pending"
-            created_at = run.get("created_at")
-            branch = run.get("head_branch")
+REPO_STATUS_FRAGMENT = """
+fragment RepoStatus on Repository {
+  nameWithOwner
+  defaultBranchRef {
+    target {
+      ... on Commit {
+        history(first: $commits, since: $since) {
+          totalCount
+          nodes { abbreviatedOid messageHeadline committedDate author { name } }
+        }
+        checkSuites(first: $checks) {
+          nodes { conclusion status workflowRun { workflow { name } } }
+        }
+      }
+    }
+  }
+  pullRequests(states: OPEN, first: $prs, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    totalCount
+    nodes { number title isDraft reviewDecision }
+  }
+}
+"""
+STATUS_COMMITS, STATUS_CHECKS, STATUS_PRS = 5, 10, 5
+# Nodes one repository can return (repo + commits + suites with their
+# workflow + PRs); GitHub prices a query by its worst-case node count.
+REPO_STATUS_NODES = 1 + STATUS_COMMITS + 2 * STATUS_CHECKS + STATUS_PRS
+MAX_STATUS_REPOS = 100
+
+
+def _graphql_node_budget() -> int:
+    return env_number("GITHUB_GRAPHQL_NODE_BUDGET", 2000)
+
+
+def _parse_repos(repos: str, owner: str) -> list:
+    """"svc-a, other-org/svc-b" -> [(owner, name), ...], de-duplicated."""
+    parsed = []
+    for item in repos.replace("\n", ",").split(","):
+        item = item.strip()
+        if item:
+            repo_owner, _, name = item.rpartition("/")
+            pair = (repo_owner or owner, name)
+            if pair not in parsed:
+                parsed.append(pair)
+    return parsed
+
+
+def _repo_chunks(pairs: list) -> list:
+    """Splits repos so no query exceeds the node budget (at least one repo each)."""
+    size = max(1, _graphql_node_budget() // REPO_STATUS_NODES)
+    return [pairs[i:i + size] for i in range(0, len(pairs), size)]
+
+
+def _repo_status_query(pairs: list) -> str:
+    fields = "\n".join(
+        f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ ...RepoStatus }}"
+        for i, (owner, name) in enumerate(pairs))
+    return ("query($since: GitTimestamp!, $commits: Int!, $checks: Int!, $prs: Int!) {\n"
+            "  rateLimit { cost remaining }\n" + fields + "\n}\n" + REPO_STATUS_FRAGMENT)
+
+
+def _repo_status_variables(hours: int) -> dict:
+    since = datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=hours)
+    return {"since": since.isoformat().replace("+00:00", "Z"),
+            "commits": STATUS_COMMITS, "checks": STATUS_CHECKS, "prs": STATUS_PRS}
+
+
+def _format_repo_status(owner: str, name: str, repo) -> str:
+    if repo is None:
+        return f"- **{owner}/{name}**: not found or no access"
+
+    parts = []
+    head = (repo.get("defaultBranchRef") or {}).get("target") or {}
+    history = head.get("history") or {}
+    commits = history.get("nodes") or []
+    if commits:
+        c = commits[0]
+        author = (c.get("author") or {}).get("name", "?")
+        parts.append(f"{history.get('totalCount', len(commits))} commits "
+                     f"(latest {c['abbreviatedOid']} {author}: {c['messageHeadline']} @ {c['committedDate']})")
+    else:
+        parts.append("no recent commits")
+
+    runs = [s for s in (head.get("checkSuites") or {}).get("nodes") or [] if s.get("workflowRun")]
+    if runs:
+        results = []
+        for s in runs:
+            conclusion = (s.get("conclusion") or s.get("status") or "pending").lower()
             icon = "🟢" if conclusion == "success" else "🔴" if conclusion == "failure" else "🟡"
-            summary.append(
-                f"{icon} ID: {
-                    run['id']} [{branch}] {status} -> {conclusion} ({created_at})")
+            results.append(f"{icon} {s['workflowRun']['workflow']['name']}: {conclusion}")
+        parts.append("CI " + ", ".join(results))
+    else:
+        parts.append("CI: no workflow runs on HEAD")
+
+    prs = repo.get("pullRequests") or {}
+    if prs.get("totalCount"):
+        listed = []
+        for pr in prs.get("nodes") or []:
+            state = "DRAFT" if pr.get("isDraft") else pr.get("reviewDecision") or "OPEN"
+            listed.append(f"#{pr['number']} {pr['title']} [{state}]")
+        parts.append(f"{prs['totalCount']} open PRs ({'; '.join(listed)})")
+    else:
+        parts.append("no open PRs")
+
+    return f"- **{repo.get('nameWithOwner', f'{owner}/{name}')}**: " + " | ".join(parts)
+
+
+def _format_multi_repo_status(chunks: list, payloads: list, hours: int) -> str:
+    lines = []
+    cost, remaining = 0, None
+    for pairs, payload in zip(chunks, payloads):
+        data = payload["data"]
+        for i, (owner, name) in enumerate(pairs):
+            lines.append(_format_repo_status(owner, name, data.get(f"r{i}")))
+        rate = data.get("rateLimit") or {}
+        cost += rate.get("cost") or 0
+        remaining = rate.get("remaining", remaining)
+    header = f"### Status of {len(lines)} repositories (last {hours}h)"
+    footer = f"_({len(chunks)} GraphQL queries, cost {cost}, {remaining} points left)_"
+    return "\n".join([header] + lines + [footer])
+
+
+@tool
+def get_multi_repo_status(repos: str, owner: str = "my-org", hours: int = 24) -> str:
+    """
+    Recent commits, latest GitHub Actions results on the default branch and
+    open PRs for many repositories at once (batched GraphQL, one round trip
+    for dozens of repos). Prefer this over per-repo tools when checking
+    several services.
+    Args:
+        repos: Comma-separated repository names ("svc-a, svc-b") or "owner/name".
+        owner: Owner for names given without one (default "my-org").
+        hours: Window for recent commits (default 24).
+    """
+    headers = _github_token_headers()
+    if not headers:
+        return "Error: GITHUB_TOKEN is missing."
 
-        return "\n".join(summary)
+    pairs = _parse_repos(repos, owner)[:MAX_STATUS_REPOS]
+    if not pairs:
+        return "Error: No repositories given."
 
+    try:
+        chunks = _repo_chunks(pairs)
+        variables = _repo_status_variables(hours)
+
+        def fetch(chunk):
+            return github_graphql(_repo_status_query(chunk), variables, headers=headers, timeout=20)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            payloads = list(pool.map(fetch, chunks))
+        return _format_multi_repo_status(chunks, payloads, hours)
     except Exception as e:
-        return f"Error checking pipeline status: {str(e)}"
+        return f"Error fetching repository status: {str(e)}"
+
+
+@async_variant(get_multi_repo_status)
+async def aget_multi_repo_status(repos: str, owner: str = "my-org", hours: int = 24) -> str:
+    headers = _github_token_headers()
+    if not headers:
+        return "Error: GITHUB_TOKEN is missing."
+
+    pairs = _parse_repos(repos, owner)[:MAX_STATUS_REPOS]
+    if not pairs:
+        return "Error: No repositories given."
+
+    try:
+        chunks = _repo_chunks(pairs)
+        variables = _repo_status_variables(hours)
+        payloads = await asyncio.gather(*[
+            agithub_graphql(_repo_status_query(chunk), variables, headers=headers, timeout=20)
+            for chunk in chunks])
+        return _format_multi_repo_status(chunks, payloads, hours)
+    except Exception as e:
+        return f"Error fetching repository status: {str(e)}"
 
 
 @tool
-def get_argocd_sync_status(app_name: str, namespace: str = "argocd") -> str:
+def get_argocd_sync_status(app_name: str, namespace: str = "argocd", context: str = "") -> str:
     """Checks ArgoCD sync status using Kubernetes CRD access."""
-    v1 = _get_k8s_client()
+    v1 = _get_k8s_client(context)
     if not v1:
         return "Error: K8s client unavailable."
 
     try:
-        custom_api = client.CustomObjectsApi()
+        custom_api = k8s_api("CustomObjectsApi", context)
         # ArgoCD Applications are typically in the 'argoproj.io' group
         app = custom_api.get_namespaced_custom_object(
             group="argoproj.io",
@@ -628,11 +1033,9 @@ def analyze_iam_policy(user: str) -> str:
     """
     if resourcemanager_v3:
         try:
-            credentials, project = default()
-            if not project:
-                project = os.getenv("GOOGLE_CLOUD_PROJECT")
+            project = gcp_project()
             if project:
-                client = resourcemanager_v3.ProjectsClient()
+                client = gcp_client("resourcemanager.projects", resourcemanager_v3.ProjectsClient)
                 policy = client.get_iam_policy(resource=f"projects/{project}")
                 roles = [
                     b.role for b in policy.bindings if f"user:{user}" in b.members]
@@ -648,33 +1051,55 @@ def analyze_iam_policy(user: str) -> str:
 # --- Advanced SRE Tools (New) ---
 
 
+# Lines of pod log mined per analysis; mining is local, so this can be far
+# more than an LLM prompt could hold.
+MINED_LOG_LINES = 20000
+# Templates shown to the LLM (and in the tool output).
+MAX_TEMPLATE_ROWS = 30
+
+
 @tool
-def analyze_log_patterns(pod_name: str, namespace: str = "default") -> str:
+def analyze_log_patterns(pod_name: str, namespace: str = "default", context: str = "",
+                         lines: int = MINED_LOG_LINES) -> str:
     """
-    Analyzes pod logs using AI to identify error patterns and root causes.
-    Uses Google GenAI SDK (Gemini 1.5 Flash) if available for high-speed analysis,
-    otherwise falls back to standard LLM (Ollama) for local compatibility.
+    Analyzes pod logs to identify error patterns and root causes.
+    Log lines are first grouped locally into templates (exact counts, first/last
+    seen, sample values); only that table and a few example lines go to the AI
+    (Google GenAI SDK if available, otherwise the standard LLM, e.g. Ollama).
     """
+    v1 = _get_k8s_client(context)
+    if not v1:
+        return "Error: Could not load Kubernetes configuration."
+
     try:
-        # Fetch logs (up to 500 lines for better context)
-        logs = get_pod_logs.invoke(
-            {"pod_name": pod_name, "namespace": namespace, "lines": 500})
+        miner = TemplateMiner().feed(pod_log_lines(v1, pod_name, namespace, tail_lines=lines, timestamps=True))
     except Exception as e:
-        return f"Could not fetch logs for analysis: {str(e)}"
+        return f"Error retrieving logs for {pod_name}: {str(e)}"
+
+    if not miner.lines:
+        return f"No logs found for pod {pod_name}."
 
-    if "Error" in logs and "retrieving logs" in logs:
-        return logs
+    return _analyze_templates(miner, pod_name, f"pod '{pod_name}' in namespace '{namespace}'")
 
-    if len(logs) < 50:
-        return f"Logs are too short for AI analysis:\n{logs}"
+
+def _analyze_templates(miner: TemplateMiner, title: str, subject: str) -> str:
+    """The template table plus one AI analysis of it (Gemini SDK, else the standard LLM)."""
+    templates = miner.templates()
+    table = miner.table(max_rows=MAX_TEMPLATE_ROWS)
+    summary = (f"**Log templates for {title}** ({miner.lines} lines -> {len(templates)} templates, "
+               f"most severe first):\n{table}")
 
     # Prepare Prompt
+    replicas = ("The 'Seen in' column tells which replicas show each template; say whether a "
+                "failure affects all replicas or only some (e.g. one bad node).\n" if miner.sources else "")
     prompt_text = (
-        f"Analyze the following logs for pod '{pod_name}' in namespace '{namespace}'.\n"
-        "Identify unique error patterns, their frequency, and potential root causes.\n"
-        "Ignore standard info/debug messages unless relevant to a failure.\n"
+        f"Below are the log templates mined from the last {miner.lines} log lines of {subject}. "
+        "Counts and timestamps are exact; <*> marks variable parts.\n"
+        "Identify the error patterns that matter, how they relate, and potential root causes.\n"
+        f"{replicas}"
+        "Ignore standard info/debug templates unless relevant to a failure.\n"
         "Format the output as a concise Markdown summary.\n\n"
-        f"LOGS:\n{logs[:100000]}"  # Safety cap
+        f"TEMPLATES:\n{table}\n\nEXAMPLE LINES:\n{miner.exemplars()}"
     )
 
     # Strategy 1: Google GenAI SDK (Gemini 1.5 Flash) - Best for Speed &
@@ -682,45 +1107,133 @@ def analyze_log_patterns(pod_name: str, namespace: str = "default") -> str:
     client = get_google_sdk_client()
     if client:
         try:
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=prompt_text
-            )
-            return f"**AI Log Analysis (Gemini 1.5 Flash):**\n{response.text}"
+            text = cached_generate_content(
+                client, prompt_text, tool="analyze_log_patterns")
+            return f"{summary}\n\n**AI Log Analysis (Gemini 1.5 Flash):**\n{text}"
         except Exception as e:
             # If SDK fails, fall through to standard LLM
             print(f"Gemini SDK failed: {e}. Falling back to standard LLM.")
 
     # Strategy 2: Standard LLM (Ollama / LangChain Adapter) - "Run with
-    # Ollama" compatibility
+    # Ollama" compatibility. The template table is small enough for a local
+    # model's context, so nothing is truncated.
     llm = get_llm()
     try:
-        # Truncate logs if using local LLM to avoid context overflow (approx 8k
-        # tokens safe limit)
-        safe_logs = logs[:12000] + \
-            ("...[TRUNCATED]" if len(logs) > 12000 else "")
-        fallback_prompt = (
-            f"Analyze these logs for '{pod_name}'. Summarize errors and root causes.\n\n{safe_logs}")
-        response = llm.invoke(fallback_prompt)
-        return f"**AI Log Analysis (Standard LLM):**\n{response.content}"
+        content = cached_invoke(
+            llm, prompt_text, tool="analyze_log_patterns")
+        return f"{summary}\n\n**AI Log Analysis (Standard LLM):**\n{content}"
     except Exception as e:
-        return f"Error during AI log analysis: {str(e)}"
+        return f"{summary}\n\nError during AI log analysis: {str(e)}"
+
+
+# Log lines read per container (and again for its previous instance) when
+# diagnosing every replica of a service.
+REPLICA_LOG_LINES = 2000
+
+
+def _selector_matches(selector: dict, labels) -> bool:
+    labels = labels or {}
+    return all(labels.get(k) == v for k, v in selector.items())
+
+
+def _service_pods(v1, service_name: str, namespace: str, context: str = "") -> tuple:
+    """
+    (pods behind the service's selector, how they were found). Without a
+    Service (or selector) of that name, pods named `<service_name>-...`.
+    """
+    svc_cache, pod_cache = cached("services", context), cached("pods", context)
+    service = svc_cache.get(namespace, service_name) if svc_cache else None
+    if service is None:
+        try:
+            service = v1.read_namespaced_service(name=service_name, namespace=namespace)
+        except Exception as e:
+            if getattr(e, "status", None) != 404:
+                raise
+    selector = (service.spec.selector or {}) if service is not None else {}
+
+    if selector:
+        how = "selector " + ",".join(f"{k}={v}" for k, v in sorted(selector.items()))
+        if pod_cache:
+            return [p for p in pod_cache.list(namespace) if _selector_matches(selector, p.metadata.labels)], how
+        label_selector = ",".join(f"{k}={v}" for k, v in selector.items())
+        pages = list_pages(v1.list_namespaced_pod, namespace, label_selector=label_selector)
+        return list(chain.from_iterable(page.items for page in pages)), how
+
+    pods = pod_cache.list(namespace) if pod_cache else chain.from_iterable(
+        page.items for page in list_pages(v1.list_namespaced_pod, namespace))
+    return [p for p in pods if p.metadata.name.startswith(f"{service_name}-")], f"name prefix '{service_name}-'"
+
+
+def _log_sources(pods) -> list:
+    """(pod, container, previous) for every container, plus its previous instance if it restarted."""
+    sources = []
+    for pod in pods:
+        restarts = {cs.name: cs.restart_count or 0 for cs in pod.status.container_statuses or []}
+        for container in pod.spec.containers:
+            sources.append((pod.metadata.name, container.name, False))
+            # Only a restarted container has a previous log (the crash itself).
+            if restarts.get(container.name):
+                sources.append((pod.metadata.name, container.name, True))
+    return sources
+
+
+def _collect_replica_logs(v1, sources: list, namespace: str, lines: int) -> tuple:
+    """Reads every (pod, container, previous) log concurrently into one miner tagged by replica."""
+    miner, lock, errors = TemplateMiner(), threading.Lock(), []
+
+    def collect(source):
+        pod, container, previous = source
+        try:
+            for line in pod_log_lines(v1, pod, namespace, container=container, previous=previous,
+                                      tail_lines=lines, timestamps=True):
+                with lock:
+                    miner.add(line, pod)
+        except Exception as e:
+            label = f"{pod}/{container}" + (" (previous)" if previous else "")
+            with lock:
+                errors.append(f"{label}: {str(e)}")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency_for("k8s"),
+                                               thread_name_prefix="replica-logs") as pool:
+        list(pool.map(collect, sources))
+    return miner, errors
+
+
+def _replica_log_analysis(v1, service_name: str, namespace: str, context: str) -> str:
+    pods, how = _service_pods(v1, service_name, namespace, context)
+    if not pods:
+        return f"No pods found for '{service_name}' ({how})."
+
+    sources = _log_sources(pods)
+    miner, errors = _collect_replica_logs(v1, sources, namespace, REPLICA_LOG_LINES)
+    restarted = sum(1 for _, _, previous in sources if previous)
+    header = (f"{len(pods)} replicas ({how}), {len(sources) - restarted} containers"
+              + (f" + {restarted} previous (restarted) containers" if restarted else ""))
+    if errors:
+        header += "\nCould not read: " + "; ".join(errors)
+    if not miner.lines:
+        return f"{header}\nNo logs found."
+    return f"{header}\n" + _analyze_templates(
+        miner, f"{service_name} ({len(pods)} replicas)",
+        f"all {len(pods)} replicas of service '{service_name}' in namespace '{namespace}'")
 
 
 @tool
 def diagnose_service_health(
         service_name: str,
-        namespace: str = "default") -> str:
+        namespace: str = "default",
+        context: str = "") -> str:
     """
     Performs a comprehensive health check on a service.
-    Orchestrates: Pod listing, Event checking, and Log analysis for failing pods.
+    Orchestrates: Pod listing, Event checking, and one Log analysis across all
+    replicas behind the service's selector (current and previous container logs).
     """
     report = [f"Health Diagnosis for '{service_name}' in '{namespace}':"]
 
     # 1. Check Pods
     try:
         # FIX: Use invoke
-        pods_output = list_k8s_pods.invoke({"namespace": namespace})
+        pods_output = list_k8s_pods.invoke({"namespace": namespace, "context": context})
     except BaseException:
         pods_output = "Failed to list pods."
     report.append(f"\n1. Pod Status:\n{pods_output}")
@@ -728,29 +1241,63 @@ def diagnose_service_health(
     # 2. Check Events
     try:
         # FIX: Use invoke
-        events_output = get_cluster_events.invoke({"namespace": namespace})
+        events_output = get_cluster_events.invoke({"namespace": namespace, "context": context})
     except BaseException:
         events_output = "Failed to list events."
     report.append(f"\n2. Recent Events:\n{events_output}")
 
-    # 3. Analyze Logs if suspicious
-    if service_name in pods_output:
-        import re
-        match = re.search(rf"({service_name}-[\w-]+)", pods_output)
-        if match:
-            pod_full_name = match.group(1)
-            report.append(f"\n3. Log Analysis for {pod_full_name}:")
-            try:
-                # FIX: Use invoke
-                logs_analysis = analyze_log_patterns.invoke(
-                    {"pod_name": pod_full_name, "namespace": namespace})
-                report.append(logs_analysis)
-            except BaseException:
-                report.append("Failed to analyze logs.")
+    # 3. Analyze the logs of every replica at once: identical lines across
+    # replicas become one template, annotated with where it occurs.
+    report.append(f"\n3. Log Analysis for all replicas of {service_name}:")
+    try:
+        v1 = _get_k8s_client(context)
+        if not v1:
+            report.append("Error: Could not load Kubernetes configuration.")
+        else:
+            report.append(_replica_log_analysis(v1, service_name, namespace, context))
+    except Exception as e:
+        report.append(f"Failed to analyze logs: {str(e)}")
 
     return "\n".join(report)
 
 
+# Failed jobs whose logs are fetched and diagnosed at the same time.
+MAX_PARALLEL_CI_JOBS = 4
+
+
+def _stream_job_log(log_url: str, headers: dict) -> FailureExcerpt:
+    """Streams a job log in chunks into a bounded failure excerpt (never the whole log in memory)."""
+    log_resp = request("github", "GET", log_url, headers=headers, timeout=15, stream=True)
+    try:
+        if log_resp.status_code != 200:
+            raise RuntimeError(f"Status: {log_resp.status_code}")
+        log_resp.encoding = log_resp.encoding or "utf-8"
+        return FailureExcerpt().feed(log_resp.iter_lines(chunk_size=64 * 1024, decode_unicode=True))
+    finally:
+        log_resp.close()
+
+
+def _analyze_failed_job(job: dict, owner: str, repo_name: str, headers: dict) -> str:
+    job_id = job['id']
+    job_name = job['name']
+    section = f"Failed Job: {job_name} (ID: {job_id})"
+
+    log_url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/jobs/{job_id}/logs"
+    try:
+        excerpt = _stream_job_log(log_url, headers)
+    except Exception as e:
+        return f"{section}\n\nCould not fetch logs ({e})"
+
+    from app.llm import generate_diagnosis
+    prompt = (f"Analyze this excerpt of the CI/CD log for job '{job_name}' and find the error. "
+              f"It contains the lines around each failure marker and the end of the log:\n\n{excerpt.render()}")
+    system_inst = "Identify the specific error message and the root cause. Suggest a fix if possible."
+
+    analysis = generate_diagnosis(prompt=prompt, system_instruction=system_inst)
+    first = f"\nFirst failure: {excerpt.first_failure}" if excerpt.first_failure else ""
+    return f"{section}{first}\n\nAI Analysis:\n{analysis}"
+
+
 @tool
 def analyze_ci_failure(
         build_id: str,
@@ -775,7 +1322,7 @@ def analyze_ci_failure(
     try:
         # 1. Get Job details to find failed step
         url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/runs/{build_id}/jobs"
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = request("github", "GET", url, headers=headers, timeout=10)
         resp.raise_for_status()
 
         jobs = resp.json().get("jobs", [])
@@ -784,32 +1331,13 @@ def analyze_ci_failure(
         if not failed_jobs:
             return f"No failed jobs found for run {build_id}."
 
-        report = []
-        for job in failed_jobs:
-            job_id = job['id']
-            job_name = job['name']
-            report.append(f"Failed Job: {job_name} (ID: {job_id})")
+        def analyze(job):
+            return _analyze_failed_job(job, owner, repo_name, headers)
 
-            # 2. Get Logs for this job
-            # Note: This returns raw text
-            log_url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/jobs/{job_id}/logs"
-            try:
-                log_resp = requests.get(log_url, headers=headers, timeout=15)
-                if log_resp.status_code == 200:
-                    logs = log_resp.text
-
-                    from app.llm import generate_diagnosis
-                    prompt = f"Analyze these CI/CD logs for job '{job_name}' and find the error:\n\n{logs}"
-                    system_inst = "Identify the specific error message and the root cause. Suggest a fix if possible."
-
-                    analysis = generate_diagnosis(
-                        prompt=prompt, system_instruction=system_inst)
-                    report.append(f"AI Analysis:\n{analysis}")
-                else:
-                    report.append(
-                        "Could not fetch logs (Status: " + str(log_resp.status_code) + ")")
-            except Exception as e:
-                report.append(f"Error fetching logs: {e}")
+        # Jobs are downloaded and diagnosed in parallel; the report keeps their order.
+        workers = min(len(failed_jobs), MAX_PARALLEL_CI_JOBS)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            report = list(pool.map(analyze, failed_jobs))
 
         return "\n\n".join(report)
 
@@ -818,13 +1346,14 @@ def analyze_ci_failure(
 
 
 @tool
-def trace_service_health(service_name: str, depth: int = 1) -> str:
+def trace_service_health(service_name: str, depth: int = 1, context: str = "") -> str:
     """
     Diagnoses the health of a service and its immediate dependencies.
     Useful for root cause analysis to see if a failure is cascading.
     Args:
         service_name: The root service to check.
         depth: How deep to traverse dependencies (default 1).
+        context: Kubeconfig context of the cluster (default: the current one).
     """
     report = [
         f"Dependency Health Trace for '{service_name}' (Depth: {depth}):"]
@@ -835,7 +1364,7 @@ def trace_service_health(service_name: str, depth: int = 1) -> str:
         # Assuming namespace "default" for simplicity, or we could look it up
         # FIX: Use invoke
         root_health = diagnose_service_health.invoke(
-            {"service_name": service_name, "namespace": "default"})
+            {"service_name": service_name, "namespace": "default", "context": context})
         report.append(root_health)
     except Exception as e:
         report.append(f"Error checking root service: {str(e)}")
@@ -855,7 +1384,7 @@ def trace_service_health(service_name: str, depth: int = 1) -> str:
                     try:
                         # FIX: Use invoke
                         dep_health = diagnose_service_health.invoke(
-                            {"service_name": dep, "namespace": "default"})
+                            {"service_name": dep, "namespace": "default", "context": context})
                         report.append(dep_health)
                     except Exception as e:
                         report.append(
@@ -910,7 +1439,8 @@ def create_issue(
             }
         }
         try:
-            resp = requests.post(
+            resp = request(
+                "jira", "POST",
                 f"{jira_url}/rest/api/2/issue",
                 json=payload,
                 auth=(jira_user, jira_token),
@@ -933,7 +1463,8 @@ def create_issue(
         payload = {"title": title, "body": description, "labels": [severity]}
 
         try:
-            resp = requests.post(
+            resp = request(
+                "github", "POST",
                 f"https://api.github.com/repos/{target}/issues",
                 json=payload,
                 headers=headers)
@@ -948,31 +1479,64 @@ def create_issue(
 # --- Additional SRE Tools (PagerDuty, ChatOps, Extended Datadog) ---
 
 
+def _format_oncall(resp, schedule_id: str) -> str:
+    resp.raise_for_status()
+    oncalls = resp.json().get("oncalls", [])
+    if not oncalls:
+        return "No one is currently on-call for this schedule."
+
+    user = oncalls[0]['user']['summary']
+    return f"📟 **PagerDuty On-Call**: {user} is currently active for schedule {schedule_id}."
+
+
+def _pagerduty_headers():
+    token = os.getenv("PAGERDUTY_TOKEN")
+    if not token:
+        return None
+    return {"Authorization": f"Token token={token}",
+            "Accept": "application/vnd.pagerduty+json;version=2"}
+
+
 @tool
 def check_on_call_schedule(schedule_id: str) -> str:
     """Checks the current on-call schedule in PagerDuty."""
-    token = os.getenv("PAGERDUTY_TOKEN")
-    if not token:
+    headers = _pagerduty_headers()
+    if not headers:
         return "Error: PAGERDUTY_TOKEN missing. Cannot fetch live on-call data."
 
-    headers = {"Authorization": f"Token token={token}",
-               "Accept": "application/vnd.pagerduty+json;version=2"}
     try:
-        resp = requests.get(
+        resp = request(
+            "pagerduty", "GET",
             f"https://api.pagerduty.com/oncalls?schedule_ids[]={schedule_id}",
             headers=headers,
             timeout=10)
-        resp.raise_for_status()
-        oncalls = resp.json().get("oncalls", [])
-        if not oncalls:
-            return "No one is currently on-call for this schedule."
+        return _format_oncall(resp, schedule_id)
+    except Exception as e:
+        return f"PagerDuty Error: {str(e)}"
+
+
+@async_variant(check_on_call_schedule)
+async def acheck_on_call_schedule(schedule_id: str) -> str:
+    headers = _pagerduty_headers()
+    if not headers:
+        return "Error: PAGERDUTY_TOKEN missing. Cannot fetch live on-call data."
 
-        user = oncalls[0]['user']['summary']
-        return f"📟 **PagerDuty On-Call**: {user} is currently active for schedule {schedule_id}."
+    try:
+        resp = await arequest("pagerduty", "GET",
+                              f"https://api.pagerduty.com/oncalls?schedule_ids[]={schedule_id}",
+                              headers=headers, timeout=10)
+        return _format_oncall(resp, schedule_id)
     except Exception as e:
         return f"PagerDuty Error: {str(e)}"
 
 
+def _slack_payload(channel: str, message: str) -> dict:
+    payload = {"text": message}
+    if channel.startswith("#"):
+        payload["channel"] = channel
+    return payload
+
+
 @tool
 def send_slack_notification(channel: str, message: str) -> str:
     """Sends a message to a Slack channel via Webhook."""
@@ -981,10 +1545,21 @@ def send_slack_notification(channel: str, message: str) -> str:
         return f"Notification Log (No Webhook): [{channel}] {message}"
 
     try:
-        payload = {"text": message}
-        if channel.startswith("#"):
-            payload["channel"] = channel
-        resp = requests.post(webhook_url, json=payload, timeout=5)
+        resp = request("slack", "POST", webhook_url, json=_slack_payload(channel, message), timeout=5)
+        resp.raise_for_status()
+        return f"Notification sent to {channel}."
+    except Exception as e:
+        return f"Error sending notification: {e}"
+
+
+@async_variant(send_slack_notification)
+async def asend_slack_notification(channel: str, message: str) -> str:
+    webhook_url = os.getenv("SLACK_WEBHOOK_URL")
+    if not webhook_url:
+        return f"Notification Log (No Webhook): [{channel}] {message}"
+
+    try:
+        resp = await arequest("slack", "POST", webhook_url, json=_slack_payload(channel, message), timeout=5)
         resp.raise_for_status()
         return f"Notification sent to {channel}."
     except Exception as e:
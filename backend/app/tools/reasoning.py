@@ -1,5 +1,5 @@
 from langchain_core.tools import tool
-from app.llm import get_llm, get_google_sdk_client
+from app.llm import get_llm, get_google_sdk_client, cached_generate_content, cached_invoke
 import json
 
 
@@ -23,24 +23,25 @@ def generate_hypothesis(context: str) -> str:
     client = get_google_sdk_client()
     if client:
         try:
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=prompt,
+            return cached_generate_content(
+                client,
+                prompt,
+                tool="generate_hypothesis",
                 config={
                     "response_mime_type": "application/json"
                 }
             )
-            return response.text
         except Exception as e:
             print(f"Gemini SDK failed: {e}. Falling back to standard LLM.")
 
     # Fallback
     llm = get_llm()
     try:
-        res = llm.invoke(
+        content = cached_invoke(
+            llm,
             prompt +
-            "\n\nReturn ONLY raw JSON. Do not include markdown formatting like ```json ... ```.")
-        content = res.content.strip()
+            "\n\nReturn ONLY raw JSON. Do not include markdown formatting like ```json ... ```.",
+            tool="generate_hypothesis").strip()
         # Clean up common markdown if present
         if content.startswith("```json"):
             content = content[7:]
@@ -4,37 +4,15 @@ import json
 from sqlalchemy.orm import Session
 from app.db import SessionLocal, Service, Runbook
 
-try:
-    from kubernetes import client, config
-except ImportError:
-    client = None
-    config = None
+from app.k8s import k8s_api
 
 
-def _get_k8s_client():
-    if not config:
-        return None
-    try:
-        config.load_kube_config()
-    except BaseException:
-        try:
-            config.load_incluster_config()
-        except BaseException:
-            return None
-    return client.CoreV1Api()
-
-
-def _get_k8s_apps_client():
-    if not config:
-        return None
-    try:
-        config.load_kube_config()
-    except BaseException:
-        try:
-            config.load_incluster_config()
-        except BaseException:
-            return None
-    return client.AppsV1Api()
+def _get_k8s_client(context: str = ""):
+    return k8s_api("CoreV1Api", context)
+
+
+def _get_k8s_apps_client(context: str = ""):
+    return k8s_api("AppsV1Api", context)
 
 
 # --- Initial Seed Data for Catalog Bootstrap ---
@@ -178,13 +156,15 @@ def list_runbooks() -> str:
 def execute_runbook(
         runbook_name: str,
         target_service: str,
-        dry_run: bool = False) -> str:
+        dry_run: bool = False,
+        context: str = "") -> str:
     """
     Executes a specific runbook against a target service.
     Args:
         runbook_name: The name of the runbook to run.
         target_service: The service to target (e.g., payment-api).
         dry_run: If True, simulates the action without making changes.
+        context: Kubeconfig context of the target cluster (default: the current one).
     """
     db = SessionLocal()
     try:
@@ -223,7 +203,7 @@ def execute_runbook(
             )
 
         if runbook_name == "restart_service":
-            v1 = _get_k8s_client()
+            v1 = _get_k8s_client(context)
             if v1:
                 try:
                     # Find pods with label app=target_service (convention)
@@ -245,7 +225,7 @@ def execute_runbook(
                     f"Error: K8s client unavailable. Cannot execute 'restart_service'.")
 
         elif runbook_name == "scale_up":
-            apps_v1 = _get_k8s_apps_client()
+            apps_v1 = _get_k8s_apps_client(context)
             if apps_v1:
                 try:
                     # Assume deployment name matches service name
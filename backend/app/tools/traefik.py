@@ -1,8 +1,9 @@
 from langchain_core.tools import tool
 import os
-import requests
 from typing import List, Dict, Optional
-from kubernetes import client, config
+from app.http import arequest, request, async_variant, run_blocking
+from app.k8s import k8s_api
+from app.k8s_cache import cached, cache_note
 
 
 def _get_traefik_api_url():
@@ -15,68 +16,94 @@ def _get_traefik_api_url():
         "http://traefik.kube-system.svc.cluster.local:8080")
 
 
+def _format_overview(resp, api_url: str) -> str:
+    if resp.status_code == 200:
+        data = resp.json()
+        return f"🟢 Traefik Active. Providers: {
+            len(
+                data.get(
+                    'providers',
+                    []))}, HTTP Services: {
+            data.get(
+                'statistics',
+                {}).get(
+                    'http',
+                    {}).get(
+                        'services',
+                0)}"
+
+    return f"🟡 Traefik reachable but returned {
+        resp.status_code} at {api_url}"
+
+
+def _traefik_pod_fallback(e: Exception, context: str = "") -> str:
+    # Fallback: Check Kubernetes pod status for Traefik
+    try:
+        v1 = k8s_api("CoreV1Api", context)
+        if v1 is None:
+            return f"🔴 Traefik API unreachable: {e}"
+        pods = v1.list_pod_for_all_namespaces(
+            label_selector="app.kubernetes.io/name=traefik")
+        if not pods.items:
+            pods = v1.list_pod_for_all_namespaces(
+                label_selector="app=traefik")
+
+        if pods.items:
+            p = pods.items[0]
+            return f"🟢 Traefik Pod '{
+                p.metadata.name}' is {
+                p.status.phase} in {
+                p.metadata.namespace}. (API Unreachable: {e})"
+        return f"🔴 Traefik pods not found in cluster. API also unreachable: {e}"
+    except BaseException:
+        return f"🔴 Traefik API unreachable: {e}"
+
+
 @tool
-def check_traefik_health() -> str:
+def check_traefik_health(context: str = "") -> str:
     """
     Checks the health and version of the Traefik Ingress Controller.
     Queries the Traefik API /health or /api/overview if available.
+    `context` selects the kubeconfig context used for the pod fallback.
     """
     api_url = _get_traefik_api_url()
     try:
         # 1. Try /health
-        resp = requests.get(f"{api_url}/health", timeout=5)
+        resp = request("traefik", "GET", f"{api_url}/health", timeout=5)
         if resp.status_code == 200:
             return f"🟢 Traefik Health: OK (Status: {resp.status_code})"
 
         # 2. Try /api/overview (if dashboard enabled)
-        resp = requests.get(f"{api_url}/api/overview", timeout=5)
+        resp = request("traefik", "GET", f"{api_url}/api/overview", timeout=5)
+        return _format_overview(resp, api_url)
+    except Exception as e:
+        return _traefik_pod_fallback(e, context)
+
+
+@async_variant(check_traefik_health)
+async def acheck_traefik_health(context: str = "") -> str:
+    api_url = _get_traefik_api_url()
+    try:
+        resp = await arequest("traefik", "GET", f"{api_url}/health", timeout=5)
         if resp.status_code == 200:
-            data = resp.json()
-            return f"🟢 Traefik Active. Providers: {
-                len(
-                    data.get(
-                        'providers',
-                        []))}, HTTP Services: {
-                data.get(
-                    'statistics',
-                    {}).get(
-                        'http',
-                        {}).get(
-                            'services',
-                    0)}"
+            return f"🟢 Traefik Health: OK (Status: {resp.status_code})"
 
-        return f"🟡 Traefik reachable but returned {
-            resp.status_code} at {api_url}"
+        resp = await arequest("traefik", "GET", f"{api_url}/api/overview", timeout=5)
+        return _format_overview(resp, api_url)
     except Exception as e:
-        # Fallback: Check Kubernetes pod status for Traefik
-        try:
-            config.load_kube_config()
-            v1 = client.CoreV1Api()
-            pods = v1.list_pod_for_all_namespaces(
-                label_selector="app.kubernetes.io/name=traefik")
-            if not pods.items:
-                pods = v1.list_pod_for_all_namespaces(
-                    label_selector="app=traefik")
-
-            if pods.items:
-                p = pods.items[0]
-                return f"🟢 Traefik Pod '{
-                    p.metadata.name}' is {
-                    p.status.phase} in {
-                    p.metadata.namespace}. (API Unreachable: {e})"
-            return f"🔴 Traefik pods not found in cluster. API also unreachable: {e}"
-        except BaseException:
-            return f"🔴 Traefik API unreachable: {e}"
+        return await run_blocking("k8s", _traefik_pod_fallback, e, context)
 
 
 @tool
-def list_traefik_routes(namespace: str = "") -> str:
+def list_traefik_routes(namespace: str = "", context: str = "") -> str:
     """
     Lists HTTP routes managed by Traefik (IngressRoutes and standard Ingresses).
+    `context` selects a kubeconfig context (default: the current one).
     """
     try:
-        config.load_kube_config()
-        custom_api = client.CustomObjectsApi()
+        custom_api = k8s_api("CustomObjectsApi", context)
+        if custom_api is None:
+            return "Error listing Traefik routes: could not load Kubernetes configuration."
 
         report = ["### 🛣️ Traefik Routing Table"]
 
@@ -98,10 +125,13 @@ def list_traefik_routes(namespace: str = "") -> str:
         except BaseException:
             pass  # CRD might not exist or permission denied
 
-        # 2. Standard Ingresses
-        v1_ing = client.NetworkingV1Api()
-        ings = v1_ing.list_ingress_for_all_namespaces()
-        for i in ings.items:
+        # 2. Standard Ingresses (IngressRoutes above are not in the watch cache)
+        ing_cache = cached("ingresses", context)
+        if ing_cache:
+            ings = ing_cache.list(namespace)
+        else:
+            ings = k8s_api("NetworkingV1Api", context).list_ingress_for_all_namespaces().items
+        for i in ings:
             ns = i.metadata.namespace
             if namespace and ns != namespace:
                 continue
@@ -112,7 +142,7 @@ def list_traefik_routes(namespace: str = "") -> str:
         if len(report) == 1:
             return "No Traefik routes found."
 
-        return "\n".join(report)
+        return "\n".join(report) + cache_note(ing_cache)
     except Exception as e:
         return f"Error listing Traefik routes: {e}"
 
@@ -120,15 +150,18 @@ def list_traefik_routes(namespace: str = "") -> str:
 @tool
 def diagnose_traefik_ingress(
         ingress_name: str,
-        namespace: str = "default") -> str:
+        namespace: str = "default",
+        context: str = "") -> str:
     """
     Diagnoses issues with a specific Traefik ingress/route.
     Checks: Backend service health, TLS secret status, and Middleware config.
+    `context` selects a kubeconfig context (default: the current one).
     """
     try:
-        config.load_kube_config()
-        v1_net = client.NetworkingV1Api()
-        v1_core = client.CoreV1Api()
+        v1_net = k8s_api("NetworkingV1Api", context)
+        v1_core = k8s_api("CoreV1Api", context)
+        if v1_net is None or v1_core is None:
+            return "Traefik Diagnostic Error: could not load Kubernetes configuration."
 
         report = [f"### 🔍 Traefik Diagnosis: {namespace}/{ingress_name}"]
 
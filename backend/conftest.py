@@ -6,6 +6,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.db import Base
+from app.llm import llm_registry
+from app.cache import response_cache
 
 # Ensure backend is in path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -14,6 +16,28 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
 
+@pytest.fixture(autouse=True)
+def reset_llm_registry():
+    """Pooled LLM clients must not leak between tests that patch the SDKs."""
+    llm_registry.clear()
+    yield
+    llm_registry.clear()
+
+
+@pytest.fixture(autouse=True)
+def keyword_only_fast_router(monkeypatch):
+    """Keep the supervisor fast path off the sentence-transformer model in unit tests."""
+    monkeypatch.setenv("ROUTER_EMBEDDINGS", "false")
+
+
+@pytest.fixture(autouse=True)
+def isolate_response_cache(tmp_path, monkeypatch):
+    """Each test gets an empty LLM response cache backed by a throwaway file."""
+    monkeypatch.setattr(response_cache, "path", str(tmp_path / "llm_cache.db"))
+    response_cache.clear()
+    yield response_cache
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """
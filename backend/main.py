@@ -1,10 +1,12 @@
 from contextlib import asynccontextmanager
+import asyncio
+import time
 import uuid
 import json
 from typing import List, Dict, Optional
 from pydantic import BaseModel
 from fastapi.responses import StreamingResponse
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from dotenv import load_dotenv
 
 # load_dotenv MUST be called before importing app modules
@@ -12,7 +14,18 @@ load_dotenv()
 
 from app.rag import initialize_rag
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from app.graph import app_graph
+from app.graph import app_graph, checkpointer, PARALLEL_NODE
+from app.checkpoint import get_checkpointer_stats
+from app.llm import get_llm_client_stats, get_response_cache_stats, get_singleflight_stats
+from app.router import fast_router
+from app.context import context_compactor
+from app.gcp import gcp_credentials, get_gcp_credential_stats
+from app.gcp_inventory import get_gcp_inventory_stats
+from app.github import get_github_cache_stats
+from app.http import async_http, sync_http
+from app.k8s import get_k8s_client_stats
+from app.k8s_cache import cache_enabled, cluster_cache, get_k8s_cache_stats, watch_contexts
+from app.log_follow import LogFilter, follow_pod, get_log_follow_stats, log_followers, parse_since
 
 
 @asynccontextmanager
@@ -22,7 +35,21 @@ async def lifespan(app: FastAPI):
         initialize_rag()
     except Exception as e:
         print(f"Warning: Failed to initialize RAG: {e}")
+    # Load the router's embedder now rather than inside the first /chat turn.
+    try:
+        fast_router.warm()
+    except Exception as e:
+        print(f"Warning: Failed to load router embeddings: {e}")
+    # Sync the cluster watch cache before the first incident question.
+    if cache_enabled():
+        for context in watch_contexts():
+            cluster_cache.start(context)
     yield
+    cluster_cache.stop()
+    log_followers.stop()
+    await async_http.aclose()
+    sync_http.close()
+    gcp_credentials.clear()
 
 app = FastAPI(title="Infra Agent Manager", version="1.0", lifespan=lifespan)
 
@@ -31,11 +58,180 @@ class ChatRequest(BaseModel):
     message: str
     history: Optional[List[Dict[str, str]]] = []
     thread_id: Optional[str] = None
+    # Set to False for the legacy stream (one event per finished node).
+    stream_tokens: bool = True
 
 
 class ResumeRequest(BaseModel):
     thread_id: str
     action: str  # "approve" or "deny"
+    stream_tokens: bool = True
+
+
+def _agent_label(node, msg, callers=None):
+    """
+    Parallel fan-out messages carry the name of the specialist that wrote them;
+    a tool result belongs to whoever made the call (`callers`: tool_call_id -> agent).
+    """
+    if node != PARALLEL_NODE:
+        return node
+    if isinstance(msg, AIMessage) and msg.name:
+        return msg.name
+    if isinstance(msg, ToolMessage):
+        return (callers or {}).get(msg.tool_call_id, node)
+    return node
+
+
+def _event(payload: dict) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+
+def _update_events(node, output):
+    """NDJSON events for one finished node update (the legacy stream)."""
+    # Check if it's the Supervisor routing
+    if node == "Supervisor":
+        next_agent = output.get("next")
+        if next_agent == PARALLEL_NODE:
+            for agent in output.get("parallel", []):
+                yield _event({"type": "activity", "agent": agent})
+        elif next_agent and next_agent != "FINISH":
+            yield _event({"type": "activity", "agent": next_agent})
+        elif next_agent == "FINISH":
+            # We are done.
+            yield _event({"type": "final"})
+
+    # Check if it's a Specialist acting
+    elif "_Specialist" in node:
+        # output usually contains "messages"
+        msgs = output.get("messages", [])
+        if not msgs:
+            return
+        if not isinstance(msgs, list):
+            msgs = [msgs]
+
+        callers = {}
+        for msg in msgs:
+            # Check for tool calls (Request)
+            if hasattr(msg, 'tool_calls') and msg.tool_calls:
+                for tool_call in msg.tool_calls:
+                    callers[tool_call.get('id')] = _agent_label(node, msg)
+                    yield _event({
+                        "type": "tool_call",
+                        "agent": _agent_label(node, msg),
+                        "tool": tool_call.get('name', 'unknown'),
+                        "args": tool_call.get('args', {})
+                    })
+
+            # Check for tool outputs (Result)
+            if isinstance(msg, ToolMessage):
+                yield _event({
+                    "type": "tool_output",
+                    "agent": _agent_label(node, msg, callers),
+                    "tool": msg.name or "unknown",
+                    "content": msg.content
+                })
+
+            if msg.content and not isinstance(msg, ToolMessage):
+                yield _event({
+                    "type": "message",
+                    "agent": _agent_label(node, msg),
+                    "content": msg.content
+                })
+
+
+def _event_agent(event):
+    """Specialist a nested LLM/tool event belongs to, or None (e.g. the Supervisor)."""
+    metadata = event.get("metadata") or {}
+    # Parallel branches tag their runs; other specialists are top-level nodes.
+    if metadata.get("agent"):
+        return metadata["agent"]
+    node = (metadata.get("langgraph_checkpoint_ns") or "").split(":", 1)[0]
+    return node if "_Specialist" in node else None
+
+
+def _chunk_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    # Some providers stream a list of content parts.
+    return "".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content or [])
+
+
+async def _token_events(inputs, config):
+    """
+    NDJSON events as they happen: LLM tokens and tool start/end of every
+    specialist, plus the same per-node events as the legacy stream.
+    """
+    tool_runs = set()
+    async for event in app_graph.astream_events(inputs, config=config, version="v2"):
+        kind = event["event"]
+        if kind == "on_chain_stream" and not event.get("parent_ids"):
+            # Root graph output: one {node: update} per finished node.
+            for node, output in event["data"]["chunk"].items():
+                if isinstance(output, dict):
+                    for line in _update_events(node, output):
+                        yield line
+            continue
+
+        agent = _event_agent(event)
+        if agent is None:
+            continue
+
+        if kind == "on_chat_model_stream":
+            # Only the ReAct model node; LLM calls made inside tools stay internal.
+            if event["metadata"].get("langgraph_node") != "agent":
+                continue
+            text = _chunk_text(event["data"]["chunk"].content)
+            if text:
+                yield _event({"type": "token", "agent": agent, "content": text})
+
+        elif kind == "on_tool_start":
+            # Tools invoked by other tools are reported as part of their caller.
+            if tool_runs.intersection(event.get("parent_ids", [])):
+                continue
+            tool_runs.add(event["run_id"])
+            yield _event({
+                "type": "tool_start",
+                "agent": agent,
+                "tool": event["name"],
+                "args": event["data"].get("input", {})
+            })
+
+        elif kind == "on_tool_end" and event["run_id"] in tool_runs:
+            tool_runs.discard(event["run_id"])
+            output = event["data"].get("output")
+            yield _event({
+                "type": "tool_end",
+                "agent": agent,
+                "tool": event["name"],
+                "content": output.content if isinstance(output, ToolMessage) else output
+            })
+
+
+async def _graph_events(inputs, config, thread_id, stream_tokens):
+    try:
+        if stream_tokens:
+            async for line in _token_events(inputs, config):
+                yield line
+        else:
+            # Use astream to get updates from the graph
+            async for event in app_graph.astream(inputs, config=config):
+                for node, output in event.items():
+                    for line in _update_events(node, output):
+                        yield line
+
+        # After stream ends, check if we are interrupted
+        final_state = app_graph.get_state(config)
+        if final_state.next:
+            # Graph paused (e.g. interrupt_before)
+            yield _event({"type": "approval_required", "thread_id": thread_id})
+        else:
+            yield _event({"type": "final"})
+
+    except Exception as e:
+        yield _event({"type": "message", "agent": "System", "content": f"Error: {str(e)}"})
+        yield _event({"type": "final"})
 
 
 @app.get("/")
@@ -43,15 +239,43 @@ def read_root():
     return {"message": "Infrastructure Agent Manager is Running"}
 
 
+@app.get("/metrics")
+def read_metrics():
+    """Exposes in-process performance counters (client pools, caches)."""
+    return {
+        "llm_clients": get_llm_client_stats(),
+        "llm_response_cache": get_response_cache_stats(),
+        "singleflight": get_singleflight_stats(),
+        "supervisor_router": fast_router.stats(),
+        "context_compaction": context_compactor.stats(),
+        "http": async_http.stats(),
+        "http_sync": sync_http.stats(),
+        "checkpointer": get_checkpointer_stats(checkpointer),
+        "k8s_clients": get_k8s_client_stats(),
+        "k8s_cache": get_k8s_cache_stats(),
+        "gcp_credentials": get_gcp_credential_stats(),
+        "gcp_inventory": get_gcp_inventory_stats(),
+        "github_cache": get_github_cache_stats(),
+        "log_follow": get_log_follow_stats(),
+    }
+
+
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     """
     Streamed Endpoint to interact with the Agent Graph.
     Returns a stream of JSON events:
     - {"type": "activity", "agent": "AgentName"}
+    - {"type": "token", "agent": "AgentName", "content": "partial text"}
+    - {"type": "tool_start", "agent": "AgentName", "tool": "...", "args": {...}}
+    - {"type": "tool_end", "agent": "AgentName", "tool": "...", "content": "..."}
+    - {"type": "tool_call", "agent": "AgentName", "tool": "...", "args": {...}}
+    - {"type": "tool_output", "agent": "AgentName", "tool": "...", "content": "..."}
     - {"type": "message", "agent": "AgentName", "content": "..."}
     - {"type": "approval_required", "thread_id": "..."}
     - {"type": "final"}
+    `token`, `tool_start` and `tool_end` are only sent when `stream_tokens` is
+    true (the default); the complete `message` follows once the node finishes.
     """
     thread_id = request.thread_id or str(uuid.uuid4())
     config = {"configurable": {"thread_id": thread_id}}
@@ -72,76 +296,16 @@ async def chat_endpoint(request: ChatRequest):
     messages.append(HumanMessage(content=request.message))
     inputs = {"messages": messages}
 
-    async def event_stream():
-        try:
-            # Use astream to get updates from the graph
-            async for event in app_graph.astream(inputs, config=config):
-                for node, output in event.items():
-                    # Check if it's the Supervisor routing
-                    if node == "Supervisor":
-                        next_agent = output.get("next")
-                        if next_agent and next_agent != "FINISH":
-                            yield json.dumps({"type": "activity", "agent": next_agent}) + "\n"
-                        elif next_agent == "FINISH":
-                            # We are done.
-                            yield json.dumps({"type": "final"}) + "\n"
-
-                    # Check if it's a Specialist acting
-                    elif "_Specialist" in node:
-                        # output usually contains "messages"
-                        msgs = output.get("messages", [])
-                        if msgs:
-                            if not isinstance(msgs, list):
-                                msgs = [msgs]
-
-                            for msg in msgs:
-                                # Check for tool calls (Request)
-                                if hasattr(
-                                        msg, 'tool_calls') and msg.tool_calls:
-                                    for tool_call in msg.tool_calls:
-                                        yield json.dumps({
-                                            "type": "tool_call",
-                                            "agent": node,
-                                            "tool": tool_call.get('name', 'unknown'),
-                                            "args": tool_call.get('args', {})
-                                        }) + "\n"
-
-                                # Check for tool outputs (Result)
-                                if isinstance(msg, ToolMessage):
-                                    yield json.dumps({
-                                        "type": "tool_output",
-                                        "agent": node,
-                                        "tool": msg.name or "unknown",
-                                        "content": msg.content
-                                    }) + "\n"
-
-                                if msg.content and not isinstance(
-                                        msg, ToolMessage):
-                                    yield json.dumps({
-                                        "type": "message",
-                                        "agent": node,
-                                        "content": msg.content
-                                    }) + "\n"
-
-            # After stream ends, check if we are interrupted
-            final_state = app_graph.get_state(config)
-            if final_state.next:
-                # Graph paused (e.g. interrupt_before)
-                yield json.dumps({"type": "approval_required", "thread_id": thread_id}) + "\n"
-            else:
-                yield json.dumps({"type": "final"}) + "\n"
-
-        except Exception as e:
-            yield json.dumps({"type": "message", "agent": "System", "content": f"Error: {str(e)}"}) + "\n"
-            yield json.dumps({"type": "final"}) + "\n"
-
-    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+    return StreamingResponse(
+        _graph_events(inputs, config, thread_id, request.stream_tokens),
+        media_type="application/x-ndjson")
 
 
 @app.post("/chat/resume")
 async def resume_chat(request: ResumeRequest):
     """
     Resumes a paused graph execution (e.g. after approval).
+    Streams the same events as /chat.
     """
     config = {"configurable": {"thread_id": request.thread_id}}
 
@@ -156,61 +320,106 @@ async def resume_chat(request: ResumeRequest):
 
     # Resume execution (with None input, as we just want to continue from
     # where we left off)
+    return StreamingResponse(
+        _graph_events(None, config, request.thread_id, request.stream_tokens),
+        media_type="application/x-ndjson")
 
-    async def event_stream():
-        try:
-            # Resume with None as input
-            async for event in app_graph.astream(None, config=config):
-                for node, output in event.items():
-                    if node == "Supervisor":
-                        next_agent = output.get("next")
-                        if next_agent and next_agent != "FINISH":
-                            yield json.dumps({"type": "activity", "agent": next_agent}) + "\n"
-                        elif next_agent == "FINISH":
-                            yield json.dumps({"type": "final"}) + "\n"
-
-                    elif "_Specialist" in node:
-                        msgs = output.get("messages", [])
-                        if msgs:
-                            if not isinstance(msgs, list):
-                                msgs = [msgs]
-                            for msg in msgs:
-                                if hasattr(
-                                        msg, 'tool_calls') and msg.tool_calls:
-                                    for tool_call in msg.tool_calls:
-                                        yield json.dumps({
-                                            "type": "tool_call",
-                                            "agent": node,
-                                            "tool": tool_call.get('name', 'unknown'),
-                                            "args": tool_call.get('args', {})
-                                        }) + "\n"
-                                if isinstance(msg, ToolMessage):
-                                    yield json.dumps({
-                                        "type": "tool_output",
-                                        "agent": node,
-                                        "tool": msg.name or "unknown",
-                                        "content": msg.content
-                                    }) + "\n"
-                                if msg.content and not isinstance(
-                                        msg, ToolMessage):
-                                    yield json.dumps({
-                                        "type": "message",
-                                        "agent": node,
-                                        "content": msg.content
-                                    }) + "\n"
-
-            # Check if finished
-            final_state = app_graph.get_state(config)
-            if final_state.next:
-                yield json.dumps({"type": "approval_required", "thread_id": request.thread_id}) + "\n"
-            else:
-                yield json.dumps({"type": "final"}) + "\n"
+# How often /logs/stream checks the pod buffers for new lines, and how long
+# it may stay silent before sending a heartbeat (keeps proxies from closing it).
+LOG_POLL_SECONDS = 0.5
+LOG_HEARTBEAT_SECONDS = 15
 
-        except Exception as e:
-            yield json.dumps({"type": "message", "agent": "System", "content": f"Error: {str(e)}"}) + "\n"
-            yield json.dumps({"type": "final"}) + "\n"
 
-    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+async def _start_followers(names, namespace, container, context):
+    async def start(name):
+        try:
+            return name, await asyncio.to_thread(follow_pod, name, namespace, container, context), None
+        except Exception as e:
+            return name, None, str(e)
+    return await asyncio.gather(*(start(name) for name in names))
+
+
+async def _log_events(started, log_filter, since, tail, duration):
+    cursors = {}
+    for name, follower, error in started:
+        if error:
+            yield {"type": "error", "pod": name, "content": f"Error following logs: {error}"}
+            continue
+        backlog, cursors[name] = follower.query(log_filter, since, tail)
+        for line in backlog:
+            yield {"type": "log", **line.to_dict()}
+
+    followers = [(name, follower) for name, follower, error in started if not error]
+    # An attached stream keeps its followers from being reaped while it reads.
+    for _, follower in followers:
+        follower.attach()
+    try:
+        deadline = time.monotonic() + duration if duration else None
+        quiet_since = time.monotonic()
+        while followers and (deadline is None or time.monotonic() < deadline):
+            await asyncio.sleep(LOG_POLL_SECONDS)
+            for name, follower in list(followers):
+                stopped = follower.stopped
+                lines, dropped, cursors[name] = follower.since_seq(cursors[name], log_filter)
+                if dropped:
+                    yield {"type": "gap", "pod": name, "dropped": dropped}
+                for line in lines:
+                    quiet_since = time.monotonic()
+                    yield {"type": "log", **line.to_dict()}
+                if stopped:
+                    # No more lines will arrive (e.g. the pod was deleted).
+                    followers.remove((name, follower))
+                    follower.detach()
+                    yield {"type": "error", "pod": name,
+                           "content": f"Stopped following logs: {follower.last_error or 'follower stopped'}"}
+            if time.monotonic() - quiet_since >= LOG_HEARTBEAT_SECONDS:
+                quiet_since = time.monotonic()
+                yield {"type": "heartbeat"}
+        yield {"type": "final"}
+    finally:
+        for _, follower in followers:
+            follower.detach()
+
+
+async def _encoded(events, sse: bool):
+    async for payload in events:
+        yield f"data: {json.dumps(payload, default=str)}\n\n" if sse else _event(payload)
+
+
+@app.get("/logs/stream")
+async def stream_logs(pods: str, namespace: str = "default", pattern: str = "", level: str = "",
+                      since: str = "", tail: int = 50, container: str = "", context: str = "",
+                      format: str = "ndjson", duration: float = 0):
+    """
+    Follows the logs of one or more pods (comma-separated `pods`) live.
+    Each pod is read over one shared connection into a bounded buffer, which
+    the `follow_pod_logs` tool reads too. Filters are applied server-side:
+    `pattern` (regex), `level` (minimum, e.g. "WARN") and, for the initial
+    `tail` lines per pod, `since` ("10m" or an RFC 3339 timestamp).
+    `format` is "ndjson" (default) or "sse"; `duration` > 0 ends the stream
+    after that many seconds. Events:
+    - {"type": "log", "pod": "...", "ts": "...", "level": "ERROR", "line": "..."}
+    - {"type": "gap", "pod": "...", "dropped": N} (reader fell behind the buffer)
+    - {"type": "error", "pod": "...", "content": "..."} (could not start, or stopped following)
+    - {"type": "heartbeat"}
+    - {"type": "final"}
+    """
+    names = [p.strip() for p in pods.split(",") if p.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="no pod names given")
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    try:
+        log_filter = LogFilter(pattern, level)
+        since_epoch = parse_since(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    started = await _start_followers(names, namespace, container, context)
+    events = _log_events(started, log_filter, since_epoch, tail, duration)
+    return StreamingResponse(
+        _encoded(events, format == "sse"),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson")
 
 if __name__ == "__main__":
     import uvicorn
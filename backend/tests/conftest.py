@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+import pytest
+
+# Keep graph checkpoints out of the working tree and isolated per test run.
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(tempfile.mkdtemp(prefix="checkpoints-"), "checkpoints.db"))
+os.environ.setdefault("GITHUB_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="github-cache-"), "github_cache.db"))
+# Tools LIST live under the tests' mocked clients; no background informers.
+os.environ.setdefault("K8S_WATCH_CACHE", "false")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_k8s_clients():
+    # Tests patch kubeconfig loading; never let a client built under one
+    # test's mocks leak into the next.
+    from app.k8s import k8s_clients
+    k8s_clients.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _fresh_gcp_credentials():
+    # Same for cached GCP credentials and SDK clients built from mocked modules.
+    from app.gcp import gcp_credentials
+    from app.gcp_inventory import inventory_cache
+    gcp_credentials.set_source(None)
+    inventory_cache.clear()
+    yield
+    gcp_credentials.clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_github_cache():
+    from app.github import github_cache
+    github_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _fresh_log_followers():
+    # Followers run background threads against mocked clients; stop them.
+    from app.log_follow import log_followers
+    log_followers.stop()
+    yield
+    log_followers.stop()
@@ -7,7 +7,7 @@ from app.tools.real import list_recent_commits, create_issue
 
 
 @patch.dict(os.environ, {"GITHUB_TOKEN": "fake_token"}, clear=True)
-@patch('app.tools.real.requests.get')
+@patch('app.github.request')
 def test_list_recent_commits_success(mock_get):
     mock_get.return_value.status_code = 200
     mock_get.return_value.json.return_value = [{
@@ -21,10 +21,11 @@ def test_list_recent_commits_success(mock_get):
     result = list_recent_commits.invoke({"owner": "my-org", "repo": "test"})
     assert "Fix bug" in result
     assert "1234567" in result
+    assert mock_get.call_args.args[:2] == ("github", "GET")
 
 
 @patch.dict(os.environ, {"GITHUB_TOKEN": "fake_token"}, clear=True)
-@patch('app.tools.code.requests.get')
+@patch('app.github.request')
 def test_read_repo_file_success(mock_get):
     mock_get.return_value.status_code = 200
     encoded_content = base64.b64encode(b"Hello World").decode("utf-8")
@@ -40,7 +41,7 @@ def test_read_repo_file_success(mock_get):
              "JIRA_USER": "user",
              "JIRA_API_TOKEN": "token"},
             clear=True)
-@patch('app.tools.real.requests.post')
+@patch('app.tools.real.request')
 def test_create_issue_success(mock_post):
     mock_post.return_value.status_code = 201
     mock_post.return_value.json.return_value = {"key": "SRE-123"}
@@ -53,3 +54,4 @@ def test_create_issue_success(mock_post):
         "system": "Jira"
     })
     assert "SRE-123" in result
+    assert mock_post.call_args.args[:3] == ("jira", "POST", "http://jira/rest/api/2/issue")
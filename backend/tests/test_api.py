@@ -34,7 +34,7 @@ def test_chat_endpoint_stream(mock_astream, mock_get_state):
 
     mock_astream.side_effect = mock_generator
 
-    response = client.post("/chat", json={"message": "Hello", "history": []})
+    response = client.post("/chat", json={"message": "Hello", "history": [], "stream_tokens": False})
     assert response.status_code == 200
 
     # Read the stream lines
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+import app.tools as tools
+from app.http import AsyncHTTP, concurrency_for, offload_tool
+from app.singleflight import singleflight
+from app.tools.azion import check_azion_status
+
+
+def _json_response(payload, status=200):
+    return httpx.Response(status, json=payload, request=httpx.Request("GET", "https://example.test"))
+
+
+def test_concurrency_limits_are_per_upstream_and_overridable():
+    assert concurrency_for("azion") == 4
+    assert concurrency_for("unknown-upstream") == concurrency_for("default")
+    with patch.dict(os.environ, {"HTTP_MAX_CONCURRENCY_GITHUB": "2"}):
+        assert concurrency_for("github") == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_upstream_is_capped_without_starving_others():
+    http = AsyncHTTP()
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "slow"
+
+    async def fast():
+        return "fast"
+
+    with patch.dict(os.environ, {"HTTP_MAX_CONCURRENCY_SLOWAPI": "2"}):
+        stuck = [asyncio.create_task(http._bounded("slowapi", slow)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        # Another upstream still gets through while slowapi is saturated.
+        assert await asyncio.wait_for(http._bounded("github", fast), 1) == "fast"
+        assert http.stats()["slowapi"]["in_flight"] == 2
+        release.set()
+        assert await asyncio.gather(*stuck) == ["slow"] * 5
+
+    stats = http.stats()["slowapi"]
+    assert stats["max_in_flight"] == 2
+    assert stats["requests"] == 5
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_variant_uses_shared_client_not_requests():
+    mock_arequest = MagicMock(side_effect=lambda *a, **k: asyncio.sleep(0, _json_response({"count": 3})))
+
+    with patch.dict(os.environ, {"AZION_TOKEN": "t"}), \
+            patch("app.tools.azion.arequest", mock_arequest), \
+            patch("app.tools.azion.request") as mock_get:
+        result = await check_azion_status.ainvoke({})
+
+    assert "3 edge applications found" in result
+    mock_get.assert_not_called()
+    assert mock_arequest.call_args.args[:2] == ("azion", "GET")
+
+
+def test_sync_invoke_keeps_requests_path():
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"count": 1}
+    with patch.dict(os.environ, {"AZION_TOKEN": "t"}), \
+            patch("app.tools.azion.request", return_value=response) as mock_get:
+        assert "1 edge applications found" in check_azion_status.invoke({})
+    mock_get.assert_called_once()
+    assert mock_get.call_args.args[:2] == ("azion", "GET")
+
+
+@pytest.mark.asyncio
+async def test_sdk_tools_are_offloaded_off_the_event_loop():
+    pods = tools.list_k8s_pods
+    assert getattr(pods.coroutine, "__offloaded__", False)
+
+    def blocking_list(namespace="default", **kwargs):
+        time.sleep(0.2)
+        return f"pods in {namespace}"
+
+    with patch.object(pods, "func", blocking_list):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        result = await pods.ainvoke({"namespace": "payments"})
+        t.cancel()
+
+    assert result == "pods in payments"
+    assert ticks >= 3  # the loop kept running while the SDK call blocked
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_tool_calls_are_coalesced():
+    calls = []
+
+    async def fake_arequest(*args, **kwargs):
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return _json_response({"count": 7})
+
+    singleflight.reset()
+    with patch.dict(os.environ, {"AZION_TOKEN": "t"}), \
+            patch("app.tools.azion.arequest", fake_arequest):
+        results = await asyncio.gather(*[tools.check_azion_status.ainvoke({}) for _ in range(4)])
+
+    assert len(set(results)) == 1
+    assert len(calls) == 1
+
+
+def test_offload_tool_keeps_native_coroutines():
+    tool = MagicMock()
+    native = object()
+    tool.coroutine = native
+    offload_tool(tool, "gcp")
+    assert tool.coroutine is native
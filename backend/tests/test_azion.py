@@ -10,7 +10,7 @@ from app.tools.azion import (
 
 
 @patch.dict(os.environ, {"AZION_TOKEN": "test_token"})
-@patch("app.tools.azion.requests.get")
+@patch("app.tools.azion.request")
 def test_check_azion_status_success(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -22,7 +22,7 @@ def test_check_azion_status_success(mock_get):
     assert "Azion Edge CDN is Active" in result
     assert "5 edge applications found" in result
     mock_get.assert_called_once_with(
-        "https://api.azionapi.net/edge_applications",
+        "azion", "GET", "https://api.azionapi.net/edge_applications",
         headers={
             "Authorization": "Token test_token",
             "Accept": "application/json; version=3",
@@ -37,7 +37,7 @@ def test_check_azion_status_missing_token():
 
 
 @patch.dict(os.environ, {"AZION_TOKEN": "test_token"})
-@patch("app.tools.azion.requests.get")
+@patch("app.tools.azion.request")
 def test_list_edge_applications_success(mock_get):
     mock_resp = MagicMock()
     mock_resp.status_code = 200
@@ -50,7 +50,7 @@ def test_list_edge_applications_success(mock_get):
 
 
 @patch.dict(os.environ, {"AZION_TOKEN": "test_token"})
-@patch("app.tools.azion.requests.post")
+@patch("app.tools.azion.request")
 def test_purge_azion_cache_success(mock_post):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -61,7 +61,7 @@ def test_purge_azion_cache_success(mock_post):
 
     assert "Successfully purged cache for 2 URL(s)" in result
     mock_post.assert_called_once_with(
-        "https://api.azionapi.net/purge/url",
+        "azion", "POST", "https://api.azionapi.net/purge/url",
         json={
             "urls": [
                 "http://example.com/1",
@@ -87,7 +87,7 @@ def test_purge_azion_cache_no_urls():
 
 
 @patch.dict(os.environ, {"AZION_TOKEN": "test_token"})
-@patch("app.tools.azion.requests.post")
+@patch("app.tools.azion.request")
 def test_get_azion_metrics_success(mock_post):
     mock_resp = MagicMock()
     mock_resp.status_code = 200
@@ -171,7 +171,7 @@ class TestBestOf2026Features(unittest.TestCase):
         mock_llm.invoke.assert_called_once()
 
     @patch.dict('os.environ', {'PAGERDUTY_TOKEN': 'fake-token'})
-    @patch('app.tools.real.requests.get')
+    @patch('app.tools.real.request')
     def test_check_on_call_schedule_mock(self, mock_get):
         """
         Verifies check_on_call_schedule returns the expected mock structure.
@@ -0,0 +1,112 @@
+import operator
+import time
+from typing import Annotated, TypedDict
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+import app.graph as graph
+from app.checkpoint import SQLiteCheckpointer, get_checkpointer
+
+
+class CounterState(TypedDict):
+    steps: Annotated[list, operator.add]
+
+
+def _counter_graph(saver):
+    g = StateGraph(CounterState)
+    g.add_node("step", lambda state: {"steps": [len(state["steps"])]})
+    g.add_edge(START, "step")
+    g.add_edge("step", END)
+    return g.compile(checkpointer=saver)
+
+
+def _compile(saver):
+    return graph.workflow.compile(
+        checkpointer=saver, interrupt_before=["Automation_Specialist", "Chaos_Specialist"])
+
+
+@pytest.mark.asyncio
+async def test_pending_approval_survives_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    config = {"configurable": {"thread_id": "approval-thread"}}
+    not_confident = {"agent": None, "confidence": 0.0, "method": "keywords", "confident": False}
+
+    with patch.object(graph.fast_router, "classify", return_value=not_confident), \
+            patch.object(graph, "_llm_route", side_effect=[{"next": "Automation_Specialist"}, {"next": "FINISH"}]):
+        first = _compile(SQLiteCheckpointer(path))
+        async for _ in first.astream({"messages": [HumanMessage(content="run the cleanup runbook")]}, config):
+            pass
+        assert first.get_state(config).next == ("Automation_Specialist",)
+
+        # A new process (or another worker) opening the same file sees the pause.
+        restarted = _compile(SQLiteCheckpointer(path))
+        assert restarted.get_state(config).next == ("Automation_Specialist",)
+        restarted.update_state(config, {"messages": [AIMessage(content="Runbook executed")]},
+                               as_node="Automation_Specialist")
+        async for _ in restarted.astream(None, config):
+            pass
+
+    final = restarted.get_state(config)
+    assert final.next == ()
+    assert final.values["messages"][-1].content == "Runbook executed"
+
+
+def test_latest_checkpoint_is_read_from_disk_across_workers(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    config = {"configurable": {"thread_id": "shared"}}
+    worker_a = _counter_graph(SQLiteCheckpointer(path))
+    worker_b = _counter_graph(SQLiteCheckpointer(path))
+
+    worker_a.invoke({"steps": []}, config)
+    assert worker_b.get_state(config).values["steps"] == [0]  # B caches this checkpoint
+    worker_a.invoke({"steps": []}, config)
+    assert worker_b.get_state(config).values["steps"] == [0, 1]
+
+
+def test_old_checkpoints_are_compacted(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.db"), keep_last=3)
+    app = _counter_graph(saver)
+    config = {"configurable": {"thread_id": "busy"}}
+    for _ in range(6):
+        app.invoke({"steps": []}, config)
+
+    assert len(list(saver.list(config))) == 3
+    assert app.get_state(config).values["steps"] == [0, 1, 2, 3, 4, 5]
+    assert saver.stats()["compacted"] > 0
+
+
+def test_idle_threads_expire_after_ttl(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.db"), ttl=60)
+    app = _counter_graph(saver)
+    app.invoke({"steps": []}, {"configurable": {"thread_id": "old"}})
+
+    with patch("app.checkpoint.time.time", return_value=time.time() + 120):
+        app.invoke({"steps": []}, {"configurable": {"thread_id": "fresh"}})
+        assert saver.purge_expired() == 1
+
+    assert saver.get_tuple({"configurable": {"thread_id": "old"}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "fresh"}}) is not None
+
+
+def test_hot_cache_respects_memory_cap(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.db"), max_bytes=600)
+    app = _counter_graph(saver)
+    for i in range(10):
+        app.invoke({"steps": []}, {"configurable": {"thread_id": f"t{i}"}})
+
+    stats = saver.stats()
+    assert stats["hot_bytes"] <= 600
+    assert stats["evictions"] > 0
+    # Evicted states are still served from disk.
+    assert app.get_state({"configurable": {"thread_id": "t0"}}).values["steps"] == [0]
+
+
+def test_backend_is_pluggable():
+    assert isinstance(get_checkpointer("memory"), MemorySaver)
+    assert isinstance(get_checkpointer("langgraph.checkpoint.memory:InMemorySaver"), MemorySaver)
+    with pytest.raises(ValueError):
+        get_checkpointer("redis")
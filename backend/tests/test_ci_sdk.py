@@ -10,8 +10,8 @@ def test_analyze_ci_failure_uses_sdk():
     # Mock environment variables
     with patch.dict("os.environ", {"GITHUB_TOKEN": "fake-token"}):
 
-        # Patch requests.get globally
-        with patch("requests.get") as mock_get:
+        # Patch the shared HTTP helper the tool calls
+        with patch("app.tools.real.request") as mock_get:
 
             # Mock job list response
             mock_jobs_resp = MagicMock()
@@ -23,9 +23,9 @@ def test_analyze_ci_failure_uses_sdk():
             # Mock log response
             mock_log_resp = MagicMock()
             mock_log_resp.status_code = 200
-            mock_log_resp.text = "LONG LOG CONTENT ... ERROR: Something failed."
+            mock_log_resp.iter_lines.return_value = iter(["LONG LOG CONTENT ...", "ERROR: Something failed."])
 
-            # Side effect for requests.get
+            # Side effect for the GitHub GETs (jobs, then logs)
             mock_get.side_effect = [mock_jobs_resp, mock_log_resp]
 
             # Mock Google SDK Client
@@ -46,12 +46,15 @@ def test_analyze_ci_failure_uses_sdk():
                 mock_client.models.generate_content.assert_called_once()
 
                 assert "Gemini found the error" in result
+                assert "First failure: ERROR: Something failed." in result
+                assert mock_get.call_args.kwargs["stream"] is True
+                mock_log_resp.close.assert_called_once()
 
 
 def test_analyze_ci_failure_fallback():
     # Same setup but SDK returns None
     with patch.dict("os.environ", {"GITHUB_TOKEN": "fake-token"}):
-        with patch("requests.get") as mock_get:
+        with patch("app.tools.real.request") as mock_get:
             mock_jobs_resp = MagicMock()
             mock_jobs_resp.status_code = 200
             mock_jobs_resp.json.return_value = {
@@ -59,7 +62,7 @@ def test_analyze_ci_failure_fallback():
             }
             mock_log_resp = MagicMock()
             mock_log_resp.status_code = 200
-            mock_log_resp.text = "Logs..."
+            mock_log_resp.iter_lines.return_value = iter(["Logs..."])
             mock_get.side_effect = [mock_jobs_resp, mock_log_resp]
 
             # Mock SDK as None
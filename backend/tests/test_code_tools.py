@@ -8,18 +8,25 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 
+def _route_to(verbs):
+    """Routes request(upstream, method, url, ...) to verbs.get/post/put(url, ...)."""
+    return lambda upstream, method, *args, **kwargs: getattr(verbs, method.lower())(*args, **kwargs)
+
+
 class TestCodeTools(unittest.TestCase):
 
     @patch("app.tools.code.get_google_sdk_client")
-    @patch("app.tools.code.requests")
+    @patch("app.github.request")
     @patch("app.tools.code.os.getenv")
     def test_generate_code_fix_sdk(
             self,
             mock_getenv,
-            mock_requests,
+            mock_request,
             mock_get_sdk):
         # Setup
         mock_getenv.return_value = "fake_token"
+        mock_requests = MagicMock()
+        mock_request.side_effect = _route_to(mock_requests)
 
         # Mock file fetch
         mock_resp = MagicMock()
@@ -49,10 +56,12 @@ class TestCodeTools(unittest.TestCase):
         mock_model.generate_content.assert_called_once()
         mock_requests.get.assert_called()
 
-    @patch("app.tools.code.requests")
+    @patch("app.tools.code.request")
     @patch("app.tools.code.os.getenv")
-    def test_create_github_pr(self, mock_getenv, mock_requests):
+    def test_create_github_pr(self, mock_getenv, mock_request):
         mock_getenv.return_value = "fake_token"
+        mock_requests = MagicMock()
+        mock_request.side_effect = _route_to(mock_requests)
 
         # Sequence of calls:
         # 1. GET repo (default branch)
@@ -115,6 +124,7 @@ class TestCodeTools(unittest.TestCase):
         self.assertIn("http://pr/1", result)
 
         # Verify calls
+        self.assertTrue(all(c.args[0] == "github" for c in mock_request.call_args_list))
         mock_requests.post.assert_any_call(
             "https://api.github.com/repos/test/repo/git/refs",
             headers=unittest.mock.ANY,
@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock, patch
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.context import ContextCompactor, estimate_tokens
+
+
+def _investigation(hops=6, size=20_000):
+    messages = [HumanMessage(content="Checkout is failing, investigate")]
+    for i in range(hops):
+        messages.append(AIMessage(content="", tool_calls=[
+            {"name": "get_pod_logs", "args": {"pod_name": f"pod-{i}"}, "id": f"call-{i}"}]))
+        body = "INFO request ok\n" * (size // 16) + f"ERROR db connection refused on pod-{i}\n"
+        messages.append(ToolMessage(content=body, tool_call_id=f"call-{i}", name="get_pod_logs"))
+        messages.append(AIMessage(content=f"Pod {i} shows DB errors.", name="K8s_Specialist"))
+    return messages
+
+
+def test_small_histories_pass_through_untouched():
+    compactor = ContextCompactor(budget=1000)
+    messages = [HumanMessage(content="hi"), AIMessage(content="hello")]
+    assert compactor.compact(messages) == messages
+    assert compactor.stats()["compacted"] == 0
+
+
+def test_old_tool_outputs_are_summarized_and_recent_kept_verbatim():
+    compactor = ContextCompactor(budget=8000, keep_recent=3)
+    messages = _investigation()
+    result = compactor.compact(messages)
+
+    assert estimate_tokens(result) <= 8000
+    assert result[-3:] == messages[-3:]
+    assert result[0] == messages[0]
+    summaries = [m for m in result[:-3] if isinstance(m, ToolMessage)]
+    assert summaries and all("Compacted output of tool 'get_pod_logs'" in m.content for m in summaries)
+    # Key error lines survive the summary and pairing with the tool call is kept.
+    assert "connection refused on pod-0" in summaries[0].content
+    assert summaries[0].tool_call_id == "call-0"
+
+
+def test_summaries_are_computed_once():
+    compactor = ContextCompactor(budget=8000, keep_recent=3)
+    messages = _investigation()
+    compactor.compact(messages)
+    misses = compactor.stats()["summary_misses"]
+    compactor.compact(messages + [AIMessage(content="next hop")])
+    stats = compactor.stats()
+    assert stats["summary_misses"] == misses
+    assert stats["summary_hits"] >= misses
+
+
+def test_oldest_turns_dropped_when_summaries_are_not_enough():
+    compactor = ContextCompactor(budget=400, keep_recent=2)
+    messages = _investigation(hops=10)
+    result = compactor.compact(messages)
+
+    assert result[0] == messages[0]
+    assert "earlier messages omitted" in result[1].content
+    assert result[-1] == messages[-1]
+    assert not isinstance(result[2], ToolMessage)
+    assert compactor.stats()["dropped_messages"] > 0
+
+
+def test_verbatim_window_never_starts_on_orphan_tool_result():
+    compactor = ContextCompactor(budget=10, keep_recent=1)
+    messages = _investigation(hops=2)[:-1]  # ends on a ToolMessage
+    result = compactor.compact(messages)
+    assert isinstance(result[-2], AIMessage) and result[-2].tool_calls
+    assert result[-1] == messages[-1]
+
+
+def test_supervisor_sees_compacted_history():
+    from app.graph import supervisor_node
+
+    with patch("app.graph.ChatPromptTemplate") as MockPrompt, \
+            patch("app.context.context_compactor.budget", 2000):
+        prompt = MockPrompt.from_messages.return_value
+        prompt.partial.return_value = prompt
+        chain = MagicMock()
+        chain.invoke.return_value = MagicMock(next_agent="FINISH")
+        prompt.__or__.return_value = chain
+
+        supervisor_node({"messages": _investigation()})
+
+    sent = chain.invoke.call_args[0][0]["messages"]
+    assert estimate_tokens(sent) <= 2000
+
+
+def test_unanswered_tool_results_stay_verbatim():
+    compactor = ContextCompactor(budget=100, keep_recent=2)
+    messages = _investigation(hops=3)[:-1]  # the model has not seen the last result
+    result = compactor.compact(messages)
+    assert result[-1] == messages[-1]
@@ -0,0 +1,14 @@
+from app.env import env_number
+
+
+def test_env_number_parses_and_falls_back(monkeypatch):
+    monkeypatch.setenv("SOME_LIMIT", "12")
+    assert env_number("SOME_LIMIT", 5) == 12
+    assert env_number("SOME_LIMIT", 5.0, float) == 12.0
+
+    monkeypatch.setenv("SOME_LIMIT", "lots")
+    assert env_number("SOME_LIMIT", 5) == 5
+    assert env_number("UNSET_LIMIT", 5) == 5
+
+    monkeypatch.setenv("SOME_LIMIT", "-3")
+    assert env_number("SOME_LIMIT", 5, minimum=1) == 1
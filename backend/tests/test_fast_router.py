@@ -0,0 +1,138 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.router import FastRouter
+
+
+@pytest.mark.parametrize("text, agent", [
+    ("Check the Traefik dashboard", "Traefik_Specialist"),
+    ("Is ArgoCD synced for checkout?", "CICD_Specialist"),
+    ("Purge the Azion cache", "Azion_Specialist"),
+    ("Write the post-mortem for INC-42", "Incident_Specialist"),
+    ("Run the IncidentFox workflow", "IncidentFox_Specialist"),
+    ("My pod is in CrashLoopBackOff", "K8s_Specialist"),
+])
+def test_keyword_rules_route_unambiguous_requests(text, agent):
+    route = FastRouter(log_path="").classify(text)
+    assert route["confident"]
+    assert route["agent"] == agent
+
+
+@pytest.mark.parametrize("text", [
+    "High latency in backend",
+    "System is slow",
+    "Post-mortem for the Traefik outage",  # two domains compete
+    "Execute the restart runbook",  # risky agents always go to the LLM
+    # Generic nouns and symptoms need the SMART TRIAGE rules.
+    "why are my pods slow and the site returning 500s",
+    "investigate the incident with checkout 5xx errors",
+    "show recent commits that might have broken checkout",
+    "check iam permissions after the outage",
+    "kubectl get pods shows timeouts on checkout",
+])
+def test_ambiguous_requests_defer_to_llm(text, monkeypatch):
+    monkeypatch.setenv("ROUTER_EMBEDDINGS", "false")
+    assert not FastRouter(log_path="").classify(text)["confident"]
+
+
+def test_invalid_threshold_falls_back_to_default(monkeypatch):
+    monkeypatch.setenv("ROUTER_CONFIDENCE_THRESHOLD", "high")
+    assert FastRouter(log_path="").threshold == 0.8
+
+
+def test_symptoms_defer_confident_embeddings_to_llm():
+    router = FastRouter(
+        rules={},
+        examples=[("pods are slow", "K8s_Specialist")],
+        embed_fn=lambda texts: [[1.0, 0.0] for _ in texts],
+        log_path="")
+
+    route = router.classify("pods are slow")
+    assert route["agent"] == "K8s_Specialist"
+    assert route["symptoms"]
+    assert not route["confident"]
+
+
+def test_embedding_nearest_neighbour():
+    vectors = {
+        "disk full on node": [1.0, 0.0],
+        "bill went up": [0.0, 1.0],
+        "storage exhausted on the worker": [0.98, 0.05],
+    }
+    router = FastRouter(
+        rules={},
+        examples=[("disk full on node", "K8s_Specialist"),
+                  ("bill went up", "FinOps_Specialist")],
+        embed_fn=lambda texts: [vectors[t] for t in texts],
+        log_path="")
+
+    route = router.classify("storage exhausted on the worker")
+    assert route["method"] == "embeddings"
+    assert route["agent"] == "K8s_Specialist"
+    assert route["confident"]
+
+
+def test_default_embedder_is_only_used_once_warmed(monkeypatch):
+    monkeypatch.setenv("ROUTER_EMBEDDINGS", "true")
+    router = FastRouter(rules={}, examples=[("disk full on node", "K8s_Specialist")], log_path="")
+
+    with patch("app.router._default_embed", return_value=[[1.0, 0.0]]) as embed:
+        route = router.classify("disk full on node")
+        assert embed.call_count == 0  # no model load inside a request
+        assert not route["confident"]
+
+        router.warm()
+        assert router.classify("disk full on node")["agent"] == "K8s_Specialist"
+        assert embed.call_count == 2
+
+
+def test_decisions_are_logged_as_jsonl(tmp_path):
+    log = tmp_path / "router.jsonl"
+    router = FastRouter(log_path=str(log))
+    route = router.classify("Check the traefik routes")
+    router.log_decision(route, "Check the traefik routes", source="fast_path")
+    router.log_decision(route, "Check the traefik routes",
+                        source="llm", llm_agent="Traefik_Specialist")
+
+    lines = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [entry["source"] for entry in lines] == ["fast_path", "llm"]
+    assert lines[1]["llm_agent"] == lines[1]["local_agent"]
+    assert router.stats()["agreements"] == 1
+
+
+def test_supervisor_skips_llm_on_fast_path():
+    from app.graph import supervisor_node
+
+    with patch("app.graph.llm") as mock_llm, \
+            patch("app.graph.ChatPromptTemplate") as MockPrompt:
+        result = supervisor_node(
+            {"messages": [HumanMessage(content="Check traefik health")]})
+
+    assert result == {"next": "Traefik_Specialist"}
+    MockPrompt.from_messages.assert_not_called()
+    mock_llm.with_structured_output.assert_not_called()
+
+
+def test_supervisor_follow_up_hops_use_llm():
+    from app.graph import supervisor_node
+
+    class Decision:
+        next_agent = "FINISH"
+        reasoning = "done"
+
+    with patch("app.graph.ChatPromptTemplate") as MockPrompt:
+        prompt = MockPrompt.from_messages.return_value
+        prompt.partial.return_value = prompt
+        chain = MagicMock()
+        chain.invoke.return_value = Decision()
+        prompt.__or__.return_value = chain
+
+        result = supervisor_node({"messages": [
+            HumanMessage(content="Check traefik health"),
+            AIMessage(content="Traefik is healthy.")]})
+
+    assert result["next"] == "FINISH"
+    chain.invoke.assert_called_once()
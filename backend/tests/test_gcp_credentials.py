@@ -0,0 +1,105 @@
+import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from app.gcp import GCPCredentials, gcp_credentials
+from app.tools.real import check_gcp_status, get_gcp_sql_instances, list_compute_instances
+
+
+class FakeCredentials:
+    """Mints numbered tokens valid for `lifetime` seconds."""
+
+    def __init__(self, lifetime=3600, delay=0.0):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.token = None
+        self.expiry = None
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, request):
+        time.sleep(self.delay)
+        with self._lock:
+            self.refreshes += 1
+            self.token = f"token-{self.refreshes}"
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        self.expiry = now + datetime.timedelta(seconds=self.lifetime)
+
+
+def _source(credentials, project="test-project"):
+    calls = []
+
+    def source():
+        calls.append(1)
+        return credentials, project
+    source.calls = calls
+    return source
+
+
+def test_credentials_and_token_are_resolved_once():
+    fake = FakeCredentials()
+    source = _source(fake)
+    cache = GCPCredentials(source)
+
+    assert cache.project_and_headers() == ("test-project", {"Authorization": "Bearer token-1"})
+    assert cache.project_and_headers() == ("test-project", {"Authorization": "Bearer token-1"})
+    assert len(source.calls) == 1 and fake.refreshes == 1
+    assert cache.stats()["hits"] == 1
+    cache.clear()
+
+
+def test_token_near_expiry_is_refreshed_before_use():
+    fake = FakeCredentials(lifetime=60)
+    cache = GCPCredentials(_source(fake))
+    with patch.dict(os.environ, {"GCP_TOKEN_REFRESH_MARGIN": "0"}):
+        assert cache.token() == "token-1"
+    with patch.dict(os.environ, {"GCP_TOKEN_REFRESH_MARGIN": "120"}), \
+            patch.object(GCPCredentials, "_start_refresher"):
+        assert cache.token() == "token-2"
+    cache.clear()
+
+
+def test_background_thread_refreshes_ahead_of_expiry():
+    fake = FakeCredentials(lifetime=1.2)
+    cache = GCPCredentials(_source(fake))
+    with patch.dict(os.environ, {"GCP_TOKEN_REFRESH_MARGIN": "1"}):
+        cache.token()
+        deadline = time.time() + 3
+        while fake.refreshes < 2:
+            assert time.time() < deadline, "no background refresh"
+            time.sleep(0.01)
+        stats = cache.stats()
+        cache.clear()
+
+    assert stats["background_refreshes"] == 1 and stats["refreshes"] == 1
+    assert fake.token == "token-2"
+
+
+def test_parallel_tools_share_one_refresh():
+    # estimate_gcp_cost fans out to both listings at once.
+    fake = FakeCredentials(delay=0.1)
+    gcp_credentials.set_source(_source(fake))
+    ok = MagicMock(status_code=200, **{"json.return_value": {"items": []}})
+    with patch("app.gcp_inventory.request", return_value=ok) as send:
+        with ThreadPoolExecutor(2) as pool:
+            results = list(pool.map(lambda t: t.invoke({}), [list_compute_instances, get_gcp_sql_instances]))
+
+    assert [r.splitlines()[0] for r in results] == [
+        "No instances found in any zone.", "No Cloud SQL instances found."]
+    assert fake.refreshes == 1
+    assert {c.kwargs["headers"]["Authorization"] for c in send.call_args_list} == {"Bearer token-1"}
+
+
+def test_sdk_clients_are_reused():
+    rm = MagicMock()
+    rm.ProjectsClient.return_value.list_projects.return_value = [MagicMock(project_id="p1")]
+    with patch("app.tools.real.resourcemanager_v3", rm):
+        check_gcp_status.invoke({})
+        check_gcp_status.invoke({})
+
+    assert rm.ProjectsClient.call_count == 1
+    assert rm.ProjectsClient.return_value.list_projects.call_count == 2
+    assert gcp_credentials.stats()["clients"] == ["resourcemanager.projects"]
@@ -0,0 +1,91 @@
+import datetime
+from types import SimpleNamespace
+
+from app.gcp_errors import ErrorAggregator
+
+NOW = datetime.datetime(2026, 5, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _entry(minutes_ago, message, resource="cloud_run_revision", log="run.googleapis.com%2Fstderr",
+           severity="ERROR"):
+    return SimpleNamespace(timestamp=NOW - datetime.timedelta(minutes=minutes_ago), payload=message,
+                           resource=SimpleNamespace(type=resource), log_name=f"projects/p/logs/{log}",
+                           severity=severity)
+
+
+def test_groups_by_resource_log_and_fingerprint():
+    agg = ErrorAggregator(60, now=NOW).feed([
+        _entry(5, "user 1234 not found"),
+        _entry(3, "user 98 not found"),
+        _entry(2, {"message": "user 7 not found"}, resource="k8s_container"),
+        _entry(1, "user 5 not found", log="other"),
+    ])
+
+    assert agg.seen == 4
+    keys = sorted(agg.groups)
+    assert keys == [
+        ("cloud_run_revision", "other", "user <*> not found"),
+        ("cloud_run_revision", "run.googleapis.com/stderr", "user <*> not found"),
+        ("k8s_container", "run.googleapis.com/stderr", "user <*> not found"),
+    ]
+    group = agg.groups[("cloud_run_revision", "run.googleapis.com/stderr", "user <*> not found")]
+    assert group.count == 2
+    assert group.first == NOW - datetime.timedelta(minutes=5)
+    assert group.message == "user 98 not found"  # latest sample
+
+
+def test_per_minute_histogram_and_trends():
+    agg = ErrorAggregator(120, now=NOW)
+    assert agg.bins == 120 and agg.bin_seconds == 60
+    for minute in range(1, 121):
+        agg.add(_entry(minute, "steady failure"))
+    for _ in range(50):
+        agg.add(_entry(2, "spike failure"))
+        agg.add(_entry(100, "old failure"))
+    for minute in range(120):
+        agg.add(_entry(minute % 10, "ramping failure"))
+        agg.add(_entry(30 + minute, "ramping failure"))
+
+    trends = {key[2]: agg.trend(group) for key, group in agg.groups.items()}
+    assert trends == {"steady failure": "steady", "spike failure": "new", "old failure": "stopped",
+                      "ramping failure": "rising (7x)"}
+    steady = agg.groups[("cloud_run_revision", "run.googleapis.com/stderr", "steady failure")]
+    assert sum(steady.bins) == 120 and max(steady.bins) == 1
+    assert steady.bins.itemsize == 4
+
+
+def test_long_windows_use_wider_bins():
+    agg = ErrorAggregator(7 * 1440, now=NOW)
+
+    assert agg.bins == 1440
+    assert agg.bin_seconds == 420
+
+
+def test_group_count_is_bounded():
+    agg = ErrorAggregator(60, now=NOW, max_groups=3).feed(
+        _entry(1, f"failure kind {c}") for c in "abcdef")
+
+    assert len(agg.groups) == 3
+    assert agg.untracked == 3
+
+
+def test_table_ranks_severity_then_count_with_sparklines():
+    agg = ErrorAggregator(60, now=NOW).feed(
+        [_entry(m, "db timeout") for m in range(30)] + [_entry(1, "kernel panic", severity="CRITICAL")])
+
+    rows = agg.table(top_k=1).splitlines()
+    assert rows[2].startswith("| 1 | CRITICAL | new | cloud_run_revision | run.googleapis.com/stderr |")
+    assert "█" in rows[2]
+    assert rows[3] == "... 1 more groups (30 entries) not shown"
+
+
+def test_cut_short_scan_judges_only_the_range_read():
+    # Newest first, capped after the last 60 minutes of a one-day window.
+    agg = ErrorAggregator(1440, now=NOW).feed(
+        (_entry(m % 60, "steady failure") for m in range(1000)), max_entries=120)
+
+    assert not agg.complete
+    assert agg.oldest == NOW - datetime.timedelta(minutes=59)
+    group = next(iter(agg.groups.values()))
+    assert agg.trend(group) == "steady"  # not "new": nothing older was read
+    assert " " not in agg.sparkline(group)  # the histogram spans the hour read, not the day
@@ -7,15 +7,20 @@ import datetime
 from app.tools.real import analyze_gcp_errors
 
 
+def _entry(ts, message, resource="gce_instance", log="app", severity="ERROR"):
+    entry = MagicMock()
+    entry.timestamp = ts
+    entry.payload = message
+    entry.resource.type = resource
+    entry.log_name = f"projects/test-project/logs/{log}"
+    entry.severity = severity
+    return entry
+
+
 class TestGCPErrors(unittest.TestCase):
     @patch("app.tools.real.cloud_logging")
-    @patch("app.tools.real.default")
     @patch.dict(os.environ, {"GOOGLE_CLOUD_PROJECT": "test-project"})
-    def test_analyze_gcp_errors_success(
-            self, mock_default, mock_cloud_logging):
-        # Setup mock default auth to return creds and project
-        mock_default.return_value = (MagicMock(), "test-project")
-
+    def test_analyze_gcp_errors_success(self, mock_cloud_logging):
         # Mock Client
         mock_client = MagicMock()
         mock_cloud_logging.Client.return_value = mock_client
@@ -24,11 +29,11 @@ class TestGCPErrors(unittest.TestCase):
         # Mock Entries
         entry1 = MagicMock()
         entry1.timestamp = datetime.datetime.now()
-        entry1.payload = "Error 1 occurred"
+        entry1.payload = "Disk quota exceeded"
 
         entry2 = MagicMock()
         entry2.timestamp = datetime.datetime.now()
-        entry2.payload = {"message": "Error 2 occurred"}
+        entry2.payload = {"message": "Connection refused"}
 
         mock_client.list_entries.return_value = [entry1, entry2]
 
@@ -36,14 +41,78 @@ class TestGCPErrors(unittest.TestCase):
         result = analyze_gcp_errors.invoke({"days": 1})
 
         self.assertIn("Found 2 errors", result)
-        self.assertIn("Error 1 occurred", result)
-        self.assertIn("Error 2 occurred", result)
+        self.assertIn("Disk quota exceeded", result)
+        self.assertIn("Connection refused", result)
 
         # Verify call args
         mock_client.list_entries.assert_called_once()
         call_kwargs = mock_client.list_entries.call_args[1]
         self.assertIn("severity>=ERROR", call_kwargs['filter_'])
 
+    @patch("app.tools.real.cloud_logging")
+    @patch.dict(os.environ, {"GOOGLE_CLOUD_PROJECT": "test-project"})
+    def test_entries_are_grouped_by_fingerprint(self, mock_cloud_logging):
+        mock_client = MagicMock()
+        mock_cloud_logging.Client.return_value = mock_client
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        def entries():
+            # Steady timeouts all day; a burst of OOMs in the last minutes.
+            for i in range(2000):
+                yield _entry(now - datetime.timedelta(minutes=i % 1400),
+                             f"Timeout calling 10.0.{i % 7}.1:443 after {i}ms", "k8s_container", "stderr")
+            for i in range(300):
+                yield _entry(now - datetime.timedelta(minutes=i % 5),
+                             f"Container {i} killed: OOM\nstack...", "k8s_container", "events", "CRITICAL")
+        mock_client.list_entries.return_value = entries()
+
+        result = analyze_gcp_errors.invoke({"days": 1, "extra_filter": 'resource.type="k8s_container"'})
+
+        self.assertIn("Found 2300 errors", result)
+        self.assertIn("in 2 groups", result)
+        lines = result.splitlines()
+        oom = next(line for line in lines if "OOM" in line)
+        timeout = next(line for line in lines if "Timeout calling" in line)
+        self.assertLess(lines.index(oom), lines.index(timeout))  # CRITICAL first
+        self.assertTrue(oom.startswith("| 300 | CRITICAL | new | k8s_container | events |"))
+        self.assertTrue(timeout.startswith("| 2000 | ERROR | steady | k8s_container | stderr |"))
+        call_kwargs = mock_client.list_entries.call_args[1]
+        self.assertIn('AND (resource.type="k8s_container")', call_kwargs["filter_"])
+        self.assertNotIn("max_results", call_kwargs)
+
+    @patch("app.tools.real.cloud_logging")
+    @patch.dict(os.environ, {"GOOGLE_CLOUD_PROJECT": "test-project", "GCP_ERRORS_MAX_ENTRIES": "10"})
+    def test_scan_is_capped(self, mock_cloud_logging):
+        mock_client = MagicMock()
+        mock_cloud_logging.Client.return_value = mock_client
+        now = datetime.datetime.now(datetime.timezone.utc)
+        mock_client.list_entries.return_value = (_entry(now, "boom") for _ in range(100))
+
+        result = analyze_gcp_errors.invoke({"days": 1})
+
+        self.assertIn("Found 10 errors", result)
+        self.assertIn("_Partial: only the newest entries back to", result)
+        self.assertIn("(limit of 10 entries)", result)
+
+    @patch("app.tools.real.cloud_logging")
+    @patch.dict(os.environ, {"GOOGLE_CLOUD_PROJECT": "test-project"})
+    def test_failed_page_returns_partial_table(self, mock_cloud_logging):
+        mock_client = MagicMock()
+        mock_cloud_logging.Client.return_value = mock_client
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        def entries():
+            for i in range(1000):
+                yield _entry(now - datetime.timedelta(seconds=i // 2), f"boom {i}")
+            raise RuntimeError("429 Quota exceeded for ReadRequestsPerMinutePerProject")
+        mock_client.list_entries.return_value = entries()
+
+        result = analyze_gcp_errors.invoke({"days": 1})
+
+        self.assertIn("Found 1000 errors", result)
+        self.assertIn("reading failed: 429 Quota exceeded", result)
+        self.assertIn("| 1000 | ERROR | - |", result)  # 8 minutes read: too few to judge a trend
+
     @patch("app.tools.real.cloud_logging", None)
     def test_analyze_gcp_errors_not_installed(self):
         result = analyze_gcp_errors.invoke({"days": 1})
@@ -0,0 +1,143 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.gcp import gcp_credentials
+from app.gcp_inventory import inventory_cache
+from app.tools.gcp_optimizer import optimize_gcp_resources
+from app.tools.real import check_gcp_status, get_gcp_sql_instances, list_compute_instances
+
+
+class StaticToken:
+    token = "t"
+    expiry = None
+
+
+@pytest.fixture
+def gcp_api():
+    """Serves scripted pages per collection, keyed by URL suffix and page token."""
+    gcp_credentials.set_source(lambda: (StaticToken(), "proj"))
+    pages = {}
+
+    def send(upstream, method, url, params=None, **kwargs):
+        collection = "sql" if "sqladmin" in url else url.rsplit("/", 1)[-1]
+        body = pages.get((collection, (params or {}).get("pageToken")), {})
+        if isinstance(body, Exception):
+            raise body
+        return MagicMock(status_code=200, **{"json.return_value": body})
+
+    with patch("app.gcp_inventory.request", side_effect=send) as api:
+        api.pages = pages
+        yield api
+
+
+def _disks(zone, names, attached=False):
+    return {f"zones/{zone}": {"disks": [
+        {"name": n, "sizeGb": str(10 * (i + 1)), "users": ["vm"] if attached else []} for i, n in enumerate(names)]}}
+
+
+def test_crawl_follows_page_tokens_across_zones(gcp_api):
+    gcp_api.pages.update({
+        ("instances", None): {"items": {
+            "zones/us-central1-a": {"instances": [{"name": "web-1", "status": "RUNNING",
+                                                   "networkInterfaces": [{"networkIP": "10.0.0.2"}]}]},
+            "zones/europe-west1-b": {"warning": {"code": "NO_RESULTS_ON_PAGE"}}},
+            "nextPageToken": "p2"},
+        ("instances", "p2"): {"items": {
+            "zones/europe-west1-b": {"instances": [{"name": "batch-1", "status": "TERMINATED"}]}}},
+    })
+
+    result = list_compute_instances.invoke({})
+
+    assert result.splitlines() == ["web-1 (RUNNING) [us-central1-a] - IP: 10.0.0.2",
+                                   "batch-1 (TERMINATED) [europe-west1-b] - IP: N/A",
+                                   "_Inventory as of 0s ago; pass refresh=true to re-crawl._"]
+    assert list_compute_instances.invoke({"zone": "europe-west1-b"}).startswith("batch-1 (TERMINATED) - IP: N/A\n")
+    params = [c.kwargs["params"] for c in gcp_api.call_args_list if c.args[2].endswith("/instances")]
+    assert params[0]["maxResults"] == 500 and params[0]["returnPartialSuccess"] == "true"
+    assert "pageToken" not in params[0] and params[1]["pageToken"] == "p2"
+
+
+def test_one_crawl_serves_every_tool_until_it_expires(gcp_api):
+    gcp_api.pages[("instances", None)] = {"items": {}}
+    gcp_api.pages[("sql", None)] = {"items": [
+        {"name": "db", "state": "RUNNABLE", "databaseVersion": "POSTGRES_15", "region": "us-central1",
+         "settings": {"tier": "db-custom-2-7680"}}]}
+
+    list_compute_instances.invoke({})
+    assert get_gcp_sql_instances.invoke({}).startswith(
+        "db (RUNNABLE) - POSTGRES_15 - db-custom-2-7680 [us-central1]\n_Inventory as of")
+    optimize_gcp_resources.invoke({})
+    assert gcp_api.call_count == 4  # one page per collection
+    assert inventory_cache.stats()["crawls"] == 1
+
+    with patch.dict("os.environ", {"GCP_INVENTORY_TTL": "0"}):
+        list_compute_instances.invoke({})
+    assert inventory_cache.stats()["crawls"] == 2
+    get_gcp_sql_instances.invoke({"refresh": True})
+    assert inventory_cache.stats()["crawls"] == 3
+
+
+def test_optimizer_counts_every_orphaned_disk(gcp_api):
+    gcp_api.pages.update({
+        ("disks", None): {"items": _disks("us-central1-a", [f"d{i}" for i in range(8)]), "nextPageToken": "x"},
+        ("disks", "x"): {"items": {**_disks("us-east1-b", [f"e{i}" for i in range(6)]),
+                                   **_disks("us-west1-a", ["in-use"], attached=True)}},
+        ("addresses", None): {"items": {"regions/us-central1": {"addresses": [
+            {"name": "old-lb", "address": "34.1.2.3", "status": "RESERVED"},
+            {"name": "live-lb", "address": "34.1.2.4", "status": "IN_USE"}]}}},
+    })
+
+    report = optimize_gcp_resources.invoke({})
+
+    assert report.count("\n- d") + report.count("\n- e") == 10
+    assert report.index("d7 (us-central1-a, 80GB)") < report.index("e5 (us-east1-b, 60GB)")  # largest first
+    assert "d0 " not in report
+    assert "- ... and 4 more (14 total, 570GB in total)" in report
+    assert "old-lb (34.1.2.3, us-central1)" in report and "live-lb" not in report
+    assert "in-use" not in report
+
+
+def test_failed_collection_is_reported_and_cached_briefly(gcp_api):
+    gcp_api.pages[("disks", None)] = RuntimeError("403 Forbidden")
+
+    report = optimize_gcp_resources.invoke({})
+    calls = gcp_api.call_count
+
+    assert "⚠️ Could not fetch disks: 403 Forbidden" in report
+    assert inventory_cache.stats()["partial"] == 1
+    assert inventory_cache.peek().errors == {"disks": "403 Forbidden"}
+
+    # The partial snapshot still answers (and reports the failure) for a minute.
+    assert "⚠️ Could not fetch disks: 403 Forbidden" in optimize_gcp_resources.invoke({})
+    assert gcp_api.call_count == calls
+    with patch("app.gcp_inventory.time.time", return_value=time.time() + 61):
+        optimize_gcp_resources.invoke({})
+    assert gcp_api.call_count > calls
+
+
+def test_unreachable_zones_are_reported(gcp_api):
+    gcp_api.pages[("instances", None)] = {
+        "items": {
+            "zones/us-central1-a": {"instances": [{"name": "web-1", "status": "RUNNING"}]},
+            "zones/us-east1-b": {"warning": {"code": "NO_RESULTS_ON_PAGE", "message": "no results"}},
+            "zones/asia-east1-a": {"warning": {"code": "UNREACHABLE", "message": "zone unavailable"}}},
+        "unreachables": ["zones/europe-west4-c"]}
+
+    result = list_compute_instances.invoke({})
+
+    assert result.startswith("web-1 (RUNNING) [us-central1-a] - IP: N/A\n")
+    assert "⚠️ Incomplete (instances: europe-west4-c: unreachable; asia-east1-a: zone unavailable)" in result
+    assert "us-east1-b" not in result
+    assert inventory_cache.stats()["partial"] == 1
+
+
+def test_status_reports_a_recent_inventory_without_crawling(gcp_api):
+    rm = MagicMock()
+    rm.ProjectsClient.return_value.list_projects.return_value = [MagicMock(project_id="proj")]
+    with patch("app.tools.real.resourcemanager_v3", rm):
+        assert "Inventory" not in check_gcp_status.invoke({})
+        assert gcp_api.call_count == 0
+        list_compute_instances.invoke({})
+        assert "Inventory (proj, 0s old): 0 VMs (0 running) in 0 zones" in check_gcp_status.invoke({})
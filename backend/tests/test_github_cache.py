@@ -0,0 +1,114 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+import requests
+
+from app.github import GitHubCache, github_cache
+from app.tools.real import get_pr_status
+
+URL = "https://api.github.com/repos/o/r/pulls/7"
+PR = {"title": "Fix leak", "state": "open", "user": {"login": "dev"}, "labels": []}
+
+
+def _response(status, body=None, **headers):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update({k.replace("_", "-"): v for k, v in headers.items()})
+    response._content = json.dumps(body).encode() if body is not None else b""
+    return response
+
+
+def test_unchanged_resources_are_revalidated_not_refetched(tmp_path):
+    cache = GitHubCache(str(tmp_path / "gh.db"))
+    with patch("app.github.request", side_effect=[
+            _response(200, PR, ETag='"v1"', X_RateLimit_Remaining="4999", X_RateLimit_Reset="9999999999"),
+            _response(304, ETag='"v1"')]) as send:
+        first = cache.get(URL, {"Authorization": "token t"})
+        second = cache.get(URL, {"Authorization": "token t"})
+
+    assert first.json() == second.json() == PR
+    assert "If-None-Match" not in send.call_args_list[0].kwargs["headers"]
+    assert send.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_ratio"] == 0.5
+    assert stats["rate_limit"]["remaining"] == 4999
+
+    # The cache is on disk: a restarted process still revalidates.
+    restarted = GitHubCache(str(tmp_path / "gh.db"))
+    with patch("app.github.request", return_value=_response(304)) as send:
+        assert restarted.get(URL, {"Authorization": "token t"}).json() == PR
+    assert send.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+
+def test_entries_are_scoped_to_the_token(tmp_path):
+    cache = GitHubCache(str(tmp_path / "gh.db"))
+    with patch("app.github.request", return_value=_response(200, PR, ETag='"v1"')) as send:
+        cache.get(URL, {"Authorization": "token a"})
+        cache.get(URL, {"Authorization": "token b"})
+    assert "If-None-Match" not in send.call_args.kwargs["headers"]
+
+
+def test_calls_slow_down_as_the_budget_runs_out(tmp_path):
+    cache = GitHubCache(str(tmp_path / "gh.db"))
+    reset = str(time.time() + 100)
+    with patch.dict(os.environ, {"GITHUB_RATELIMIT_RESERVE": "50"}), \
+            patch("app.github.request", return_value=_response(
+                200, PR, ETag='"v1"', X_RateLimit_Remaining="20", X_RateLimit_Reset=reset)), \
+            patch("app.github.time.sleep") as sleep:
+        cache.get(URL)
+        cache.get(URL)
+
+    sleep.assert_called_once()
+    assert 4 < sleep.call_args.args[0] <= 5  # ~100s / 20 calls, capped
+    assert cache.stats()["throttled"] == 1
+
+
+def test_cached_answer_is_served_while_rate_limited(tmp_path):
+    cache = GitHubCache(str(tmp_path / "gh.db"))
+    reset = str(time.time() + 600)
+    with patch("app.github.request", side_effect=[
+            _response(200, PR, ETag='"v1"', X_RateLimit_Remaining="0", X_RateLimit_Reset=reset)]) as send, \
+            patch("app.github.time.sleep"):
+        cache.get(URL)
+        assert cache.get(URL).json() == PR
+
+    assert send.call_count == 1
+    assert cache.stats()["stale_served"] == 1
+
+
+def test_old_entries_expire_and_the_table_is_bounded(tmp_path):
+    cache = GitHubCache(str(tmp_path / "gh.db"), ttl=3600, max_rows=1)
+    with patch("app.github.request", side_effect=lambda *a, **kw: _response(200, PR, ETag='"v1"')):
+        for n in range(3):
+            cache.get(f"{URL}{n}")
+    for n, age in enumerate([60, 30, 7200]):
+        cache._conn.execute("UPDATE github_responses SET stored_at = ? WHERE url = ?",
+                            (time.time() - age, f"{URL}{n}"))
+
+    # Past the TTL a row is not revalidated against, and purging drops it.
+    with patch("app.github.request", return_value=_response(200, PR)) as send:
+        cache.get(f"{URL}2")
+    assert "If-None-Match" not in send.call_args.kwargs["headers"]
+
+    assert cache.purge_expired() == 2  # the expired row, then the oldest beyond max_rows
+    assert cache._conn.execute("SELECT url FROM github_responses").fetchall() == [(f"{URL}1",)]
+    assert cache.stats()["purged"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_tool_revalidates_through_the_shared_cache():
+    request = httpx.Request("GET", URL)
+    replies = [httpx.Response(200, json=PR, headers={"ETag": '"v1"'}, request=request),
+               httpx.Response(304, request=request)]
+    with patch.dict(os.environ, {"GITHUB_TOKEN": "t"}), \
+            patch("app.github.arequest", side_effect=replies) as send:
+        first = await get_pr_status.ainvoke({"owner": "o", "repo": "r", "pr_id": 7})
+        second = await get_pr_status.ainvoke({"owner": "o", "repo": "r", "pr_id": 7})
+
+    assert first == second and "Fix leak" in second
+    assert send.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert github_cache.stats()["hits"] == 1
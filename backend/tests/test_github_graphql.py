@@ -0,0 +1,89 @@
+import os
+import re
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from app.tools.real import REPO_STATUS_NODES, _parse_repos, _repo_chunks, get_multi_repo_status
+
+
+def _repo(name, runs=(("CI", "SUCCESS"),), prs=0):
+    return {
+        "nameWithOwner": f"my-org/{name}",
+        "defaultBranchRef": {"target": {
+            "history": {"totalCount": 3, "nodes": [{"abbreviatedOid": "abc1234", "messageHeadline": "Bump deps",
+                                                     "committedDate": "2026-05-01T10:00:00Z",
+                                                     "author": {"name": "dev"}}]},
+            "checkSuites": {"nodes": [{"conclusion": c, "status": "COMPLETED",
+                                       "workflowRun": {"workflow": {"name": w}}} for w, c in runs]
+                            + [{"conclusion": "SUCCESS", "status": "COMPLETED", "workflowRun": None}]},
+        }},
+        "pullRequests": {"totalCount": prs, "nodes": [
+            {"number": 10 + i, "title": f"Change {i}", "isDraft": i == 1, "reviewDecision": "APPROVED"}
+            for i in range(prs)]},
+    }
+
+
+def _graphql_reply(query_repos, missing=()):
+    data = {"rateLimit": {"cost": 1, "remaining": 4990}}
+    for i, (_, name) in enumerate(query_repos):
+        data[f"r{i}"] = None if name in missing else _repo(name)
+    return {"data": data}
+
+
+def test_repos_are_parsed_and_chunked_by_node_budget():
+    pairs = _parse_repos("svc-a, other/svc-b,\nsvc-a", "my-org")
+    assert pairs == [("my-org", "svc-a"), ("other", "svc-b")]
+
+    many = [("my-org", f"svc-{i}") for i in range(40)]
+    assert len(_repo_chunks(many)) == 1  # the default budget fits 40 services
+    with patch.dict(os.environ, {"GITHUB_GRAPHQL_NODE_BUDGET": str(REPO_STATUS_NODES * 15)}):
+        assert [len(c) for c in _repo_chunks(many)] == [15, 15, 10]
+
+
+def test_forty_repos_take_one_round_trip():
+    names = [f"svc-{i}" for i in range(40)]
+    reply = MagicMock(status_code=200, **{"json.return_value": _graphql_reply(
+        [("my-org", n) for n in names], missing={"svc-7"})})
+
+    with patch.dict(os.environ, {"GITHUB_TOKEN": "t"}), \
+            patch("app.github.request", return_value=reply) as send:
+        result = get_multi_repo_status.invoke({"repos": ", ".join(names), "hours": 6})
+
+    send.assert_called_once()
+    assert send.call_args.args[:3] == ("github", "POST", "https://api.github.com/graphql")
+    body = send.call_args.kwargs["json"]
+    assert 'r39: repository(owner: "my-org", name: "svc-39")' in body["query"]
+    assert body["variables"]["commits"] == 5
+    assert result.startswith("### Status of 40 repositories (last 6h)")
+    assert ("- **my-org/svc-0**: 3 commits (latest abc1234 dev: Bump deps @ 2026-05-01T10:00:00Z) "
+            "| CI 🟢 CI: success | no open PRs") in result
+    assert "- **my-org/svc-7**: not found or no access" in result
+    assert result.endswith("_(1 GraphQL queries, cost 1, 4990 points left)_")
+
+
+@pytest.mark.asyncio
+async def test_async_chunks_are_sent_concurrently():
+    async def reply(upstream, method, url, json=None, **kwargs):
+        pairs = [("my-org", name) for name in re.findall(r'name: "([^"]+)"', json["query"])]
+        request = httpx.Request(method, url)
+        payload = _graphql_reply(pairs)
+        payload["data"]["r0"] = _repo(pairs[0][1], runs=(("Deploy", "FAILURE"),), prs=2)
+        return httpx.Response(200, json=payload, request=request)
+
+    with patch.dict(os.environ, {"GITHUB_TOKEN": "t", "GITHUB_GRAPHQL_NODE_BUDGET": str(REPO_STATUS_NODES * 2)}), \
+            patch("app.github.arequest", side_effect=reply) as send:
+        result = await get_multi_repo_status.ainvoke({"repos": "a, b, c"})
+
+    assert send.await_count == 2
+    assert "🔴 Deploy: failure" in result
+    assert "2 open PRs (#10 Change 0 [APPROVED]; #11 Change 1 [DRAFT])" in result
+    assert result.endswith("_(2 GraphQL queries, cost 2, 4990 points left)_")
+
+
+def test_query_errors_are_reported():
+    reply = MagicMock(status_code=200, **{"json.return_value": {"errors": [{"message": "Bad credentials"}]}})
+    with patch.dict(os.environ, {"GITHUB_TOKEN": "t"}), patch("app.github.request", return_value=reply):
+        result = get_multi_repo_status.invoke({"repos": "svc-a"})
+    assert result == "Error fetching repository status: GraphQL error: Bad credentials"
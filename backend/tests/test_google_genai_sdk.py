@@ -33,11 +33,10 @@ class TestGoogleGenAISDK(unittest.TestCase):
             MockClient.assert_called_once_with(api_key="fake-api-key")
             self.assertEqual(client, mock_instance)
 
+    @patch.dict(os.environ, {"LLM_PROVIDER": "gemini"})
     @patch("app.llm.ChatGoogleGenerativeAI")
     def test_get_llm_gemini(self, mock_chat_google):
         """Test that get_llm uses langchain-google-genai with correct settings."""
-        os.environ["LLM_PROVIDER"] = "gemini"
-
         get_llm()
 
         # Verify it was called with model="gemini-1.5-flash"
@@ -0,0 +1,144 @@
+import io
+import os
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from app.http import SYNC_DEFAULT_TIMEOUT, AsyncHTTP, SyncHTTP, concurrency_for, retry_delay
+
+
+def _response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(b"")
+    return response
+
+
+def test_sessions_are_pooled_per_upstream():
+    http = SyncHTTP()
+    github = http.session("github")
+
+    assert http.session("github") is github
+    assert http.session("slack") is not github
+    assert github.get_adapter("https://api.github.com")._pool_maxsize == concurrency_for("github")
+
+
+def test_get_is_retried_on_5xx_with_default_timeout():
+    http = SyncHTTP()
+    with patch.object(requests.Session, "request", side_effect=[_response(503), _response(200)]) as send, \
+            patch("app.http.time.sleep") as sleep:
+        response = http.request("github", "GET", "https://api.github.com/repos/o/r")
+
+    assert response.status_code == 200
+    assert send.call_count == 2
+    assert send.call_args.kwargs["timeout"] == SYNC_DEFAULT_TIMEOUT
+    sleep.assert_called_once()
+    stats = http.stats()["github"]
+    assert stats["requests"] == 2 and stats["retries"] == 1 and stats["in_flight"] == 0
+    assert stats["errors"] == 1  # the 503
+
+
+def test_post_is_only_retried_when_it_was_not_processed():
+    http = SyncHTTP()
+    with patch.object(requests.Session, "request", side_effect=[_response(503)]) as send, \
+            patch("app.http.time.sleep"):
+        assert http.request("jira", "POST", "https://jira/issue", json={}).status_code == 503
+    assert send.call_count == 1
+
+    with patch.object(requests.Session, "request",
+                      side_effect=[_response(429, {"Retry-After": "3"}), _response(201)]) as send, \
+            patch("app.http.time.sleep") as sleep:
+        assert http.request("jira", "POST", "https://jira/issue", json={}).status_code == 201
+    sleep.assert_called_once_with(3.0)
+
+
+def test_post_is_retried_on_refused_connection_only():
+    refused = requests.ConnectionError(MaxRetryError(None, "/issue", NewConnectionError(None, "refused")))
+    http = SyncHTTP()
+    with patch.object(requests.Session, "request", side_effect=[refused, _response(201)]) as send, \
+            patch("app.http.time.sleep"):
+        assert http.request("jira", "POST", "https://jira/issue", json={}).status_code == 201
+    assert send.call_count == 2
+
+    # A connection dropped after sending may have been processed.
+    with patch.object(requests.Session, "request", side_effect=requests.ConnectionError("aborted")) as send:
+        with pytest.raises(requests.ConnectionError):
+            http.request("jira", "POST", "https://jira/issue", json={})
+    assert send.call_count == 1
+
+
+def test_close_drops_sessions_and_their_limits():
+    http = SyncHTTP()
+    http.session("github")
+    http.close()
+
+    assert not http._sessions and not http._semaphores
+    http.session("github")
+    assert set(http._semaphores) == {"github"}
+
+
+def test_close_while_a_call_is_in_flight():
+    http = SyncHTTP()
+    session = http.session("github")
+    session.request = MagicMock(side_effect=lambda *a, **kw: http.close() or _response(200))
+
+    # The next call's semaphore is looked up after close() emptied the dict.
+    assert http.request("github", "GET", "https://api.github.com/a").status_code == 200
+    assert http._send("github", session, "GET", "https://api.github.com/b").status_code == 200
+
+
+def test_retries_are_bounded_and_errors_counted():
+    http = SyncHTTP()
+    with patch.dict(os.environ, {"HTTP_MAX_RETRIES": "1"}), \
+            patch.object(requests.Session, "request", side_effect=requests.ConnectTimeout("down")) as send, \
+            patch("app.http.time.sleep"):
+        with pytest.raises(requests.ConnectTimeout):
+            http.request("pagerduty", "GET", "https://api.pagerduty.com/oncalls")
+
+    assert send.call_count == 2
+    assert http.stats()["pagerduty"]["errors"] == 2
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = [retry_delay(10) for _ in range(50)]
+    assert all(0 <= d <= 8.0 for d in delays)
+    assert len(set(delays)) > 1
+    assert retry_delay(0, MagicMock(headers={"Retry-After": "120"})) == 8.0
+
+
+@pytest.mark.asyncio
+async def test_async_requests_share_the_retry_policy():
+    http = AsyncHTTP()
+    request = httpx.Request("GET", "https://api.azionapi.net")
+    replies = [httpx.Response(502, request=request), httpx.Response(200, request=request)]
+    with patch.object(httpx.AsyncClient, "request", side_effect=replies), \
+            patch("app.http.asyncio.sleep") as sleep:
+        response = await http.request("azion", "GET", "https://api.azionapi.net")
+
+    assert response.status_code == 200
+    sleep.assert_awaited_once()
+    stats = http.stats()["azion"]
+    assert stats["retries"] == 1 and stats["latency_ms_max"] >= 0
+    await http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_post_follows_the_same_error_policy():
+    http = AsyncHTTP()
+    request = httpx.Request("POST", "https://events.pagerduty.com")
+    replies = [httpx.ConnectError("refused"), httpx.Response(202, request=request)]
+    with patch.object(httpx.AsyncClient, "request", side_effect=replies) as send, \
+            patch("app.http.asyncio.sleep"):
+        assert (await http.request("pagerduty", "POST", "https://events.pagerduty.com")).status_code == 202
+    assert send.call_count == 2
+
+    with patch.object(httpx.AsyncClient, "request", side_effect=httpx.ReadTimeout("slow")) as send:
+        with pytest.raises(httpx.ReadTimeout):
+            await http.request("pagerduty", "POST", "https://events.pagerduty.com")
+    assert send.call_count == 1
+    assert http.stats()["pagerduty"]["errors"] == 2
+    await http.aclose()
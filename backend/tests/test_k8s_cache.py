@@ -0,0 +1,205 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kubernetes.client import V1ListMeta, V1ManagedFieldsEntry, V1ObjectMeta, V1Pod, V1PodList, V1PodStatus
+from kubernetes.client.rest import ApiException
+
+import app.tools as tools
+from app.k8s_cache import Informer, cluster_cache
+
+
+def _pod(name, rv, namespace="default", phase="Running"):
+    meta = V1ObjectMeta(name=name, namespace=namespace, resource_version=rv,
+                        managed_fields=[V1ManagedFieldsEntry(manager="kubectl")])
+    return V1Pod(metadata=meta, status=V1PodStatus(phase=phase))
+
+
+def _page(items, rv, token=None):
+    return V1PodList(items=items, metadata=V1ListMeta(resource_version=rv, _continue=token))
+
+
+class FakeWatch:
+    """Replays one scripted stream per watch call, then idles until stopped."""
+
+    script = []
+    calls = []
+
+    def __init__(self):
+        self.resource_version = None
+        self._stopped = threading.Event()
+
+    def stream(self, func, resource_version=None, **kwargs):
+        FakeWatch.calls.append(resource_version)
+        step = FakeWatch.script.pop(0) if FakeWatch.script else None
+        if isinstance(step, Exception):
+            raise step
+        for kind, obj in step or []:
+            self.resource_version = obj.metadata.resource_version
+            yield {"type": kind, "object": obj}
+        if step is None:
+            self._stopped.wait(5)
+
+    def stop(self):
+        self._stopped.set()
+
+
+def _wait_for(condition, timeout=3):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def fake_api():
+    api = MagicMock()
+    FakeWatch.calls = []
+    with patch("app.k8s_cache.k8s_api", return_value=api), patch("kubernetes.watch.Watch", FakeWatch):
+        yield api
+    FakeWatch.script = []
+
+
+def test_watch_resumes_from_last_resource_version_without_relisting(fake_api):
+    fake_api.list_pod_for_all_namespaces.return_value = _page([_pod("api-1", "100")], "100")
+    FakeWatch.script = [[("ADDED", _pod("api-2", "101")), ("DELETED", _pod("api-1", "102"))]]
+
+    informer = Informer("pods")
+    informer.start()
+    _wait_for(lambda: len(FakeWatch.calls) == 2)
+    informer.stop()
+
+    assert FakeWatch.calls == ["100", "102"]
+    assert fake_api.list_pod_for_all_namespaces.call_count == 1
+    assert [p.metadata.name for p in informer.list("default")] == ["api-2"]
+
+
+def test_expired_resource_version_triggers_relist(fake_api):
+    fake_api.list_pod_for_all_namespaces.side_effect = [
+        _page([_pod("api-1", "100")], "100"),
+        _page([_pod("api-1", "100"), _pod("api-3", "250")], "250"),
+    ]
+    FakeWatch.script = [ApiException(status=410, reason="Expired")]
+
+    informer = Informer("pods")
+    informer.start()
+    _wait_for(lambda: len(FakeWatch.calls) == 2)
+    informer.stop()
+
+    assert FakeWatch.calls == ["100", "250"]
+    assert informer.stats()["relists"] == 1
+    assert len(informer.list()) == 2
+
+
+def test_initial_list_is_paginated(fake_api):
+    fake_api.list_pod_for_all_namespaces.side_effect = [
+        _page([_pod("a", "1")], "10", token="next"),
+        _page([_pod("b", "2")], "10"),
+    ]
+    informer = Informer("pods")
+    informer._relist()
+
+    calls = fake_api.list_pod_for_all_namespaces.call_args_list
+    assert calls[1].kwargs["_continue"] == "next"
+    assert len(informer.list()) == 2 and informer.resource_version == "10"
+
+
+def test_memory_is_bounded(fake_api):
+    fake_api.list_pod_for_all_namespaces.return_value = _page([_pod(f"p{i}", str(i)) for i in range(3)], "3")
+    pods = Informer("pods", limit=2)
+    pods._relist()
+
+    assert len(pods.list()) == 2
+    assert pods.get("default", "p2").metadata.managed_fields is None
+    assert not pods.usable()  # an incomplete pod list would hide pods
+
+    fake_api.list_event_for_all_namespaces.return_value = _page([_pod(f"e{i}", str(i)) for i in range(3)], "3")
+    events = Informer("events", limit=2)
+    events._relist()
+    assert events.usable()  # only the newest events matter
+
+
+def test_relist_is_bounded_page_by_page_and_swapped_in(fake_api):
+    informer = Informer("events", limit=2)
+    informer._store["default", "old"] = _pod("old", "1")
+    seen_during_list = []
+
+    def pages(**kwargs):
+        seen_during_list.append([p.metadata.name for p in informer.list()])
+        token = kwargs.get("_continue")
+        n = int(token) if token else 0
+        return _page([_pod(f"e{n}", str(n)), _pod(f"e{n + 1}", str(n + 1))], "9",
+                     token=str(n + 2) if n < 4 else None)
+
+    fake_api.list_event_for_all_namespaces.side_effect = pages
+    informer._relist()
+
+    assert seen_during_list == [["old"]] * 3  # readers keep the old store until the swap
+    assert [p.metadata.name for p in informer.list()] == ["e4", "e5"]
+    assert informer.stats()["evictions"] == 4 and not informer.complete
+
+
+def test_disconnected_store_goes_stale(fake_api):
+    fake_api.list_pod_for_all_namespaces.return_value = _page([_pod("api-1", "1")], "1")
+    informer = Informer("pods")
+    informer._relist()
+    assert informer.freshness() == "watch cache, live"
+
+    with patch("app.k8s_cache.time.time", return_value=time.time() + 45):
+        assert informer.freshness() == "watch cache, under 120s stale"  # the bound, not the lag
+        assert informer.usable()
+    with patch("app.k8s_cache.time.time", return_value=time.time() + 600):
+        assert not informer.usable()
+
+
+def test_read_tools_answer_from_the_cache(fake_api):
+    fake_api.list_pod_for_all_namespaces.return_value = _page(
+        [_pod("api-1", "1", phase="Running"), _pod("db-0", "2", namespace="data")], "2")
+    informer = Informer("pods")
+    informer._relist()
+    informer.connected = True  # watching
+
+    with patch.dict(os.environ, {"K8S_WATCH_CACHE": "true"}), \
+            patch.dict(cluster_cache._informers, {("", "pods"): informer}), \
+            patch("app.tools.real._get_k8s_client") as live:
+        result = tools.list_k8s_pods.invoke({"namespace": "default"})
+
+    live.assert_not_called()
+    assert result.startswith("Pods in default: api-1 (Running)")
+    assert "db-0" not in result
+    assert "_(from watch cache, live)_" in result
+
+
+def test_tool_calls_never_start_informers():
+    v1 = MagicMock()
+    v1.list_namespaced_pod.return_value.data = json.dumps({
+        "kind": "Table", "columnDefinitions": [{"name": "Name"}, {"name": "Status"}],
+        "rows": [{"cells": ["api-1", "Running"]}], "metadata": {}})
+    with patch.dict(os.environ, {"K8S_WATCH_CACHE": "true"}), \
+            patch.object(Informer, "start") as start, \
+            patch("app.tools.real._get_k8s_client", return_value=v1):
+        result = tools.list_k8s_pods.invoke({"namespace": "default", "context": "staging"})
+
+    assert result == "Pods in default: api-1 (Running)"
+    start.assert_not_called()
+
+
+def test_server_start_watches_configured_contexts():
+    from main import app, lifespan
+
+    async def run():
+        async with lifespan(app):
+            return cluster_cache.stats()
+
+    with patch.dict(os.environ, {"K8S_WATCH_CACHE": "true", "K8S_WATCH_CONTEXTS": "staging, staging"}), \
+            patch.object(Informer, "start") as start, \
+            patch("main.initialize_rag"), patch("main.fast_router") as router:
+        stores = asyncio.run(run())
+
+    router.warm.assert_called_once()  # the router's embedder loads at start, not in /chat
+    assert start.call_count == 14  # one informer per cached resource and context
+    assert "default/pods" in stores and "staging/pods" in stores
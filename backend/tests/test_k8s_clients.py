@@ -0,0 +1,70 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from kubernetes import config
+
+import app.tools as tools
+from app.k8s import k8s_api, k8s_clients
+
+
+def _kubeconfig(tmp_path, body="apiVersion: v1\n"):
+    path = tmp_path / "config"
+    path.write_text(body)
+    return str(path)
+
+
+def test_kubeconfig_is_loaded_once_and_client_is_shared(tmp_path):
+    with patch.dict(os.environ, {"KUBECONFIG": _kubeconfig(tmp_path)}), \
+            patch("kubernetes.config.load_kube_config") as load:
+        first = k8s_api("CoreV1Api")
+        second = k8s_api("AppsV1Api")
+
+    assert load.call_count == 1
+    assert first.api_client is second.api_client
+    assert k8s_clients.stats()["hits"] == 1
+
+
+def test_kubeconfig_change_triggers_reload(tmp_path):
+    path = _kubeconfig(tmp_path)
+    with patch.dict(os.environ, {"KUBECONFIG": path}), \
+            patch("kubernetes.config.load_kube_config") as load:
+        before = k8s_api("CoreV1Api").api_client
+        with open(path, "a") as f:
+            f.write("current-context: prod\n")
+        after = k8s_api("CoreV1Api").api_client
+
+    assert load.call_count == 2
+    assert before is not after
+    assert k8s_clients.stats()["reloads"] == 1
+
+
+def test_each_context_gets_its_own_configuration(tmp_path):
+    with patch.dict(os.environ, {"KUBECONFIG": _kubeconfig(tmp_path)}), \
+            patch("kubernetes.config.load_kube_config") as load:
+        staging = k8s_api("CoreV1Api", "staging")
+        prod = k8s_api("CoreV1Api", "prod")
+
+    assert staging.api_client is not prod.api_client
+    assert staging.api_client.configuration is not prod.api_client.configuration
+    assert [c.kwargs["context"] for c in load.call_args_list] == ["staging", "prod"]
+    assert k8s_clients.stats()["contexts"] == ["prod", "staging"]
+
+
+def test_unloadable_config_returns_none(tmp_path):
+    with patch.dict(os.environ, {"KUBECONFIG": str(tmp_path / "missing")}), \
+            patch("kubernetes.config.load_kube_config", side_effect=config.ConfigException("no config")), \
+            patch("kubernetes.config.load_incluster_config", side_effect=config.ConfigException("not in cluster")):
+        assert k8s_api("CoreV1Api") is None
+        assert "Could not load Kubernetes configuration" in tools.list_k8s_pods.invoke({"namespace": "default"})
+
+    assert k8s_clients.stats()["failures"] == 2
+
+
+def test_tools_pass_context_to_the_factory():
+    v1 = MagicMock()
+    v1.list_namespaced_pod.return_value.data = '{"kind": "Table", "rows": [], "metadata": {}}'
+    with patch("app.tools.real.k8s_api", return_value=v1) as api:
+        tools.list_k8s_pods.invoke({"namespace": "payments", "context": "prod"})
+
+    api.assert_called_once_with("CoreV1Api", "prod")
+    v1.list_namespaced_pod.assert_called_once()
@@ -0,0 +1,80 @@
+import datetime
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+from kubernetes.client import CoreV1Event, CoreV1EventList, V1ListMeta, V1ObjectMeta, V1ObjectReference
+
+import app.tools as tools
+from app.k8s_events import EventAggregator
+
+NOW = datetime.datetime(2026, 5, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _event(name, reason, minutes_ago, type_="Warning", count=1, namespace="default", kind="Pod",
+           message="Back-off restarting failed container", first_minutes_ago=None):
+    last = NOW - datetime.timedelta(minutes=minutes_ago)
+    first = NOW - datetime.timedelta(minutes=first_minutes_ago if first_minutes_ago is not None else minutes_ago)
+    return CoreV1Event(
+        metadata=V1ObjectMeta(name=f"{name}.{reason}", namespace=namespace),
+        involved_object=V1ObjectReference(kind=kind, name=name, namespace=namespace),
+        type=type_, reason=reason, message=message, count=count,
+        first_timestamp=first, last_timestamp=last)
+
+
+def test_repeated_events_collapse_into_ranked_groups():
+    aggregator = EventAggregator(window_minutes=60, now=NOW)
+    for e in [
+        _event("api-1", "BackOff", 30, count=5, first_minutes_ago=50),
+        _event("api-1", "BackOff", 2, count=7, first_minutes_ago=25),
+        _event("api-1", "Pulled", 1, type_="Normal", message="Container image pulled"),
+        _event("db-0", "FailedMount", 10, message="MountVolume.SetUp failed | timeout"),
+        _event("old-0", "OOMKilled", 120),  # outside the window
+    ]:
+        aggregator.add(e)
+
+    ranked = aggregator.ranked()
+    assert [key[2] for key, _ in ranked] == ["api-1", "db-0", "api-1"]
+    backoff = ranked[0][1]
+    assert backoff["count"] == 12
+    assert backoff["first"] == NOW - datetime.timedelta(minutes=50)
+    assert backoff["last"] == NOW - datetime.timedelta(minutes=2)
+    assert aggregator.seen == 14
+
+    table = aggregator.table(max_rows=2)
+    assert "| Warning | Pod/api-1 | BackOff | 12 | 50m ago | 2m ago | Back-off restarting failed container |" in table
+    assert "MountVolume.SetUp failed / timeout" in table
+    assert "... 1 more groups not shown" in table
+    assert "old-0" not in table
+
+
+def test_tool_filters_by_object_server_side_across_namespaces():
+    v1 = MagicMock()
+    v1.list_event_for_all_namespaces.return_value = CoreV1EventList(
+        items=[_event("api-1", "BackOff", 1, count=3, namespace="payments")], metadata=V1ListMeta())
+
+    with patch("app.tools.real._get_k8s_client", return_value=v1):
+        result = tools.get_cluster_events.invoke(
+            {"namespace": "", "involved_object": "Pod/api-1", "window_minutes": 0})
+
+    kwargs = v1.list_event_for_all_namespaces.call_args.kwargs
+    assert kwargs["field_selector"] == "involvedObject.name=api-1,involvedObject.kind=Pod"
+    assert kwargs["limit"] == 500
+    v1.list_namespaced_event.assert_not_called()
+    assert result.startswith("Events in all namespaces: 3 events in 1 groups")
+    assert "| Warning | Pod/payments/api-1 | BackOff | 3 |" in result
+
+
+def test_investigation_uses_the_requested_window_cluster_wide():
+    from app.tools.observability import investigate_root_cause
+
+    # investigate_root_cause imports its tools from app.tools at call time.
+    mocks = {name: MagicMock(**{"invoke.return_value": "ok"}) for name in [
+        "get_cluster_events", "get_active_alerts", "list_recent_commits", "check_gcp_status",
+        "check_traefik_health", "check_azion_status"]}
+    with ExitStack() as stack:
+        for name, mock in mocks.items():
+            stack.enter_context(patch(f"app.tools.{name}", mock))
+        stack.enter_context(patch("app.tools.observability.analyze_heavy_logs"))
+        investigate_root_cause.invoke({"service_name": "api", "time_window_minutes": 15})
+
+    mocks["get_cluster_events"].invoke.assert_called_once_with({"namespace": "", "window_minutes": 15})
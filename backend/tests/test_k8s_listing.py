@@ -0,0 +1,104 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+from kubernetes.client import (V1Container, V1ContainerState, V1ContainerStateWaiting, V1ContainerStatus,
+                               V1Deployment, V1DeploymentList, V1DeploymentSpec, V1LabelSelector, V1ListMeta,
+                               V1ObjectMeta, V1Pod, V1PodSpec, V1PodStatus, V1PodTemplateSpec)
+
+import app.tools as tools
+import app.tools.k8s_optimizer as k8s_optimizer
+from app.k8s import TABLE_ACCEPT, list_table_rows
+from app.k8s_cache import Informer, cluster_cache
+
+
+def _table(rows, columns=("Name", "Status"), token=None):
+    return MagicMock(data=json.dumps({
+        "kind": "Table",
+        "columnDefinitions": [{"name": c} for c in columns],
+        "rows": [{"cells": list(r)} for r in rows],
+        "metadata": {"continue": token} if token else {},
+    }))
+
+
+def _deployment(name, image="registry/app:1.0"):
+    spec = V1DeploymentSpec(selector=V1LabelSelector(), template=V1PodTemplateSpec(
+        spec=V1PodSpec(containers=[V1Container(name="app", image=image)])))
+    return V1Deployment(metadata=V1ObjectMeta(name=name, namespace="default"), spec=spec)
+
+
+def test_table_rows_are_paged_with_projection():
+    list_fn = MagicMock(side_effect=[_table([("a", "Running")], token="next"), _table([("b", "Pending")])])
+
+    rows = list(list_table_rows(list_fn, "default", page_size=1))
+
+    assert rows == [{"Name": "a", "Status": "Running"}, {"Name": "b", "Status": "Pending"}]
+    first, second = list_fn.call_args_list
+    assert first.kwargs["limit"] == 1
+    assert first.kwargs["_headers"] == {"Accept": TABLE_ACCEPT}
+    assert "_continue" not in first.kwargs and second.kwargs["_continue"] == "next"
+
+
+def test_selectors_are_pushed_down_and_output_is_bounded():
+    v1 = MagicMock()
+    v1.list_namespaced_pod.return_value = _table(
+        [("api-1", "CrashLoopBackOff"), ("api-2", "CrashLoopBackOff"), ("worker-1", "Pending"),
+         ("worker-2", "Pending"), ("worker-3", "Pending")])
+
+    with patch("app.tools.real._get_k8s_client", return_value=v1):
+        result = tools.list_k8s_pods.invoke(
+            {"namespace": "prod", "field_selector": "status.phase!=Running", "max_pods": 2})
+
+    kwargs = v1.list_namespaced_pod.call_args.kwargs
+    assert kwargs["field_selector"] == "status.phase!=Running"
+    assert kwargs["label_selector"] is None
+    assert result == ("Pods in prod: api-1 (CrashLoopBackOff), api-2 (CrashLoopBackOff)"
+                      " ... and 3 more (5 total: Pending=3, CrashLoopBackOff=2)")
+
+
+def test_cache_reports_container_reason_and_selectors_bypass_it():
+    waiting = V1ContainerStatus(name="app", image="x", image_id="", ready=False, restart_count=4,
+                                state=V1ContainerState(waiting=V1ContainerStateWaiting(reason="CrashLoopBackOff")))
+    pod = V1Pod(metadata=V1ObjectMeta(name="api-1", namespace="default"),
+                status=V1PodStatus(phase="Running", container_statuses=[waiting]))
+    pods = Informer("pods")
+    with patch("app.k8s_cache.k8s_api") as api:
+        api.return_value.list_pod_for_all_namespaces.return_value = MagicMock(
+            items=[pod], metadata=V1ListMeta(resource_version="1"))
+        pods._relist()
+
+    v1 = MagicMock()
+    v1.list_namespaced_pod.return_value = _table([("api-1", "CrashLoopBackOff")])
+    with patch.dict(os.environ, {"K8S_WATCH_CACHE": "true"}), \
+            patch.dict(cluster_cache._informers, {("", "pods"): pods}), \
+            patch("app.tools.real._get_k8s_client", return_value=v1):
+        cached_result = tools.list_k8s_pods.invoke({"namespace": "default"})
+        v1.list_namespaced_pod.assert_not_called()
+        tools.list_k8s_pods.invoke({"namespace": "default", "label_selector": "app=api"})
+
+    assert cached_result.startswith("Pods in default: api-1 (CrashLoopBackOff)")
+    assert v1.list_namespaced_pod.call_args.kwargs["label_selector"] == "app=api"
+
+
+def test_optimizer_pages_deployments_and_bounds_the_report():
+    apps_v1 = MagicMock()
+    apps_v1.list_namespaced_deployment.side_effect = [
+        V1DeploymentList(items=[_deployment("api"), _deployment("web", "web:latest")],
+                         metadata=V1ListMeta(_continue="next")),
+        V1DeploymentList(items=[_deployment("worker")], metadata=V1ListMeta()),
+    ]
+    autoscaling_v2 = MagicMock()
+    autoscaling_v2.list_namespaced_horizontal_pod_autoscaler.return_value = _table(
+        [("api-hpa", "Deployment/api")], columns=("Name", "Reference"))
+
+    with patch.object(k8s_optimizer, "_get_k8s_apps_client", return_value=apps_v1), \
+            patch.object(k8s_optimizer, "_get_k8s_autoscaling_client", return_value=autoscaling_v2), \
+            patch.object(k8s_optimizer, "MAX_AUDITED_DEPLOYMENTS", 2):
+        result = tools.optimize_k8s_resources.invoke({"namespace": "default", "label_selector": "tier=web"})
+
+    assert apps_v1.list_namespaced_deployment.call_args_list[0].kwargs["label_selector"] == "tier=web"
+    assert apps_v1.list_namespaced_deployment.call_args_list[1].kwargs["_continue"] == "next"
+    assert "**web** (app)" in result and "Using ':latest' tag" in result
+    assert "No HPA configured" not in result.split("**web**")[0]  # api is covered by its HPA
+    assert "**worker**" not in result
+    assert "... and 1 more deployments with findings" in result
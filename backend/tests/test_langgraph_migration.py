@@ -20,7 +20,7 @@ def test_langgraph_workflow_instantiation():
 
 def test_langgraph_compilation():
     """
-    Verifies that the graph compiles correctly and has the MemorySaver attached
+    Verifies that the graph compiles correctly and has a checkpointer attached
     for human-in-the-loop interruption.
     """
     assert app_graph is not None
@@ -0,0 +1,99 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from app.llm import LLMClientRegistry, get_llm, get_google_sdk_client, get_llm_client_stats
+
+
+def test_registry_reuses_client_for_same_fingerprint():
+    registry = LLMClientRegistry()
+    factory = MagicMock(side_effect=lambda: object())
+
+    first = registry.get("ollama:llama3", "fp-1", factory)
+    second = registry.get("ollama:llama3", "fp-1", factory)
+
+    assert first is second
+    assert factory.call_count == 1
+    stats = registry.stats()["slots"]["ollama:llama3"]
+    assert stats == {"hits": 1, "misses": 1, "reloads": 0,
+                     "connections_opened": 0, "connections_reused": 0}
+
+
+def test_registry_reloads_when_config_changes():
+    registry = LLMClientRegistry()
+
+    first = registry.get("ollama:llama3", "fp-1", object)
+    second = registry.get("ollama:llama3", "fp-2", object)
+
+    assert first is not second
+    assert registry.stats()["slots"]["ollama:llama3"]["reloads"] == 1
+
+
+def test_registry_does_not_pool_missing_clients():
+    registry = LLMClientRegistry()
+    registry.get("genai-sdk", "fp", lambda: None)
+    registry.get("genai-sdk", "fp", lambda: None)
+
+    assert registry.stats()["totals"]["misses"] == 2
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_registry_counts_opened_and_reused_connections():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    registry = LLMClientRegistry()
+    http_client = httpx.Client()
+    try:
+        # SDK clients keep their httpx client a level or two down.
+        registry.get("ollama:llama3", "fp",
+                     lambda: SimpleNamespace(_client=SimpleNamespace(_client=http_client)))
+        for _ in range(3):
+            http_client.get(url)
+    finally:
+        http_client.close()
+        server.shutdown()
+        server.server_close()
+
+    stats = registry.stats()["slots"]["ollama:llama3"]
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+
+
+def test_get_llm_is_pooled_across_calls():
+    with patch.dict(os.environ, {"LLM_PROVIDER": "ollama", "OLLAMA_MODEL": "llama3"}), \
+            patch("app.llm.ChatOllama") as MockOllama:
+        MockOllama.side_effect = lambda **kw: MagicMock()
+
+        assert get_llm() is get_llm()
+        MockOllama.assert_called_once()
+
+        with patch.dict(os.environ, {"OLLAMA_BASE_URL": "http://other:11434"}):
+            get_llm()
+        assert MockOllama.call_count == 2
+
+
+def test_google_sdk_client_is_pooled():
+    with patch.dict(os.environ, {"GOOGLE_API_KEY": "fake-key"}), \
+            patch("google.genai.Client") as MockClient:
+        assert get_google_sdk_client() is get_google_sdk_client()
+        MockClient.assert_called_once_with(api_key="fake-key")
+
+    stats = get_llm_client_stats()
+    assert stats["slots"]["genai-sdk"]["hits"] == 1
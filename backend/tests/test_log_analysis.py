@@ -7,15 +7,24 @@ from unittest.mock import MagicMock, patch
 from app.tools import real
 
 
+def _log_client(text):
+    """A CoreV1Api mock whose pod log streams `text` in small chunks."""
+    data = text.encode()
+    resp = MagicMock()
+    resp.stream.return_value = [data[i:i + 7] for i in range(0, len(data), 7)]
+    v1 = MagicMock()
+    v1.read_namespaced_pod_log.return_value = resp
+    return v1
+
+
 class TestLogAnalysis(unittest.TestCase):
 
-    @patch('app.tools.real.get_pod_logs')
+    @patch('app.tools.real._get_k8s_client')
     @patch('app.tools.real.get_google_sdk_client')
-    def test_gemini_sdk_path(self, mock_get_sdk, mock_get_pod_logs_tool):
+    def test_gemini_sdk_path(self, mock_get_sdk, mock_k8s):
         # Setup
-        # analyze_log_patterns calls get_pod_logs.invoke(...)
-        mock_get_pod_logs_tool.invoke.return_value = "ERROR: Connection failed\nStacktrace..." + \
-            (" " * 50)
+        # analyze_log_patterns streams the pod log and mines it locally
+        mock_k8s.return_value = _log_client("ERROR: Connection failed\nStacktrace...\n")
 
         mock_client = MagicMock()
         mock_response = MagicMock()
@@ -34,17 +43,16 @@ class TestLogAnalysis(unittest.TestCase):
         self.assertIn("Database is down", result)
         mock_client.models.generate_content.assert_called_once()
 
-    @patch('app.tools.real.get_pod_logs')
+    @patch('app.tools.real._get_k8s_client')
     @patch('app.tools.real.get_google_sdk_client')
     @patch('app.tools.real.get_llm')
     def test_ollama_fallback_path(
             self,
             mock_get_llm,
             mock_get_sdk,
-            mock_get_pod_logs_tool):
+            mock_k8s):
         # Setup
-        mock_get_pod_logs_tool.invoke.return_value = "ERROR: Timeout\nStacktrace..." + \
-            (" " * 50)
+        mock_k8s.return_value = _log_client("ERROR: Timeout\nStacktrace...")
         mock_get_sdk.return_value = None  # Simulate no SDK/API Key
 
         mock_llm = MagicMock()
@@ -60,3 +68,41 @@ class TestLogAnalysis(unittest.TestCase):
         self.assertIn("**AI Log Analysis (Standard LLM):**", result)
         self.assertIn("Network issue", result)
         mock_llm.invoke.assert_called_once()
+
+    @patch('app.tools.real._get_k8s_client')
+    @patch('app.tools.real.get_google_sdk_client')
+    def test_only_templates_reach_the_llm(self, mock_get_sdk, mock_k8s):
+        lines = [f"2026-05-01T10:00:{i % 60:02d}Z ERROR timeout after {i}ms calling 10.0.0.{i % 9}:5432"
+                 for i in range(3000)]
+        lines += [f"2026-05-01T10:01:00Z INFO request {i} served" for i in range(2000)]
+        v1 = _log_client("\n".join(lines) + "\n")
+        mock_k8s.return_value = v1
+
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value.text = "DB timeouts."
+        mock_get_sdk.return_value = mock_client
+
+        result = real.analyze_log_patterns.invoke({"pod_name": "my-pod"})
+
+        prompt = mock_client.models.generate_content.call_args.kwargs["contents"]
+        self.assertLess(len(prompt), 3000)
+        self.assertIn("| ERROR | 3000 |", prompt)
+        self.assertIn("| INFO | 2000 |", prompt)
+        self.assertIn("5000 lines -> 2 templates", result)
+        self.assertIn("DB timeouts.", result)
+        kwargs = v1.read_namespaced_pod_log.call_args.kwargs
+        self.assertFalse(kwargs["_preload_content"])
+        v1.read_namespaced_pod_log.return_value.release_conn.assert_called_once()
+
+    @patch('app.tools.real._get_k8s_client')
+    @patch('app.tools.real.get_google_sdk_client')
+    @patch('app.tools.real.get_llm')
+    def test_table_survives_llm_failure(self, mock_get_llm, mock_get_sdk, mock_k8s):
+        mock_k8s.return_value = _log_client("ERROR disk full on /dev/sda1\n")
+        mock_get_sdk.return_value = None
+        mock_get_llm.return_value.invoke.side_effect = RuntimeError("ollama down")
+
+        result = real.analyze_log_patterns.invoke({"pod_name": "my-pod"})
+
+        self.assertIn("ERROR disk full on /dev/sda1", result)
+        self.assertIn("Error during AI log analysis: ollama down", result)
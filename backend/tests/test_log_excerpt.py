@@ -0,0 +1,68 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from app.log_excerpt import FailureExcerpt
+from app.tools.real import analyze_ci_failure
+
+
+def _build_log(n=100_000, failures=(50_000,)):
+    for i in range(n):
+        ts = "2026-05-01T10:00:00.1234567Z "
+        if i in failures:
+            yield ts + "##[error]Process completed with exit code 1."
+        elif i == n - 5:
+            yield ts + "=== 1 failed, 812 passed in 93.1s ==="
+        else:
+            yield ts + f"compiling module {i}"
+
+
+def test_excerpt_keeps_failure_windows_and_tail_only():
+    excerpt = FailureExcerpt(context=3, max_lines=50).feed(_build_log())
+    text = excerpt.render()
+    lines = text.splitlines()
+
+    assert lines[0].startswith("[100000 lines, ") and lines[0].endswith(" KB, 1 failure markers]")
+    assert lines[1] == "... (49997 lines skipped) ..."
+    assert lines[2:9] == [f"compiling module {i}" for i in (49997, 49998, 49999)] + [
+        "##[error]Process completed with exit code 1."] + [f"compiling module {i}" for i in (50001, 50002, 50003)]
+    assert "=== 1 failed, 812 passed in 93.1s ===" in text
+    assert "2026-05-01T" not in text  # timestamps stripped
+    assert len(lines) < 50
+    assert excerpt.first_failure == "##[error]Process completed with exit code 1."
+
+
+def test_overlapping_windows_merge_and_excerpt_is_capped():
+    log = ["ok"] * 5 + ["FAILED tests/test_a.py::test_x", "ok", "AssertionError: 1 != 2"] + ["ok"] * 10
+    text = FailureExcerpt(context=2, max_lines=100, tail=0).feed(log).render()
+    assert text.splitlines()[1:] == ["... (3 lines skipped) ...", "ok", "ok", "FAILED tests/test_a.py::test_x",
+                                     "ok", "AssertionError: 1 != 2", "ok", "ok"]
+
+    capped = FailureExcerpt(context=5, max_lines=10, tail=0).feed(
+        f"--- FAIL: TestCase{i}" for i in range(1000)).render()
+    assert capped.count("--- FAIL") == 10 and capped.endswith("(excerpt capped at 10 lines) ...")
+
+
+def test_failed_jobs_are_streamed_and_diagnosed_in_parallel():
+    jobs = MagicMock(status_code=200, **{"json.return_value": {"jobs": [
+        {"id": 1, "name": "unit", "conclusion": "failure"},
+        {"id": 2, "name": "lint", "conclusion": "success"},
+        {"id": 3, "name": "e2e", "conclusion": "failure"}]}})
+
+    def send(upstream, method, url, **kwargs):
+        if url.endswith("/jobs"):
+            return jobs
+        log = MagicMock(status_code=200, encoding=None)
+        log.iter_lines.return_value = _build_log(2_000, failures=(1_000,))
+        return log
+
+    prompts = []
+    with patch.dict(os.environ, {"GITHUB_TOKEN": "t"}), \
+            patch("app.tools.real.request", side_effect=send) as request, \
+            patch("app.llm.generate_diagnosis", side_effect=lambda prompt, **kw: prompts.append(prompt) or "diag"):
+        result = analyze_ci_failure.invoke({"build_id": "42", "repo_name": "api"})
+
+    assert result.index("Failed Job: unit (ID: 1)") < result.index("Failed Job: e2e (ID: 3)")
+    assert "lint" not in result
+    assert all(c.kwargs.get("stream") for c in request.call_args_list if "/logs" in c.args[2])
+    assert len(prompts) == 2 and all(len(p) < 10_000 for p in prompts)
+    assert "exit code 1" in prompts[0]
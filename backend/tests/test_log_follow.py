@@ -0,0 +1,227 @@
+import json
+import queue
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.log_follow import LogFilter, PodLogFollower, log_followers, parse_since, parse_timestamp
+from app.tools import real
+from main import app
+
+
+class FakeLogs:
+    """CoreV1Api stand-in: a fixed tail, then a live stream fed through a queue."""
+
+    def __init__(self, tail_lines):
+        self.tail = tail_lines
+        self.live = queue.Queue()
+        self.calls = []
+
+    def read_namespaced_pod_log(self, **kwargs):
+        self.calls.append(kwargs)
+        resp = MagicMock()
+        if kwargs.get("follow"):
+            def live(_size):
+                while True:
+                    line = self.live.get()
+                    if line is None:
+                        return
+                    yield (line + "\n").encode()
+            resp.stream.side_effect = live
+            # Closing the response ends a read blocked on a quiet pod.
+            resp.shutdown.side_effect = lambda: self.live.put(None)
+        else:
+            resp.stream.return_value = ["".join(line + "\n" for line in self.tail).encode()]
+        return resp
+
+    def follow_calls(self):
+        return [c for c in self.calls if c.get("follow")]
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+TAIL = [
+    "2026-05-01T10:00:00.000000001Z INFO starting server",
+    "2026-05-01T10:00:01.5Z ERROR db connection refused",
+    "2026-05-01T10:00:02Z WARN retrying in 5s",
+]
+
+
+@pytest.fixture
+def fake_logs():
+    fake = FakeLogs(TAIL)
+    with patch("app.log_follow.k8s_api", return_value=fake):
+        yield fake
+        log_followers.stop()
+    for _ in fake.follow_calls():
+        fake.live.put(None)
+
+
+def test_parse_timestamps_and_since():
+    assert parse_timestamp("2026-05-01T10:00:00Z") == parse_timestamp("2026-05-01T12:00:00+02:00")
+    assert parse_timestamp("2026-05-01T10:00:01.5Z") - parse_timestamp("2026-05-01T10:00:00Z") == 1.5
+    assert parse_since("10m", now=1000.0) == 400.0
+    assert parse_since("") is None
+    with pytest.raises(ValueError):
+        parse_since("yesterday")
+
+
+def test_filter_by_pattern_and_minimum_level(fake_logs):
+    follower = PodLogFollower("api-1")
+    follower.start()
+    try:
+        lines, _ = follower.query(LogFilter(level="WARN"))
+        assert [line.text for line in lines] == ["ERROR db connection refused", "WARN retrying in 5s"]
+        lines, _ = follower.query(LogFilter(pattern=r"retry\w+"))
+        assert [line.level for line in lines] == ["WARN"]
+        since = parse_timestamp("2026-05-01T10:00:01Z")
+        lines, _ = follower.query(since=since, limit=1)
+        assert [line.text for line in lines] == ["WARN retrying in 5s"]
+    finally:
+        follower.stop()
+    with pytest.raises(ValueError):
+        LogFilter(level="LOUD")
+
+
+def test_ring_buffer_is_bounded_and_reports_gaps(fake_logs):
+    follower = PodLogFollower("api-1", capacity=2)
+    follower.start()
+    try:
+        for i in range(5):
+            fake_logs.live.put(f"2026-05-01T10:01:0{i}Z INFO tick {i}")
+        assert _wait_for(lambda: follower.seq() == 8)
+        lines, dropped, seq = follower.since_seq(3)
+        assert [line.text for line in lines] == ["INFO tick 3", "INFO tick 4"]
+        assert dropped == 3  # ticks 0-2 were evicted before they were read
+        assert seq == 8
+    finally:
+        follower.stop()
+
+
+def test_reconnect_resumes_without_duplicates(fake_logs):
+    follower = PodLogFollower("api-1")
+    follower.start()
+    try:
+        fake_logs.live.put("2026-05-01T10:01:00Z INFO live line")
+        assert _wait_for(lambda: follower.seq() == 4)
+        fake_logs.live.put(None)  # container restarted: the stream ends
+        assert _wait_for(lambda: len(fake_logs.follow_calls()) == 2)
+        # The resumed stream repeats the last second before new lines.
+        fake_logs.live.put("2026-05-01T10:01:00Z INFO live line")
+        fake_logs.live.put("2026-05-01T10:01:03Z INFO after restart")
+        assert _wait_for(lambda: follower.seq() == 5)
+        assert follower.stats()["duplicates"] == 1
+        assert "since_seconds" in fake_logs.follow_calls()[1]
+    finally:
+        follower.stop()
+
+
+def test_tool_reuses_one_follower_per_pod(fake_logs):
+    first = real.follow_pod_logs.invoke({"pods": "api-1, api-2", "level": "ERROR"})
+    assert "**api-1** (1 matching lines" in first
+    assert "ERROR db connection refused" in first
+    assert "**api-2**" in first
+
+    second = real.follow_pod_logs.invoke({"pods": "api-1", "pattern": "starting"})
+    assert "INFO starting server" in second
+    # One tail read and one follow connection per pod, however often it is asked.
+    assert _wait_for(lambda: len(fake_logs.follow_calls()) == 2)
+    assert len(fake_logs.calls) == 4
+    assert log_followers.stats()["reused"] == 1
+
+
+def test_idle_follower_is_reaped_and_its_thread_exits(fake_logs, monkeypatch):
+    monkeypatch.setenv("LOG_FOLLOW_IDLE_SECONDS", "0.2")
+    follower = log_followers.get("api-1")
+    assert _wait_for(lambda: follower.connected)
+
+    # Nobody reads the quiet pod again: the reaper stops it without another lookup.
+    assert _wait_for(lambda: not follower._thread.is_alive())
+    assert log_followers.stats()["expired"] == 1
+    assert not log_followers.stats()["pods"]
+    assert "last_error" not in follower.stats()
+
+
+def test_follower_with_an_open_stream_is_not_reaped(fake_logs, monkeypatch):
+    monkeypatch.setenv("LOG_FOLLOW_IDLE_SECONDS", "0.2")
+    monkeypatch.setenv("LOG_FOLLOW_MAX_PODS", "1")
+    follower = log_followers.get("api-1")
+    follower.attach()
+
+    log_followers.get("api-2")  # over the limit, but api-1 is pinned
+    time.sleep(0.5)
+    assert not follower.stopped
+    assert "default/default/api-1" in log_followers.stats()["pods"]
+
+    follower.detach()
+    assert _wait_for(lambda: follower.stopped)
+
+
+def test_deleted_pod_stops_retrying(fake_logs):
+    gone = Exception("pod not found")
+    gone.status = 404
+    fake_logs.read_namespaced_pod_log = MagicMock(side_effect=[fake_logs.read_namespaced_pod_log(), gone])
+    follower = PodLogFollower("api-1")
+    follower.start()
+
+    assert _wait_for(lambda: not follower._thread.is_alive())
+    assert follower.stats()["errors"] == 1
+
+
+def test_tool_rejects_bad_filters(fake_logs):
+    assert real.follow_pod_logs.invoke({"pods": "api-1", "pattern": "("}).startswith("Error: invalid pattern")
+    assert not fake_logs.calls
+
+
+def test_stream_endpoint_sends_backlog_then_live_lines(fake_logs):
+    client = TestClient(app)
+    fake_logs.live.put("2026-05-01T10:02:00Z ERROR live failure")
+    fake_logs.live.put("2026-05-01T10:02:01Z INFO live ok")
+
+    response = client.get("/logs/stream", params={"pods": "api-1", "level": "ERROR", "duration": 1})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e.get("line") for e in events if e["type"] == "log"] == [
+        "ERROR db connection refused", "ERROR live failure"]
+    assert events[-1] == {"type": "final"}
+
+
+def test_stream_ends_when_its_follower_stops(fake_logs):
+    gone = Exception("pod not found")
+    gone.status = 404
+    tail = fake_logs.read_namespaced_pod_log(tail_lines=1)
+    live = fake_logs.read_namespaced_pod_log(follow=True)
+    fake_logs.live.put("2026-05-01T10:02:00Z ERROR last words")
+    fake_logs.live.put(None)
+    fake_logs.read_namespaced_pod_log = MagicMock(side_effect=[tail, live, gone])
+
+    # No duration: the stream must still end once the pod is gone.
+    response = TestClient(app).get("/logs/stream", params={"pods": "api-1", "tail": 0})
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert "ERROR last words" in [e.get("line") for e in events]
+    assert events[-2] == {"type": "error", "pod": "api-1", "content": "Stopped following logs: pod not found"}
+    assert events[-1] == {"type": "final"}
+
+
+def test_stream_endpoint_sse_and_validation(fake_logs):
+    client = TestClient(app)
+
+    response = client.get("/logs/stream", params={"pods": "api-1", "format": "sse", "tail": 1, "duration": 0.1})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith('data: {"type": "log"')
+    assert "WARN retrying in 5s" in response.text
+
+    assert client.get("/logs/stream", params={"pods": "api-1", "level": "LOUD"}).status_code == 400
+    assert client.get("/logs/stream", params={"pods": " , "}).status_code == 400
@@ -0,0 +1,107 @@
+from app.log_templates import TemplateMiner, WILDCARD
+
+
+def test_variables_are_masked_into_one_template():
+    miner = TemplateMiner().feed([
+        "2026-05-01T10:00:00Z ERROR connect to 10.0.0.1:5432 failed after 30s",
+        "2026-05-01T10:00:05Z ERROR connect to 10.0.0.2:5432 failed after 12s",
+        "2026-05-01T10:00:09Z ERROR connect to 10.0.0.3:5432 failed after 30s",
+    ])
+
+    [template] = miner.templates()
+    assert template.text == f"ERROR connect to {WILDCARD} failed after {WILDCARD}"
+    assert template.count == 3
+    assert template.level == "ERROR"
+    assert template.first_seen == "2026-05-01T10:00:00Z"
+    assert template.last_seen == "2026-05-01T10:00:09Z"
+    assert template.values[3] == ["10.0.0.1:5432", "10.0.0.2:5432", "10.0.0.3:5432"]
+    assert template.values[6] == ["30s", "12s"]
+
+
+def test_differing_words_merge_into_wildcards():
+    miner = TemplateMiner().feed([
+        "connection closed by alice reason timeout",
+        "connection closed by bob reason reset",
+        "cache warmed",
+    ])
+
+    texts = {t.text: t.count for t in miner.templates()}
+    assert texts == {f"connection closed by {WILDCARD} reason {WILDCARD}": 2, "cache warmed": 1}
+    merged = miner.templates()[0]
+    assert merged.values == {3: ["alice", "bob"], 5: ["timeout", "reset"]}
+
+
+def test_key_value_tokens_keep_their_key():
+    miner = TemplateMiner().feed(["retry attempt=1 status=503", "retry attempt=2 status=503"])
+
+    [template] = miner.templates()
+    assert template.text == f"retry attempt={WILDCARD} status={WILDCARD}"
+
+
+def test_templates_sorted_by_severity_then_count():
+    miner = TemplateMiner().feed(
+        ["INFO request served"] * 5 + ["WARN slow query"] * 2 + ["FATAL out of memory"])
+
+    assert [t.level for t in miner.templates()] == ["FATAL", "WARN", "INFO"]
+
+
+def test_template_count_is_bounded():
+    miner = TemplateMiner(max_templates=10).feed(f"event{c} happened here" for c in "abcdefghijklmnopqrstuvwxyz")
+
+    assert len(miner.templates()) == 10
+    assert miner.evicted == 16
+    assert miner.lines == 26
+
+
+def test_table_and_exemplars_are_compact():
+    lines = [f"ERROR job {i} failed with code {i % 3}" for i in range(10000)]
+    lines += [f"{word} unique message" for word in ("alpha", "beta", "gamma", "delta", "omega", "sigma")]
+    miner = TemplateMiner().feed(lines)
+
+    table = miner.table(max_rows=5)
+    assert "| ERROR | 10000 |" in table
+    assert "more templates" in table
+    assert len(table.splitlines()) == 8
+    assert miner.exemplars(1) == "ERROR job 0 failed with code 0"
+
+
+def test_blank_lines_are_ignored():
+    miner = TemplateMiner().feed(["", "   ", "\n"])
+
+    assert miner.lines == 0
+    assert miner.templates() == []
+
+
+def test_sources_annotate_where_templates_occur():
+    miner = TemplateMiner()
+    miner.feed(["INFO ready", "ERROR disk failing on sdb"], source="pod-b")
+    miner.feed(["2026-05-01T10:00:09Z INFO ready"], source="pod-a")
+    miner.feed(["2026-05-01T10:00:01Z INFO ready"], source="pod-c")
+
+    assert miner.sources == {"pod-a", "pod-b", "pod-c"}
+    info = next(t for t in miner.templates() if t.level == "INFO")
+    assert info.sources == {"pod-b": 1, "pod-a": 1, "pod-c": 1}
+    # Interleaved sources keep the true time range.
+    assert (info.first_seen, info.last_seen) == ("2026-05-01T10:00:01Z", "2026-05-01T10:00:09Z")
+    table = miner.table()
+    assert "| Seen in |" in table
+    assert "| ERROR | 1 | 1/3: pod-b |" in table
+    assert "| INFO | 3 | all 3 |" in table
+
+
+def test_mostly_variable_lines_share_one_template():
+    lines = [f"10.0.{i % 200}.{i % 250} 200 {i % 97}ms" for i in range(20000)]
+
+    miner = TemplateMiner().feed(lines)
+
+    [template] = miner.templates()
+    assert template.count == 20000
+    assert template.text == f"{WILDCARD} {WILDCARD} {WILDCARD}"
+    assert miner.evicted == 0
+
+
+def test_key_value_samples_are_recorded():
+    miner = TemplateMiner().feed(["retry attempt=1 status=503", "retry attempt=2 status=503"])
+
+    [template] = miner.templates()
+    assert template.values == {1: ["1", "2"], 2: ["503"]}
@@ -0,0 +1,121 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.map_reduce import map_reduce, split_lines
+from app.tools.observability import analyze_heavy_logs
+
+
+def test_split_lines_keeps_lines_whole():
+    text = "".join(f"line {i:03d}\n" for i in range(100))  # 9 chars per line
+
+    chunks = split_lines(text, 40)
+
+    assert "".join(chunks) == text
+    assert all(len(c) <= 40 for c in chunks)
+    assert all(c.endswith("\n") for c in chunks)
+    assert len(chunks) == 25
+
+
+def test_split_lines_cuts_oversized_lines():
+    chunks = split_lines("a" * 25 + "\nshort\n", 10)
+
+    assert chunks == ["a" * 10, "a" * 10, "aaaaa\n", "short\n"]
+
+
+def test_every_chunk_is_analyzed_and_reduced_to_one_report():
+    seen = []
+    lock = threading.Lock()
+
+    def analyze(prompt):
+        with lock:
+            seen.append(prompt)
+        if "LOG PART:" in prompt:
+            return "finding " + prompt.rsplit("\n", 2)[-2]
+        return "merged"
+
+    text = "".join(f"ERROR event {i}\n" for i in range(1000))
+    report, chunks = map_reduce(text, analyze, context="ctx", max_chars=500)
+
+    assert report == "merged"
+    map_prompts = [p for p in seen if "LOG PART:" in p]
+    assert len(map_prompts) == chunks == len(split_lines(text, 500))
+    # The last line of the log was read.
+    assert any("ERROR event 999" in p for p in map_prompts)
+    reduce_prompts = [p for p in seen if "LOG PART:" not in p]
+    assert len(reduce_prompts) > 1  # hierarchical: more than one merge level
+    assert all(p.startswith("Context: ctx") for p in reduce_prompts)
+
+
+def test_concurrency_is_capped():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def analyze(prompt):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return "ok"
+
+    map_reduce("x\n" * 200, analyze, max_chars=10, concurrency=3)
+
+    assert peak[0] == 3
+
+
+def test_failed_chunk_does_not_lose_the_rest():
+    def analyze(prompt):
+        if "boom" in prompt:
+            raise RuntimeError("model overloaded")
+        return "partial" if "LOG PART:" in prompt else prompt
+
+    report, _ = map_reduce("boom\nfine\n", analyze, max_chars=5)
+
+    assert "(Analysis of this part failed: model overloaded)" in report
+    assert "partial" in report
+
+
+def test_all_chunks_failing_raises():
+    def analyze(prompt):
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError, match="down"):
+        map_reduce("a\nb\n", analyze, max_chars=2)
+
+
+@patch("app.llm.get_llm")
+@patch("app.llm.get_google_sdk_client", return_value=None)
+def test_heavy_logs_fallback_covers_whole_log_and_caches_chunks(mock_sdk, mock_get_llm, monkeypatch):
+    monkeypatch.setenv("LLM_CHUNK_CHARS", "1000")
+    llm = MagicMock()
+    llm.invoke.side_effect = lambda prompt: MagicMock(content=f"summary of {len(prompt)} chars")
+    mock_get_llm.return_value = llm
+    logs = "".join(f"2026-05-01T10:00:00Z ERROR request {i} failed\n" for i in range(500))
+
+    result = analyze_heavy_logs.invoke({"log_content": logs, "context": "first"})
+
+    assert "chunks map-reduced" in result
+    assert "TRUNCATED" not in str(llm.invoke.call_args_list)
+    map_calls = [c for c in llm.invoke.call_args_list if "LOG PART:" in c.args[0]]
+    assert len(map_calls) == len(split_lines(logs, 1000))
+
+    # Same log, new question: chunk findings come from the cache, only the merges rerun.
+    llm.invoke.reset_mock()
+    analyze_heavy_logs.invoke({"log_content": logs, "context": "second"})
+    assert llm.invoke.call_count > 0
+    assert not [c for c in llm.invoke.call_args_list if "LOG PART:" in c.args[0]]
+
+
+@patch("app.llm.get_llm")
+@patch("app.llm.get_google_sdk_client", return_value=None)
+def test_heavy_logs_small_input_is_one_call(mock_sdk, mock_get_llm):
+    mock_get_llm.return_value.invoke.return_value = MagicMock(content="DNS")
+
+    result = analyze_heavy_logs.invoke({"log_content": "Error: connection failed", "context": "test"})
+
+    assert result == "Analysis (Standard LLM Fallback):\nDNS"
+    mock_get_llm.return_value.invoke.assert_called_once()
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+import app.graph as graph
+from app.graph import PARALLEL_NODE, _route_result, parallel_specialists_node
+
+
+class FakeSpecialist:
+    """Async stand-in for a compiled ReAct specialist."""
+
+    def __init__(self, reply, delay=0.0, tracker=None):
+        self.reply = reply
+        self.delay = delay
+        self.tracker = tracker
+
+    async def ainvoke(self, inputs, config=None):
+        if self.tracker is not None:
+            self.tracker["running"] += 1
+            self.tracker["peak"] = max(self.tracker["peak"], self.tracker["running"])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            if self.tracker is not None:
+                self.tracker["running"] -= 1
+        return {"messages": list(inputs["messages"]) + [AIMessage(content=self.reply)]}
+
+
+def test_route_result_fans_out_only_to_safe_agents():
+    assert _route_result("Traefik_Specialist", ["Traefik_Specialist", "Datadog_Specialist"]) == {
+        "next": PARALLEL_NODE, "parallel": ["Traefik_Specialist", "Datadog_Specialist"]}
+    # Risky or unknown agents are filtered; a single branch is a normal hop.
+    assert _route_result("Traefik_Specialist", ["Traefik_Specialist", "Automation_Specialist", "Bogus"]) == {
+        "next": "Traefik_Specialist"}
+    assert _route_result("FINISH", None) == {"next": "FINISH"}
+
+
+@pytest.mark.asyncio
+async def test_branches_run_concurrently_and_merge_in_order():
+    fakes = {
+        "Traefik_Specialist": FakeSpecialist("Ingress healthy", delay=0.3),
+        "Datadog_Specialist": FakeSpecialist("p99 spike on checkout", delay=0.3),
+        "GCP_Specialist": FakeSpecialist("Cloud SQL CPU 98%", delay=0.3),
+    }
+    state = {"messages": [HumanMessage(content="5xx on checkout")],
+             "parallel": list(fakes)}
+
+    with patch.dict(graph.specialists, fakes), patch.object(graph, "FANOUT_MAX_CONCURRENCY", 3):
+        start = time.monotonic()
+        result = await parallel_specialists_node(state)
+        elapsed = time.monotonic() - start
+
+    assert elapsed < 0.6  # slowest branch, not the sum
+    assert [m.name for m in result["messages"]] == list(fakes)
+    assert result["messages"][2].content == "Cloud SQL CPU 98%"
+    assert result["parallel"] == []
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_branch_deadline():
+    tracker = {"running": 0, "peak": 0}
+    fakes = {
+        "Traefik_Specialist": FakeSpecialist("ok", delay=0.05, tracker=tracker),
+        "Datadog_Specialist": FakeSpecialist("ok", delay=0.05, tracker=tracker),
+        "GCP_Specialist": FakeSpecialist("never", delay=5, tracker=tracker),
+    }
+    state = {"messages": [HumanMessage(content="triage")], "parallel": list(fakes)}
+
+    with patch.dict(graph.specialists, fakes), \
+            patch.object(graph, "FANOUT_MAX_CONCURRENCY", 2), \
+            patch.object(graph, "FANOUT_BRANCH_TIMEOUT", 0.2):
+        result = await parallel_specialists_node(state)
+
+    assert tracker["peak"] == 2
+    timed_out = result["messages"][-1]
+    assert timed_out.name == "GCP_Specialist"
+    assert "did not finish" in timed_out.content
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_reports_each_parallel_branch():
+    from main import chat_endpoint, ChatRequest
+
+    async def mock_astream(inputs, config=None):
+        yield {"Supervisor": {"next": PARALLEL_NODE,
+                              "parallel": ["Traefik_Specialist", "Datadog_Specialist"]}}
+        yield {PARALLEL_NODE: {"messages": [
+            AIMessage(content="", name="Traefik_Specialist",
+                      tool_calls=[{"name": "check_traefik_health", "args": {}, "id": "call-1"}]),
+            ToolMessage(content="all routers up", name="check_traefik_health", tool_call_id="call-1"),
+            AIMessage(content="Ingress healthy", name="Traefik_Specialist"),
+            AIMessage(content="p99 spike", name="Datadog_Specialist")]}}
+        yield {"Supervisor": {"next": "FINISH"}}
+
+    mock_graph = MagicMock()
+    mock_graph.astream = mock_astream
+    mock_graph.get_state.return_value = MagicMock(values={}, next=None)
+
+    with patch("main.app_graph", mock_graph):
+        response = await chat_endpoint(ChatRequest(message="5xx triage", stream_tokens=False))
+        events = [json.loads(line) async for line in response.body_iterator if line.strip()]
+
+    activities = [e["agent"] for e in events if e["type"] == "activity"]
+    assert activities == ["Traefik_Specialist", "Datadog_Specialist"]
+    messages = {e["agent"]: e["content"] for e in events if e["type"] == "message"}
+    assert messages == {"Traefik_Specialist": "Ingress healthy", "Datadog_Specialist": "p99 spike"}
+    tool_events = [(e["type"], e["agent"]) for e in events if e["type"] in ("tool_call", "tool_output")]
+    assert tool_events == [("tool_call", "Traefik_Specialist"), ("tool_output", "Traefik_Specialist")]
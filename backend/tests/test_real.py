@@ -6,6 +6,7 @@ from app.tools.real import (
     get_active_alerts
 )
 import os
+import json
 
 
 def test_list_k8s_pods_success():
@@ -13,10 +14,13 @@ def test_list_k8s_pods_success():
     with patch('app.tools.real.config.load_kube_config'), \
             patch('app.tools.real.client.CoreV1Api') as mock_api:
         mock_v1 = MagicMock()
-        mock_pod = MagicMock()
-        mock_pod.metadata.name = "test-pod-1"
-        mock_pod.status.phase = "Running"
-        mock_v1.list_namespaced_pod.return_value.items = [mock_pod]
+        # Pods are listed as a server-side Table (name + status columns).
+        mock_v1.list_namespaced_pod.return_value.data = json.dumps({
+            "kind": "Table",
+            "columnDefinitions": [{"name": "Name"}, {"name": "Status"}],
+            "rows": [{"cells": ["test-pod-1", "Running"]}],
+            "metadata": {},
+        })
         mock_api.return_value = mock_v1
         result = list_k8s_pods.invoke({"namespace": "default"})
         assert "test-pod-1" in result
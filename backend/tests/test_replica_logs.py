@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.tools import real
+
+
+def _pod(name, labels, restarts=0, containers=("app",)):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, labels=labels),
+        spec=SimpleNamespace(containers=[SimpleNamespace(name=c) for c in containers]),
+        status=SimpleNamespace(container_statuses=[
+            SimpleNamespace(name=c, restart_count=restarts) for c in containers]))
+
+
+class ApiError(Exception):
+    def __init__(self, status):
+        super().__init__(f"({status})")
+        self.status = status
+
+
+def _client(pods, logs, selector=None):
+    """CoreV1Api mock: one Service (or a 404), a pod list and per-(pod, previous) logs."""
+    v1 = MagicMock()
+    if selector is None:
+        v1.read_namespaced_service.side_effect = ApiError(404)
+    else:
+        v1.read_namespaced_service.return_value = SimpleNamespace(spec=SimpleNamespace(selector=selector))
+
+    def list_pods(namespace, label_selector=None, limit=None):
+        wanted = dict(kv.split("=") for kv in label_selector.split(",")) if label_selector else {}
+        items = [p for p in pods if all(p.metadata.labels.get(k) == v for k, v in wanted.items())]
+        return SimpleNamespace(items=items, metadata=SimpleNamespace(_continue=None))
+    v1.list_namespaced_pod.side_effect = list_pods
+
+    def read_log(name, namespace, previous=False, **kwargs):
+        text = logs[(name, previous)]
+        if isinstance(text, Exception):
+            raise text
+        resp = MagicMock()
+        resp.stream.return_value = [text.encode()]
+        return resp
+    v1.read_namespaced_pod_log.side_effect = read_log
+    return v1
+
+
+def _diagnose(v1, llm_text="One node is failing."):
+    client = MagicMock()
+    client.models.generate_content.return_value.text = llm_text
+    with patch("app.tools.real._get_k8s_client", return_value=v1), \
+            patch("app.tools.real.list_k8s_pods") as pods_tool, \
+            patch("app.tools.real.get_cluster_events") as events_tool, \
+            patch("app.tools.real.get_google_sdk_client", return_value=client):
+        pods_tool.invoke.return_value = "Pods in default: ..."
+        events_tool.invoke.return_value = "No events."
+        result = real.diagnose_service_health.invoke({"service_name": "api"})
+    return result, client
+
+
+STARTED = "2026-05-01T10:00:00Z INFO server started on port 8080\n"
+
+
+def test_all_replicas_through_selector_in_one_analysis():
+    pods = [_pod("api-7d9-a", {"app": "api"}), _pod("api-7d9-b", {"app": "api"}, restarts=2),
+            _pod("api-worker-c", {"app": "worker"})]
+    logs = {
+        ("api-7d9-a", False): STARTED,
+        ("api-7d9-b", False): STARTED + "2026-05-01T10:00:05Z ERROR read failed on /dev/sdb\n",
+        ("api-7d9-b", True): "2026-05-01T09:59:00Z FATAL disk /dev/sdb I/O error\n",
+    }
+    v1 = _client(pods, logs, selector={"app": "api"})
+
+    result, client = _diagnose(v1)
+
+    client.models.generate_content.assert_called_once()
+    prompt = client.models.generate_content.call_args.kwargs["contents"]
+    assert "| INFO | 2 | all 2 |" in prompt
+    assert "| FATAL | 1 | 1/2: api-7d9-b |" in prompt
+    assert "| ERROR | 1 | 1/2: api-7d9-b |" in prompt
+    assert "api-worker-c" not in prompt
+    assert "2 replicas (selector app=api), 2 containers + 1 previous (restarted) containers" in result
+    assert "One node is failing." in result
+    previous = [c.kwargs["name"] for c in v1.read_namespaced_pod_log.call_args_list if c.kwargs["previous"]]
+    assert previous == ["api-7d9-b"]
+
+
+def test_falls_back_to_name_prefix_without_service():
+    pods = [_pod("api-1", {}), _pod("api-2", {}), _pod("db-0", {})]
+    logs = {("api-1", False): STARTED, ("api-2", False): STARTED}
+    v1 = _client(pods, logs)
+
+    result, client = _diagnose(v1)
+
+    assert "2 replicas (name prefix 'api-')" in result
+    assert "| INFO | 2 | all 2 |" in client.models.generate_content.call_args.kwargs["contents"]
+
+
+def test_unreadable_replica_does_not_hide_the_others():
+    pods = [_pod("api-1", {"app": "api"}), _pod("api-2", {"app": "api"})]
+    logs = {("api-1", False): STARTED, ("api-2", False): ApiError(500)}
+    v1 = _client(pods, logs, selector={"app": "api"})
+
+    result, _ = _diagnose(v1)
+
+    assert "Could not read: api-2/app: (500)" in result
+    assert "server started on port" in result
+
+
+def test_no_pods_behind_selector():
+    v1 = _client([], {}, selector={"app": "api"})
+
+    result, client = _diagnose(v1)
+
+    assert "No pods found for 'api' (selector app=api)." in result
+    client.models.generate_content.assert_not_called()
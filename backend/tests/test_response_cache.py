@@ -0,0 +1,93 @@
+import time
+from unittest.mock import MagicMock, patch
+
+from app.cache import DEFAULT_TTLS, ResponseCache
+from app.llm import cached_generate_content, cached_invoke, generate_diagnosis
+
+
+def test_cache_key_is_content_addressed():
+    k1 = ResponseCache.make_key("gemini-1.5-flash", "sys", "prompt")
+    k2 = ResponseCache.make_key("gemini-1.5-flash", "sys", "prompt")
+    k3 = ResponseCache.make_key("llama3", "sys", "prompt")
+    assert k1 == k2
+    assert k1 != k3
+
+
+def test_persistent_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ResponseCache(path=path)
+    first.set("k", "cached diagnosis", tool="generate_diagnosis")
+
+    second = ResponseCache(path=path)
+    assert second.get("k") == "cached diagnosis"
+    assert second.stats()["disk_hits"] == 1
+    # Promoted to the memory tier
+    assert second.get("k") == "cached diagnosis"
+    assert second.stats()["memory_hits"] == 1
+
+
+def test_lru_evicts_oldest_entry(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "c.db"), max_entries=2)
+    for k in ("a", "b", "c"):
+        cache.set(k, k.upper())
+    assert list(cache._memory) == ["b", "c"]
+
+
+def test_entries_expire_per_tool_ttl(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_TTL_SCAN_INFRASTRUCTURE", "1")
+    cache = ResponseCache(path=str(tmp_path / "c.db"))
+    cache.set("k", "ok", tool="scan_infrastructure")
+
+    with patch("app.cache.time.time", return_value=time.time() + 5):
+        assert cache.get("k") is None
+
+
+def test_invalid_ttl_override_falls_back_to_default(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_TTL_SCAN_INFRASTRUCTURE", "soon")
+    assert ResponseCache.ttl_for("scan_infrastructure") == DEFAULT_TTLS["scan_infrastructure"]
+
+
+def test_cached_generate_content_hits_sdk_once(isolate_response_cache):
+    client = MagicMock()
+    client.models.generate_content.return_value = MagicMock(text="Root cause: DNS")
+
+    assert cached_generate_content(client, ["sys", "logs"]) == "Root cause: DNS"
+    assert cached_generate_content(client, ["sys", "logs"]) == "Root cause: DNS"
+
+    client.models.generate_content.assert_called_once()
+    assert isolate_response_cache.stats()["memory_hits"] == 1
+
+
+def test_bypass_flag_skips_lookup(monkeypatch):
+    llm = MagicMock()
+    llm.invoke.return_value = MagicMock(content="fresh")
+
+    cached_invoke(llm, "prompt")
+    cached_invoke(llm, "prompt", bypass=True)
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "true")
+    cached_invoke(llm, "prompt")
+
+    assert llm.invoke.call_count == 3
+
+
+def test_generate_diagnosis_repeat_is_served_from_cache():
+    llm = MagicMock()
+    llm.invoke.return_value = MagicMock(content="OOMKilled")
+
+    with patch("app.llm.get_google_sdk_client", return_value=None), \
+            patch("app.llm.get_llm", return_value=llm):
+        assert generate_diagnosis("why is it crashing?") == "OOMKilled"
+        assert generate_diagnosis("why is it crashing?") == "OOMKilled"
+
+    llm.invoke.assert_called_once()
+
+
+def test_failed_calls_are_not_cached():
+    client = MagicMock()
+    client.models.generate_content.side_effect = [Exception("quota"), MagicMock(text="ok")]
+
+    try:
+        cached_generate_content(client, "prompt")
+    except Exception:
+        pass
+    assert cached_generate_content(client, "prompt") == "ok"
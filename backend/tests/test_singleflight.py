@@ -0,0 +1,106 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.singleflight import SingleFlight, call_key
+
+
+def _wait_for_waiters(sf, key, n):
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if sf.stats()["keys"].get(key, {}).get("coalesced", 0) >= n:
+            return
+        time.sleep(0.01)
+
+
+def test_concurrent_identical_calls_execute_once():
+    sf = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_scan():
+        calls.append(1)
+        release.wait(5)
+        return "scan result"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(sf.do, "scan", slow_scan) for _ in range(5)]
+        _wait_for_waiters(sf, "scan", 4)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert results == ["scan result"] * 5
+    assert len(calls) == 1
+    stats = sf.stats()["keys"]["scan"]
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["max_waiters"] == 4
+    assert sf.stats()["inflight"] == 0
+
+
+def test_waiters_receive_leader_exception():
+    sf = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("API server unavailable")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(sf.do, "k", failing) for _ in range(2)]
+        _wait_for_waiters(sf, "k", 1)
+        release.set()
+        for f in futures:
+            with pytest.raises(RuntimeError):
+                f.result()
+
+
+def test_sequential_calls_are_not_cached():
+    sf = SingleFlight()
+    fn = MagicMock(side_effect=["a", "b"])
+    assert sf.do("k", fn) == "a"
+    assert sf.do("k", fn) == "b"
+
+
+def test_reentrant_leader_does_not_deadlock():
+    sf = SingleFlight()
+
+    def outer():
+        return sf.do("k", lambda: "inner")
+
+    assert sf.do("k", outer) == "inner"
+
+
+def test_call_key_is_argument_order_independent():
+    assert call_key("t", namespace="a", lines=5) == call_key(
+        "t", lines=5, namespace="a")
+
+
+def test_read_only_tools_are_coalesced():
+    from app.singleflight import singleflight
+    from app.tools import list_k8s_pods
+
+    release = threading.Event()
+    v1 = MagicMock()
+
+    def slow_list(namespace, **kwargs):
+        release.wait(5)
+        return MagicMock(data='{"kind": "Table", "rows": [], "metadata": {}}')
+
+    v1.list_namespaced_pod.side_effect = slow_list
+    key = call_key("tool:list_k8s_pods", namespace="default", context="", label_selector="",
+                   field_selector="", max_pods=100)
+
+    with patch("app.tools.real._get_k8s_client", return_value=v1):
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(list_k8s_pods.invoke, {"namespace": "default"})
+                       for _ in range(3)]
+            _wait_for_waiters(singleflight, key, 2)
+            release.set()
+            results = [f.result() for f in futures]
+
+    assert v1.list_namespaced_pod.call_count == 1
+    assert len(set(results)) == 1
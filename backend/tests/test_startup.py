@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for a cold CI runner; eager imports used to take >10s.
+IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET", "5"))
+
+HEAVY_MODULES = [
+    "kubernetes",
+    "google.cloud.logging",
+    "datadog_api_client",
+    "langchain_chroma",
+    "langchain_huggingface",
+    "sentence_transformers",
+    "torch",
+    "langchain_google_genai",
+    "google.genai",
+    "langchain_ollama",
+    "ollama",
+    "app.tools.real",
+]
+
+
+def _run(code):
+    """Runs `code` in a fresh interpreter so import caching does not skew timings."""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, LLM_PROVIDER="ollama")
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, timeout=120, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_main_is_fast_and_skips_vendor_sdks():
+    result = _run(
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS, f"import main took {result['elapsed']:.2f}s"
+
+
+def test_specialist_is_built_on_first_use():
+    result = _run(
+        "import json, sys\n"
+        "import app.graph as g\n"
+        "before = [s.built for s in g.specialists.values()]\n"
+        "g.k8s_agent.agent\n"
+        "print(json.dumps({'before': before, 'k8s': g.k8s_agent.built,\n"
+        "                  'gcp': g.gcp_agent.built, 'real': 'app.tools.real' in sys.modules}))\n"
+    )
+    assert not any(result["before"])
+    assert result["k8s"] and result["real"]
+    assert not result["gcp"]
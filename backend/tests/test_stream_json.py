@@ -61,7 +61,7 @@ async def test_chat_endpoint_streams_tool_output():
     with pytest.MonkeyPatch.context() as m:
         m.setattr("main.app_graph", mock_graph)
 
-        request = ChatRequest(message="status")
+        request = ChatRequest(message="status", stream_tokens=False)
         response = await chat_endpoint(request)
 
         # Consume the stream
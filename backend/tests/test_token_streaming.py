@@ -0,0 +1,123 @@
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+import app.graph as graph
+import app.tools as tools
+from app.graph import _route_result
+
+
+class StreamingFakeLLM(BaseChatModel):
+    """Streams its reply word by word; calls `tool_name` first when set."""
+
+    tool_name: str = ""
+
+    @property
+    def _llm_type(self):
+        return "streaming-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages):
+        if self.tool_name and not isinstance(messages[-1], ToolMessage):
+            return AIMessage(content="", tool_calls=[{"name": self.tool_name, "args": {}, "id": "call-1"}])
+        persona = str(messages[0].content)
+        return AIMessage(content="Ingress routes look healthy" if "Traefik" in persona else "Edge cache is warm")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": tc["name"], "args": "{}", "id": tc["id"], "index": 0} for tc in reply.tool_calls]))
+            return
+        words = reply.content.split(" ")
+        for i, word in enumerate(words):
+            text = word if i == len(words) - 1 else word + " "
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                await run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+
+async def _collect(request):
+    from main import chat_endpoint
+    response = await chat_endpoint(request)
+    return [json.loads(line) async for line in response.body_iterator if line.strip()]
+
+
+@pytest.mark.asyncio
+async def test_tokens_and_tool_events_stream_before_the_final_message():
+    from main import ChatRequest
+
+    async def fake_health(*args, **kwargs):
+        return "Traefik API: 12 routers, 0 errors"
+
+    health = tools.check_traefik_health
+    with patch.object(graph, "llm", StreamingFakeLLM(tool_name="check_traefik_health")), \
+            patch.object(health, "coroutine", fake_health), \
+            patch.object(graph, "_llm_route", return_value={"next": "FINISH"}):
+        events = await _collect(ChatRequest(message="check traefik", thread_id=str(uuid.uuid4())))
+
+    types = [e["type"] for e in events]
+    tokens = [e for e in events if e["type"] == "token"]
+    assert {e["agent"] for e in tokens} == {"Traefik_Specialist"}
+    assert "".join(e["content"] for e in tokens) == "Ingress routes look healthy"
+
+    start = next(e for e in events if e["type"] == "tool_start")
+    end = next(e for e in events if e["type"] == "tool_end")
+    assert start == {"type": "tool_start", "agent": "Traefik_Specialist",
+                     "tool": "check_traefik_health", "args": {}}
+    assert end["content"] == "Traefik API: 12 routers, 0 errors"
+
+    # Live events come first; the node-level message follows when the node finishes.
+    message_at = len(types) - 1 - types[::-1].index("message")
+    assert types.index("tool_start") < types.index("tool_end") < types.index("token") < message_at
+    assert events[message_at]["content"] == "Ingress routes look healthy"
+    assert types[-1] == "final"
+
+
+@pytest.mark.asyncio
+async def test_parallel_branch_tokens_are_attributed_to_their_specialist():
+    from main import ChatRequest
+
+    fanout = _route_result("Traefik_Specialist", ["Traefik_Specialist", "Azion_Specialist"])
+    not_confident = {"agent": None, "confidence": 0.0, "method": "keywords", "confident": False}
+    with patch.object(graph, "llm", StreamingFakeLLM()), \
+            patch.object(graph.fast_router, "classify", return_value=not_confident), \
+            patch.object(graph, "_llm_route", side_effect=[fanout, {"next": "FINISH"}]):
+        events = await _collect(ChatRequest(message="users see 5xx", thread_id=str(uuid.uuid4())))
+
+    text = {}
+    for e in events:
+        if e["type"] == "token":
+            text[e["agent"]] = text.get(e["agent"], "") + e["content"]
+    assert text == {"Traefik_Specialist": "Ingress routes look healthy",
+                    "Azion_Specialist": "Edge cache is warm"}
+
+
+@pytest.mark.asyncio
+async def test_legacy_flag_keeps_node_level_stream():
+    from main import ChatRequest
+
+    async def mock_astream(inputs, config=None):
+        yield {"Supervisor": {"next": "K8s_Specialist"}}
+        yield {"K8s_Specialist": {"messages": [AIMessage(content="3 pods running")]}}
+
+    mock_graph = MagicMock()
+    mock_graph.astream = mock_astream
+    mock_graph.get_state.return_value = MagicMock(values={}, next=None)
+
+    with patch("main.app_graph", mock_graph):
+        events = await _collect(ChatRequest(message="pods?", stream_tokens=False))
+
+    mock_graph.astream_events.assert_not_called()
+    assert [e["type"] for e in events] == ["activity", "message", "final"]